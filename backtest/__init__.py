@@ -0,0 +1,12 @@
+"""
+Backtesting of preset parameters against stored market history.
+"""
+
+from .engine import BacktestConfig, BacktestResult, ParameterGrid, run_backtest
+
+__all__ = [
+    'BacktestConfig',
+    'BacktestResult',
+    'ParameterGrid',
+    'run_backtest'
+]
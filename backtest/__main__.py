@@ -0,0 +1,97 @@
+"""
+Command-line backtest runner.
+
+Example:
+    python -m backtest --asset BTC --strategy straddle --start 2025-01-01 \
+        --end 2025-06-30 --sl 20:100:5 --target 0,20:200:10 --sync
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backtest.engine import STRATEGIES, BacktestConfig, ParameterGrid, run_backtest
+from delta.market_history import market_history
+
+
+def _values(spec: str) -> list:
+    """Parse '10,20,30' and 'start:stop:step' (inclusive) lists."""
+    values = []
+    for part in spec.split(','):
+        if ':' in part:
+            start, stop, step = map(float, part.split(':'))
+            values.extend(np.arange(start, stop + step / 2, step).round(6).tolist())
+        else:
+            values.append(float(part))
+    return values
+
+
+def _timestamp(date: str) -> int:
+    return int(datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+async def _sync(symbol: str, resolution: str, start: int, end: int):
+    from delta.client import DeltaClient
+
+    # Candles are a public endpoint, no API keys needed
+    client = DeltaClient('', '')
+    try:
+        await market_history.sync_candles(client, symbol, resolution, start, end)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest preset parameters on stored candles")
+    parser.add_argument('--asset', default='BTC', choices=['BTC', 'ETH'])
+    parser.add_argument('--strategy', default='straddle', choices=STRATEGIES)
+    parser.add_argument('--start', required=True, help="YYYY-MM-DD (UTC)")
+    parser.add_argument('--end', required=True, help="YYYY-MM-DD (UTC)")
+    parser.add_argument('--resolution', default='5m')
+    parser.add_argument('--entry-time', default='09:30', help="Daily entry time, HH:MM IST")
+    parser.add_argument('--sl', default='0,25:100:5', help="SL trigger %% values (0 = no SL)")
+    parser.add_argument('--target', default='0,25:100:5', help="Target trigger %% values (0 = no target)")
+    parser.add_argument('--offsets', default='0', help="ATM offsets (straddle/MOVE)")
+    parser.add_argument('--otm', default='percentage:2,percentage:5',
+                        help="OTM selections type:value (strangle)")
+    parser.add_argument('--direction', default='short', help="long, short or long,short")
+    parser.add_argument('--lot-size', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sync', action='store_true', help="Append candles newer than the last stored one before running")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    symbol = f"{args.asset}USD"
+    start, end = _timestamp(args.start), _timestamp(args.end)
+    if args.sync:
+        asyncio.run(_sync(symbol, args.resolution, start, end))
+    candles = market_history.read_candles(symbol, args.resolution, start, end)
+    if not len(candles):
+        parser.error(f"No stored {args.resolution} candles for {symbol} (use --sync)")
+
+    grid = ParameterGrid(
+        sl_trigger_pct=_values(args.sl),
+        target_trigger_pct=_values(args.target),
+        direction=tuple(args.direction.split(',')),
+        atm_offset=[int(v) for v in _values(args.offsets)],
+        otm_selection=[(t, float(v)) for t, v in (s.split(':') for s in args.otm.split(','))]
+    )
+    config = BacktestConfig(
+        strategy=args.strategy,
+        asset=args.asset,
+        resolution=args.resolution,
+        entry_time=args.entry_time,
+        lot_size=args.lot_size
+    )
+
+    result = run_backtest(candles, config, grid, workers=args.workers)
+    print(f"{len(result.rows)} combinations, {result.days} days "
+          f"({result.first_day} → {result.last_day}) in {result.elapsed:.2f}s")
+    for row in result.best(args.top):
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+"""
+Vectorized backtester for straddle, strangle and MOVE presets.
+
+Each trading day is one trade: at the preset's entry time (IST) strikes
+are chosen from the spot price with the same helpers the live strategies
+use (calculate_atm_strike for straddles and MOVE, calculate_otm_strikes
+for strangles), then held to the next daily settlement. Historical
+option quotes are not stored, so leg premiums are modelled from the
+underlying candles with Black-Scholes at the trailing realized vol.
+
+Stop-loss and target triggers are percentages of each leg's entry
+premium, as in BaseStrategy.calculate_sl_target_prices and
+MoveTradeExecutor.calculate_sl_target_prices. For every day the running
+max/min of a leg's return is searched once for all thresholds, so a whole
+SL x target x direction grid is evaluated in a few array operations.
+Strike configurations (ATM offsets / OTM selections) are distributed
+over a process pool.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+
+from delta.market_history import CandleSeries, RESOLUTION_SECONDS
+from delta.greeks import SECONDS_PER_YEAR, SETTLEMENT_HOUR_UTC, bs_price
+from delta.utils.atm_calculator import calculate_atm_strike
+from delta.utils.otm_calculator import calculate_otm_strikes
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+STRATEGIES = ('straddle', 'strangle', 'move')
+
+# Underlying units per contract
+CONTRACT_VALUE = {'BTC': 0.001, 'ETH': 0.01}
+
+
+@dataclass
+class BacktestConfig:
+    """Fixed settings of a backtest run."""
+
+    strategy: str
+    asset: str
+    resolution: str = '5m'
+    entry_time: str = '09:30'
+    lot_size: int = 1
+    vol_lookback_days: int = 7
+    vol_multiplier: float = 1.0
+
+
+@dataclass
+class ParameterGrid:
+    """Preset parameters to sweep; every combination is evaluated."""
+
+    sl_trigger_pct: Sequence[float] = (50.0,)
+    target_trigger_pct: Sequence[float] = (0.0,)
+    direction: Sequence[str] = ('short',)
+    atm_offset: Sequence[int] = (0,)
+    otm_selection: Sequence[Tuple[str, float]] = (('percentage', 5.0),)
+
+    def strike_configs(self, strategy: str) -> List[Dict[str, Any]]:
+        """Strike-selection parameters for a strategy (one process-pool task each)."""
+        if strategy == 'strangle':
+            return [{'otm_selection': {'type': t, 'value': v}} for t, v in self.otm_selection]
+        return [{'atm_offset': offset} for offset in self.atm_offset]
+
+    def size(self, strategy: str) -> int:
+        """Number of parameter combinations."""
+        return (len(self.strike_configs(strategy)) * len(self.direction)
+                * len(self.sl_trigger_pct) * len(self.target_trigger_pct))
+
+
+@dataclass
+class BacktestResult:
+    """Per-combination statistics of a run."""
+
+    rows: List[Dict[str, Any]]
+    days: int
+    elapsed: float
+    first_day: Optional[str] = None
+    last_day: Optional[str] = None
+    config: Optional[BacktestConfig] = field(default=None, repr=False)
+
+    def best(self, n: int = 10, key: str = 'total_pnl') -> List[Dict[str, Any]]:
+        """Top combinations by a statistic."""
+        return sorted(self.rows, key=lambda row: row[key], reverse=True)[:n]
+
+
+@dataclass
+class _Days:
+    """Day-by-step matrices shared by every strike configuration."""
+
+    dates: List[str]
+    spot: np.ndarray       # (days, steps) underlying price, padded past expiry
+    tau: np.ndarray        # (days, steps) years to settlement
+    valid: np.ndarray      # (days, steps) step is at or before settlement
+    vol: np.ndarray        # (days,) annualized vol used for pricing
+
+
+def _entry_and_expiry(day: datetime, entry_time: str) -> Tuple[int, int]:
+    """Entry timestamp for a date and the first daily settlement after it."""
+    hour, minute = map(int, entry_time.split(':'))
+    entry = IST.localize(day.replace(hour=hour, minute=minute)).astimezone(timezone.utc)
+    expiry = entry.replace(hour=SETTLEMENT_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if expiry <= entry:
+        expiry += timedelta(days=1)
+    return int(entry.timestamp()), int(expiry.timestamp())
+
+
+def prepare_days(candles: CandleSeries, config: BacktestConfig) -> _Days:
+    """
+    Cut candles into one entry-to-settlement path per day.
+
+    Args:
+        candles: Underlying candles at config.resolution
+        config: Backtest settings
+
+    Returns:
+        Day matrices (days without full coverage or vol history are skipped)
+    """
+    step = RESOLUTION_SECONDS[config.resolution]
+    lookback = int(config.vol_lookback_days * 86400 / step)
+    periods_per_year = SECONDS_PER_YEAR / step
+    log_close = np.log(candles.close)
+
+    first = datetime.fromtimestamp(int(candles.time[0]), IST).replace(tzinfo=None)
+    last = datetime.fromtimestamp(int(candles.time[-1]), IST).replace(tzinfo=None)
+
+    dates, paths, taus, vols = [], [], [], []
+    day = first.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day <= last:
+        entry, expiry = _entry_and_expiry(day, config.entry_time)
+        day += timedelta(days=1)
+
+        i0 = int(np.searchsorted(candles.time, entry))
+        i1 = int(np.searchsorted(candles.time, expiry - step, side='right'))
+        if i0 >= len(candles) or candles.time[i0] != entry or i1 <= i0 or candles.time[i1 - 1] + step < expiry:
+            continue
+        if i0 < lookback:
+            continue
+
+        returns = np.diff(log_close[i0 - lookback:i0])
+        vol = float(np.std(returns) * np.sqrt(periods_per_year)) * config.vol_multiplier
+        if not np.isfinite(vol) or vol <= 0:
+            continue
+
+        # Entry at the open of the entry candle, then every candle close
+        path = np.concatenate([[candles.open[i0]], candles.close[i0:i1]])
+        stamps = np.concatenate([[entry], candles.time[i0:i1] + step])
+        dates.append(datetime.fromtimestamp(entry, IST).strftime('%Y-%m-%d'))
+        paths.append(path)
+        # Floor at one second so settlement prices at intrinsic without 0/0
+        taus.append(np.maximum(expiry - stamps, 1) / SECONDS_PER_YEAR)
+        vols.append(vol)
+
+    steps = max((len(p) for p in paths), default=0)
+    spot = np.empty((len(paths), steps))
+    tau = np.zeros((len(paths), steps))
+    valid = np.zeros((len(paths), steps), dtype=bool)
+    for i, (path, t) in enumerate(zip(paths, taus)):
+        spot[i, :len(path)] = path
+        spot[i, len(path):] = path[-1]
+        tau[i, :len(t)] = t
+        tau[i, len(t):] = t[-1]
+        valid[i, :len(path)] = True
+
+    return _Days(dates=dates, spot=spot, tau=tau, valid=valid, vol=np.asarray(vols))
+
+
+def _legs(strategy: str, asset: str, entry_spots: np.ndarray, params: Dict[str, Any]) -> List[Tuple[np.ndarray, Tuple[bool, ...]]]:
+    """
+    Strikes per day for each leg, chosen with the live strike helpers.
+
+    Returns:
+        [(strikes (days,), option types)] - a MOVE leg is a call+put pair
+    """
+    if strategy == 'strangle':
+        selection = params['otm_selection']
+        pairs = [calculate_otm_strikes(s, asset, selection['type'], selection['value']) for s in entry_spots]
+        calls = np.array([c for c, _ in pairs], dtype=float)
+        puts = np.array([p for _, p in pairs], dtype=float)
+        return [(calls, (True,)), (puts, (False,))]
+
+    strikes = np.array([calculate_atm_strike(s, asset, params['atm_offset']) for s in entry_spots], dtype=float)
+    if strategy == 'move':
+        return [(strikes, (True, False))]
+    return [(strikes, (True,)), (strikes, (False,))]
+
+
+def _first_crossing(levels: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """
+    First step at which each non-decreasing row reaches each threshold.
+
+    Rows are shifted into disjoint ranges and searched as one flat array.
+
+    Args:
+        levels: (days, steps), non-decreasing along steps
+        thresholds: (n,) finite thresholds
+
+    Returns:
+        (days, n) step indices; `steps` where a row never reaches a threshold
+    """
+    days, steps = levels.shape
+    lo = min(levels.min(), thresholds.min())
+    span = max(levels.max(), thresholds.max()) - lo + 1.0
+    offset = np.arange(days)[:, None] * span
+    flat = (levels - lo + offset).ravel()
+    queries = thresholds[None, :] - lo + offset
+    return np.searchsorted(flat, queries, side='left') - np.arange(days)[:, None] * steps
+
+
+def _leg_outcomes(
+    premium: np.ndarray,
+    valid: np.ndarray,
+    sl_pct: np.ndarray,
+    target_pct: np.ndarray,
+    short: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Exit return of one leg for every (SL, target, day).
+
+    Returns:
+        (exit_return, sl_hit, target_hit), each (n_sl, n_target, days);
+        returns are relative to the entry premium (long perspective)
+    """
+    days, steps = premium.shape
+    last = valid.sum(axis=1) - 1
+    rows = np.arange(days)
+
+    returns = premium / np.maximum(premium[:, :1], 1e-12) - 1.0
+    returns = np.where(valid, returns, returns[rows, last][:, None])
+
+    rising = np.maximum.accumulate(returns, axis=1)
+    falling = -np.minimum.accumulate(returns, axis=1)
+    sl_levels, target_levels = (rising, falling) if short else (falling, rising)
+
+    def crossings(levels: np.ndarray, pct: np.ndarray, cap: float = np.inf) -> np.ndarray:
+        enabled = (pct > 0) & (pct < cap)
+        index = np.full((days, len(pct)), steps)
+        if enabled.any():
+            index[:, enabled] = _first_crossing(levels, pct[enabled] / 100.0)
+        return index
+
+    # A long SL at 100% or more sits at a zero price and never triggers
+    sl_index = crossings(sl_levels, sl_pct, np.inf if short else 100.0).T[:, None, :]              # (n_sl, 1, days)
+    target_index = crossings(target_levels, target_pct).T[None, :, :]  # (1, n_target, days)
+
+    sl_hit = (sl_index <= target_index) & (sl_index < steps)
+    target_hit = (target_index < sl_index)
+    exit_index = np.where(sl_hit, sl_index, np.where(target_hit, target_index, last[None, None, :]))
+    exit_index = np.minimum(exit_index, last[None, None, :])
+    return returns[rows, exit_index], sl_hit, target_hit
+
+
+def _run_strike_config(
+    strategy: str,
+    asset: str,
+    params: Dict[str, Any],
+    days: _Days,
+    grid: ParameterGrid,
+    lot_size: int
+) -> List[Dict[str, Any]]:
+    """Evaluate every direction x SL x target combination for one strike configuration."""
+    sl_pct = np.asarray(grid.sl_trigger_pct, dtype=float)
+    target_pct = np.asarray(grid.target_trigger_pct, dtype=float)
+    scale = lot_size * CONTRACT_VALUE.get(asset.upper(), 1.0)
+
+    legs = []
+    for strikes, types in _legs(strategy, asset, days.spot[:, 0], params):
+        premium = sum(
+            bs_price(days.spot, strikes[:, None], days.tau, days.vol[:, None], np.full(days.spot.shape, is_call))
+            for is_call in types
+        )
+        legs.append(premium)
+
+    rows = []
+    for direction in grid.direction:
+        short = direction == 'short'
+        pnl = 0.0
+        sl_hits = np.zeros((len(sl_pct), len(target_pct), len(days.dates)), dtype=bool)
+        target_hits = np.zeros_like(sl_hits)
+        for premium in legs:
+            exit_return, sl_hit, target_hit = _leg_outcomes(premium, days.valid, sl_pct, target_pct, short)
+            leg_pnl = exit_return * premium[:, 0][None, None, :] * scale
+            pnl = pnl + (-leg_pnl if short else leg_pnl)
+            sl_hits |= sl_hit
+            target_hits |= target_hit
+
+        equity = np.cumsum(pnl, axis=2)
+        drawdown = (np.maximum.accumulate(equity, axis=2) - equity).max(axis=2)
+        total = pnl.sum(axis=2)
+        win_rate = (pnl > 0).mean(axis=2)
+
+        for i, sl in enumerate(sl_pct):
+            for j, target in enumerate(target_pct):
+                rows.append({
+                    **params,
+                    'direction': direction,
+                    'sl_trigger_pct': float(sl),
+                    'target_trigger_pct': float(target),
+                    'total_pnl': round(float(total[i, j]), 4),
+                    'mean_pnl': round(float(total[i, j]) / len(days.dates), 4),
+                    'win_rate': round(float(win_rate[i, j]), 4),
+                    'max_drawdown': round(float(drawdown[i, j]), 4),
+                    'sl_hits': int(sl_hits[i, j].sum()),
+                    'target_hits': int(target_hits[i, j].sum())
+                })
+    return rows
+
+
+def run_backtest(
+    candles: CandleSeries,
+    config: BacktestConfig,
+    grid: ParameterGrid,
+    workers: Optional[int] = None
+) -> BacktestResult:
+    """
+    Evaluate every parameter combination over the candle history.
+
+    Args:
+        candles: Underlying candles at config.resolution
+        config: Fixed run settings
+        grid: Parameters to sweep
+        workers: Processes to use (None = CPU count, 1 = run inline)
+
+    Returns:
+        BacktestResult with one row per combination
+
+    Raises:
+        ValueError: If the strategy is unknown or no day has full data
+    """
+    if config.strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {config.strategy}. Supported: {list(STRATEGIES)}")
+
+    started = time.perf_counter()
+    days = prepare_days(candles, config)
+    if not days.dates:
+        raise ValueError("No day in the candle history covers entry to settlement")
+
+    configs = grid.strike_configs(config.strategy)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    args = [(config.strategy, config.asset, params, days, grid, config.lot_size) for params in configs]
+
+    if workers <= 1:
+        results = [_run_strike_config(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_strike_config, *zip(*args)))
+
+    rows = [row for result in results for row in result]
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Backtest {config.strategy} {config.asset}: {len(rows)} combinations over "
+        f"{len(days.dates)} days in {elapsed:.2f}s ({workers} worker(s))"
+    )
+    return BacktestResult(
+        rows=rows,
+        days=len(days.dates),
+        elapsed=elapsed,
+        first_day=days.dates[0],
+        last_day=days.dates[-1],
+        config=config
+    )
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for the bot's latency-critical paths.
+
+Run with `python -m benchmarks` (same environment as the bot).
+"""
@@ -0,0 +1,80 @@
+"""
+Run the benchmark suite.
+
+    python -m benchmarks                     # run everything, compare with last saved run
+    python -m benchmarks -k select --quick   # subset, fewer iterations
+    python -m benchmarks --save              # append this run to results/history.jsonl
+    python -m benchmarks --fail-on-regression
+"""
+
+import argparse
+import importlib
+import sys
+
+from benchmarks import harness
+
+# Benchmark modules (importing registers their benchmarks)
+BENCH_MODULES = (
+    'benchmarks.bench_selection',
+    'benchmarks.bench_client',
+    'benchmarks.bench_state',
+    'benchmarks.bench_formatting',
+)
+
+COLUMNS = ('p50_us', 'p99_us', 'mean_us', 'ops_per_sec', 'peak_kib_per_op', 'retained_blocks_per_op')
+
+
+def _report(name: str, stats: dict):
+    print(f"{name:<28}" + "".join(f"{stats[column]:>24}" for column in COLUMNS), flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Critical-path micro-benchmarks')
+    parser.add_argument('-k', '--filter', help='Only run benchmarks whose name or group contains this')
+    parser.add_argument('--quick', action='store_true', help='Run a tenth of the iterations')
+    parser.add_argument('--save', action='store_true', help='Append results to the history file')
+    parser.add_argument('--threshold', type=float, default=harness.DEFAULT_THRESHOLD,
+                        help='Relative increase reported as a regression (default %(default)s)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 if anything regressed')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    args = parser.parse_args()
+
+    for module in BENCH_MODULES:
+        importlib.import_module(module)
+
+    names = [
+        name for name, bench in harness.BENCHMARKS.items()
+        if not args.filter or args.filter in name or args.filter == bench.group
+    ]
+    if args.list:
+        for name in names:
+            print(f"{harness.BENCHMARKS[name].group:<12}{name}")
+        return 0
+    if not names:
+        print(f"No benchmarks match '{args.filter}'")
+        return 1
+
+    print(f"{'benchmark':<28}" + "".join(f"{column:>24}" for column in COLUMNS))
+    results = harness.run(names, scale=0.1 if args.quick else 1.0, report=_report)
+
+    machine = harness.machine_id()
+    previous = [entry for entry in harness.load_history() if entry.get('machine') == machine]
+    regressions = []
+    if previous:
+        baseline = previous[-1]
+        regressions = harness.compare(baseline['results'], results, args.threshold)
+        print(f"\nCompared with {baseline['timestamp']} ({baseline.get('commit') or 'unknown commit'}):")
+        for line in regressions or ['no regressions']:
+            print(f"  {line}")
+    else:
+        print(f"\nNo saved run for {machine} to compare with")
+
+    if args.save:
+        entry = harness.save_run(results)
+        print(f"Saved run to {harness.HISTORY_PATH} ({entry['timestamp']})")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+DeltaClient request overhead: signing, rate limiting, metrics and parsing.
+
+Requests go to an in-process stub transport, so the numbers are the
+client's own cost per call. Each run uses a fresh API key to stay inside
+the rate limiter's quota.
+"""
+
+import json
+import uuid
+
+import httpx
+
+from benchmarks.harness import benchmark
+from delta.client import DeltaClient
+from delta.signature import generate_signature
+
+TICKER = json.dumps({
+    'success': True,
+    'result': {'symbol': 'BTCUSD', 'mark_price': '65000.5', 'spot_price': '64990.1', 'volume': 1234}
+}).encode()
+
+ORDER = json.dumps({
+    'success': True,
+    'result': {'id': 1, 'product_id': 27, 'size': 1, 'side': 'buy', 'state': 'open', 'limit_price': '510.5'}
+}).encode()
+
+ORDER_DATA = {
+    'product_id': 27,
+    'size': 1,
+    'side': 'buy',
+    'order_type': 'limit_order',
+    'limit_price': '510.5',
+    'time_in_force': 'gtc'
+}
+
+
+def _respond(request: httpx.Request) -> httpx.Response:
+    body = ORDER if request.method == 'POST' else TICKER
+    return httpx.Response(200, content=body, headers={'Content-Type': 'application/json'})
+
+
+async def _client() -> DeltaClient:
+    client = DeltaClient(f"bench-{uuid.uuid4().hex}", 'bench-secret', base_url='https://bench.invalid')
+    await client.client.aclose()
+    client.client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(_respond))
+    return client
+
+
+@benchmark('request_public', iterations=1000, setup=_client)
+async def request_public(client):
+    await client.get_ticker('BTCUSD')
+
+
+@benchmark('request_signed_order', iterations=400, setup=_client)
+async def request_signed_order(client):
+    await client.place_order(ORDER_DATA)
+
+
+@benchmark('generate_signature_get', iterations=5000)
+def signature_get():
+    generate_signature('bench-secret', 'GET', '1700000000', '/v2/positions/margined', 'contract_types=call_options')
+
+
+@benchmark('generate_signature_post', iterations=5000)
+def signature_post():
+    generate_signature('bench-secret', 'POST', '1700000000', '/v2/orders', payload=json.dumps(ORDER_DATA, separators=(',', ':')))
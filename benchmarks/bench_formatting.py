@@ -0,0 +1,40 @@
+"""
+Message formatting for large position and trade lists.
+"""
+
+from benchmarks.harness import benchmark
+from bot.utils.message_formatter import format_position, format_trade_history
+
+POSITIONS = [
+    {
+        'symbol': f"C-BTC-{60000 + i * 200}-{(i % 28) + 1:02d}0125",
+        'size': (i % 7) - 3 or 1,
+        'entry_price': 500.0 + i,
+        'mark_price': 520.5 + i,
+        'unrealized_pnl': (i % 11 - 5) * 12.5,
+        'margin': 250.0 + i,
+        'leverage': 10
+    }
+    for i in range(500)
+]
+
+TRADES = [
+    {
+        'entry_price': 500.0 + i,
+        'exit_price': 510.0 + i,
+        'pnl': (i % 9 - 4) * 8.25,
+        'commission': 0.45,
+        'entry_time': '2025-01-15 09:30:00'
+    }
+    for i in range(500)
+]
+
+
+@benchmark('format_positions_500', iterations=200, ops=len(POSITIONS))
+def format_positions():
+    "\n".join(format_position(position, i) for i, position in enumerate(POSITIONS))
+
+
+@benchmark('format_trade_history_500', iterations=200, ops=len(TRADES))
+def format_trades():
+    format_trade_history(TRADES, 'bench')
@@ -0,0 +1,89 @@
+"""
+Strike selection against a fully listed product catalogue.
+
+The catalogue is built from the fake exchange's listings, so selection
+runs over a realistic number of strikes and expiries without network.
+"""
+
+import time
+
+from benchmarks.harness import benchmark
+from bot.executors.move_executor import MoveTradeExecutor
+from bot.scheduler.algo_scheduler import select_algo_options
+from delta.expiry_calendar import expiry_calendar
+from delta.fake_server import FakeExchange, FakeExchangeConfig
+from delta.product_catalog import product_catalog
+from delta.utils.expiry_parser import parse_expiry_code
+
+EXPIRY_CODES = ('D', 'D+1', 'W', 'W+1', 'M', 'M+1')
+
+
+class _SpotClient:
+    """Stands in for DeltaClient where only the spot price is needed."""
+
+    def __init__(self, spot: float):
+        self.spot = spot
+
+    async def get_spot_price(self, asset: str) -> float:
+        return self.spot
+
+
+def _catalogue() -> float:
+    exchange = FakeExchange(FakeExchangeConfig(seed=0))
+    product_catalog._build_indexes(list(exchange.products.values()))
+    product_catalog._refreshed_at = time.monotonic()
+    return exchange.spot['BTC']
+
+
+def _straddle():
+    spot = _catalogue()
+    return {'strategy_type': 'straddle'}, {'expiry_type': 'daily', 'atm_offset': 500}, spot
+
+
+def _strangle_pct():
+    spot = _catalogue()
+    return {'strategy_type': 'strangle'}, {'expiry_type': 'weekly', 'otm_selection': {'type': 'percentage', 'value': 2}}, spot
+
+
+def _strangle_numeral():
+    spot = _catalogue()
+    return {'strategy_type': 'strangle'}, {'expiry_type': 'daily', 'otm_selection': {'type': 'numeral', 'value': 3}}, spot
+
+
+def _move_executor():
+    return MoveTradeExecutor(_SpotClient(_catalogue()))
+
+
+@benchmark('select_straddle', setup=_straddle)
+def select_straddle(fixture):
+    preset, strategy, spot = fixture
+    select_algo_options(preset, strategy, 'BTC', spot)
+
+
+@benchmark('select_strangle_pct', setup=_strangle_pct)
+def select_strangle_pct(fixture):
+    preset, strategy, spot = fixture
+    select_algo_options(preset, strategy, 'BTC', spot)
+
+
+@benchmark('select_strangle_numeral', setup=_strangle_numeral)
+def select_strangle_numeral(fixture):
+    preset, strategy, spot = fixture
+    select_algo_options(preset, strategy, 'BTC', spot)
+
+
+@benchmark('select_move_contract', iterations=500, setup=_move_executor)
+async def select_move_contract(executor):
+    await executor.select_move_contract('BTC', 'daily', 1)
+
+
+@benchmark('parse_expiry_code', ops=len(EXPIRY_CODES))
+def parse_expiry_codes():
+    for code in EXPIRY_CODES:
+        parse_expiry_code(code)
+
+
+@benchmark('expiry_calendar_resolve', iterations=5000, setup=_catalogue, ops=len(EXPIRY_CODES))
+def resolve_expiry_codes(spot):
+    for code in EXPIRY_CODES:
+        expiry_calendar.resolve('ETH', code)
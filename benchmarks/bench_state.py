@@ -0,0 +1,22 @@
+"""
+StateManager under contention: many concurrent handlers across users.
+"""
+
+import asyncio
+
+from benchmarks.harness import benchmark
+from bot.utils.state_manager import StateManager
+
+USERS = 64
+TASKS = 512
+
+
+async def _handler(manager: StateManager, user_id: int, step: int):
+    await manager.set_state(user_id, 'awaiting_input', {'step': step})
+    await manager.update_data(user_id, {'last': step})
+    await manager.get_state(user_id)
+
+
+@benchmark('state_contention', iterations=200, setup=StateManager, ops=TASKS * 3)
+async def state_contention(manager):
+    await asyncio.gather(*(_handler(manager, i % USERS, i) for i in range(TASKS)))
@@ -0,0 +1,245 @@
+"""
+Benchmark registry, runner and results history.
+
+A benchmark is a sync or async callable registered with @benchmark. An
+optional setup callable builds its fixture once. Every iteration is timed
+on its own, giving p50/p99 per operation. A separate pass under
+tracemalloc measures peak bytes and retained memory blocks per
+operation, so allocation-heavy changes show up even when wall time is
+noisy.
+
+Runs can be appended to benchmarks/results/history.jsonl and compared
+with the previous run on the same machine.
+"""
+
+import asyncio
+import gc
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'results', 'history.jsonl')
+
+# Iterations measured under tracemalloc (it slows code down ~10x)
+ALLOCATION_SAMPLES = 100
+
+# Relative increase in p50, p99 or peak memory reported as a regression
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark."""
+
+    name: str
+    func: Callable[..., Any]
+    setup: Optional[Callable[[], Any]]
+    iterations: int
+    ops: int
+    group: str
+
+
+# Global benchmark registry
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: Optional[str] = None,
+    iterations: int = 2000,
+    setup: Optional[Callable[[], Any]] = None,
+    ops: int = 1
+):
+    """
+    Register a benchmark.
+
+    Args:
+        name: Benchmark name (defaults to the function name)
+        iterations: Timed calls
+        setup: Builds the fixture passed to every call (sync or async)
+        ops: Operations performed per call; stats are reported per operation
+
+    Returns:
+        Decorator
+    """
+    def register(func):
+        bench_name = name or func.__name__
+        if bench_name in BENCHMARKS:
+            raise ValueError(f"Benchmark '{bench_name}' already registered")
+        group = func.__module__.rsplit('.', 1)[-1].replace('bench_', '')
+        BENCHMARKS[bench_name] = Benchmark(bench_name, func, setup, iterations, ops, group)
+        return func
+    return register
+
+
+async def _call(func: Callable[..., Any], *args):
+    result = func(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_benchmark(bench: Benchmark, scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Time a benchmark and measure its allocations.
+
+    Args:
+        bench: Registered benchmark
+        scale: Multiplier on the iteration count
+
+    Returns:
+        Stats in microseconds per operation plus allocation figures
+    """
+    fixture = None
+    if bench.setup is not None:
+        fixture = bench.setup()
+        if inspect.isawaitable(fixture):
+            fixture = await fixture
+    args = () if bench.setup is None else (fixture,)
+
+    iterations = max(10, int(bench.iterations * scale))
+    for _ in range(max(5, iterations // 10)):
+        await _call(bench.func, *args)
+
+    gc.collect()
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        await _call(bench.func, *args)
+        timings.append((time.perf_counter_ns() - t0) / 1000 / bench.ops)
+    elapsed = time.perf_counter() - started
+
+    samples = min(ALLOCATION_SAMPLES, iterations)
+    peaks = []
+    gc.collect()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await _call(bench.func, *args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    retained = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'ops': bench.ops,
+        'p50_us': round(_percentile(timings, 50), 3),
+        'p99_us': round(_percentile(timings, 99), 3),
+        'mean_us': round(statistics.fmean(timings), 3),
+        'min_us': round(timings[0], 3),
+        'ops_per_sec': round(iterations * bench.ops / elapsed, 1),
+        'peak_kib_per_op': round(statistics.median(peaks) / 1024 / bench.ops, 3),
+        'retained_blocks_per_op': round(retained / samples / bench.ops, 2)
+    }
+
+
+async def run_all(names: List[str], scale: float = 1.0, report: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+    """
+    Run benchmarks in registration order.
+
+    Application logging below WARNING is disabled while timing, so the
+    numbers measure the code rather than console output.
+
+    Args:
+        names: Benchmarks to run
+        scale: Multiplier on iteration counts
+        report: Called with (name, stats) after each benchmark
+
+    Returns:
+        name -> stats
+    """
+    results = {}
+    previous = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        for name in names:
+            results[name] = await run_benchmark(BENCHMARKS[name], scale)
+            if report:
+                report(name, results[name])
+    finally:
+        logging.disable(previous)
+    return results
+
+
+def machine_id() -> str:
+    """Identifies comparable runs (hardware and interpreter, not hostnames)."""
+    return f"{platform.machine()}-{os.cpu_count()}cpu-py{platform.python_version()}"
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def load_history(path: str = HISTORY_PATH) -> List[Dict[str, Any]]:
+    """Recorded runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_run(results: Dict[str, Dict], path: str = HISTORY_PATH) -> Dict[str, Any]:
+    """Append a run to the history file."""
+    entry = {
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'commit': _commit(),
+        'machine': machine_id(),
+        'results': results
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry, sort_keys=True) + '\n')
+    return entry
+
+
+def compare(baseline: Dict[str, Dict], results: Dict[str, Dict], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Regressions of results against a baseline run.
+
+    Args:
+        baseline: name -> stats of the earlier run
+        results: name -> stats of this run
+        threshold: Relative increase reported (0.25 = 25%)
+
+    Returns:
+        One line per regressed statistic
+    """
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for key in ('p50_us', 'p99_us', 'peak_kib_per_op'):
+            old, new = before.get(key), stats.get(key)
+            if old and new and new > old * (1 + threshold):
+                regressions.append(f"{name}: {key} {old} → {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def run(names: List[str], scale: float = 1.0, report: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+    """Synchronous entry point for run_all."""
+    return asyncio.run(run_all(names, scale, report))
@@ -7,6 +7,8 @@ from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from bot.utils.logger import setup_logger
 from delta.client import DeltaClient
+from delta.expiry_calendar import expiry_calendar, FAMILY_MOVE
+from delta.product_catalog import product_catalog
 
 logger = setup_logger(__name__)
 
@@ -43,29 +45,18 @@ class MoveTradeExecutor:
             List of MOVE contract dicts
         """
         try:
-            # Fetch all MOVE options products
-            products_response = await self.client.get_products(contract_types='move_options')
-            
-            if not products_response.get('success') or not products_response.get('result'):
+            # MOVE options products from the cached catalogue
+            if not await product_catalog.ensure_fresh():
                 logger.error("Failed to fetch MOVE contracts")
                 return []
             
-            products = products_response['result']
-            
-            # Filter MOVE contracts for the asset
-            asset_moves = [
-                p for p in products
-                if p.get('underlying_asset', {}).get('symbol') == asset
-                and p.get('contract_type') == 'move_options'
-                and p.get('state') in ['live', 'auction']
-            ]
-            
-            if not asset_moves:
-                logger.warning(f"No MOVE contracts found for {asset}")
+            # Nearest listed MOVE expiry of this type
+            listed = expiry_calendar.resolve_type(asset, expiry, family=FAMILY_MOVE)
+            if not listed:
+                logger.warning(f"No {expiry} expiry listed for {asset}")
                 return []
             
-            # Filter by expiry type
-            filtered_moves = self._filter_by_expiry(asset_moves, expiry)
+            filtered_moves = product_catalog.get_move_contracts(asset, listed.code)
             
             logger.info(f"Found {len(filtered_moves)} {expiry} MOVE contracts for {asset}")
             
@@ -75,58 +66,6 @@ class MoveTradeExecutor:
             logger.error(f"Error fetching MOVE contracts: {e}", exc_info=True)
             return []
     
-    def _filter_by_expiry(
-        self,
-        contracts: List[Dict[str, Any]],
-        expiry_type: str
-    ) -> List[Dict[str, Any]]:
-        """
-        Filter contracts by expiry type.
-        
-        Args:
-            contracts: List of MOVE contracts
-            expiry_type: "daily", "weekly", or "monthly"
-        
-        Returns:
-            Filtered contracts
-        """
-        from datetime import datetime, timedelta
-        
-        now = datetime.utcnow()
-        
-        filtered = []
-        
-        for contract in contracts:
-            settlement_time_str = contract.get('settlement_time')
-            
-            if not settlement_time_str:
-                continue
-            
-            try:
-                settlement_time = datetime.fromisoformat(settlement_time_str.replace('Z', '+00:00'))
-                time_diff = settlement_time - now
-                
-                if expiry_type == "daily":
-                    # Daily: Expires within 48 hours
-                    if time_diff.total_seconds() <= 48 * 3600:
-                        filtered.append(contract)
-                
-                elif expiry_type == "weekly":
-                    # Weekly: Expires between 2-10 days
-                    if 2 * 24 * 3600 < time_diff.total_seconds() <= 10 * 24 * 3600:
-                        filtered.append(contract)
-                
-                elif expiry_type == "monthly":
-                    # Monthly: Expires between 10-40 days
-                    if 10 * 24 * 3600 < time_diff.total_seconds() <= 40 * 24 * 3600:
-                        filtered.append(contract)
-            
-            except Exception as e:
-                logger.warning(f"Error parsing settlement time for {contract.get('symbol')}: {e}")
-                continue
-        
-        return filtered
-    
     async def find_atm_strike(
         self,
         asset: str,
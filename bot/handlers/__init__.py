@@ -231,7 +231,8 @@ def register_all_handlers(application: Application):
         # ==================== LEVEL 999: MESSAGE ROUTER ====================
         logger.info("📝 Registering message router (Group 999 - Lowest priority)...")
         
-        from .message_router import route_message
+        from .message_router import route_message, register_state_routes
+        register_state_routes()
         application.add_handler(
             MessageHandler(
                 filters.TEXT & ~filters.COMMAND,
@@ -601,5 +601,13 @@ def register_api_handlers(application: Application):
     logger.info("API handlers registered")
 
 
+def register_text_routes(router):
+    """Register the API setup text-input states."""
+    router.add('api_add_name', handle_api_name_input)
+    router.add('api_add_description', handle_api_description_input)
+    router.add('api_add_key', handle_api_key_input)
+    router.add('api_add_secret', handle_api_secret_input)
+
+
 if __name__ == "__main__":
     print("API handler module loaded")
@@ -838,3 +838,9 @@ def register_auto_trade_handlers(application: Application):
     ))
     
     logger.info("Auto trade handlers registered")
+
+
+def register_text_routes(router):
+    """Register the auto trade time-entry states."""
+    router.add('auto_trade_add_time', handle_auto_trade_time_input, pass_text=True)
+    router.add('auto_trade_edit_time', handle_auto_trade_edit_time_input, pass_text=True)
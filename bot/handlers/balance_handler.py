@@ -2,6 +2,7 @@
 Balance display handlers.
 """
 
+import asyncio
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -14,12 +15,105 @@ from bot.utils.error_handler import error_handler
 from bot.utils.message_formatter import format_balance, format_error_message
 from bot.validators.user_validator import check_user_authorization
 from bot.keyboards.balance_keyboards import get_balance_keyboard
-from database.operations.api_ops import get_api_credentials, get_decrypted_api_credential
-from delta.client import DeltaClient
+from bot.utils.account_fanout import (
+    AccountResult,
+    ProgressMessage,
+    fan_out_accounts,
+    pending_footer
+)
+from database.operations.api_ops import get_api_credentials
 
 logger = setup_logger(__name__)
 
 
+# Fixed conversion rate: 1 USD = 85 INR
+USD_TO_INR = 85.0
+
+
+async def _fetch_account_balance(api, client) -> AccountResult:
+    """
+    Fetch wallet balance and unrealized PnL for one account.
+    
+    Args:
+        api: API credential
+        client: Pooled DeltaClient for the account
+    
+    Returns:
+        AccountResult with formatted text and balance totals as data
+    """
+    response, positions = await asyncio.gather(
+        client.get_wallet_balance(),
+        client.get_positions()
+    )
+    
+    if not response.get('success'):
+        error_msg = response.get('error', {}).get('message', 'Unknown error')
+        return AccountResult(
+            api,
+            f"<b>❌ {api.api_name}</b>\n"
+            f"Error: {error_msg}\n",
+            error=error_msg
+        )
+    
+    result = response.get('result', [])
+    
+    # Try to find INR balance first (India API)
+    balance_data = None
+    for bal in result:
+        asset = bal.get('asset_symbol', '')
+        if asset in ['INR', 'USDT', 'USD']:
+            balance_data = bal
+            break
+    
+    # Calculate total unrealized PnL from positions
+    unrealized_pnl = 0.0
+    if positions.get('success'):
+        for pos in positions.get('result', []):
+            unrealized_pnl += float(pos.get('unrealized_pnl', 0))
+    
+    if not balance_data:
+        return AccountResult(
+            api,
+            f"<b>⚠️ {api.api_name}</b>\n"
+            f"No balance found\n"
+        )
+    
+    asset_symbol = balance_data.get('asset_symbol', 'INR')
+    balance = float(balance_data.get('balance', 0))
+    
+    # Convert to both INR and USD
+    if asset_symbol == 'INR':
+        balance_inr = balance
+        balance_usd = balance / USD_TO_INR
+        unrealized_pnl_disp = unrealized_pnl / USD_TO_INR  # For display
+    else:  # USD or USDT
+        balance_usd = balance
+        balance_inr = balance * USD_TO_INR
+        unrealized_pnl_disp = unrealized_pnl
+    
+    # Format balance message
+    balance_text = (
+        f"<b>💼 {api.api_name}</b>\n"
+        f"Balance: ₹{balance_inr:,.2f} (${balance_usd:,.2f})\n"
+    )
+    
+    if unrealized_pnl != 0:
+        if unrealized_pnl > 0:
+            balance_text += f"Total Blocked Margin: 🟢 +${unrealized_pnl:,.2f}\n"
+        else:
+            balance_text += f"Total Blocked Margin: 🔴 ${unrealized_pnl:,.2f}\n"
+    
+    return AccountResult(
+        api,
+        balance_text,
+        data={
+            'balance_inr': balance_inr,
+            'balance_usd': balance_usd,
+            'unrealized_pnl': unrealized_pnl_disp
+        }
+    )
+
+
 @error_handler
 async def balance_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -57,106 +151,21 @@ async def balance_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode='HTML'
     )
     
-    # Fetch balances for all APIs
-    balance_messages = []
-    total_balance_inr = 0
-    total_balance_usd = 0
-    total_unrealized_pnl = 0
-    
-    # Fixed conversion rate: 1 USD = 85 INR
-    USD_TO_INR = 85.0
-    
-    for api in apis:
-        try:
-            # Get decrypted credentials
-            credentials = await get_decrypted_api_credential(str(api.id))
-            if not credentials:
-                balance_messages.append(
-                    f"<b>❌ {api.api_name}</b>\n"
-                    f"Failed to decrypt credentials\n"
-                )
-                continue
-            
-            api_key, api_secret = credentials
-            
-            # Create Delta client
-            client = DeltaClient(api_key, api_secret)
-            
-            try:
-                # Fetch balance
-                response = await client.get_wallet_balance()
-                positions = await client.get_positions()
-                
-                if response.get('success'):
-                    result = response.get('result', [])
-                    
-                    # Try to find INR balance first (India API)
-                    balance_data = None
-                    for bal in result:
-                        asset = bal.get('asset_symbol', '')
-                        if asset in ['INR', 'USDT', 'USD']:
-                            balance_data = bal
-                            break
-                    
-                    # Calculate total unrealized PnL from positions
-                    unrealized_pnl = 0.0
-                    if positions.get('success'):
-                        for pos in positions.get('result', []):
-                            unrealized_pnl += float(pos.get('unrealized_pnl', 0))
-                    
-                    if balance_data:
-                        asset_symbol = balance_data.get('asset_symbol', 'INR')
-                        balance = float(balance_data.get('balance', 0))
-                        
-                        # Convert to both INR and USD
-                        if asset_symbol == 'INR':
-                            balance_inr = balance
-                            balance_usd = balance / USD_TO_INR
-                            unrealized_pnl_disp = unrealized_pnl / USD_TO_INR  # For display
-                        else:  # USD or USDT
-                            balance_usd = balance
-                            balance_inr = balance * USD_TO_INR
-                            unrealized_pnl_disp = unrealized_pnl
-                        
-                        # Format balance message
-                        balance_text = (
-                            f"<b>💼 {api.api_name}</b>\n"
-                            f"Balance: ₹{balance_inr:,.2f} (${balance_usd:,.2f})\n"
-                        )
-                        
-                        if unrealized_pnl != 0:
-                            if unrealized_pnl > 0:
-                                balance_text += f"Total Blocked Margin: 🟢 +${unrealized_pnl:,.2f}\n"
-                            else:
-                                balance_text += f"Total Blocked Margin: 🔴 ${unrealized_pnl:,.2f}\n"
-                        
-                        balance_messages.append(balance_text)
-                        
-                        # Add to totals
-                        total_balance_inr += balance_inr
-                        total_balance_usd += balance_usd
-                        total_unrealized_pnl += unrealized_pnl_disp
-                    else:
-                        balance_messages.append(
-                            f"<b>⚠️ {api.api_name}</b>\n"
-                            f"No balance found\n"
-                        )
-                else:
-                    error_msg = response.get('error', {}).get('message', 'Unknown error')
-                    balance_messages.append(
-                        f"<b>❌ {api.api_name}</b>\n"
-                        f"Error: {error_msg}\n"
-                    )
-            
-            finally:
-                await client.close()
-        
-        except Exception as e:
-            logger.error(f"Failed to fetch balance for API {api.id}: {e}", exc_info=True)
-            balance_messages.append(
-                f"<b>❌ {api.api_name}</b>\n"
-                f"Error: {str(e)[:50]}\n"
-            )
+    # Fetch balances for all APIs concurrently, streaming partial results
+    progress = ProgressMessage(query)
+    
+    async def on_result(results):
+        done = [r.text for r in results if r is not None]
+        await progress.update(
+            "<b>💰 Wallet Balance</b>\n\n" + "\n".join(done) + pending_footer(results)
+        )
+    
+    results = await fan_out_accounts(apis, _fetch_account_balance, on_result=on_result)
+    
+    balance_messages = [r.text for r in results]
+    totals = [r.data for r in results if r.data]
+    total_balance_inr = sum(t['balance_inr'] for t in totals)
+    total_unrealized_pnl = sum(t['unrealized_pnl'] for t in totals)
     
     # Construct final message
     if balance_messages:
@@ -182,10 +191,10 @@ async def balance_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
     
     # Display balances
-    await query.edit_message_text(
+    await progress.update(
         final_text,
-        reply_markup=get_balance_keyboard(apis),
-        parse_mode='HTML'
+        force=True,
+        reply_markup=get_balance_keyboard(apis)
     )
     
     log_user_action(user.id, "balance_view", f"Viewed {len(apis)} balance(s)")
@@ -55,4 +55,9 @@ async def handle_manual_preset_name_input(update: Update, context: ContextTypes.
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode='HTML'
     )
-    
+
+
+def register_text_routes(router):
+    """Register the manual preset name states (add and edit share a handler)."""
+    router.add('manual_preset_add_name', handle_manual_preset_name_input, pass_text=True)
+    router.add('manual_preset_edit_name', handle_manual_preset_name_input, pass_text=True)
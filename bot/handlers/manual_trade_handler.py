@@ -18,7 +18,7 @@ from database.operations.manual_trade_preset_ops import (
 )
 from database.operations.api_ops import get_api_credential_by_id, get_decrypted_api_credential
 from database.operations.strategy_ops import get_strategy_preset_by_id
-from delta.client import DeltaClient
+from delta.client_registry import get_delta_client
 
 logger = setup_logger(__name__)
 
@@ -150,7 +150,7 @@ async def manual_trade_select_callback(update: Update, context: ContextTypes.DEF
         api_name = safe_get_attr(api, 'api_name', 'Unknown API')
         
         api_key, api_secret = credentials
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             ticker_symbol = f"{asset}USD"
@@ -431,7 +431,7 @@ async def manual_trade_execute_callback(update: Update, context: ContextTypes.DE
         
         logger.info(f"📊 SL: {sl_trigger}%, Target: {target_trigger}%")
         
-        client = DeltaClient(pending_trade['api_key'], pending_trade['api_secret'])
+        client = get_delta_client(pending_trade['api_key'], pending_trade['api_secret'])
         
         try:
             side = 'buy' if pending_trade['direction'] == 'long' else 'sell'
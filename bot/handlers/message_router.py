@@ -1,447 +1,379 @@
 """
-✅ COMPREHENSIVE GLOBAL MESSAGE ROUTER
 Global message router for directing ALL text input based on user state.
 
-Handles:
-- API Configuration
-- MOVE Strategy (Create, Edit, Trade)
-- STRADDLE Strategy
-- STRANGLE Strategy
-- Manual/Auto Presets and Trades
+Handler modules own their text-input states: each exposes
+register_text_routes(router) and adds the states it handles at startup.
+Dispatch is then a single dict lookup to a pre-resolved handler, so the
+cost of routing a message does not grow with the number of strategies.
+
+Every route keeps a latency histogram (exported on /metrics) and slow
+handlers are logged. Conflicting registrations, and handler modules that
+cannot be imported or register nothing, fail at startup instead of on the
+first message that needs them. States that are declared (ConversationState
+values and literals passed to state_manager.set_state) but not routed are
+reported when the routes load.
 
 Key Features:
-- Single entry point for all text messages (Group 11)
+- Single entry point for all text messages (Group 999)
 - State-based routing
-- Comprehensive error handling
-- Detailed logging
-- ✅ FIXED: Proper state clearing on errors
+- Proper state clearing on errors
 """
 
+import ast
+import importlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from bot.utils.logger import setup_logger
-from bot.utils.state_manager import state_manager
+from bot.utils.state_manager import ConversationState, state_manager
 from bot.utils.error_handler import error_handler
-# At the TOP of file, add import:
-from bot.handlers.move.preset.input_handlers import route_move_preset_message
 
-# In your MESSAGE ROUTING FUNCTION, add this condition:
 logger = setup_logger(__name__)
 
+# Modules that own text-input states (each defines register_text_routes)
+ROUTE_MODULES = (
+    'bot.handlers.api_handler',
+    'bot.handlers.move.strategy.create',
+    'bot.handlers.move.strategy.edit_text_input',
+    'bot.handlers.move.strategy.view',
+    'bot.handlers.move.preset.input_handlers',
+    'bot.handlers.straddle_input_handlers',
+    'bot.handlers.strangle_input_handlers',
+    'bot.handlers.manual_preset_input_handlers',
+    'bot.handlers.auto_trade_handler',
+)
+
+# Package scanned for states handlers set
+HANDLERS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Handler latency histogram buckets (seconds)
+ROUTE_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Handlers slower than this are logged
+SLOW_ROUTE_SECONDS = 2.0
+
+TextHandler = Callable[..., Awaitable[Any]]
+
+
+class Route:
+    """A state bound to its resolved handler, with latency statistics."""
+
+    __slots__ = ('state', 'handler', 'pass_text', 'name', 'counts', 'sum', 'count', 'errors', 'slow')
+
+    def __init__(self, state: str, handler: TextHandler, pass_text: bool, name: str):
+        self.state = state
+        self.handler = handler
+        self.pass_text = pass_text
+        self.name = name
+        self.counts = [0] * len(ROUTE_LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.slow = 0
+
+    def observe(self, elapsed: float):
+        for i, bound in enumerate(ROUTE_LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self.counts[i] += 1
+        self.sum += elapsed
+        self.count += 1
+
+
+def _notice_handler(text: str) -> TextHandler:
+    """Handler replying with a fixed hint (states that expect a button press)."""
+    async def reply(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        await update.message.reply_text(text, parse_mode='HTML')
+    return reply
+
+
+def declared_states(root: str = HANDLERS_DIR) -> Set[str]:
+    """
+    States the bot can put a user in.
+
+    ConversationState values plus every string literal passed as the state
+    to set_state() in the handler sources. States built at runtime
+    (f-strings) cannot be listed and are left out.
+
+    Args:
+        root: Directory scanned recursively for .py files
+
+    Returns:
+        Set of state strings
+    """
+    states = {state.value for state in ConversationState}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding='utf-8') as f:
+                try:
+                    tree = ast.parse(f.read(), filename=path)
+                except SyntaxError as e:
+                    logger.warning(f"Cannot scan {path} for states: {e}")
+                    continue
+            for node in ast.walk(tree):
+                if not (isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Attribute)
+                        and node.func.attr == 'set_state'):
+                    continue
+                arg = node.args[1] if len(node.args) > 1 else next(
+                    (kw.value for kw in node.keywords if kw.arg == 'state'), None
+                )
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    states.add(arg.value)
+    return states
+
+
+class StateRouter:
+    """
+    Registry mapping conversation states to text-input handlers.
+    """
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self._routes: Dict[str, Route] = {}
+        self._unhandled: Dict[str, int] = {}
+        self.loaded = False
+
+    def add(self, state: str, handler: TextHandler, pass_text: bool = False):
+        """
+        Route a state to a handler.
+
+        Args:
+            state: State string stored by state_manager
+            handler: Coroutine function taking (update, context[, text])
+            pass_text: Pass the stripped message text as a third argument
+
+        Raises:
+            ValueError: If the state is already routed to another handler
+            TypeError: If the handler is not callable
+        """
+        if not callable(handler):
+            raise TypeError(f"Handler for state '{state}' is not callable: {handler!r}")
+
+        name = getattr(handler, '__qualname__', repr(handler))
+        existing = self._routes.get(state)
+        if existing is not None and existing.handler is not handler:
+            raise ValueError(
+                f"State '{state}' already routed to {existing.name}, cannot route to {name}"
+            )
+        self._routes[state] = Route(state, handler, pass_text, name)
+
+    def add_notice(self, states: Iterable[str], text: str):
+        """
+        Answer text sent in callback-driven states with a hint.
+
+        Args:
+            states: States that expect a button press
+            text: Reply sent instead of processing the message
+        """
+        handler = _notice_handler(text)
+        for state in states:
+            self.add(state, handler)
+
+    def load(self, modules: Iterable[str] = ROUTE_MODULES) -> int:
+        """
+        Import handler modules and let each register its states.
+
+        Declared states left without a route are logged as warnings.
+
+        Args:
+            modules: Dotted module paths defining register_text_routes(router)
+
+        Returns:
+            Number of routed states
+
+        Raises:
+            ImportError: If a module cannot be imported
+            AttributeError: If a module has no register_text_routes()
+        """
+        for module_path in modules:
+            try:
+                module = importlib.import_module(module_path)
+            except ImportError as e:
+                logger.error(f"❌ Text routes unavailable, cannot import {module_path}: {e}")
+                raise
+
+            register = getattr(module, 'register_text_routes', None)
+            if register is None:
+                raise AttributeError(f"{module_path} has no register_text_routes()")
+            register(self)
+
+        self.loaded = True
+        logger.info(f"✓ Message router loaded {len(self._routes)} state routes")
+
+        unrouted = self.unrouted()
+        if unrouted:
+            logger.warning(
+                f"⚠️ {len(unrouted)} declared states have no text route "
+                f"(text sent in them is rejected): {', '.join(unrouted)}"
+            )
+        return len(self._routes)
+
+    def unrouted(self) -> List[str]:
+        """Declared states no module routes."""
+        return sorted(declared_states() - self._routes.keys())
+
+    def resolve(self, state: str) -> Optional[Route]:
+        """Route for a state, or None if no module handles it."""
+        return self._routes.get(state)
+
+    @property
+    def states(self) -> List[str]:
+        """Routed states."""
+        return sorted(self._routes)
+
+    async def dispatch(self, route: Route, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+        """
+        Run a route's handler, recording its latency.
+
+        Args:
+            route: Resolved route
+            update: Telegram update
+            context: Handler context
+            text: Stripped message text
+        """
+        started = time.perf_counter()
+        try:
+            if route.pass_text:
+                await route.handler(update, context, text)
+            else:
+                await route.handler(update, context)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route.observe(elapsed)
+            if elapsed > SLOW_ROUTE_SECONDS:
+                route.slow += 1
+                logger.warning(f"Slow route {route.state} → {route.name}: {elapsed:.2f}s")
+
+    def unhandled(self, state: str):
+        """Count a message received in a state no module routes."""
+        self._unhandled[state] = self._unhandled.get(state, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-route counts and latency plus unhandled states."""
+        return {
+            'routes': {
+                state: {
+                    'handler': route.name,
+                    'count': route.count,
+                    'errors': route.errors,
+                    'slow': route.slow,
+                    'mean_ms': round(route.sum / route.count * 1000, 2) if route.count else None
+                }
+                for state, route in sorted(self._routes.items())
+                if route.count
+            },
+            'routed_states': len(self._routes),
+            'unhandled': dict(self._unhandled)
+        }
+
+    def render_prometheus(self) -> str:
+        """Render route latency in Prometheus text exposition format."""
+        lines = [
+            "# HELP bot_route_duration_seconds Text handler latency by conversation state",
+            "# TYPE bot_route_duration_seconds histogram"
+        ]
+        for state, route in sorted(self._routes.items()):
+            if not route.count:
+                continue
+            for bound, count in zip(ROUTE_LATENCY_BUCKETS, route.counts):
+                lines.append(f'bot_route_duration_seconds_bucket{{state="{state}",le="{bound}"}} {count}')
+            lines.append(f'bot_route_duration_seconds_bucket{{state="{state}",le="+Inf"}} {route.count}')
+            lines.append(f'bot_route_duration_seconds_sum{{state="{state}"}} {route.sum:.6f}')
+            lines.append(f'bot_route_duration_seconds_count{{state="{state}"}} {route.count}')
+
+        lines += [
+            "# HELP bot_route_errors_total Text handlers that raised",
+            "# TYPE bot_route_errors_total counter"
+        ]
+        for state, route in sorted(self._routes.items()):
+            if route.errors:
+                lines.append(f'bot_route_errors_total{{state="{state}"}} {route.errors}')
+
+        lines += [
+            "# HELP bot_route_unhandled_total Messages received in a state with no route",
+            "# TYPE bot_route_unhandled_total counter"
+        ]
+        for state, count in sorted(self._unhandled.items()):
+            lines.append(f'bot_route_unhandled_total{{state="{state}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Global state router instance
+state_router = StateRouter()
+
+
+def register_state_routes():
+    """Load every module's text routes (called once at handler registration)."""
+    if not state_router.loaded:
+        state_router.load()
+
 
 @error_handler
 async def route_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    ✅ GLOBAL MESSAGE ROUTER
-    
-    Routes ALL text messages to appropriate handler based on user's state.
+    Route a text message to the handler registered for the user's state.
+
     This is the ONLY MessageHandler for the entire bot.
-    
-    Handler Group: 11 (runs after callback handlers)
+
+    Handler Group: 999 (runs after callback handlers)
     """
-    
     try:
-        logger.info("=" * 80)
-        logger.info("🌍 GLOBAL MESSAGE ROUTER CALLED")
-        logger.info("=" * 80)
-        
-        # Validate message
         if not update.message or not update.message.text:
-            logger.warning("❌ No message or text in update")
             return
-        
+
         user = update.effective_user
         text = update.message.text.strip()
-        
-        logger.info(f"👤 User {user.id} ({user.first_name}) sent: '{text[:50]}'")
-        
+
         # Skip commands
         if text.startswith('/'):
-            logger.info(f"⏭️ Skipping command: {text}")
             return
-        
-        # Get current state
+
         state_str = await state_manager.get_state(user.id)
-        logger.info(f"📍 Current state: {state_str}")
-        
+
         # If no state, send helpful message
         if state_str is None:
-            logger.warning(f"❌ No active state for user {user.id}")
             await update.message.reply_text(
                 "ℹ️ Please use /start to begin.",
                 parse_mode='HTML'
             )
             return
-        
-        logger.info(f"🎯 Routing to handler for state: {state_str}")
-        
-        # ==================== API CONFIGURATION STATES ====================
-        if state_str == 'api_add_name':
-            from bot.handlers.api_handler import handle_api_name_input
-            await handle_api_name_input(update, context)
-            
-        elif state_str == 'api_add_description':
-            from bot.handlers.api_handler import handle_api_description_input
-            await handle_api_description_input(update, context)
-            
-        elif state_str == 'api_add_key':
-            from bot.handlers.api_handler import handle_api_key_input
-            await handle_api_key_input(update, context)
-            
-        elif state_str == 'api_add_secret':
-            from bot.handlers.api_handler import handle_api_secret_input
-            await handle_api_secret_input(update, context)
-        
-        # ==================== MOVE STRATEGY CREATION ====================
-        elif state_str == 'move_add_name':
-            from bot.handlers.move.strategy.create import handle_move_add_name_input
-            await handle_move_add_name_input(update, context)
-            logger.info("✅ Routed to: handle_move_add_name_input")
-
-        elif state_str == 'move_add_description':
-            from bot.handlers.move.strategy.create import handle_move_description_input
-            await handle_move_description_input(update, context)
-            logger.info("✅ Routed to: handle_move_description_input")
-
-        elif state_str == 'move_add_lot_size':
-            from bot.handlers.move.strategy.create import handle_move_lot_size_input
-            await handle_move_lot_size_input(update, context)
-            logger.info("✅ Routed to: handle_move_lot_size_input")
-
-        elif state_str == 'move_add_atm_offset':
-            from bot.handlers.move.strategy.create import handle_move_atm_offset_input
-            await handle_move_atm_offset_input(update, context)
-            logger.info("✅ Routed to: handle_move_atm_offset_input")
-
-        elif state_str == 'move_add_sl_trigger':
-            from bot.handlers.move.strategy.create import handle_move_sl_trigger_input
-            await handle_move_sl_trigger_input(update, context)
-            logger.info("✅ Routed to: handle_move_sl_trigger_input")
-
-        elif state_str == 'move_add_sl_limit':
-            from bot.handlers.move.strategy.create import handle_move_sl_limit_input
-            await handle_move_sl_limit_input(update, context)
-            logger.info("✅ Routed to: handle_move_sl_limit_input")
-
-        elif state_str == 'move_add_target_trigger':
-            from bot.handlers.move.strategy.create import handle_move_target_trigger_input
-            await handle_move_target_trigger_input(update, context)
-            logger.info("✅ Routed to: handle_move_target_trigger_input")
-
-        elif state_str == 'move_add_target_limit':
-            from bot.handlers.move.strategy.create import handle_move_target_limit_input
-            await handle_move_target_limit_input(update, context)
-            logger.info("✅ Routed to: handle_move_target_limit_input")
-        
-        # ==================== MOVE STRATEGY EDITING ====================
-        elif state_str == 'move_edit_name':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (name)")
-
-        elif state_str == 'move_edit_description':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (description)")
-
-        elif state_str == 'move_edit_atm_offset':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (atm_offset)")
-
-        elif state_str == 'move_edit_sl_trigger':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (sl_trigger)")
-
-        elif state_str == 'move_edit_sl_limit':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (sl_limit)")
-
-        elif state_str == 'move_edit_target_trigger':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (target_trigger)")
-
-        elif state_str == 'move_edit_target_limit':
-            from bot.handlers.move.strategy.edit import move_edit_text_input
-            await move_edit_text_input(update, context)
-            logger.info("✅ Routed to: move_edit_text_input (target_limit)")
-        
-        # ==================== MOVE PRESET STATES ====================
-        elif state_str == 'move_create_preset_name':
-            from bot.handlers.move.preset.create import handle_move_preset_name
-            await handle_move_preset_name(update, context)
-            logger.info("✅ Routed to: handle_move_preset_name")
-        
-        elif state_str == 'move_preset_sl_trigger':
-            from bot.handlers.move.preset.create import handle_move_preset_sl_trigger
-            await handle_move_preset_sl_trigger(update, context)
-            logger.info("✅ Routed to: handle_move_preset_sl_trigger")
-        
-        elif state_str == 'move_preset_sl_limit':
-            from bot.handlers.move.preset.create import handle_move_preset_sl_limit
-            await handle_move_preset_sl_limit(update, context)
-            logger.info("✅ Routed to: handle_move_preset_sl_limit")
-        
-        elif state_str == 'move_preset_target':
-            from bot.handlers.move.preset.create import handle_move_preset_target
-            await handle_move_preset_target(update, context)
-            logger.info("✅ Routed to: handle_move_preset_target")
-        
-        elif state_str == 'move_preset_target_limit':
-            from bot.handlers.move.preset.create import handle_move_preset_target_limit
-            await handle_move_preset_target_limit(update, context)
-            logger.info("✅ Routed to: handle_move_preset_target_limit")
-        
-        elif state_str.startswith('move_edit_preset_'):
-            from bot.handlers.move.preset.edit import handle_move_edit_preset_field
-            await handle_move_edit_preset_field(update, context)
-            logger.info("✅ Routed to: handle_move_edit_preset_field")
-
-        # ==================== MOVE STRATEGY VIEW (CALLBACK-BASED) ====================
-        elif state_str == 'move_view_strategies_list':
-            logger.info("📌 State move_view_strategies_list is callback-based")
-            await update.message.reply_text(
-                "ℹ️ Please use the buttons to select a strategy.",
-                parse_mode='HTML'
-            )
-
-        elif state_str == 'move_view_strategy_detail':
-            logger.info("📌 State move_view_strategy_detail is callback-based")
-            await update.message.reply_text(
-                "ℹ️ Please use the buttons below.",
-                parse_mode='HTML'
-            )
-
-        # ==================== MOVE MANUAL TRADE ====================
-        elif state_str == 'move_manual_entry_price':
-            from bot.handlers.move.trade.manual import handle_move_manual_entry_price
-            await handle_move_manual_entry_price(update, context)
-            logger.info("✅ Routed to: handle_move_manual_entry_price")
-        
-        elif state_str == 'move_manual_lot_size':
-            from bot.handlers.move.trade.manual import handle_move_manual_lot_size
-            await handle_move_manual_lot_size(update, context)
-            logger.info("✅ Routed to: handle_move_manual_lot_size")
-        
-        elif state_str == 'move_manual_sl_price':
-            from bot.handlers.move.trade.manual import handle_move_manual_sl_price
-            await handle_move_manual_sl_price(update, context)
-            logger.info("✅ Routed to: handle_move_manual_sl_price")
-        
-        elif state_str == 'move_manual_target_price':
-            from bot.handlers.move.trade.manual import handle_move_manual_target_price
-            await handle_move_manual_target_price(update, context)
-            logger.info("✅ Routed to: handle_move_manual_target_price")
-        
-        elif state_str == 'move_manual_direction':
-            from bot.handlers.move.trade.manual import handle_move_manual_direction
-            await handle_move_manual_direction(update, context)
-            logger.info("✅ Routed to: handle_move_manual_direction")
-        
-        elif state_str == 'move_manual_strategy_select':
-            from bot.handlers.move.trade.manual import handle_move_manual_strategy_select
-            await handle_move_manual_strategy_select(update, context)
-            logger.info("✅ Routed to: handle_move_manual_strategy_select")
-        
-        # ==================== MOVE AUTO TRADE ====================
-        elif state_str == 'move_auto_add_time':
-            from bot.handlers.move_auto_trade_handler import handle_move_auto_time_input
-            await handle_move_auto_time_input(update, context, text)
-            logger.info("✅ Routed to: handle_move_auto_time_input")
-        
-        elif state_str == 'move_auto_edit_time':
-            from bot.handlers.move_auto_trade_handler import handle_move_auto_edit_time_input
-            await handle_move_auto_edit_time_input(update, context, text)
-            logger.info("✅ Routed to: handle_move_auto_edit_time_input")
-        
-        # ==================== STRADDLE STRATEGY ====================
-        elif state_str == 'straddle_add_name':
-            from bot.handlers.straddle_input_handlers import handle_straddle_name_input
-            await handle_straddle_name_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_name_input")
-        
-        elif state_str == 'straddle_add_description':
-            from bot.handlers.straddle_input_handlers import handle_straddle_description_input
-            await handle_straddle_description_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_description_input")
-        
-        elif state_str == 'straddle_add_lot_size':
-            from bot.handlers.straddle_input_handlers import handle_straddle_lot_size_input
-            await handle_straddle_lot_size_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_lot_size_input")
-        
-        elif state_str == 'straddle_add_sl_trigger':
-            from bot.handlers.straddle_input_handlers import handle_straddle_sl_trigger_input
-            await handle_straddle_sl_trigger_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_sl_trigger_input")
-        
-        elif state_str == 'straddle_add_sl_limit':
-            from bot.handlers.straddle_input_handlers import handle_straddle_sl_limit_input
-            await handle_straddle_sl_limit_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_sl_limit_input")
-        
-        elif state_str == 'straddle_add_target_trigger':
-            from bot.handlers.straddle_input_handlers import handle_straddle_target_trigger_input
-            await handle_straddle_target_trigger_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_target_trigger_input")
-        
-        elif state_str == 'straddle_add_target_limit':
-            from bot.handlers.straddle_input_handlers import handle_straddle_target_limit_input
-            await handle_straddle_target_limit_input(update, context, text)
-            logger.info("✅ Routed to: handle_straddle_target_limit_input")
-
-        elif state_str == 'straddle_add_atm_offset':
-            from bot.handlers.straddle_input_handlers import handle_atm_offset_input
-            await handle_atm_offset_input(update, context, text)
-            logger.info("✅ Routed to: handle_atm_offset_input")
-        
-        # ==================== STRANGLE STRATEGY ====================
-        elif state_str == 'strangle_add_name':
-            from bot.handlers.strangle_input_handlers import handle_strangle_name_input
-            await handle_strangle_name_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_name_input")
-        
-        elif state_str == 'strangle_add_description':
-            from bot.handlers.strangle_input_handlers import handle_strangle_description_input
-            await handle_strangle_description_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_description_input")
-        
-        elif state_str == 'strangle_add_lot_size':
-            from bot.handlers.strangle_input_handlers import handle_strangle_lot_size_input
-            await handle_strangle_lot_size_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_lot_size_input")
-        
-        elif state_str == 'strangle_add_sl_trigger':
-            from bot.handlers.strangle_input_handlers import handle_strangle_sl_trigger_input
-            await handle_strangle_sl_trigger_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_sl_trigger_input")
-        
-        elif state_str == 'strangle_add_sl_limit':
-            from bot.handlers.strangle_input_handlers import handle_strangle_sl_limit_input
-            await handle_strangle_sl_limit_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_sl_limit_input")
-        
-        elif state_str == 'strangle_add_target_trigger':
-            from bot.handlers.strangle_input_handlers import handle_strangle_target_trigger_input
-            await handle_strangle_target_trigger_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_target_trigger_input")
-        
-        elif state_str == 'strangle_add_target_limit':
-            from bot.handlers.strangle_input_handlers import handle_strangle_target_limit_input
-            await handle_strangle_target_limit_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_target_limit_input")
-        
-        elif state_str == 'strangle_add_otm_value':
-            from bot.handlers.strangle_input_handlers import handle_strangle_otm_value_input
-            await handle_strangle_otm_value_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_otm_value_input")
-        
-        elif state_str == 'strangle_edit_name_input':
-            from bot.handlers.strangle_input_handlers import handle_strangle_edit_name_input
-            await handle_strangle_edit_name_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_edit_name_input")
-        
-        elif state_str == 'strangle_edit_desc_input':
-            from bot.handlers.strangle_input_handlers import handle_strangle_edit_desc_input
-            await handle_strangle_edit_desc_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_edit_desc_input")
-        
-        elif state_str == 'strangle_edit_lot_input':
-            from bot.handlers.strangle_input_handlers import handle_strangle_edit_lot_input
-            await handle_strangle_edit_lot_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_edit_lot_input")
-        
-        elif state_str == 'strangle_edit_otm_value_input':
-            from bot.handlers.strangle_input_handlers import handle_strangle_edit_otm_value_input
-            await handle_strangle_edit_otm_value_input(update, context, text)
-            logger.info("✅ Routed to: handle_strangle_edit_otm_value_input")
-        
-        # ==================== MANUAL TRADE PRESET ====================
-        elif state_str == 'manual_preset_add_name':
-            from bot.handlers.manual_preset_input_handlers import handle_manual_preset_name_input
-            await handle_manual_preset_name_input(update, context, text)
-            logger.info("✅ Routed to: handle_manual_preset_name_input")
-        
-        elif state_str == 'manual_preset_edit_name':
-            from bot.handlers.manual_preset_input_handlers import handle_manual_preset_name_input
-            await handle_manual_preset_name_input(update, context, text)
-            logger.info("✅ Routed to: handle_manual_preset_name_input (edit)")
-        
-        # ==================== AUTO TRADE ====================
-        elif state_str == 'auto_trade_add_time':
-            from bot.handlers.auto_trade_handler import handle_auto_trade_time_input
-            await handle_auto_trade_time_input(update, context, text)
-            logger.info("✅ Routed to: handle_auto_trade_time_input")
-        
-        elif state_str == 'auto_trade_edit_time':
-            from bot.handlers.auto_trade_handler import handle_auto_trade_edit_time_input
-            await handle_auto_trade_edit_time_input(update, context, text)
-            logger.info("✅ Routed to: handle_auto_trade_edit_time_input")
-
-        # ==================== CALLBACK-BASED STATES ====================
-        elif state_str in ['straddle_sl_monitor_confirm', 'strangle_sl_monitor_confirm']:
-            logger.info(f"📌 State {state_str} is callback-based, skipping text handler")
-            await update.message.reply_text(
-                "ℹ️ Please use the buttons to confirm your choice.",
-                parse_mode='HTML'
-            )
 
-        # ==================== UNHANDLED STATE ====================
-        else:
+        route = state_router.resolve(state_str)
+        if route is None:
+            state_router.unhandled(state_str)
             logger.warning(f"⚠️ UNHANDLED STATE: {state_str}")
             await update.message.reply_text(
                 "❌ Something went wrong. Please use /start.",
                 parse_mode='HTML'
             )
-            # ✅ FIX 1: Clear state on unhandled error
             await state_manager.clear_state(user.id)
-        
-        logger.info("=" * 80)
-        logger.info("✅ MESSAGE ROUTER COMPLETE")
-        logger.info("=" * 80)
-    
+            return
+
+        logger.debug(f"User {user.id} state {state_str} → {route.name}")
+        await state_router.dispatch(route, update, context, text)
+
     except Exception as e:
-        logger.error("=" * 80)
         logger.error(f"❌ ERROR IN MESSAGE ROUTER: {e}", exc_info=True)
-        logger.error("=" * 80)
         try:
             await update.message.reply_text(
                 "❌ An error occurred. Please try /start.",
                 parse_mode='HTML'
             )
-            # ✅ FIX 2: Always clear state on exception
+            # Always clear state on exception
             await state_manager.clear_state(update.effective_user.id)
         except Exception as err:
-            logger.error(f"Failed to send error message: {err}")  # ✅ ADDED CLOSING PARENTHESIS
+            logger.error(f"Failed to send error message: {err}")
 
 
-@error_handler
-async def route_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Global text message router"""
-    
-    user = update.effective_user
-    current_state = await state_manager.get_state(user.id)
-    
-    logger.info(f"📨 MESSAGE ROUTER: User {user.id}, State: {current_state}")
-    
-    try:
-        # ✅ ADD THIS FIRST - MOVE PRESET HAS PRIORITY
-        if current_state and current_state.startswith('move_preset_'):
-            await route_move_preset_message(update, context)
-            return
-        
-        # Then your existing routing for other strategies...
-        if current_state == 'move_strategy_...':
-            await route_move_strategy_message(update, context)
-        elif current_state == 'straddle_strategy_...':
-            await route_straddle_message(update, context)
-        # ... etc
-        
-    except Exception as e:
-        logger.error(f"❌ Error in message router: {e}", exc_info=True)
-        
-__all__ = ['route_message']
+__all__ = ['route_message', 'state_router', 'register_state_routes', 'StateRouter']
@@ -341,6 +341,18 @@ async def route_move_preset_message(update: Update, context: ContextTypes.DEFAUL
         await update.message.reply_text("❌ Error processing input")
 
 
+def register_text_routes(router):
+    """Register the MOVE preset create/edit text-input states."""
+    router.add('move_preset_add_name', handle_preset_name_input)
+    router.add('move_preset_add_description', handle_preset_description_input)
+    router.add('move_preset_edit_name', handle_preset_edit_name_input)
+    router.add('move_preset_edit_description', handle_preset_edit_description_input)
+    router.add('move_preset_edit_sl_trigger', handle_preset_edit_sl_trigger_input)
+    router.add('move_preset_edit_sl_limit', handle_preset_edit_sl_limit_input)
+    router.add('move_preset_edit_target_trigger', handle_preset_edit_target_trigger_input)
+    router.add('move_preset_edit_target_limit', handle_preset_edit_target_limit_input)
+
+
 __all__ = [
     'route_move_preset_message',
     'handle_preset_name_input',
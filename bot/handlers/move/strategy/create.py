@@ -582,6 +582,19 @@ async def move_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         parse_mode='HTML'
     )
 
+
+def register_text_routes(router):
+    """Register the MOVE strategy creation text-input states."""
+    router.add('move_add_name', handle_move_add_name_input)
+    router.add('move_add_description', handle_move_description_input)
+    router.add('move_add_lot_size', handle_move_lot_size_input)
+    router.add('move_add_atm_offset', handle_move_atm_offset_input)
+    router.add('move_add_sl_trigger', handle_move_sl_trigger_input)
+    router.add('move_add_sl_limit', handle_move_sl_limit_input)
+    router.add('move_add_target_trigger', handle_move_target_trigger_input)
+    router.add('move_add_target_limit', handle_move_target_limit_input)
+
+
 __all__ = [
     'move_add_callback',
     'move_add_new_strategy_callback',
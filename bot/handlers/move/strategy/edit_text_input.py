@@ -245,5 +245,12 @@ async def handle_move_edit_text_input(update: Update, context: ContextTypes.DEFA
         logger.info("=" * 60)
 
 
+def register_text_routes(router):
+    """Register the MOVE strategy edit states (one handler for every field)."""
+    for field in ('name', 'description', 'atm_offset', 'sl_trigger', 'sl_limit',
+                  'target_trigger', 'target_limit'):
+        router.add(f'move_edit_{field}', handle_move_edit_text_input)
+
+
 __all__ = ['handle_move_edit_text_input']
   
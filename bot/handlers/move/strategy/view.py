@@ -203,6 +203,14 @@ def format_strategy_details(strategy: dict) -> str:
 
 
 # ✅ EXPORT ONLY WHAT'S NEEDED
+
+
+def register_text_routes(router):
+    """Answer text sent while a strategy list or detail view is open."""
+    router.add_notice(['move_view_strategies_list'], "ℹ️ Please use the buttons to select a strategy.")
+    router.add_notice(['move_view_strategy_detail'], "ℹ️ Please use the buttons below.")
+
+
 __all__ = [
     'view_strategies_list',
     'view_strategy_details',
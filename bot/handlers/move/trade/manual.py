@@ -20,7 +20,7 @@ from bot.validators.user_validator import check_user_authorization
 from database.operations.move_trade_preset_ops import get_move_trade_presets, get_move_trade_preset_by_id
 from database.operations.api_ops import get_api_credential_by_id, get_decrypted_api_credential
 from database.operations.move_strategy_ops import get_move_strategy
-from delta.client import DeltaClient
+from delta.client_registry import get_delta_client
 
 logger = setup_logger(__name__)
 
@@ -167,7 +167,7 @@ async def move_manual_select_callback(update: Update, context: ContextTypes.DEFA
         
         # Create Delta client
         api_key, api_secret = credentials
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Import executor
@@ -371,7 +371,7 @@ async def move_manual_execute_callback(update: Update, context: ContextTypes.DEF
     
     try:
         # Create Delta client
-        client = DeltaClient(pending_trade['api_key'], pending_trade['api_secret'])
+        client = get_delta_client(pending_trade['api_key'], pending_trade['api_secret'])
         
         try:
             # Import executor
@@ -9,7 +9,7 @@ from bot.utils.logger import setup_logger, log_user_action
 from bot.utils.error_handler import error_handler
 from bot.validators.user_validator import check_user_authorization
 from database.operations.api_ops import get_api_credentials, get_decrypted_api_credential
-from delta.client import DeltaClient
+from delta.client_registry import get_delta_client
 
 logger = setup_logger(__name__)
 
@@ -91,7 +91,7 @@ async def move_list_asset_callback(update: Update, context: ContextTypes.DEFAULT
             return
         
         api_key, api_secret = credentials
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Fetch move options
@@ -2,6 +2,10 @@
 Options listing handlers.
 """
 
+import asyncio
+import math
+import time
+
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -18,8 +22,11 @@ from bot.keyboards.options_keyboards import (
     get_expiry_selection_keyboard
 )
 from bot.keyboards.expiry_keyboards import get_expiry_list_keyboard
-from delta.client import DeltaClient
-from delta.utils.expiry_parser import parse_expiry_code, format_expiry_date, get_all_expiry_dates
+from delta.client_registry import get_public_client
+from delta.expiry_calendar import expiry_calendar
+from delta.product_catalog import product_catalog
+from delta.market_history import market_history
+from config import settings
 
 logger = setup_logger(__name__)
 
@@ -123,36 +130,22 @@ async def expiry_selection_callback(update: Update, context: ContextTypes.DEFAUL
     )
     
     try:
-        # Parse expiry code to get date
-        expiry_date = parse_expiry_code(expiry_code)
-        formatted_date = format_expiry_date(expiry_date, '%d %b %Y')
-        
-        # Create Delta client (unauthenticated call)
-        client = DeltaClient("", "")
+        # Shared public client (unauthenticated call)
+        client = get_public_client()
         
         try:
-            # Fetch products (options)
-            response = await client.get_products(contract_types='call_options,put_options')
-            
-            if not response.get('success'):
-                error_msg = response.get('error', {}).get('message', 'Unknown error')
+            # Options come from the cached product catalogue
+            if not await product_catalog.ensure_fresh():
                 await query.edit_message_text(
-                    format_error_message(f"Failed to fetch options: {error_msg}"),
+                    format_error_message("Failed to fetch options: product list unavailable"),
                     parse_mode='HTML'
                 )
                 return
             
-            products = response.get('result', [])
-            
-            # Filter products by asset and expiry date
-            # Note: This is a simplified filter. In production, match exact settlement time
-            expiry_str = expiry_date.strftime('%Y-%m-%d')
-            
-            matching_options = []
-            for product in products:
-                symbol = product.get('symbol', '')
-                if asset in symbol and expiry_str[:7] in product.get('settlement_time', ''):
-                    matching_options.append(product)
+            # Listed expiry for the code, and its options
+            expiry = expiry_calendar.resolve(asset, expiry_code)
+            formatted_date = expiry.format() if expiry else "Not listed"
+            matching_options = product_catalog.get_options_for_expiry(asset, expiry.code) if expiry else []
             
             if not matching_options:
                 await query.edit_message_text(
@@ -174,7 +167,7 @@ async def expiry_selection_callback(update: Update, context: ContextTypes.DEFAUL
                 if strike:
                     strikes.add(strike)
                     
-                    if 'C' in option.get('symbol', ''):
+                    if option.get('contract_type') == 'call_options':
                         calls[strike] = option
                     else:
                         puts[strike] = option
@@ -182,13 +175,28 @@ async def expiry_selection_callback(update: Update, context: ContextTypes.DEFAUL
             # Sort strikes
             sorted_strikes = sorted(strikes)
             
-            # Get spot price for reference
+            # Latest recorded chain snapshot, when the recorder is running
+            marks = {}
             spot_price = 0
-            try:
-                spot_response = await client.get_spot_price(asset)
-                spot_price = spot_response
-            except Exception:
-                pass
+            # Directory listing and memmap reads run off the event loop
+            snapshot = await asyncio.to_thread(
+                lambda: market_history.chain_at(asset, expiry.code, int(time.time())).copy()
+            )
+            if len(snapshot) and time.time() - snapshot['time'][0] <= 2 * settings.CHAIN_SNAPSHOT_INTERVAL:
+                marks = {
+                    (float(row['strike']), bool(row['is_call'])): float(row['mark'])
+                    for row in snapshot if math.isfinite(row['mark'])
+                }
+                if math.isfinite(snapshot['spot'][0]):
+                    spot_price = float(snapshot['spot'][0])
+            
+            # Get spot price for reference
+            if not spot_price:
+                try:
+                    spot_response = await client.get_spot_price(asset)
+                    spot_price = spot_response
+                except Exception:
+                    pass
             
             # Format options list
             text = f"<b>📑 {asset} Options - {expiry_code}</b>\n\n"
@@ -209,6 +217,11 @@ async def expiry_selection_callback(update: Update, context: ContextTypes.DEFAUL
                         atm_indicator = " 🎯 ATM"
                         
                 strike = float(strike) if isinstance(strike, str) else strike
+                call_mark = marks.get((float(strike), True))
+                put_mark = marks.get((float(strike), False))
+                if call_mark is not None and put_mark is not None:
+                    has_call += f" ${call_mark:,.2f}"
+                    has_put += f" ${put_mark:,.2f}"
                 text += f"  ${strike:,.0f}: Call {has_call} | Put {has_put}{atm_indicator}\n"
             
             if len(sorted_strikes) > 10:
@@ -26,7 +26,7 @@ from database.operations.api_ops import (
     get_decrypted_api_credential,
     get_api_credential_by_id  # ✅ ADD THIS
 )
-from delta.client import DeltaClient  # ✅ FIXED PATH
+from delta.client_registry import get_delta_client
 
 logger = setup_logger(__name__)
 
@@ -111,7 +111,7 @@ async def order_view_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         api_key, api_secret = credentials
         
         # Create Delta client
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Fetch open orders
@@ -221,7 +221,7 @@ async def order_detail_callback(update: Update, context: ContextTypes.DEFAULT_TY
         api_key, api_secret = credentials
         
         # Create Delta client
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Fetch order details
@@ -336,7 +336,7 @@ async def order_cancel_confirm_callback(update: Update, context: ContextTypes.DE
         api_key, api_secret = credentials
         
         # Create Delta client
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Cancel order
@@ -434,7 +434,7 @@ async def order_cancel_all_confirm_callback(update: Update, context: ContextType
         api_key, api_secret = credentials
         
         # Create Delta client
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Cancel all orders
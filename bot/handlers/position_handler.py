@@ -14,12 +14,117 @@ from bot.utils.error_handler import error_handler
 from bot.utils.message_formatter import format_position, format_error_message
 from bot.validators.user_validator import check_user_authorization
 from bot.keyboards.position_keyboards import get_position_keyboard
-from database.operations.api_ops import get_api_credentials, get_decrypted_api_credential
-from delta.client import DeltaClient
+from bot.utils.account_fanout import (
+    AccountResult,
+    ProgressMessage,
+    fan_out_accounts,
+    pending_footer
+)
+from database.operations.api_ops import get_api_credentials
 
 logger = setup_logger(__name__)
 
 
+async def _fetch_account_positions(api, client) -> AccountResult:
+    """
+    Fetch and format open positions for one account.
+
+    Args:
+        api: API credential
+        client: Pooled DeltaClient for the account
+
+    Returns:
+        AccountResult with formatted text and PnL/position totals as data
+    """
+    response = await client.get_positions()
+    logger.info(f"[API: {api.api_name}] Raw /positions response: {response}")
+
+    if not response.get('success'):
+        error_msg = response.get('error', {}).get('message', 'Unknown error')
+        logger.error(f"[API: {api.api_name}] Error in positions response: {error_msg}")
+        return AccountResult(
+            api,
+            f"<b>❌ {api.api_name}</b>\n"
+            f"Error: {error_msg}\n",
+            error=error_msg
+        )
+
+    result = response.get('result', [])
+    for idx, pos in enumerate(result):
+        logger.info(f"[API: {api.api_name}] Position #{idx} data: {pos}")
+
+    active_positions = [
+        pos for pos in result
+        if float(pos.get('size', 0)) != 0
+    ]
+
+    if not active_positions:
+        return AccountResult(
+            api,
+            f"<b>📊 {api.api_name}</b>\n"
+            f"No open positions\n",
+            data={'pnl': 0.0, 'positions': 0}
+        )
+
+    api_position_text = f"<b>📊 {api.api_name}</b>\n\n"
+    total_pnl = 0.0
+
+    for position in active_positions:
+        size = float(position.get('size', 0))
+        entry_price = float(position.get('entry_price', 0))
+        mark_price = float(position.get('mark_price', 0))
+        symbol = position.get('product', {}).get('symbol', 'Unknown')
+
+        # Default: assume BTC unless ETH is found in symbol
+        if 'ETH' in symbol:
+            lot_size = 0.01
+        else:
+            lot_size = 0.001
+
+        if size < 0:
+            try:
+                custom_pnl = (entry_price - mark_price) * abs(size) * lot_size
+            except Exception:
+                custom_pnl = 0.0
+        else:
+            try:
+                custom_pnl = float(position.get('unrealized_pnl', 0)) * abs(size) * lot_size
+            except Exception:
+                custom_pnl = 0.0
+
+        # Log each field
+        logger.info(
+            f"[API: {api.api_name}] {symbol} position: size={size}, entry={entry_price}, mark={mark_price}, "
+            f"unrealized_pnl={position.get('unrealized_pnl')}, pnl={position.get('pnl')}"
+        )
+
+        direction = "🟢 Long" if size > 0 else "🔴 Short"
+
+        api_position_text += (
+            f"{direction} {symbol}\n"
+            f"Size: {abs(size)}\n"
+            f"Entry: ${entry_price:,.2f}\n"
+            f"Mark: ${mark_price:,.2f}\n"
+            f"PnL: "
+        )
+
+        if custom_pnl > 0:
+            api_position_text += f"🟢 +${custom_pnl:,.2f}\n"
+        elif custom_pnl < 0:
+            api_position_text += f"🔴 ${custom_pnl:,.2f}\n"
+        else:
+            api_position_text += f"⚪ ${custom_pnl:,.2f}\n"
+
+        api_position_text += "\n"
+        total_pnl += custom_pnl
+
+    return AccountResult(
+        api,
+        api_position_text,
+        data={'pnl': total_pnl, 'positions': len(active_positions)}
+    )
+
+
 @error_handler
 async def position_view_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -58,114 +163,20 @@ async def position_view_callback(update: Update, context: ContextTypes.DEFAULT_T
         parse_mode='HTML'
     )
 
-    position_messages = []
-    total_unrealized_pnl = 0.0
-    total_positions = 0
+    # Fetch positions for all APIs concurrently, streaming partial results
+    progress = ProgressMessage(query)
 
-    for api in apis:
-        try:
-            credentials = await get_decrypted_api_credential(str(api.id))
-            if not credentials:
-                position_messages.append(
-                    f"<b>❌ {api.api_name}</b>\n"
-                    f"Failed to decrypt credentials\n"
-                )
-                continue
+    async def on_result(results):
+        done = [r.text for r in results if r is not None]
+        await progress.update(
+            "<b>📊 Open Positions</b>\n\n" + "\n".join(done) + pending_footer(results)
+        )
 
-            api_key, api_secret = credentials
-            client = DeltaClient(api_key, api_secret)
+    results = await fan_out_accounts(apis, _fetch_account_positions, on_result=on_result)
 
-            try:
-                response = await client.get_positions()
-                logger.info(f"[API: {api.api_name}] Raw /positions response: {response}")
-
-                if response.get('success'):
-                    result = response.get('result', [])
-                    for idx, pos in enumerate(result):
-                        logger.info(f"[API: {api.api_name}] Position #{idx} data: {pos}")
-
-                    active_positions = [
-                        pos for pos in result
-                        if float(pos.get('size', 0)) != 0
-                    ]
-
-                    if active_positions:
-                        api_position_text = f"<b>📊 {api.api_name}</b>\n\n"
-
-                        for position in active_positions:
-                            size = float(position.get('size', 0))
-                            entry_price = float(position.get('entry_price', 0))
-                            mark_price = float(position.get('mark_price', 0))
-                            symbol = position.get('product', {}).get('symbol', 'Unknown')
-                            size = float(position.get('size', 0))
-
-                            # Default: assume BTC unless ETH is found in symbol
-                            if 'ETH' in symbol:
-                                lot_size = 0.01
-                            else:
-                                lot_size = 0.001
-
-                            if size < 0:
-                                try:
-                                    custom_pnl = (entry_price - mark_price) * abs(size) * lot_size
-                                except Exception:
-                                    custom_pnl = 0.0
-                            else:
-                                try:
-                                    custom_pnl = float(position.get('unrealized_pnl', 0)) * abs(size) * lot_size
-                                except Exception:
-                                    custom_pnl = 0.0
-
-                            # Log each field
-                            logger.info(
-                                f"[API: {api.api_name}] {symbol} position: size={size}, entry={entry_price}, mark={mark_price}, "
-                                f"unrealized_pnl={position.get('unrealized_pnl')}, pnl={position.get('pnl')}"
-                            )
-
-                            direction = "🟢 Long" if size > 0 else "🔴 Short"
-
-                            api_position_text += (
-                                f"{direction} {symbol}\n"
-                                f"Size: {abs(size)}\n"
-                                f"Entry: ${entry_price:,.2f}\n"
-                                f"Mark: ${mark_price:,.2f}\n"
-                                f"PnL: "
-                            )
-
-                            if custom_pnl > 0:
-                                api_position_text += f"🟢 +${custom_pnl:,.2f}\n"
-                            elif custom_pnl < 0:
-                                api_position_text += f"🔴 ${custom_pnl:,.2f}\n"
-                            else:
-                                api_position_text += f"⚪ ${custom_pnl:,.2f}\n"
-
-                            api_position_text += "\n"
-                            total_unrealized_pnl += custom_pnl
-                            total_positions += 1
-
-                        position_messages.append(api_position_text)
-                    else:
-                        position_messages.append(
-                            f"<b>📊 {api.api_name}</b>\n"
-                            f"No open positions\n"
-                        )
-                else:
-                    error_msg = response.get('error', {}).get('message', 'Unknown error')
-                    logger.error(f"[API: {api.api_name}] Error in positions response: {error_msg}")
-                    position_messages.append(
-                        f"<b>❌ {api.api_name}</b>\n"
-                        f"Error: {error_msg}\n"
-                    )
-
-            finally:
-                await client.close()
-
-        except Exception as e:
-            logger.error(f"Failed to fetch positions for API {api.id}: {e}", exc_info=True)
-            position_messages.append(
-                f"<b>❌ {api.api_name}</b>\n"
-                f"Error: {str(e)[:80]}\n"
-            )
+    position_messages = [r.text for r in results]
+    total_unrealized_pnl = sum(r.data['pnl'] for r in results if r.data)
+    total_positions = sum(r.data['positions'] for r in results if r.data)
 
     # Construct final message
     if position_messages:
@@ -187,10 +198,10 @@ async def position_view_callback(update: Update, context: ContextTypes.DEFAULT_T
             "Please try again later."
         )
 
-    await query.edit_message_text(
+    await progress.update(
         final_text,
-        reply_markup=get_position_keyboard(),
-        parse_mode='HTML'
+        force=True,
+        reply_markup=get_position_keyboard()
     )
 
     log_user_action(user.id, "position_view", f"Viewed positions from {len(apis)} API(s)")
@@ -737,4 +737,16 @@ async def show_strategy_edit_menu(update: Update, strategy_id: str):
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode='HTML'
         )
-    
+
+
+def register_text_routes(router):
+    """Register the straddle creation text-input states."""
+    router.add('straddle_add_name', handle_straddle_name_input, pass_text=True)
+    router.add('straddle_add_description', handle_straddle_description_input, pass_text=True)
+    router.add('straddle_add_lot_size', handle_straddle_lot_size_input, pass_text=True)
+    router.add('straddle_add_sl_trigger', handle_straddle_sl_trigger_input, pass_text=True)
+    router.add('straddle_add_sl_limit', handle_straddle_sl_limit_input, pass_text=True)
+    router.add('straddle_add_target_trigger', handle_straddle_target_trigger_input, pass_text=True)
+    router.add('straddle_add_target_limit', handle_straddle_target_limit_input, pass_text=True)
+    router.add('straddle_add_atm_offset', handle_atm_offset_input, pass_text=True)
+    router.add_notice(['straddle_sl_monitor_confirm'], "ℹ️ Please use the buttons to confirm your choice.")
@@ -696,4 +696,20 @@ async def handle_strangle_edit_otm_value_input(update: Update, context: ContextT
     
     except ValueError as e:
         await update.message.reply_text(f"❌ Invalid input: {str(e)}")
-        
+
+
+def register_text_routes(router):
+    """Register the strangle creation and edit text-input states."""
+    router.add('strangle_add_name', handle_strangle_name_input, pass_text=True)
+    router.add('strangle_add_description', handle_strangle_description_input, pass_text=True)
+    router.add('strangle_add_lot_size', handle_strangle_lot_size_input, pass_text=True)
+    router.add('strangle_add_sl_trigger', handle_strangle_sl_trigger_input, pass_text=True)
+    router.add('strangle_add_sl_limit', handle_strangle_sl_limit_input, pass_text=True)
+    router.add('strangle_add_target_trigger', handle_strangle_target_trigger_input, pass_text=True)
+    router.add('strangle_add_target_limit', handle_strangle_target_limit_input, pass_text=True)
+    router.add('strangle_add_otm_value', handle_strangle_otm_value_input, pass_text=True)
+    router.add('strangle_edit_name_input', handle_strangle_edit_name_input, pass_text=True)
+    router.add('strangle_edit_desc_input', handle_strangle_edit_desc_input, pass_text=True)
+    router.add('strangle_edit_lot_input', handle_strangle_edit_lot_input, pass_text=True)
+    router.add('strangle_edit_otm_value_input', handle_strangle_edit_otm_value_input, pass_text=True)
+    router.add_notice(['strangle_sl_monitor_confirm'], "ℹ️ Please use the buttons to confirm your choice.")
@@ -15,12 +15,132 @@ from bot.utils.error_handler import error_handler
 from bot.utils.message_formatter import format_error_message, format_number
 from bot.validators.user_validator import check_user_authorization
 from bot.keyboards.confirmation_keyboards import get_back_keyboard
-from database.operations.api_ops import get_api_credentials, get_decrypted_api_credential
-from delta.client import DeltaClient
+from bot.utils.account_fanout import (
+    AccountResult,
+    ProgressMessage,
+    fan_out_accounts,
+    pending_footer
+)
+from database.operations.api_ops import get_api_credentials
 
 logger = setup_logger(__name__)
 
 
+async def _fetch_account_trades(
+    api,
+    client,
+    start_timestamp: int,
+    end_timestamp: int
+) -> AccountResult:
+    """
+    Fetch and format fills for one account.
+    
+    Args:
+        api: API credential
+        client: Pooled DeltaClient for the account
+        start_timestamp: Range start (Unix microseconds)
+        end_timestamp: Range end (Unix microseconds)
+    
+    Returns:
+        AccountResult with formatted text and trade stats as data
+    """
+    # Fetch fills (executed trades) from Delta Exchange
+    response = await client.get_fills(
+        start_time=start_timestamp,
+        end_time=end_timestamp
+    )
+    
+    if not response.get('success'):
+        error_msg = response.get('error', {}).get('message', 'Unknown error')
+        return AccountResult(
+            api,
+            f"<b>❌ {api.api_name}</b>\n"
+            f"API Error: {error_msg}\n",
+            error=error_msg
+        )
+    
+    fills = response.get('result', [])
+    
+    if not fills:
+        return AccountResult(
+            api,
+            f"<b>📊 {api.api_name}</b>\n"
+            f"No trades found\n"
+        )
+    
+    # Format trades for this API
+    api_text = f"<b>📊 {api.api_name}</b>\n\n"
+    
+    api_stats = {
+        'trades': 0,
+        'pnl': 0,
+        'commission': 0,
+        'winning': 0,
+        'losing': 0
+    }
+    
+    # Group fills by product (symbol)
+    trades_by_symbol = {}
+    for fill in fills:
+        symbol = fill.get('product_symbol', 'Unknown')
+        if symbol not in trades_by_symbol:
+            trades_by_symbol[symbol] = []
+        trades_by_symbol[symbol].append(fill)
+    
+    # Format each symbol's trades
+    for symbol, symbol_fills in trades_by_symbol.items():
+        api_text += f"<b>{symbol}</b>\n"
+        
+        for fill in symbol_fills[:5]:  # Show max 5 trades per symbol
+            side = fill.get('side', 'unknown').upper()
+            size = fill.get('size', 0)
+            price = fill.get('price', 0)
+            commission = fill.get('commission', 0)
+            pnl = fill.get('realized_pnl', 0)
+            
+            # Calculate stats
+            api_stats['trades'] += 1
+            api_stats['pnl'] += pnl
+            api_stats['commission'] += commission
+            
+            if pnl > 0:
+                api_stats['winning'] += 1
+            elif pnl < 0:
+                api_stats['losing'] += 1
+            
+            # Format PnL with color
+            if pnl > 0:
+                pnl_str = f"🟢 +${format_number(pnl)}"
+            elif pnl < 0:
+                pnl_str = f"🔴 -${format_number(abs(pnl))}"
+            else:
+                pnl_str = f"⚪ ${format_number(pnl)}"
+            
+            api_text += (
+                f"  {side} {size} @ ${format_number(price)}\n"
+                f"  PnL: {pnl_str} | Fee: ${format_number(commission)}\n\n"
+            )
+        
+        if len(symbol_fills) > 5:
+            api_text += f"  <i>...and {len(symbol_fills) - 5} more trades</i>\n\n"
+    
+    # API Summary
+    net_pnl = api_stats['pnl'] - api_stats['commission']
+    if net_pnl > 0:
+        net_pnl_str = f"🟢 +${format_number(net_pnl)}"
+    elif net_pnl < 0:
+        net_pnl_str = f"🔴 -${format_number(abs(net_pnl))}"
+    else:
+        net_pnl_str = f"⚪ ${format_number(net_pnl)}"
+    
+    api_text += (
+        f"<b>Trades:</b> {api_stats['trades']}\n"
+        f"<b>Net PnL:</b> {net_pnl_str}\n"
+    )
+    
+    return AccountResult(api, api_text, data=api_stats)
+
+
 @error_handler
 async def trade_history_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -70,8 +190,21 @@ async def trade_history_callback(update: Update, context: ContextTypes.DEFAULT_T
         start_timestamp = int(start_time.timestamp() * 1000000)
         end_timestamp = int(end_time.timestamp() * 1000000)
         
-        # Fetch trade history for each API
-        all_trades_text = []
+        # Fetch trade history for all APIs concurrently, streaming partial results
+        progress = ProgressMessage(query)
+        
+        async def fetch(api, client):
+            return await _fetch_account_trades(api, client, start_timestamp, end_timestamp)
+        
+        async def on_result(results):
+            done = [r.text for r in results if r is not None]
+            await progress.update(
+                "<b>📈 Trade History (Last 3 Days)</b>\n\n" + "\n".join(done) + pending_footer(results)
+            )
+        
+        results = await fan_out_accounts(apis, fetch, on_result=on_result)
+        
+        all_trades_text = [r.text for r in results]
         combined_stats = {
             'total_trades': 0,
             'total_pnl': 0,
@@ -79,131 +212,13 @@ async def trade_history_callback(update: Update, context: ContextTypes.DEFAULT_T
             'winning_trades': 0,
             'losing_trades': 0
         }
-        
-        for api in apis:
-            try:
-                # Get API credentials
-                credentials = await get_decrypted_api_credential(str(api.id))
-                if not credentials:
-                    all_trades_text.append(
-                        f"<b>❌ {api.api_name}</b>\n"
-                        f"Failed to decrypt credentials\n"
-                    )
-                    continue
-                
-                api_key, api_secret = credentials
-                
-                # Create Delta client
-                client = DeltaClient(api_key, api_secret)
-                
-                try:
-                    # Fetch fills (executed trades) from Delta Exchange
-                    response = await client.get_fills(
-                        start_time=start_timestamp,
-                        end_time=end_timestamp
-                    )
-                    
-                    if not response.get('success'):
-                        error_msg = response.get('error', {}).get('message', 'Unknown error')
-                        all_trades_text.append(
-                            f"<b>❌ {api.api_name}</b>\n"
-                            f"API Error: {error_msg}\n"
-                        )
-                        continue
-                    
-                    fills = response.get('result', [])
-                    
-                    if fills:
-                        # Format trades for this API
-                        api_text = f"<b>📊 {api.api_name}</b>\n\n"
-                        
-                        api_stats = {
-                            'trades': 0,
-                            'pnl': 0,
-                            'commission': 0
-                        }
-                        
-                        # Group fills by product (symbol)
-                        trades_by_symbol = {}
-                        for fill in fills:
-                            symbol = fill.get('product_symbol', 'Unknown')
-                            if symbol not in trades_by_symbol:
-                                trades_by_symbol[symbol] = []
-                            trades_by_symbol[symbol].append(fill)
-                        
-                        # Format each symbol's trades
-                        for symbol, symbol_fills in trades_by_symbol.items():
-                            api_text += f"<b>{symbol}</b>\n"
-                            
-                            for fill in symbol_fills[:5]:  # Show max 5 trades per symbol
-                                side = fill.get('side', 'unknown').upper()
-                                size = fill.get('size', 0)
-                                price = fill.get('price', 0)
-                                commission = fill.get('commission', 0)
-                                pnl = fill.get('realized_pnl', 0)
-                                
-                                # Calculate stats
-                                api_stats['trades'] += 1
-                                api_stats['pnl'] += pnl
-                                api_stats['commission'] += commission
-                                
-                                if pnl > 0:
-                                    combined_stats['winning_trades'] += 1
-                                elif pnl < 0:
-                                    combined_stats['losing_trades'] += 1
-                                
-                                # Format PnL with color
-                                if pnl > 0:
-                                    pnl_str = f"🟢 +${format_number(pnl)}"
-                                elif pnl < 0:
-                                    pnl_str = f"🔴 -${format_number(abs(pnl))}"
-                                else:
-                                    pnl_str = f"⚪ ${format_number(pnl)}"
-                                
-                                api_text += (
-                                    f"  {side} {size} @ ${format_number(price)}\n"
-                                    f"  PnL: {pnl_str} | Fee: ${format_number(commission)}\n\n"
-                                )
-                            
-                            if len(symbol_fills) > 5:
-                                api_text += f"  <i>...and {len(symbol_fills) - 5} more trades</i>\n\n"
-                        
-                        # API Summary
-                        net_pnl = api_stats['pnl'] - api_stats['commission']
-                        if net_pnl > 0:
-                            net_pnl_str = f"🟢 +${format_number(net_pnl)}"
-                        elif net_pnl < 0:
-                            net_pnl_str = f"🔴 -${format_number(abs(net_pnl))}"
-                        else:
-                            net_pnl_str = f"⚪ ${format_number(net_pnl)}"
-                        
-                        api_text += (
-                            f"<b>Trades:</b> {api_stats['trades']}\n"
-                            f"<b>Net PnL:</b> {net_pnl_str}\n"
-                        )
-                        
-                        all_trades_text.append(api_text)
-                        
-                        # Update combined stats
-                        combined_stats['total_trades'] += api_stats['trades']
-                        combined_stats['total_pnl'] += api_stats['pnl']
-                        combined_stats['total_commission'] += api_stats['commission']
-                    
-                    else:
-                        all_trades_text.append(
-                            f"<b>📊 {api.api_name}</b>\n"
-                            f"No trades found\n"
-                        )
-                
-                finally:
-                    await client.close()
-            
-            except Exception as e:
-                logger.error(f"Failed to fetch trades for API {api.id}: {e}", exc_info=True)
-                all_trades_text.append(
-                    f"<b>❌ {api.api_name}</b>\n"
-                    f"Error: {str(e)}\n"
-                )
+        for result in results:
+            if result.data:
+                combined_stats['total_trades'] += result.data['trades']
+                combined_stats['total_pnl'] += result.data['pnl']
+                combined_stats['total_commission'] += result.data['commission']
+                combined_stats['winning_trades'] += result.data['winning']
+                combined_stats['losing_trades'] += result.data['losing']
         
         # Construct final message
         if combined_stats['total_trades'] > 0:
@@ -245,10 +260,10 @@ async def trade_history_callback(update: Update, context: ContextTypes.DEFAULT_T
             )
         
         # Display trade history
-        await query.edit_message_text(
+        await progress.update(
             final_text,
-            reply_markup=get_back_keyboard("back_to_main"),
-            parse_mode='HTML'
+            force=True,
+            reply_markup=get_back_keyboard("back_to_main")
         )
         
         log_user_action(
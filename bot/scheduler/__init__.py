@@ -2,6 +2,8 @@
 Scheduler package for automated trading.
 """
 
-from .algo_scheduler import start_algo_scheduler
+from .scheduling_core import scheduling_core, JobType
+from .algo_scheduler import register_algo_jobs
+from .move_scheduler import register_move_jobs
 
-__all__ = ['start_algo_scheduler']
+__all__ = ['scheduling_core', 'JobType', 'register_algo_jobs', 'register_move_jobs']
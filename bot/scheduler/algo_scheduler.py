@@ -5,28 +5,151 @@ Includes automatic stop-loss and target order placement.
 """
 
 import asyncio
-import calendar
-from datetime import datetime, timedelta
-from typing import Dict, Set
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 import pytz
 
+from config import settings
 from bot.utils.logger import setup_logger
-from database.operations.algo_setup_ops import (
-    get_all_active_algo_setups,
-    update_algo_execution
-)
+from bot.scheduler.scheduling_core import JobType, scheduling_core
+from database.operations.algo_setup_ops import is_algo_setup_active, update_algo_execution
 from database.operations.manual_trade_preset_ops import get_manual_trade_preset
 from database.operations.api_ops import get_api_credential_by_id, get_decrypted_api_credential
 from database.operations.strategy_ops import get_strategy_preset_by_id
 from delta.client import DeltaClient
+from delta.client_registry import get_delta_client
+from delta.expiry_calendar import expiry_calendar, FAMILY_OPTIONS
+from delta.product_catalog import product_catalog
+from delta.websocket_feed import market_feed
+from delta.rate_limiter import request_priority, LANE_PROTECTIVE
 
 logger = setup_logger(__name__)
 
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
 
-# Track pending executions (setup_id -> task)
-pending_executions: Dict[str, asyncio.Task] = {}
+
+def build_sl_target_orders(product_id: int, size: int, direction: str, entry_price: float,
+                           sl_trigger_pct: float, sl_limit_pct: float,
+                           target_trigger_pct: float, target_limit_pct: float) -> Dict[str, Dict]:
+    """
+    Build stop-loss and target bracket order payloads for an option leg.
+    
+    Args:
+        product_id: Option product ID
+        size: Lot size
+        direction: 'long' or 'short'
+        entry_price: Entry price of the option
+        sl_trigger_pct: Stop-loss trigger percentage
+        sl_limit_pct: Stop-loss limit percentage
+        target_trigger_pct: Target trigger percentage (0 for none)
+        target_limit_pct: Target limit percentage
+    
+    Returns:
+        dict: {'sl': {...}, 'target': {...}} with 'order', 'trigger' and 'limit' per entry
+    """
+    # Long exits by selling below (SL) / above (target) entry; short is mirrored
+    sign = 1 if direction == 'long' else -1
+    exit_side = 'sell' if direction == 'long' else 'buy'
+    
+    def bracket(stop_order_type: str, trigger_price: float, limit_price: float) -> Dict:
+        return {
+            'order': {
+                'product_id': product_id,
+                'size': size,
+                'side': exit_side,
+                'order_type': 'limit_order',
+                'stop_order_type': stop_order_type,
+                'stop_price': round(trigger_price, 2),
+                'limit_price': round(limit_price, 2),
+                'time_in_force': 'gtc',
+                'reduce_only': True  # ✅ CRITICAL FIX
+            },
+            'trigger': trigger_price,
+            'limit': limit_price
+        }
+    
+    brackets = {
+        'sl': bracket(
+            'stop_loss_order',
+            entry_price * (1 - sign * sl_trigger_pct / 100),
+            entry_price * (1 - sign * sl_limit_pct / 100)
+        )
+    }
+    
+    if target_trigger_pct > 0:
+        brackets['target'] = bracket(
+            'take_profit_order',
+            entry_price * (1 + sign * target_trigger_pct / 100),
+            entry_price * (1 + sign * target_limit_pct / 100)
+        )
+    
+    return brackets
+
+
+async def submit_orders(client: DeltaClient, orders: List[Dict]) -> List[Dict]:
+    """
+    Submit orders concurrently so they share one round trip of wall time.
+    
+    Delta's /v2/orders/batch endpoint only accepts limit orders for a single
+    product, so multi-leg entries and brackets are pipelined instead.
+    
+    Args:
+        client: Delta client
+        orders: Order payloads
+    
+    Returns:
+        list: One API response per order (exceptions become failed responses)
+    """
+    responses = await asyncio.gather(
+        *(client.place_order(order) for order in orders),
+        return_exceptions=True
+    )
+    
+    return [
+        {'success': False, 'error': {'message': str(r)}} if isinstance(r, Exception) else r
+        for r in responses
+    ]
+
+
+async def rollback_entry(client: DeltaClient, cancel_orders: List[tuple], close_legs: List[tuple]):
+    """
+    Undo a partially placed entry: cancel bracket orders and flatten filled legs.
+    
+    Args:
+        client: Delta client
+        cancel_orders: (product_id, order_id) pairs to cancel
+        close_legs: (product_id, size, entry_side) tuples to close at market
+    """
+    close_orders = [
+        {
+            'product_id': product_id,
+            'size': size,
+            'side': 'sell' if entry_side == 'buy' else 'buy',
+            'order_type': 'market_order',
+            'time_in_force': 'ioc',
+            'reduce_only': True
+        }
+        for product_id, size, entry_side in close_legs
+    ]
+    
+    with request_priority(LANE_PROTECTIVE):
+        results = await asyncio.gather(
+            *(client.cancel_order(product_id, order_id) for product_id, order_id in cancel_orders),
+            submit_orders(client, close_orders),
+            return_exceptions=True
+        )
+    
+    close_results = results[-1] if not isinstance(results[-1], Exception) else []
+    failed = [r for r in results[:-1] if isinstance(r, Exception) or not r.get('success')]
+    failed += [r for r in close_results if not r.get('success')]
+    
+    if failed:
+        logger.error(f"Rollback incomplete: {len(failed)} action(s) failed: {failed}")
+    else:
+        logger.info(f"Rolled back entry: cancelled {len(cancel_orders)} order(s), closed {len(close_legs)} leg(s)")
 
 
 async def place_sl_target_orders(client: DeltaClient, symbol: str, size: int, direction: str, 
@@ -50,168 +173,356 @@ async def place_sl_target_orders(client: DeltaClient, symbol: str, size: int, di
     Returns:
         dict: Order IDs and details
     """
-    orders = {}
-    
     try:
-        # Get product_id from symbol
-        products_response = await client.get_products(contract_types='call_options,put_options')
-        
-        if not products_response.get('success'):
-            raise Exception("Failed to fetch products for SL/Target placement")
-        
-        product = next((p for p in products_response['result'] if p['symbol'] == symbol), None)
+        product = await product_catalog.get_product(symbol)
         
         if not product:
             raise Exception(f"Product not found: {symbol}")
         
-        product_id = product['id']
+        brackets = build_sl_target_orders(
+            product['id'], size, direction, entry_price,
+            sl_trigger_pct, sl_limit_pct, target_trigger_pct, target_limit_pct
+        )
+        responses = await submit_orders(client, [b['order'] for b in brackets.values()])
+        return _collect_bracket_results(brackets, responses, option_type)
+    
+    except Exception as e:
+        logger.error(f"Error placing SL/Target for {option_type}: {e}", exc_info=True)
+        return {'error': str(e)}
+
+
+def _collect_bracket_results(brackets: Dict[str, Dict], responses: List[Dict], option_type: str) -> Dict:
+    """
+    Map bracket order responses to the order-details dict used by callers.
+    
+    Args:
+        brackets: Output of build_sl_target_orders
+        responses: API responses in the same order as brackets
+        option_type: 'CE' or 'PE' for logging
+    
+    Returns:
+        dict: sl/target order IDs, trigger/limit prices and errors
+    """
+    orders = {}
+    
+    for (kind, bracket), response in zip(brackets.items(), responses):
+        label = 'SL' if kind == 'sl' else 'Target'
+        
+        if response.get('success'):
+            orders[f'{kind}_order_id'] = response['result']['id']
+            orders[f'{kind}_trigger'] = bracket['trigger']
+            orders[f'{kind}_limit'] = bracket['limit']
+            logger.info(
+                f"{option_type} {label} order placed: {response['result']['id']} "
+                f"(trigger={bracket['trigger']:.2f}, limit={bracket['limit']:.2f})"
+            )
+        else:
+            error_msg = response.get('error', {}).get('message', 'Unknown error')
+            orders[f'{kind}_error'] = error_msg
+            logger.error(f"{option_type} {label} order failed: {error_msg}")
+    
+    return orders
+
+
+class AlgoSetupError(Exception):
+    """Setup cannot be executed (missing preset, credentials or strategy)."""
+
+
+@dataclass
+class PreparedAlgoTrade:
+    """Everything an algo trade needs before its execution second."""
+
+    setup_id: str
+    user_id: int
+    preset: dict
+    strategy: Any
+    asset: str
+    direction: str
+    lot_size: int
+    sl_trigger_pct: float
+    sl_limit_pct: float
+    target_trigger_pct: float
+    target_limit_pct: float
+    client: DeltaClient
+    ticker_subscription: Any = None
+    client_released: bool = False
+
+    async def get_spot_price(self) -> float:
+        """
+        Get spot price, preferring the latest streamed ticker over a REST call.
+        
+        Returns:
+            Spot price
+        """
+        latest = None
+        if self.ticker_subscription is not None:
+            while not self.ticker_subscription.queue.empty():
+                latest = self.ticker_subscription.queue.get_nowait()
+        
+        if latest and latest.get('spot_price'):
+            # Ticker timestamps are in microseconds
+            age = time.time() - int(latest.get('timestamp', 0)) / 1_000_000
+            if age <= settings.SPOT_PRICE_CACHE_TTL:
+                return float(latest['spot_price'])
+        
+        return await self.client.get_spot_price(self.asset)
+
+    def close(self):
+        """Release the ticker subscription and the pooled client (idempotent)."""
+        if self.ticker_subscription is not None:
+            self.ticker_subscription.close()
+            self.ticker_subscription = None
+        if not self.client_released:
+            self.client_released = True
+            self.client.release()
+
+
+@dataclass
+class SelectedOptions:
+    """Expiry and CE/PE products chosen for an algo trade."""
+
+    expiry: str
+    ce_option: dict
+    pe_option: dict
+    ce_strike: float
+    pe_strike: float
+
+
+def select_algo_options(
+    preset: dict,
+    strategy: Any,
+    asset: str,
+    spot_price: float,
+    now: Optional[datetime] = None
+) -> SelectedOptions:
+    """
+    Pick the expiry and CE/PE products for a straddle or strangle preset.
+
+    Uses the loaded product catalogue only (no API calls).
+
+    Args:
+        preset: Algo trade preset (strategy_type)
+        strategy: Strategy preset (model or dict)
+        asset: BTC or ETH
+        spot_price: Current spot price
+        now: Reference time for expiry resolution (defaults to now)
+
+    Returns:
+        SelectedOptions
+
+    Raises:
+        Exception: If no options are listed for the expiry or strikes
+    """
+    # READ EXPIRY TYPE FROM STRATEGY PRESET
+    if hasattr(strategy, 'expiry_type'):
+        expiry_type = strategy.expiry_type
+    elif isinstance(strategy, dict):
+        expiry_type = strategy.get('expiry_type', 'daily')
+    else:
+        expiry_type = 'daily'
+
+    # Nearest listed option expiry of that type (settled expiries roll over automatically)
+    expiry = expiry_calendar.resolve_type(asset, expiry_type, now, FAMILY_OPTIONS)
+    if not expiry:
+        raise Exception(f"No {expiry_type} expiry listed for {asset}")
+    target_expiry = expiry.code
+    logger.info(f"Expiry Type: {expiry_type.upper()} | Target: {target_expiry} ({expiry.format()})")
+
+    # Look up listed strikes for the expiry
+    strikes = product_catalog.get_strikes(asset, target_expiry)
+    if not strikes:
+        raise Exception(f"No options found for {asset} with expiry {target_expiry}")
+
+    logger.info(f"Found {len(strikes)} live strikes for {asset} expiring {target_expiry}")
+
+    # Calculate strikes based on strategy type
+    if preset['strategy_type'] == 'straddle':
+        if hasattr(strategy, 'atm_offset'):
+            atm_offset = strategy.atm_offset
+        else:
+            atm_offset = strategy.get('atm_offset', 0)
         
-        # Calculate stop-loss prices
-        if direction == 'long':
-            # For long positions, SL is below entry
-            sl_trigger_price = entry_price * (1 - sl_trigger_pct / 100)
-            sl_limit_price = entry_price * (1 - sl_limit_pct / 100)
-            sl_side = 'sell'  # Exit long by selling
-            
-            # Target is above entry
-            if target_trigger_pct > 0:
-                target_trigger_price = entry_price * (1 + target_trigger_pct / 100)
-                target_limit_price = entry_price * (1 + target_limit_pct / 100)
-                target_side = 'sell'
-        else:  # short
-            # For short positions, SL is above entry
-            sl_trigger_price = entry_price * (1 + sl_trigger_pct / 100)
-            sl_limit_price = entry_price * (1 + sl_limit_pct / 100)
-            sl_side = 'buy'  # Exit short by buying
-            
-            # Target is below entry
-            if target_trigger_pct > 0:
-                target_trigger_price = entry_price * (1 - target_trigger_pct / 100)
-                target_limit_price = entry_price * (1 - target_limit_pct / 100)
-                target_side = 'buy'
+        target_strike = spot_price + atm_offset
+        atm_strike = product_catalog.nearest_strike(asset, target_expiry, target_strike)
         
-        # Place stop-loss order
-        logger.info(f"Placing SL for {option_type}: trigger={sl_trigger_price:.2f}, limit={sl_limit_price:.2f}")
+        logger.info(f"Straddle ATM strike: {atm_strike} (offset: {atm_offset})")
         
-        sl_order = await client.place_order({
-            'product_id': product_id,
-            'size': size,
-            'side': sl_side,
-            'order_type': 'limit_order',
-            'stop_order_type': 'stop_loss_order',
-            'stop_price': round(sl_trigger_price, 2),
-            'limit_price': round(sl_limit_price, 2),
-            'time_in_force': 'gtc',
-            'reduce_only': True  # ✅ CRITICAL FIX
-        })
-        
-        if sl_order.get('success'):
-            orders['sl_order_id'] = sl_order['result']['id']
-            orders['sl_trigger'] = sl_trigger_price
-            orders['sl_limit'] = sl_limit_price
-            logger.info(f"{option_type} Stop-loss order placed: {sl_order['result']['id']}")
+        ce_option = product_catalog.get_option(asset, target_expiry, atm_strike, 'C')
+        pe_option = product_catalog.get_option(asset, target_expiry, atm_strike, 'P')
+        
+        if not ce_option or not pe_option:
+            raise Exception("Could not find matching ATM options")
+        
+        ce_strike = atm_strike
+        pe_strike = atm_strike
+    
+    else:  # strangle
+        if hasattr(strategy, 'otm_selection'):
+            otm_selection = strategy.otm_selection
+            otm_type = otm_selection.type
+            otm_value = otm_selection.value
         else:
-            logger.error(f"{option_type} SL order failed: {sl_order.get('error', {}).get('message')}")
-            orders['sl_error'] = sl_order.get('error', {}).get('message', 'Unknown error')
+            otm_selection = strategy.get('otm_selection', {})
+            otm_type = otm_selection.get('type', 'percentage')
+            otm_value = otm_selection.get('value', 0)
         
-        # Place target order if specified
-        if target_trigger_pct > 0:
-            logger.info(f"Placing Target for {option_type}: trigger={target_trigger_price:.2f}, limit={target_limit_price:.2f}")
-            
-            target_order = await client.place_order({
-                'product_id': product_id,
-                'size': size,
-                'side': target_side,
-                'order_type': 'limit_order',
-                'stop_order_type': 'take_profit_order',
-                'stop_price': round(target_trigger_price, 2),
-                'limit_price': round(target_limit_price, 2),
-                'time_in_force': 'gtc',
-                'reduce_only': True  # ✅ CRITICAL FIX
-            })
-            
-            if target_order.get('success'):
-                orders['target_order_id'] = target_order['result']['id']
-                orders['target_trigger'] = target_trigger_price
-                orders['target_limit'] = target_limit_price
-                logger.info(f"{option_type} Target order placed: {target_order['result']['id']}")
-            else:
-                logger.error(f"{option_type} Target order failed: {target_order.get('error', {}).get('message')}")
-                orders['target_error'] = target_order.get('error', {}).get('message', 'Unknown error')
+        if otm_type == 'percentage':
+            offset = spot_price * (otm_value / 100)
+            ce_target = spot_price + offset
+            pe_target = spot_price - offset
+            logger.info(f"Strangle OTM % calculation: CE target={ce_target}, PE target={pe_target}")
+        else:  # numeral
+            atm_strike = product_catalog.nearest_strike(asset, target_expiry, spot_price)
+            atm_index = strikes.index(atm_strike)
+            num_strikes = int(otm_value)
+            ce_target = strikes[min(atm_index + num_strikes, len(strikes) - 1)]
+            pe_target = strikes[max(atm_index - num_strikes, 0)]
+            logger.info(f"Strangle OTM strikes calculation: CE target={ce_target}, PE target={pe_target}")
+        
+        ce_strike = product_catalog.nearest_strike(asset, target_expiry, ce_target)
+        pe_strike = product_catalog.nearest_strike(asset, target_expiry, pe_target)
+        
+        ce_option = product_catalog.get_option(asset, target_expiry, ce_strike, 'C')
+        pe_option = product_catalog.get_option(asset, target_expiry, pe_strike, 'P')
+        
+        if not ce_option or not pe_option:
+            raise Exception("Could not find matching OTM options")
+
+    return SelectedOptions(target_expiry, ce_option, pe_option, ce_strike, pe_strike)
+
+
+async def prepare_algo_trade(setup_id: str, user_id: int, prewarm: bool = False) -> Optional[PreparedAlgoTrade]:
+    """
+    Load setup, preset, strategy and credentials for an algo trade.
     
-    except Exception as e:
-        logger.error(f"Error placing SL/Target for {option_type}: {e}", exc_info=True)
-        orders['error'] = str(e)
+    With prewarm=True this also refreshes the product catalogue, opens the
+    pooled client connection and subscribes to the underlying's ticker, so
+    the execution second only has to pick strikes and send orders.
     
-    return orders
+    Args:
+        setup_id: Algo setup ID
+        user_id: Telegram user ID
+        prewarm: Warm catalogue, connection and spot price feed
+    
+    Returns:
+        PreparedAlgoTrade, or None if the setup is missing or inactive
+    
+    Raises:
+        AlgoSetupError: If the setup cannot be executed
+    """
+    from database.operations.algo_setup_ops import get_algo_setup
+    setup = await get_algo_setup(setup_id)
+    
+    if not setup or not setup.get('is_active'):
+        logger.warning(f"Setup {setup_id} not found or inactive")
+        return None
+    
+    # Get manual preset
+    preset = await get_manual_trade_preset(setup['manual_preset_id'])
+    if not preset:
+        raise AlgoSetupError('Manual preset not found')
+    
+    # Get API credentials
+    api = await get_api_credential_by_id(preset['api_credential_id'])
+    if not api:
+        raise AlgoSetupError('API credential not found')
+    
+    credentials = await get_decrypted_api_credential(preset['api_credential_id'])
+    if not credentials:
+        raise AlgoSetupError('Failed to decrypt credentials')
+    
+    # Get strategy
+    strategy = await get_strategy_preset_by_id(preset['strategy_preset_id'])
+    if not strategy:
+        raise AlgoSetupError('Strategy not found')
+    
+    # Handle both dict and Pydantic model
+    if hasattr(strategy, 'asset'):
+        params = {
+            'asset': strategy.asset,
+            'direction': strategy.direction,
+            'lot_size': strategy.lot_size,
+            'sl_trigger_pct': strategy.sl_trigger_pct,
+            'sl_limit_pct': strategy.sl_limit_pct,
+            'target_trigger_pct': strategy.target_trigger_pct,
+            'target_limit_pct': strategy.target_limit_pct,
+        }
+    else:
+        params = {
+            'asset': strategy.get('asset'),
+            'direction': strategy.get('direction'),
+            'lot_size': strategy.get('lot_size'),
+            'sl_trigger_pct': strategy.get('sl_trigger_pct', 0),
+            'sl_limit_pct': strategy.get('sl_limit_pct', 0),
+            'target_trigger_pct': strategy.get('target_trigger_pct', 0),
+            'target_limit_pct': strategy.get('target_limit_pct', 0),
+        }
+    
+    api_key, api_secret = credentials
+    prepared = PreparedAlgoTrade(
+        setup_id=setup_id,
+        user_id=user_id,
+        preset=preset,
+        strategy=strategy,
+        client=get_delta_client(api_key, api_secret),
+        **params
+    )
+    
+    if prewarm:
+        try:
+            # New expiries are listed during the day, so force a fresh catalogue
+            await product_catalog.refresh()
+            prepared.ticker_subscription = await market_feed.subscribe_ticker(f"{prepared.asset}USD")
+            # Opens the pooled connection (TLS handshake) ahead of the orders
+            await prepared.client.get_ticker(f"{prepared.asset}USD")
+        except BaseException:
+            prepared.close()
+            raise
+    
+    return prepared
 
 
-async def execute_algo_trade(setup_id: str, user_id: int, bot_application):
-    """Execute algo trade for a setup."""
+async def execute_algo_trade(setup_id: str, user_id: int, bot_application,
+                             prepared: Optional[PreparedAlgoTrade] = None):
+    """
+    Execute algo trade for a setup.
+    
+    Args:
+        setup_id: Algo setup ID
+        user_id: Telegram user ID
+        bot_application: Bot application for notifications
+        prepared: Pre-warmed trade context (loaded now if not given)
+    """
     client = None
     try:
         logger.info(f"Executing algo trade for setup {setup_id}")
         
-        # Get algo setup
-        from database.operations.algo_setup_ops import get_algo_setup
-        setup = await get_algo_setup(setup_id)
-        
-        if not setup or not setup.get('is_active'):
-            logger.warning(f"Setup {setup_id} not found or inactive")
-            return
-        
-        # Get manual preset
-        preset = await get_manual_trade_preset(setup['manual_preset_id'])
-        if not preset:
-            logger.error(f"Manual preset not found for setup {setup_id}")
-            await update_algo_execution(setup_id, 'failed', {'error': 'Manual preset not found'})
-            return
-        
-        # Get API credentials
-        api = await get_api_credential_by_id(preset['api_credential_id'])
-        if not api:
-            logger.error(f"API credential not found for setup {setup_id}")
-            await update_algo_execution(setup_id, 'failed', {'error': 'API credential not found'})
-            return
-        
-        credentials = await get_decrypted_api_credential(preset['api_credential_id'])
-        if not credentials:
-            logger.error(f"Failed to decrypt credentials for setup {setup_id}")
-            await update_algo_execution(setup_id, 'failed', {'error': 'Failed to decrypt credentials'})
-            return
+        loaded_now = prepared is None
+        if prepared is None:
+            try:
+                prepared = await prepare_algo_trade(setup_id, user_id)
+            except AlgoSetupError as e:
+                logger.error(f"{e} for setup {setup_id}")
+                await update_algo_execution(setup_id, 'failed', {'error': str(e)})
+                return
         
-        # Get strategy
-        strategy = await get_strategy_preset_by_id(preset['strategy_preset_id'])
-        if not strategy:
-            logger.error(f"Strategy not found for setup {setup_id}")
-            await update_algo_execution(setup_id, 'failed', {'error': 'Strategy not found'})
+        if prepared is None:
             return
         
-        # Handle both dict and Pydantic model
-        if hasattr(strategy, 'asset'):
-            asset = strategy.asset
-            direction = strategy.direction
-            lot_size = strategy.lot_size
-            sl_trigger_pct = strategy.sl_trigger_pct
-            sl_limit_pct = strategy.sl_limit_pct
-            target_trigger_pct = strategy.target_trigger_pct
-            target_limit_pct = strategy.target_limit_pct
-        else:
-            asset = strategy.get('asset')
-            direction = strategy.get('direction')
-            lot_size = strategy.get('lot_size')
-            sl_trigger_pct = strategy.get('sl_trigger_pct', 0)
-            sl_limit_pct = strategy.get('sl_limit_pct', 0)
-            target_trigger_pct = strategy.get('target_trigger_pct', 0)
-            target_limit_pct = strategy.get('target_limit_pct', 0)
-        
-        # Create Delta client
-        api_key, api_secret = credentials
-        client = DeltaClient(api_key, api_secret)
-        
-        # Get spot price using get_spot_price (same as manual trade)
+        preset = prepared.preset
+        strategy = prepared.strategy
+        asset = prepared.asset
+        direction = prepared.direction
+        lot_size = prepared.lot_size
+        sl_trigger_pct = prepared.sl_trigger_pct
+        sl_limit_pct = prepared.sl_limit_pct
+        target_trigger_pct = prepared.target_trigger_pct
+        target_limit_pct = prepared.target_limit_pct
+        client = prepared.client
+        
+        # Spot price from the streamed ticker, or REST (same as manual trade)
         try:
-            spot_price = await client.get_spot_price(asset)
+            spot_price = await prepared.get_spot_price()
             logger.info(f"Spot price for {asset}: {spot_price}")
         except Exception as e:
             error_msg = f"Failed to fetch spot price: {str(e)}"
@@ -229,240 +540,105 @@ async def execute_algo_trade(setup_id: str, user_id: int, bot_application):
                 pass
             return
 
-        # Get options
-        products_response = await client.get_products(contract_types='call_options,put_options')
-        if not products_response.get('success'):
-            raise Exception(f"Failed to fetch options: {products_response.get('error', {}).get('message')}")
+        # Make sure the product catalogue is loaded
+        if not await product_catalog.ensure_fresh():
+            raise Exception("Failed to load product catalogue")
 
-        products = products_response['result']
-
-        # READ EXPIRY TYPE FROM STRATEGY PRESET
-        if hasattr(strategy, 'expiry_type'):
-            expiry_type = strategy.expiry_type
-        elif isinstance(strategy, dict):
-            expiry_type = strategy.get('expiry_type', 'daily')
-        else:
-            expiry_type = 'daily'
-
-        # Get current time in IST
-        ist = pytz.timezone('Asia/Kolkata')
-        now_ist = datetime.now(ist)
-
-        # CALCULATE TARGET EXPIRY BASED ON STRATEGY'S EXPIRY_TYPE
-        if expiry_type == 'daily':
-            if now_ist.hour < 17 or (now_ist.hour == 17 and now_ist.minute < 30):
-                target_expiry_date = now_ist.date()
-            else:
-                target_expiry_date = now_ist.date() + timedelta(days=1)
-
-        elif expiry_type == 'weekly':
-            current_weekday = now_ist.weekday()
-            if current_weekday < 4:
-                days_to_friday = 4 - current_weekday
-            elif current_weekday == 4:
-                if now_ist.hour >= 17 and now_ist.minute >= 30:
-                    days_to_friday = 7
-                else:
-                    days_to_friday = 0
-            else:
-                days_to_friday = (7 - current_weekday + 4) % 7
-    
-            target_expiry_date = now_ist.date() + timedelta(days=days_to_friday)
-
-        elif expiry_type == 'monthly':
-            year = now_ist.year
-            month = now_ist.month
-            last_day = calendar.monthrange(year, month)[1]
-            last_date = datetime(year, month, last_day, tzinfo=ist).date()
-    
-            while last_date.weekday() != 4:
-                last_date -= timedelta(days=1)
-    
-            if now_ist.date() > last_date or (now_ist.date() == last_date and now_ist.hour >= 17 and now_ist.minute >= 30):
-                if month == 12:
-                    next_month = 1
-                    next_year = year + 1
-                else:
-                    next_month = month + 1
-                    next_year = year
-        
-                last_day = calendar.monthrange(next_year, next_month)[1]
-                target_expiry_date = datetime(next_year, next_month, last_day, tzinfo=ist).date()
-        
-                while target_expiry_date.weekday() != 4:
-                    target_expiry_date -= timedelta(days=1)
-            else:
-                target_expiry_date = last_date
-
-        else:
-            raise ValueError(f"Invalid expiry_type: {expiry_type}")
-
-        target_expiry = target_expiry_date.strftime('%d%m%y')
-        logger.info(f"Expiry Type: {expiry_type.upper()} | Target: {target_expiry} ({target_expiry_date.strftime('%d %b %Y')})")
-
-        # Filter options by expiry
-        filtered_options = [
-            p for p in products
-            if asset in p.get('symbol', '') 
-            and p.get('state') == 'live'
-            and target_expiry in p.get('symbol', '')
-        ]
-
-        if not filtered_options:
-            logger.warning(f"No options found for expiry {target_expiry}, trying next day...")
-            target_expiry_date = target_expiry_date + timedelta(days=1)
-            target_expiry = target_expiry_date.strftime('%d%m%y')
-            logger.info(f"Using next day's expiry: {target_expiry} ({target_expiry_date.strftime('%d %b %Y')})")
-    
-            filtered_options = [
-                p for p in products
-                if asset in p.get('symbol', '') 
-                and p.get('state') == 'live'
-                and target_expiry in p.get('symbol', '')
-            ]
-    
-            if not filtered_options:
-                raise Exception(f"No options found for {asset} with expiry {target_expiry}")
-
-        logger.info(f"Found {len(filtered_options)} live options for {asset} expiring {target_expiry}")
- 
-        # Calculate strikes based on strategy type
-        if preset['strategy_type'] == 'straddle':
-            if hasattr(strategy, 'atm_offset'):
-                atm_offset = strategy.atm_offset
-            else:
-                atm_offset = strategy.get('atm_offset', 0)
-            
-            target_strike = spot_price + atm_offset
-            strikes = sorted(set(float(p['strike_price']) for p in filtered_options if p.get('strike_price')))
-            atm_strike = min(strikes, key=lambda x: abs(x - target_strike))
-            
-            logger.info(f"Straddle ATM strike: {atm_strike} (offset: {atm_offset})")
-            
-            ce_option = next((p for p in filtered_options 
-                             if float(p['strike_price']) == atm_strike and 'C' in p['symbol']), None)
-            pe_option = next((p for p in filtered_options 
-                             if float(p['strike_price']) == atm_strike and 'P' in p['symbol']), None)
-            
-            if not ce_option or not pe_option:
-                raise Exception("Could not find matching ATM options")
-            
-            ce_symbol = ce_option['symbol']
-            pe_symbol = pe_option['symbol']
-            ce_strike = atm_strike
-            pe_strike = atm_strike
-        
-        else:  # strangle
-            if hasattr(strategy, 'otm_selection'):
-                otm_selection = strategy.otm_selection
-                otm_type = otm_selection.type
-                otm_value = otm_selection.value
-            else:
-                otm_selection = strategy.get('otm_selection', {})
-                otm_type = otm_selection.get('type', 'percentage')
-                otm_value = otm_selection.get('value', 0)
-            
-            strikes = sorted(set(float(p['strike_price']) for p in filtered_options if p.get('strike_price')))
-            
-            if otm_type == 'percentage':
-                offset = spot_price * (otm_value / 100)
-                ce_target = spot_price + offset
-                pe_target = spot_price - offset
-                logger.info(f"Strangle OTM % calculation: CE target={ce_target}, PE target={pe_target}")
-            else:  # numeral
-                atm_strike = min(strikes, key=lambda x: abs(x - spot_price))
-                atm_index = strikes.index(atm_strike)
-                num_strikes = int(otm_value)
-                ce_target = strikes[min(atm_index + num_strikes, len(strikes) - 1)]
-                pe_target = strikes[max(atm_index - num_strikes, 0)]
-                logger.info(f"Strangle OTM strikes calculation: CE target={ce_target}, PE target={pe_target}")
-            
-            ce_strike = min(strikes, key=lambda x: abs(x - ce_target))
-            pe_strike = min(strikes, key=lambda x: abs(x - pe_target))
-            
-            ce_option = next((p for p in filtered_options 
-                             if float(p['strike_price']) == ce_strike and 'C' in p['symbol']), None)
-            pe_option = next((p for p in filtered_options 
-                             if float(p['strike_price']) == pe_strike and 'P' in p['symbol']), None)
-            
-            if not ce_option or not pe_option:
-                raise Exception("Could not find matching OTM options")
-            
-            ce_symbol = ce_option['symbol']
-            pe_symbol = pe_option['symbol']
+        selected = select_algo_options(preset, strategy, asset, spot_price)
+        ce_option = selected.ce_option
+        pe_option = selected.pe_option
+        ce_symbol = ce_option['symbol']
+        pe_symbol = pe_option['symbol']
+        ce_strike = selected.ce_strike
+        pe_strike = selected.pe_strike
         
         logger.info(f"Selected options - CE: {ce_symbol}, PE: {pe_symbol}")
         
-        # Execute entry orders
-        side = 'buy' if direction == 'long' else 'sell'
+        # A pre-warmed context was loaded ahead of time; the setup may have
+        # been deactivated since
+        if not loaded_now and not await is_algo_setup_active(setup_id):
+            logger.warning(f"Setup {setup_id} deactivated before entry, skipping")
+            return
         
-        # Get CE product_id
+        # Execute entry orders: both legs in one concurrent submission
+        side = 'buy' if direction == 'long' else 'sell'
         ce_product_id = ce_option['id']
-
-        # Place CE order
-        logger.info(f"Placing CE order: {side} {lot_size} {ce_symbol}")
-        ce_order = await client.place_order({
-            'product_id': ce_product_id,
-            'size': lot_size,
-            'side': side,
-            'order_type': 'market_order',
-            'time_in_force': 'ioc'
-        })
+        pe_product_id = pe_option['id']
         
-        if not ce_order.get('success'):
-            raise Exception(f"CE order failed: {ce_order.get('error', {}).get('message')}")
+        logger.info(f"Placing entry orders: {side} {lot_size} {ce_symbol} + {pe_symbol}")
+        ce_order, pe_order = await submit_orders(client, [
+            {
+                'product_id': product_id,
+                'size': lot_size,
+                'side': side,
+                'order_type': 'market_order',
+                'time_in_force': 'ioc'
+            }
+            for product_id in (ce_product_id, pe_product_id)
+        ])
+        
+        if not ce_order.get('success') or not pe_order.get('success'):
+            # Never leave a naked single leg: flatten whichever leg filled
+            filled = [
+                (product_id, lot_size, side)
+                for product_id, order in ((ce_product_id, ce_order), (pe_product_id, pe_order))
+                if order.get('success')
+            ]
+            if filled:
+                await rollback_entry(client, [], filled)
+            
+            errors = [
+                f"{leg} order failed: {order.get('error', {}).get('message')}"
+                for leg, order in (('CE', ce_order), ('PE', pe_order))
+                if not order.get('success')
+            ]
+            raise Exception("; ".join(errors) + (" (filled leg closed)" if filled else ""))
         
         ce_order_id = ce_order['result']['id']
         ce_fill_price = float(ce_order['result'].get('average_fill_price', 0))
-        logger.info(f"CE order filled: ID={ce_order_id}, Price={ce_fill_price}")
-        
-        # Get PE product_id
-        pe_product_id = pe_option['id']
-
-        # Place PE order
-        logger.info(f"Placing PE order: {side} {lot_size} {pe_symbol}")
-        pe_order = await client.place_order({
-            'product_id': pe_product_id,
-            'size': lot_size,
-            'side': side,
-            'order_type': 'market_order',
-            'time_in_force': 'ioc'
-        })
-        
-        if not pe_order.get('success'):
-            raise Exception(f"PE order failed: {pe_order.get('error', {}).get('message')}")
-        
         pe_order_id = pe_order['result']['id']
         pe_fill_price = float(pe_order['result'].get('average_fill_price', 0))
-        logger.info(f"PE order filled: ID={pe_order_id}, Price={pe_fill_price}")
-        
-        # Place stop-loss and target orders for CE
-        ce_bracket_orders = await place_sl_target_orders(
-            client=client,
-            symbol=ce_symbol,
-            size=lot_size,
-            direction=direction,
-            entry_price=ce_fill_price,
-            sl_trigger_pct=sl_trigger_pct,
-            sl_limit_pct=sl_limit_pct,
-            target_trigger_pct=target_trigger_pct,
-            target_limit_pct=target_limit_pct,
-            option_type='CE'
-        )
-        
-        # Place stop-loss and target orders for PE
-        pe_bracket_orders = await place_sl_target_orders(
-            client=client,
-            symbol=pe_symbol,
-            size=lot_size,
-            direction=direction,
-            entry_price=pe_fill_price,
-            sl_trigger_pct=sl_trigger_pct,
-            sl_limit_pct=sl_limit_pct,
-            target_trigger_pct=target_trigger_pct,
-            target_limit_pct=target_limit_pct,
-            option_type='PE'
-        )
+        logger.info(f"Entry filled: CE ID={ce_order_id} @ {ce_fill_price}, PE ID={pe_order_id} @ {pe_fill_price}")
+        
+        # Place stop-loss and target orders for both legs in one concurrent submission
+        leg_brackets = {
+            'CE': build_sl_target_orders(
+                ce_product_id, lot_size, direction, ce_fill_price,
+                sl_trigger_pct, sl_limit_pct, target_trigger_pct, target_limit_pct
+            ),
+            'PE': build_sl_target_orders(
+                pe_product_id, lot_size, direction, pe_fill_price,
+                sl_trigger_pct, sl_limit_pct, target_trigger_pct, target_limit_pct
+            )
+        }
+        with request_priority(LANE_PROTECTIVE):
+            bracket_responses = await submit_orders(client, [
+                bracket['order'] for brackets in leg_brackets.values() for bracket in brackets.values()
+            ])
+        
+        ce_count = len(leg_brackets['CE'])
+        ce_bracket_orders = _collect_bracket_results(leg_brackets['CE'], bracket_responses[:ce_count], 'CE')
+        pe_bracket_orders = _collect_bracket_results(leg_brackets['PE'], bracket_responses[ce_count:], 'PE')
+        
+        # Stop-losses are mandatory: roll the whole entry back if either failed
+        if 'sl_error' in ce_bracket_orders or 'sl_error' in pe_bracket_orders:
+            placed = [
+                (bracket['order']['product_id'], response['result']['id'])
+                for bracket, response in zip(
+                    [b for brackets in leg_brackets.values() for b in brackets.values()],
+                    bracket_responses
+                )
+                if response.get('success')
+            ]
+            await rollback_entry(
+                client,
+                placed,
+                [(ce_product_id, lot_size, side), (pe_product_id, lot_size, side)]
+            )
+            raise Exception(
+                "Stop-loss placement failed, entry rolled back: "
+                f"{ce_bracket_orders.get('sl_error') or pe_bracket_orders.get('sl_error')}"
+            )
         
         # Build execution details
         details = {
@@ -533,6 +709,7 @@ async def execute_algo_trade(setup_id: str, user_id: int, bot_application):
     
             # Build strategy data for monitor
             monitor_data = {
+                'strategy_id': f"algo_{setup_id}_{datetime.now(IST).strftime('%Y%m%d%H%M')}",
                 'user_id': user_id,
                 'api_id': preset['api_credential_id'],  # ✅ ADD THIS
                 'strategy_type': preset['strategy_type'],
@@ -544,12 +721,12 @@ async def execute_algo_trade(setup_id: str, user_id: int, bot_application):
                 'pe_entry_price': pe_fill_price,
                 'ce_sl_order_id': ce_bracket_orders.get('sl_order_id'),
                 'pe_sl_order_id': pe_bracket_orders.get('sl_order_id'),
+                'ce_sl_price': ce_bracket_orders.get('sl_trigger'),
+                'pe_sl_price': pe_bracket_orders.get('sl_trigger'),
             }
     
-            # Start monitoring
-            asyncio.create_task(
-                start_leg_protection_monitor(monitor_data, bot_application)
-            )
+            # Register with the shared monitor engine
+            await start_leg_protection_monitor(monitor_data, bot_application)
             logger.info(f"🛡️ Leg protection activated for setup {setup_id}")
     
         except Exception as monitor_error:
@@ -572,269 +749,47 @@ async def execute_algo_trade(setup_id: str, user_id: int, bot_application):
             pass
     
     finally:
-        if client:
-            await client.close()
-
+        # Releases the pooled client as well
+        if prepared:
+            prepared.close()
 
-# ============================================================
-# ✅ LEG PROTECTION MONITORING FUNCTIONS
-# ============================================================
 
-async def monitor_leg_protection(strategy: Dict, bot_application):
+def parse_execution_time(execution_time: str) -> Tuple[int, int]:
     """
-    Monitor strategy legs and protect remaining leg when one closes.
-    Checks every 30 seconds for closed positions.
+    Parse an algo setup execution time.
+    
+    Args:
+        execution_time: Time in IST (HH:MM format)
+    
+    Returns:
+        (hour, minute)
     """
-    client = None
-    try:
-        logger.info(f"🔍 Starting leg protection monitor for {strategy['ce_symbol']}/{strategy['pe_symbol']}")
-        
-        # Get API credentials
-        from database.operations.api_ops import get_decrypted_api_credential
-        credentials = await get_decrypted_api_credential(strategy['api_id'])
-        
-        if not credentials:
-            logger.error("Failed to get API credentials for monitoring")
-            return
-        
-        api_key, api_secret = credentials
-        from delta.client import DeltaClient
-        client = DeltaClient(api_key, api_secret)
-        
-        # Monitor for up to 24 hours (2880 checks at 30sec intervals)
-        for _ in range(2880):
-            await asyncio.sleep(30)  # Check every 30 seconds
-            
-            # Skip if already protected
-            if strategy.get('leg_protection_activated'):
-                logger.info("Leg protection already activated, stopping monitor")
-                break
-            
-            try:
-                # Get current positions
-                positions = await client.get_positions()
-                
-                if not positions.get('success'):
-                    continue
-                
-                positions_data = positions['result']
-                
-                # Find CE and PE positions
-                ce_position = next((p for p in positions_data 
-                                  if strategy['ce_symbol'] in p.get('product', {}).get('symbol', '')), None)
-                pe_position = next((p for p in positions_data 
-                                  if strategy['pe_symbol'] in p.get('product', {}).get('symbol', '')), None)
-                
-                # Check if positions exist
-                ce_size = int(ce_position.get('size', 0)) if ce_position else 0
-                pe_size = int(pe_position.get('size', 0)) if pe_position else 0
-                
-                # Check if ONE leg is closed
-                ce_closed = ce_size == 0
-                pe_closed = pe_size == 0
-                
-                # ONE leg closed, other still open → PROTECT!
-                if ce_closed and not pe_closed:
-                    logger.info(f"🛡️ CE leg closed, protecting PE leg")
-                    await protect_remaining_leg(
-                        client=client,
-                        strategy=strategy,
-                        remaining_symbol=strategy['pe_symbol'],
-                        remaining_entry_price=strategy['pe_entry_price'],
-                        remaining_sl_order_id=strategy.get('pe_sl_order_id'),
-                        closed_leg='CE',
-                        bot_application=bot_application
-                    )
-                    strategy['leg_protection_activated'] = True
-                    break
-                
-                elif pe_closed and not ce_closed:
-                    logger.info(f"🛡️ PE leg closed, protecting CE leg")
-                    await protect_remaining_leg(
-                        client=client,
-                        strategy=strategy,
-                        remaining_symbol=strategy['ce_symbol'],
-                        remaining_entry_price=strategy['ce_entry_price'],
-                        remaining_sl_order_id=strategy.get('ce_sl_order_id'),
-                        closed_leg='PE',
-                        bot_application=bot_application
-                    )
-                    strategy['leg_protection_activated'] = True
-                    break
-                
-                # Both legs still open - continue monitoring
-                elif not ce_closed and not pe_closed:
-                    continue
-                
-                # Both legs closed - stop monitoring
-                else:
-                    logger.info("Both legs closed, stopping monitor")
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Error checking leg status: {e}")
-                continue
-        
-        logger.info("Leg protection monitoring ended")
-        
-    except Exception as e:
-        logger.error(f"Error in leg protection monitor: {e}", exc_info=True)
-    finally:
-        if client:
-            await client.close()
+    hour, minute = map(int, execution_time.split(':'))
+    return hour, minute
 
 
-async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str, 
-                                remaining_entry_price: float, remaining_sl_order_id: str,
-                                closed_leg: str, bot_application):
-    """
-    Move remaining leg's SL to breakeven (entry price).
-    """
-    try:
-        logger.info(f"🛡️ Protecting remaining leg: {remaining_symbol}")
-        
-        # Cancel existing SL order
-        if remaining_sl_order_id:
-            try:
-                cancel_result = await client.cancel_order(remaining_sl_order_id)
-                if cancel_result.get('success'):
-                    logger.info(f"✅ Cancelled old SL order: {remaining_sl_order_id}")
-                else:
-                    logger.warning(f"Failed to cancel SL: {cancel_result.get('error')}")
-            except Exception as e:
-                logger.error(f"Error cancelling SL: {e}")
-        
-        # Get product details
-        products_response = await client.get_products(contract_types='call_options,put_options')
-        if not products_response.get('success'):
-            raise Exception("Failed to fetch products")
-        
-        product = next((p for p in products_response['result'] 
-                       if p['symbol'] == remaining_symbol), None)
-        
-        if not product:
-            raise Exception(f"Product not found: {remaining_symbol}")
-        
-        # Place new SL at breakeven (entry price)
-        direction = strategy.get('direction', 'long')
-        side = 'sell' if direction == 'long' else 'buy'
-        
-        new_sl_order = await client.place_order({
-            'product_id': product['id'],
-            'size': strategy.get('lot_size', 1),
-            'side': side,
-            'order_type': 'limit_order',
-            'stop_order_type': 'stop_loss_order',
-            'stop_price': round(remaining_entry_price, 2),
-            'limit_price': round(remaining_entry_price * 0.98, 2),  # 2% below for execution
-            'time_in_force': 'gtc'
-        })
-        
-        if new_sl_order.get('success'):
-            new_sl_id = new_sl_order['result']['id']
-            logger.info(f"✅ New breakeven SL placed: {new_sl_id} at ${remaining_entry_price:.2f}")
-            
-            # Send notification
-            remaining_leg = 'CE' if closed_leg == 'PE' else 'PE'
-            message = (
-                f"🛡️ **Leg Protection Activated!**\n\n"
-                f"🔄 **{closed_leg} leg closed**\n"
-                f"🛡️ **{remaining_leg} leg protected**\n\n"
-                f"💰 **New SL:** ${remaining_entry_price:.2f} (Breakeven)\n\n"
-                f"✅ You're now protected from further losses!"
-            )
-            
-            try:
-                await bot_application.bot.send_message(
-                    chat_id=strategy['user_id'],
-                    text=message,
-                    parse_mode="Markdown"
-                )
-            except Exception as e:
-                logger.error(f"Failed to send notification: {e}")
-            
-        else:
-            logger.error(f"Failed to place new SL: {new_sl_order.get('error')}")
-        
-    except Exception as e:
-        logger.error(f"Error protecting remaining leg: {e}", exc_info=True)
+async def _prewarm_algo_setup(setup: dict) -> Optional[PreparedAlgoTrade]:
+    """Pre-warm an algo setup 5 minutes before execution."""
+    return await prepare_algo_trade(setup['_id'], setup['user_id'], prewarm=True)
 
-# ============================================================
-# END OF LEG PROTECTION FUNCTIONS
-# ============================================================
 
+async def _execute_algo_setup(setup: dict, prepared: Optional[PreparedAlgoTrade], bot_application):
+    """Execute an algo setup at its exact target time."""
+    logger.info(f"Executing trade for setup {setup['_id']} at {datetime.now(IST).strftime('%I:%M:%S %p IST')}")
+    await execute_algo_trade(setup['_id'], setup['user_id'], bot_application, prepared=prepared)
 
-async def schedule_algo_execution(setup: dict, bot_application):
-    """Schedule algo execution 5 minutes before target time."""
-    setup_id = setup['id']
-    
-    # Parse execution time (format: "HH:MM")
-    exec_hour, exec_minute = map(int, setup['execution_time'].split(':'))
-    
-    # Get current IST time
-    now_ist = datetime.now(IST)
-    
-    # Calculate target execution time
-    target_time = now_ist.replace(hour=exec_hour, minute=exec_minute, second=0, microsecond=0)
-    
-    # If target time has passed today, schedule for tomorrow
-    if target_time <= now_ist:
-        target_time += timedelta(days=1)
-    
-    # Calculate pre-activation time (5 minutes before)
-    pre_activation_time = target_time - timedelta(minutes=5)
-    
-    # Calculate wait time
-    wait_seconds = (pre_activation_time - now_ist).total_seconds()
-    
-    if wait_seconds > 0:
-        logger.info(f"Scheduling setup {setup_id} to pre-activate in {wait_seconds:.0f} seconds at {pre_activation_time.strftime('%I:%M %p IST')}")
-        
-        # Wait until pre-activation
-        await asyncio.sleep(wait_seconds)
-        
-        logger.info(f"Pre-activating setup {setup_id} - 5 minutes to execution")
-        
-        # Wait final 5 minutes until exact execution time
-        final_wait = (target_time - datetime.now(IST)).total_seconds()
-        if final_wait > 0:
-            await asyncio.sleep(final_wait)
-        
-        # Execute trade
-        logger.info(f"Executing trade for setup {setup_id} at {datetime.now(IST).strftime('%I:%M %p IST')}")
-        await execute_algo_trade(setup_id, setup['user_id'], bot_application)
 
+# Algo setups as a scheduling core job type
+ALGO_JOB_TYPE = JobType(
+    name='algo',
+    collection='algo_setups',
+    active_filter={'is_active': True},
+    parse_time=parse_execution_time,
+    execute=_execute_algo_setup,
+    prewarm=_prewarm_algo_setup
+)
 
-async def start_algo_scheduler(bot_application):
-    """Start the algo scheduler."""
-    logger.info("Starting algo scheduler...")
-    
-    while True:
-        try:
-            # Get all active setups
-            setups = await get_all_active_algo_setups()
-            
-            for setup in setups:
-                setup_id = setup['id']
-                
-                # Skip if already scheduled
-                if setup_id in pending_executions:
-                    continue
-                
-                # Create and store task
-                task = asyncio.create_task(schedule_algo_execution(setup, bot_application))
-                pending_executions[setup_id] = task
-                logger.info(f"Scheduled algo setup {setup_id} for {setup['execution_time']} IST")
-            
-            # Clean up completed tasks
-            completed = [sid for sid, task in pending_executions.items() if task.done()]
-            for sid in completed:
-                del pending_executions[sid]
-                logger.info(f"Cleaned up completed execution for setup {sid}")
-            
-            # Check every 60 seconds
-            await asyncio.sleep(60)
-        
-        except Exception as e:
-            logger.error(f"Error in algo scheduler: {e}", exc_info=True)
-            await asyncio.sleep(60)
+
+def register_algo_jobs():
+    """Register algo setups with the scheduling core."""
+    scheduling_core.register_job_type(ALGO_JOB_TYPE)
@@ -1,33 +1,68 @@
 """
 MOVE Options Auto-Trade Scheduler.
-Checks every minute for scheduled trades and executes them automatically.
+Registers MOVE schedules with the scheduling core, which fires them at
+the exact minute and pre-warms them 5 minutes ahead.
 """
 
 import asyncio
+from dataclasses import dataclass
 from datetime import datetime
 import pytz
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-from bot.utils.logger import setup_logger, log_to_telegram
+from bot.utils.logger import setup_logger
 from bot.executors.move_executor import MoveTradeExecutor
+from bot.scheduler.scheduling_core import JobType, scheduling_core
 from database.operations.move_auto_trade_ops import (
-    get_all_active_move_schedules,
+    is_move_schedule_enabled,
     update_move_schedule_last_execution
 )
 from database.operations.move_trade_preset_ops import get_move_trade_preset_by_id
 from database.operations.move_strategy_ops import get_move_strategy
 from database.operations.api_ops import get_decrypted_api_credential, get_api_credential_by_id
 from delta.client import DeltaClient
+from delta.client_registry import get_delta_client
+from delta.product_catalog import product_catalog
 
 logger = setup_logger(__name__)
 
 IST = pytz.timezone('Asia/Kolkata')
 
 
+def parse_schedule_time(execution_time: str) -> Tuple[int, int]:
+    """
+    Parse a schedule time like "09:30 AM IST".
+    
+    Args:
+        execution_time: Schedule time string
+    
+    Returns:
+        (hour, minute) in 24-hour IST
+    """
+    parsed = datetime.strptime(execution_time.replace(' IST', '').strip(), "%I:%M %p")
+    return parsed.hour, parsed.minute
+
+
+@dataclass
+class PreparedMoveTrade:
+    """Preset, strategy and pooled client loaded ahead of a MOVE trade."""
+    
+    preset: Dict[str, Any]
+    strategy: Any
+    client: DeltaClient
+    client_released: bool = False
+    
+    def close(self):
+        """Release the pooled client (idempotent)."""
+        if not self.client_released:
+            self.client_released = True
+            self.client.release()
+
+
 class MoveAutoTradeScheduler:
     """
-    Scheduler for automatic MOVE trade execution.
-    Runs as a background task checking schedules every minute.
+    Executor for scheduled MOVE trades.
+    Timing is handled by the scheduling core.
     """
     
     def __init__(self, telegram_bot=None):
@@ -38,85 +73,90 @@ class MoveAutoTradeScheduler:
             telegram_bot: Telegram Application instance for sending notifications
         """
         self.telegram_bot = telegram_bot
-        self.running = False
-        self.scheduler_task = None
         logger.info("MoveAutoTradeScheduler initialized")
     
-    async def check_and_execute_schedules(self):
-        """Check all active schedules and execute due trades."""
+    async def prepare_scheduled_trade(self, schedule: Dict[str, Any]) -> PreparedMoveTrade:
+        """
+        Load preset, strategy and pooled client ahead of execution.
+        
+        Args:
+            schedule: Schedule document from database
+        
+        Returns:
+            PreparedMoveTrade (close() releases its client)
+        """
+        preset_id = schedule.get('preset_id')
+        
+        # Get preset
+        preset = await get_move_trade_preset_by_id(preset_id)
+        
+        if not preset:
+            raise Exception(f"Preset {preset_id} not found")
+        
+        # Get strategy
+        strategy = await get_move_strategy(preset['strategy_id'])
+        
+        if not strategy:
+            raise Exception(f"Strategy {preset['strategy_id']} not found")
+        
+        # Get API credentials
+        credentials = await get_decrypted_api_credential(preset['api_id'])
+        
+        if not credentials:
+            raise Exception("Failed to decrypt API credentials")
+        
+        api_key, api_secret = credentials
+        prepared = PreparedMoveTrade(preset, strategy, get_delta_client(api_key, api_secret))
+        
         try:
-            # Get current time in IST
-            now_ist = datetime.now(IST)
-            current_time_str = now_ist.strftime("%I:%M %p IST")
-            current_hour_minute = now_ist.strftime("%I:%M %p")
-            
-            logger.debug(f"Checking schedules at {current_time_str}")
-            
-            # Get all active schedules
-            schedules = await get_all_active_move_schedules()
-            
-            if not schedules:
-                return
-            
-            logger.debug(f"Found {len(schedules)} active schedules")
-            
-            # Check each schedule
-            for schedule in schedules:
-                try:
-                    # Parse schedule time (format: "09:30 AM IST")
-                    schedule_time = schedule.get('execution_time', '').replace(' IST', '').strip()
-                    
-                    # Match current time with schedule time
-                    if schedule_time == current_hour_minute:
-                        logger.info(f"⏰ Schedule matched: {schedule.get('preset_name')} at {schedule_time}")
-                        
-                        # Execute the trade
-                        await self.execute_scheduled_trade(schedule)
-                        
-                except Exception as e:
-                    logger.error(f"Error processing schedule {schedule.get('_id')}: {e}", exc_info=True)
-                    # Continue with other schedules
-                    continue
+            # Warm the product catalogue and the pooled connection
+            await product_catalog.refresh()
+            asset = strategy.get('asset') if isinstance(strategy, dict) else strategy.asset
+            await prepared.client.get_ticker(f"{asset}USD")
+        except BaseException:
+            prepared.close()
+            raise
         
-        except Exception as e:
-            logger.error(f"Error in check_and_execute_schedules: {e}", exc_info=True)
+        return prepared
     
-    async def execute_scheduled_trade(self, schedule: Dict[str, Any]):
+    async def execute_scheduled_trade(self, schedule: Dict[str, Any], prepared: Optional[PreparedMoveTrade] = None):
         """
         Execute a scheduled MOVE trade.
         
         Args:
             schedule: Schedule document from database
+            prepared: Output of prepare_scheduled_trade (loaded now if not given)
         """
         schedule_id = schedule.get('_id')
         user_id = schedule.get('user_id')
-        preset_id = schedule.get('preset_id')
         preset_name = schedule.get('preset_name', 'Unknown')
         
+        # The schedule document (and any pre-warmed context) was read at sync
+        # time; the schedule may have been disabled or deleted since
+        if not await is_move_schedule_enabled(schedule_id):
+            logger.warning(f"Schedule {schedule_id} ({preset_name}) disabled or deleted, skipping")
+            if prepared is not None:
+                prepared.close()
+            return
+        
         try:
             logger.info(f"🤖 Auto-executing: {preset_name} for user {user_id}")
             
-            # Send starting notification
+            # Send starting notification without holding up the orders
             if self.telegram_bot:
-                await self.send_telegram_notification(
+                asyncio.create_task(self.send_telegram_notification(
                     user_id,
                     f"🤖 <b>Auto Trade Executing</b>\n\n"
                     f"Preset: {preset_name}\n"
                     f"Time: {datetime.now(IST).strftime('%I:%M %p IST')}\n\n"
                     f"⏳ Placing orders..."
-                )
-            
-            # Get preset
-            preset = await get_move_trade_preset_by_id(preset_id)
-            
-            if not preset:
-                raise Exception(f"Preset {preset_id} not found")
+                ))
             
-            # Get strategy
-            strategy = await get_move_strategy(preset['strategy_id'])
+            if prepared is None:
+                prepared = await self.prepare_scheduled_trade(schedule)
             
-            if not strategy:
-                raise Exception(f"Strategy {preset['strategy_id']} not found")
+            strategy = prepared.strategy
+            client = prepared.client
             
             # Handle dict vs Pydantic model
             if isinstance(strategy, dict):
@@ -138,17 +178,6 @@ class MoveAutoTradeScheduler:
                 target_trigger = strategy.target_trigger
                 target_limit = strategy.target_limit
             
-            # Get API credentials
-            credentials = await get_decrypted_api_credential(preset['api_id'])
-            
-            if not credentials:
-                raise Exception("Failed to decrypt API credentials")
-            
-            api_key, api_secret = credentials
-            
-            # Create Delta client
-            client = DeltaClient(api_key, api_secret)
-            
             try:
                 # Create executor and execute trade
                 executor = MoveTradeExecutor(client)
@@ -216,7 +245,7 @@ class MoveAutoTradeScheduler:
                     logger.error(f"❌ Auto trade failed: {error_msg}")
             
             finally:
-                await client.close()
+                prepared.close()
         
         except Exception as e:
             logger.error(f"Error executing scheduled trade: {e}", exc_info=True)
@@ -241,62 +270,6 @@ class MoveAutoTradeScheduler:
             )
         except Exception as e:
             logger.error(f"Failed to send Telegram notification: {e}")
-    
-    async def scheduler_loop(self):
-        """Main scheduler loop - runs every minute."""
-        logger.info("🤖 MOVE Auto Trade Scheduler started")
-        
-        # Send startup notification (to all users with active schedules)
-        await log_to_telegram(
-            f"🤖 <b>Auto Trade Scheduler Started</b>\n"
-            f"Time: {datetime.now(IST).strftime('%I:%M %p IST')}\n"
-            f"Status: Active\n"
-            f"Checking every minute..."
-        )
-        
-        while self.running:
-            try:
-                # Check and execute schedules
-                await self.check_and_execute_schedules()
-                
-                # Wait 60 seconds
-                await asyncio.sleep(60)
-            
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {e}", exc_info=True)
-                # Wait before retrying
-                await asyncio.sleep(60)
-    
-    async def start(self):
-        """Start the scheduler."""
-        if self.running:
-            logger.warning("Scheduler already running")
-            return
-        
-        self.running = True
-        self.scheduler_task = asyncio.create_task(self.scheduler_loop())
-        logger.info("✅ Scheduler started")
-    
-    async def stop(self):
-        """Stop the scheduler."""
-        if not self.running:
-            return
-        
-        self.running = False
-        
-        if self.scheduler_task:
-            self.scheduler_task.cancel()
-            try:
-                await self.scheduler_task
-            except asyncio.CancelledError:
-                pass
-        
-        logger.info("🛑 Scheduler stopped")
-        
-        await log_to_telegram(
-            f"🛑 <b>Auto Trade Scheduler Stopped</b>\n"
-            f"Time: {datetime.now(IST).strftime('%I:%M %p IST')}"
-        )
 
 
 # Global scheduler instance
@@ -311,4 +284,36 @@ def get_move_scheduler(telegram_bot=None) -> MoveAutoTradeScheduler:
         move_scheduler = MoveAutoTradeScheduler(telegram_bot)
     
     return move_scheduler
-      
+
+
+async def _prewarm_move_schedule(schedule: Dict[str, Any]) -> PreparedMoveTrade:
+    """Pre-warm a MOVE schedule 5 minutes before execution."""
+    return await get_move_scheduler().prepare_scheduled_trade(schedule)
+
+
+async def _execute_move_schedule(schedule: Dict[str, Any], prepared: Optional[PreparedMoveTrade], bot_application):
+    """Execute a MOVE schedule at its exact time."""
+    logger.info(f"⏰ Schedule due: {schedule.get('preset_name')} at {schedule.get('execution_time')}")
+    await get_move_scheduler(bot_application).execute_scheduled_trade(schedule, prepared=prepared)
+
+
+# MOVE schedules as a scheduling core job type
+MOVE_JOB_TYPE = JobType(
+    name='move',
+    collection='move_auto_executions',
+    active_filter={'enabled': True},
+    parse_time=parse_schedule_time,
+    execute=_execute_move_schedule,
+    prewarm=_prewarm_move_schedule
+)
+
+
+def register_move_jobs(telegram_bot=None):
+    """
+    Register MOVE schedules with the scheduling core.
+    
+    Args:
+        telegram_bot: Telegram Application instance for notifications
+    """
+    get_move_scheduler(telegram_bot)
+    scheduling_core.register_job_type(MOVE_JOB_TYPE)
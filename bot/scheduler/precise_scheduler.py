@@ -0,0 +1,341 @@
+"""
+Drift-free execution scheduler with a pre-warm phase.
+
+Jobs sit in a single heap ordered by deadline and one loop sleeps until
+the earliest one, so firing does not depend on a polling interval. Each
+job can pre-warm ahead of its run time (credentials, pooled client,
+product catalogue, spot price) so that at the target second only the
+time-critical work remains. Fire-time jitter is recorded per job.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds before run time that the pre-warm phase starts
+PREWARM_LEAD = 300.0
+
+# Longest single sleep; long waits are re-derived from the wall clock after
+# this so clock corrections never push a fire time out
+RESYNC_INTERVAL = 30.0
+
+# Longest wait at fire time for a pre-warm that is still running
+PREWARM_GRACE = 10.0
+
+# Longest wait at shutdown for jobs that are already firing
+STOP_GRACE = 30.0
+
+# Jitter samples kept for stats
+JITTER_SAMPLES = 500
+
+PHASE_PREWARM = 'prewarm'
+PHASE_FIRE = 'fire'
+
+
+@dataclass
+class ScheduledJob:
+    """A one-shot job fired at an exact wall-clock time."""
+
+    job_id: str
+    run_at: datetime
+    execute: Callable[[Any], Awaitable[None]]
+    prewarm: Optional[Callable[[], Awaitable[Any]]] = None
+    prewarm_lead: float = PREWARM_LEAD
+    description: str = ''
+    state: str = 'scheduled'
+    prewarmed: Any = None
+    jitter_ms: Optional[float] = None
+    error: Optional[str] = None
+    version: int = 0
+    _prewarm_task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def fire_ts(self) -> float:
+        """Run time as a Unix timestamp."""
+        return self.run_at.timestamp()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to status dictionary."""
+        return {
+            'job_id': self.job_id,
+            'description': self.description,
+            'run_at': self.run_at.isoformat(),
+            'state': self.state,
+            'jitter_ms': self.jitter_ms,
+            'error': self.error
+        }
+
+
+class PreciseScheduler:
+    """
+    Heap-based scheduler firing jobs at exact deadlines.
+    """
+
+    def __init__(self):
+        """Initialize scheduler."""
+        self._heap: List[tuple] = []
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self._jitter: deque = deque(maxlen=JITTER_SAMPLES)
+        self.fired = 0
+        self.failed = 0
+
+    # ==================== Job management ====================
+
+    def schedule(self, job: ScheduledJob) -> ScheduledJob:
+        """
+        Schedule a job, replacing any pending job with the same ID.
+
+        Args:
+            job: Job to schedule
+
+        Returns:
+            The scheduled job
+        """
+        self.cancel(job.job_id)
+
+        job.version = next(self._counter)
+        job.state = 'scheduled'
+        self._jobs[job.job_id] = job
+
+        if job.prewarm:
+            prewarm_ts = job.fire_ts - job.prewarm_lead
+            heapq.heappush(self._heap, (prewarm_ts, job.version, PHASE_PREWARM, job.job_id))
+        heapq.heappush(self._heap, (job.fire_ts, job.version, PHASE_FIRE, job.job_id))
+
+        self._wake.set()
+        logger.info(f"⏱️ Scheduled {job.job_id} at {job.run_at.isoformat()}")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a pending job (heap entries are discarded lazily).
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if a pending job was cancelled
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.state in ('firing', 'running', 'done', 'failed'):
+            return False
+
+        del self._jobs[job_id]
+        job.state = 'cancelled'
+        if job._prewarm_task and not job._prewarm_task.done():
+            job._prewarm_task.cancel()
+        self._release(job)
+        return True
+
+    def get_job(self, job_id: str) -> Optional[ScheduledJob]:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+
+    def is_pending(self, job_id: str) -> bool:
+        """Whether a job is waiting to fire (scheduled, pre-warming or armed)."""
+        job = self._jobs.get(job_id)
+        return job is not None and job.state in ('scheduled', 'prewarming', 'armed')
+
+    def get_jobs(self, prefix: str = '') -> List[ScheduledJob]:
+        """Get jobs whose ID starts with prefix, earliest first."""
+        jobs = [job for job_id, job in self._jobs.items() if job_id.startswith(prefix)]
+        return sorted(jobs, key=lambda j: j.fire_ts)
+
+    # ==================== Execution ====================
+
+    @staticmethod
+    def _release(job: ScheduledJob):
+        """Close a job's pre-warmed context (e.g. its ticker subscription)."""
+        prewarmed, job.prewarmed = job.prewarmed, None
+        close = getattr(prewarmed, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error releasing pre-warm of {job.job_id}: {e}")
+
+    def _spawn(self, coro):
+        """Run a coroutine in a tracked task."""
+        task = asyncio.create_task(coro)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task
+
+    async def _prewarm(self, job: ScheduledJob):
+        """Run a job's pre-warm hook."""
+        job.state = 'prewarming'
+        started = time.monotonic()
+        try:
+            job.prewarmed = await job.prewarm()
+            if job.state == 'cancelled':
+                # Cancelled while the hook was finishing
+                self._release(job)
+                return
+            if job.state == 'prewarming':
+                job.state = 'armed'
+            logger.info(f"🔥 Pre-warmed {job.job_id} in {(time.monotonic() - started) * 1000:.0f} ms")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Fire still goes ahead and falls back to a cold start
+            if job.state == 'prewarming':
+                job.state = 'armed'
+            logger.error(f"Pre-warm failed for {job.job_id}: {e}", exc_info=True)
+
+    async def _fire(self, job: ScheduledJob):
+        """
+        Fire a job, waiting briefly for an unfinished pre-warm.
+
+        The job is marked 'firing' first, so a sync during the pre-warm
+        grace cannot cancel it. A pre-warm that fails, times out or is
+        cancelled leaves a cold start.
+        """
+        job.state = 'firing'
+        job.jitter_ms = round((time.time() - job.fire_ts) * 1000, 2)
+        self._jitter.append(job.jitter_ms)
+
+        prewarm_task = job._prewarm_task
+        if prewarm_task and not prewarm_task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(prewarm_task), PREWARM_GRACE)
+            except asyncio.CancelledError:
+                # Only swallow the pre-warm's own cancellation, not ours
+                if not prewarm_task.cancelled():
+                    raise
+                logger.warning(f"Firing {job.job_id} cold (pre-warm cancelled)")
+            except Exception:
+                logger.warning(f"Firing {job.job_id} without finished pre-warm")
+
+        job.state = 'running'
+        logger.info(f"🚀 Firing {job.job_id} (jitter {job.jitter_ms:+.1f} ms)")
+
+        try:
+            await job.execute(job.prewarmed)
+            job.state = 'done'
+            self.fired += 1
+        except Exception as e:
+            job.state = 'failed'
+            job.error = str(e)
+            self.failed += 1
+            logger.error(f"Scheduled job {job.job_id} failed: {e}", exc_info=True)
+        finally:
+            self._release(job)
+            if self._jobs.get(job.job_id) is job:
+                del self._jobs[job.job_id]
+
+    async def _run(self):
+        """Sleep until the earliest deadline and dispatch it."""
+        while True:
+            if not self._heap:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            deadline, version, phase, job_id = self._heap[0]
+            delay = deadline - time.time()
+
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), min(delay, RESYNC_INTERVAL))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            job = self._jobs.get(job_id)
+            if job is None or job.version != version:
+                continue
+
+            if phase == PHASE_PREWARM:
+                job._prewarm_task = self._spawn(self._prewarm(job))
+            else:
+                self._spawn(self._fire(job))
+
+    def start(self):
+        """Start the scheduler loop."""
+        if self._task and not self._task.done():
+            logger.warning("Precise scheduler already running")
+            return
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("Precise scheduler started")
+
+    async def stop(self):
+        """
+        Stop the loop, cancel pending jobs and let firing jobs finish.
+
+        A job that is already firing may be mid-entry, so it gets up to
+        STOP_GRACE seconds to complete (or roll back) before it is cancelled.
+        """
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        # Cancels pending pre-warms and releases finished ones
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+
+        if self._running:
+            done, still_running = await asyncio.wait(list(self._running), timeout=STOP_GRACE)
+            if still_running:
+                logger.error(
+                    f"{len(still_running)} scheduled job(s) still running after "
+                    f"{STOP_GRACE:.0f}s, cancelling"
+                )
+                for task in still_running:
+                    task.cancel()
+                await asyncio.gather(*still_running, return_exceptions=True)
+
+        self._heap.clear()
+        for job in self._jobs.values():
+            self._release(job)
+        self._jobs.clear()
+        logger.info("Precise scheduler stopped")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the scheduler loop is running."""
+        return self._task is not None and not self._task.done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics including fire-time jitter."""
+        samples = sorted(abs(j) for j in self._jitter)
+        jitter = None
+        if samples:
+            jitter = {
+                'samples': len(samples),
+                'last_ms': self._jitter[-1],
+                'mean_ms': round(sum(samples) / len(samples), 2),
+                'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                'max_ms': samples[-1]
+            }
+
+        return {
+            'running': self.is_running,
+            'pending': sum(1 for j in self._jobs.values() if j.state in ('scheduled', 'prewarming', 'armed')),
+            'fired': self.fired,
+            'failed': self.failed,
+            'jitter': jitter
+        }
+
+
+# Global scheduler instance
+precise_scheduler = PreciseScheduler()
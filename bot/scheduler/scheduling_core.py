@@ -0,0 +1,307 @@
+"""
+Single scheduling core for every timed job in the bot.
+
+Job types (algo setups, MOVE schedules, auto executions) register how to
+find their schedules and how to pre-warm and run them. The core syncs
+each type with one indexed query on 'next_run_at' and hands due jobs to
+the precise scheduler, which fires them at the exact second.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import pytz
+
+from bot.utils.logger import setup_logger, log_to_telegram
+from bot.scheduler.precise_scheduler import ScheduledJob, PreciseScheduler, precise_scheduler
+from delta.metrics import request_tags
+from database.operations.schedule_ops import (
+    get_due_schedules,
+    set_next_run_at,
+    get_upcoming_schedules,
+    count_active_schedules
+)
+
+logger = setup_logger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Seconds between schedule syncs
+SYNC_INTERVAL = 60.0
+
+# Jobs due within this many seconds are loaded into the precise scheduler
+# (must exceed the pre-warm lead plus one sync interval)
+SYNC_HORIZON = 600.0
+
+
+@dataclass
+class JobType:
+    """How the core finds, pre-warms and runs one kind of schedule."""
+
+    name: str
+    collection: str
+    active_filter: Dict[str, Any]
+    parse_time: Callable[[str], Tuple[int, int]]
+    execute: Callable[[Dict[str, Any], Any, Any], Awaitable[None]]
+    prewarm: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+    time_field: str = 'execution_time'
+    misfire_grace: float = 0.0
+    stats: Dict[str, int] = field(default_factory=lambda: {'scheduled': 0, 'fired': 0})
+
+
+def _to_utc(value: datetime) -> datetime:
+    """Aware datetime -> naive UTC for storage."""
+    return value.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _from_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored naive UTC datetime -> aware IST."""
+    if value is None:
+        return None
+    return pytz.utc.localize(value).astimezone(IST)
+
+
+def next_occurrence(hour: int, minute: int, after: datetime) -> datetime:
+    """
+    Get the first daily HH:MM IST occurrence strictly after a time.
+
+    Args:
+        hour: Hour in IST
+        minute: Minute
+        after: Reference time (aware)
+
+    Returns:
+        Aware IST datetime
+    """
+    after_ist = after.astimezone(IST)
+    candidate = after_ist.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= after_ist:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class SchedulingCore:
+    """
+    Registry of job types fed into one precise scheduler.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[PreciseScheduler] = None,
+        sync_interval: float = SYNC_INTERVAL,
+        horizon: float = SYNC_HORIZON
+    ):
+        """
+        Initialize scheduling core.
+
+        Args:
+            scheduler: Precise scheduler that fires jobs
+            sync_interval: Seconds between schedule syncs
+            horizon: Seconds ahead to load due jobs
+        """
+        self.scheduler = scheduler or precise_scheduler
+        self.sync_interval = sync_interval
+        self.horizon = horizon
+        self.job_types: Dict[str, JobType] = {}
+        self.bot_application = None
+        self.last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register_job_type(self, job_type: JobType):
+        """
+        Register a job type.
+
+        Args:
+            job_type: Job type definition
+        """
+        self.job_types[job_type.name] = job_type
+        logger.info(f"Registered job type '{job_type.name}' ({job_type.collection})")
+
+    @staticmethod
+    def job_id(job_type: JobType, doc_id: str) -> str:
+        """Scheduler job ID for a schedule document."""
+        return f"{job_type.name}:{doc_id}"
+
+    # ==================== Sync ====================
+
+    async def sync_job_type(self, job_type: JobType):
+        """
+        Load due schedules of one type and (re)schedule them.
+
+        Args:
+            job_type: Job type to sync
+        """
+        now = datetime.now(IST)
+        horizon = now + timedelta(seconds=self.horizon)
+        docs = await get_due_schedules(job_type.collection, job_type.active_filter, _to_utc(horizon))
+        seen = set()
+
+        for doc in docs:
+            doc_id = doc['_id']
+            job_id = self.job_id(job_type, doc_id)
+
+            try:
+                hour, minute = job_type.parse_time(doc.get(job_type.time_field, ''))
+            except (ValueError, AttributeError) as e:
+                logger.error(f"Invalid {job_type.name} schedule time for {doc_id}: {e}")
+                continue
+
+            stored = _from_utc(doc.get('next_run_at'))
+            run_at = stored
+
+            # New/edited schedules and runs missed beyond the grace period
+            if run_at is None or run_at < now - timedelta(seconds=job_type.misfire_grace):
+                run_at = next_occurrence(hour, minute, now)
+            if run_at != stored:
+                await set_next_run_at(job_type.collection, doc_id, _to_utc(run_at))
+
+            if run_at > horizon:
+                continue
+
+            seen.add(job_id)
+            job = self.scheduler.get_job(job_id)
+            if self.scheduler.is_pending(job_id) and job.run_at == run_at:
+                continue
+
+            self._schedule(job_type, doc, run_at, (hour, minute))
+
+        # Drop pending jobs whose schedule was disabled, deleted or moved
+        for job in self.scheduler.get_jobs(f"{job_type.name}:"):
+            if job.job_id not in seen and self.scheduler.cancel(job.job_id):
+                logger.info(f"Cancelled {job.job_id} (schedule changed or disabled)")
+
+    def _schedule(self, job_type: JobType, doc: Dict[str, Any], run_at: datetime, hour_minute: Tuple[int, int]):
+        """Hand one schedule occurrence to the precise scheduler."""
+        doc_id = doc['_id']
+
+        async def execute(prepared):
+            # Advance first so a restart mid-run never fires the same occurrence twice
+            await set_next_run_at(
+                job_type.collection, doc_id, _to_utc(next_occurrence(*hour_minute, run_at))
+            )
+            job_type.stats['fired'] += 1
+            # Delta calls are traced under the schedule ID (see delta.metrics)
+            with request_tags(setup_id=doc_id, job=job_type.name, phase='fire'):
+                await job_type.execute(doc, prepared, self.bot_application)
+
+        async def prewarm():
+            with request_tags(setup_id=doc_id, job=job_type.name, phase='prewarm'):
+                return await job_type.prewarm(doc)
+
+        self.scheduler.schedule(ScheduledJob(
+            job_id=self.job_id(job_type, doc_id),
+            run_at=run_at,
+            execute=execute,
+            prewarm=prewarm if job_type.prewarm else None,
+            description=doc.get(job_type.time_field, '')
+        ))
+        job_type.stats['scheduled'] += 1
+
+    async def sync(self):
+        """Sync every registered job type."""
+        for job_type in self.job_types.values():
+            try:
+                await self.sync_job_type(job_type)
+            except Exception as e:
+                logger.error(f"Error syncing job type '{job_type.name}': {e}", exc_info=True)
+        self.last_sync = datetime.now(IST)
+
+    async def _sync_loop(self):
+        """Sync schedules every sync_interval seconds."""
+        while True:
+            try:
+                await self.sync()
+                await asyncio.sleep(self.sync_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in scheduling core: {e}", exc_info=True)
+                await asyncio.sleep(self.sync_interval)
+
+    # ==================== Lifecycle ====================
+
+    async def start(self, bot_application):
+        """
+        Start the precise scheduler and the sync loop.
+
+        Args:
+            bot_application: Bot application passed to job handlers
+        """
+        if self._task and not self._task.done():
+            logger.warning("Scheduling core already running")
+            return
+
+        self.bot_application = bot_application
+        self.scheduler.start()
+        self._task = asyncio.create_task(self._sync_loop())
+        logger.info(f"Scheduling core started ({', '.join(self.job_types)})")
+
+        await log_to_telegram(
+            message=f"Scheduling core started: {', '.join(self.job_types) or 'no job types'}",
+            level="INFO",
+            module="bot.scheduler.scheduling_core"
+        )
+
+    async def stop(self):
+        """Stop the sync loop and the precise scheduler."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        await self.scheduler.stop()
+        logger.info("Scheduling core stopped")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the sync loop is running."""
+        return self._task is not None and not self._task.done()
+
+    async def get_status(self) -> Dict[str, Any]:
+        """
+        Get status of every job type and the precise scheduler.
+
+        Returns:
+            Status dictionary
+        """
+        job_types = {}
+
+        for name, job_type in self.job_types.items():
+            active, upcoming = await asyncio.gather(
+                count_active_schedules(job_type.collection, job_type.active_filter),
+                get_upcoming_schedules(job_type.collection, job_type.active_filter)
+            )
+            job_types[name] = {
+                'collection': job_type.collection,
+                'active': active,
+                'scheduled': job_type.stats['scheduled'],
+                'fired': job_type.stats['fired'],
+                'upcoming': [
+                    {
+                        'id': doc['_id'],
+                        'user_id': doc.get('user_id'),
+                        'execution_time': doc.get(job_type.time_field),
+                        'next_run_at': (
+                            _from_utc(doc['next_run_at']).isoformat()
+                            if doc.get('next_run_at') else None
+                        )
+                    }
+                    for doc in upcoming
+                ]
+            }
+
+        return {
+            'status': 'running' if self.is_running else 'stopped',
+            'last_sync': self.last_sync.isoformat() if self.last_sync else None,
+            'timing': self.scheduler.get_stats(),
+            'jobs': [job.to_dict() for job in self.scheduler.get_jobs()],
+            'job_types': job_types
+        }
+
+
+# Global scheduling core instance
+scheduling_core = SchedulingCore()
@@ -0,0 +1,192 @@
+"""
+Webhook update ingestion with per-chat FIFO lanes.
+
+The webhook acknowledges Telegram as soon as an update is queued. Updates
+are de-duplicated by update_id and appended to a lane per chat; a bounded
+pool of workers drains the lanes so different users are served
+concurrently while each chat's updates are still processed in order.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from telegram import Update
+from telegram.ext import Application
+
+from config import settings
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Recent update IDs remembered for de-duplication
+DEDUP_WINDOW = 2000
+
+# Processing-lag samples kept for stats
+LAG_SAMPLES = 500
+
+
+def _lane_key(update: Update) -> Any:
+    """Chat the update belongs to (falls back to user, then a shared lane)."""
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return 'global'
+
+
+class UpdateDispatcher:
+    """
+    Per-chat FIFO lanes drained by a bounded worker pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Initialize dispatcher.
+
+        Args:
+            workers: Updates processed concurrently (across chats)
+            max_pending: Updates held before new ones are refused
+        """
+        self.workers = workers or settings.WEBHOOK_WORKERS
+        self.max_pending = max_pending or settings.WEBHOOK_MAX_PENDING
+        self.application: Optional[Application] = None
+        self._lanes: Dict[Any, Deque[Tuple[Update, float]]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._seen: Set[int] = set()
+        self._seen_order: Deque[int] = deque()
+        self._pending = 0
+        self._tasks: list = []
+        self._lag: Deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.stats = {
+            'received': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'processed': 0,
+            'failed': 0
+        }
+
+    def _remember(self, update_id: int) -> bool:
+        """Record an update ID; False if it was already seen."""
+        if update_id in self._seen:
+            return False
+        self._seen.add(update_id)
+        self._seen_order.append(update_id)
+        if len(self._seen_order) > DEDUP_WINDOW:
+            self._seen.discard(self._seen_order.popleft())
+        return True
+
+    def submit(self, update: Update) -> bool:
+        """
+        Queue an update on its chat's lane without waiting for processing.
+
+        Args:
+            update: Parsed Telegram update
+
+        Returns:
+            False if refused because the dispatcher is full (Telegram should retry)
+        """
+        if self._pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            logger.warning(f"Update queue full ({self._pending}), refusing update {update.update_id}")
+            return False
+
+        self.stats['received'] += 1
+        if not self._remember(update.update_id):
+            self.stats['duplicates'] += 1
+            logger.debug(f"Duplicate update ignored: {update.update_id}")
+            return True
+
+        key = _lane_key(update)
+        lane = self._lanes.get(key)
+        if lane is None:
+            # New/idle lane: schedule it; busy lanes are re-queued by their worker
+            lane = self._lanes[key] = deque()
+            self._ready.put_nowait(key)
+        lane.append((update, time.monotonic()))
+        self._pending += 1
+        return True
+
+    async def _worker(self, index: int):
+        """Take a ready lane, process its next update, re-queue it if more are waiting."""
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes[key]
+            update, received = lane.popleft()
+            self._lag.append(time.monotonic() - received)
+
+            try:
+                await self.application.process_update(update)
+                self.stats['processed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Error processing update {update.update_id}: {e}", exc_info=True)
+            finally:
+                self._pending -= 1
+                if lane:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._lanes[key]
+
+    def start(self, application: Application):
+        """
+        Start the worker pool.
+
+        Args:
+            application: Bot application that processes updates
+        """
+        self.application = application
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Update dispatcher started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Let queued updates finish (bounded by timeout), then stop the workers.
+
+        Args:
+            timeout: Seconds allowed for draining
+        """
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._pending:
+            logger.warning(f"Update dispatcher stopped with {self._pending} update(s) unprocessed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, lane count and processing lag."""
+        samples = sorted(self._lag)
+        lag = None
+        if samples:
+            lag = {
+                'last_ms': round(self._lag[-1] * 1000, 1),
+                'mean_ms': round(sum(samples) / len(samples) * 1000, 1),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+                'max_ms': round(samples[-1] * 1000, 1)
+            }
+
+        oldest = None
+        waiting = [lane[0][1] for lane in self._lanes.values() if lane]
+        if waiting:
+            oldest = round((time.monotonic() - min(waiting)) * 1000, 1)
+
+        return {
+            **self.stats,
+            'queue_depth': self._pending,
+            'active_lanes': len(self._lanes),
+            'workers': len(self._tasks),
+            'oldest_pending_ms': oldest,
+            'lag': lag
+        }
+
+
+# Global update dispatcher instance
+update_dispatcher = UpdateDispatcher()
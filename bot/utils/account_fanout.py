@@ -0,0 +1,164 @@
+"""
+Concurrent per-account fetches for multi-API views.
+
+Runs one fetch per API credential under a bounded semaphore with a
+per-account timeout, so a screen waits for the slowest account rather
+than the sum of all of them. Partial results can be streamed to the
+Telegram message as each account returns.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from telegram.error import BadRequest
+
+from config import settings
+from bot.utils.logger import setup_logger
+from database.operations.api_ops import get_decrypted_api_credential
+from delta.client_registry import get_delta_client
+
+logger = setup_logger(__name__)
+
+# Minimum seconds between streamed message edits (Telegram edit flood limit)
+PROGRESS_EDIT_INTERVAL = 1.0
+
+
+@dataclass
+class AccountResult:
+    """Outcome of one account fetch."""
+
+    api: Any
+    text: str
+    data: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the fetch succeeded."""
+        return self.error is None
+
+
+async def fan_out_accounts(
+    apis: Sequence[Any],
+    fetch: Callable[[Any, Any], Awaitable[AccountResult]],
+    on_result: Optional[Callable[[List[Optional[AccountResult]]], Awaitable[None]]] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> List[AccountResult]:
+    """
+    Run fetch(api, client) for every API concurrently.
+
+    Args:
+        apis: API credential models (need .id and .api_name)
+        fetch: Coroutine returning an AccountResult for one account
+        on_result: Called with results so far (None = pending) as each account finishes
+        concurrency: Maximum accounts fetched at once
+        timeout: Seconds allowed per account
+
+    Returns:
+        Results in the same order as apis
+    """
+    concurrency = concurrency or settings.ACCOUNT_FANOUT_CONCURRENCY
+    timeout = timeout or settings.ACCOUNT_FETCH_TIMEOUT
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Optional[AccountResult]] = [None] * len(apis)
+
+    async def run(index: int, api: Any):
+        started = time.monotonic()
+
+        async with semaphore:
+            try:
+                credentials = await get_decrypted_api_credential(str(api.id))
+                if not credentials:
+                    result = AccountResult(
+                        api,
+                        f"<b>❌ {api.api_name}</b>\nFailed to decrypt credentials\n",
+                        error='credentials'
+                    )
+                else:
+                    client = get_delta_client(*credentials)
+                    try:
+                        result = await asyncio.wait_for(fetch(api, client), timeout)
+                    finally:
+                        await client.close()
+
+            except asyncio.TimeoutError:
+                logger.warning(f"Account fetch timed out for API {api.id} after {timeout}s")
+                result = AccountResult(
+                    api,
+                    f"<b>⏱️ {api.api_name}</b>\nTimed out after {timeout:.0f}s\n",
+                    error='timeout'
+                )
+
+            except Exception as e:
+                logger.error(f"Account fetch failed for API {api.id}: {e}", exc_info=True)
+                result = AccountResult(
+                    api,
+                    f"<b>❌ {api.api_name}</b>\nError: {str(e)[:80]}\n",
+                    error=str(e)
+                )
+
+        result.elapsed = time.monotonic() - started
+        results[index] = result
+
+        if on_result:
+            try:
+                await on_result(results)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    await asyncio.gather(*(run(i, api) for i, api in enumerate(apis)))
+    return results
+
+
+class ProgressMessage:
+    """
+    Throttled editor for streaming partial results into a callback message.
+    """
+
+    def __init__(self, query, min_interval: float = PROGRESS_EDIT_INTERVAL):
+        """
+        Initialize progress message.
+
+        Args:
+            query: Telegram callback query whose message is edited
+            min_interval: Minimum seconds between edits
+        """
+        self.query = query
+        self.min_interval = min_interval
+        self._last_edit = 0.0
+        self._last_text: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def update(self, text: str, force: bool = False, **kwargs):
+        """
+        Edit the message, skipping edits that come too fast or change nothing.
+
+        Args:
+            text: New message text (HTML)
+            force: Edit even if inside the throttle window (final render)
+            **kwargs: Extra edit_message_text arguments (reply_markup, ...)
+        """
+        async with self._lock:
+            if text == self._last_text and not kwargs:
+                return
+            if not force and time.monotonic() - self._last_edit < self.min_interval:
+                return
+
+            try:
+                await self.query.edit_message_text(text, parse_mode='HTML', **kwargs)
+            except BadRequest as e:
+                if 'not modified' not in str(e).lower():
+                    raise
+
+            self._last_text = text
+            self._last_edit = time.monotonic()
+
+
+def pending_footer(results: Sequence[Optional[AccountResult]]) -> str:
+    """Footer line counting accounts still loading."""
+    pending = sum(1 for r in results if r is None)
+    return f"\n⏳ <i>Loading {pending} more account(s)...</i>" if pending else ""
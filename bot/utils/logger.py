@@ -1,18 +1,31 @@
 """
 Logging configuration with dual output: file and Telegram.
 Sends critical logs to a separate Telegram bot for monitoring.
+
+Module loggers share one QueueHandler; a background QueueListener thread
+does all console and file I/O, so a slow disk never stalls the event
+loop. Log files rotate at midnight (bot.log, error.log).
+
+Telegram logs go through TelegramLogShipper: callers only enqueue, and a
+background task coalesces bursts into digest messages with repeated
+events counted instead of resent.
 """
 
+import atexit
 import logging
+import logging.handlers
 import asyncio
+import queue
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from functools import wraps
 import traceback
+from collections import OrderedDict
 
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import RetryAfter
 
 from config import settings
 
@@ -20,38 +33,25 @@ from config import settings
 LOGS_DIR = Path("logs")
 LOGS_DIR.mkdir(exist_ok=True)
 
-# Rate limiting for Telegram logs
-_telegram_log_queue = []
-_last_telegram_log_time = datetime.now()
-_telegram_log_lock = asyncio.Lock()
+# Rotated log files kept
+LOG_BACKUP_DAYS = 14
+
+# Telegram log shipping: send pace, queue bound and burst coalescing window
 MAX_TELEGRAM_LOGS_PER_MINUTE = 10
+TELEGRAM_LOG_QUEUE_SIZE = 500
+TELEGRAM_LOG_BATCH_DELAY = 2.0
+TELEGRAM_MESSAGE_LIMIT = 4000
 
 # Telegram bot for logging
 _log_bot: Optional[Bot] = None
 
+# Shared queue pipeline (created on first setup_logger call)
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_queue_listener: Optional[logging.handlers.QueueListener] = None
 
-def setup_logger(name: str) -> logging.Logger:
-    """
-    Set up a logger with file and console handlers.
-    
-    Args:
-        name: Logger name (usually __name__)
-    
-    Returns:
-        Configured logger instance
-    """
-    logger = logging.getLogger(name)
-    
-    # ✅ PREVENT DUPLICATE HANDLERS - Check if THIS logger already has handlers
-    if logger.hasHandlers():
-        return logger
-    
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
-    
-    # ✅ PREVENT PROPAGATION TO ROOT LOGGER
-    logger.propagate = False
-    
-    # Create formatters
+
+def _build_sinks():
+    """Create the console and rotating file handlers run by the listener thread."""
     detailed_formatter = logging.Formatter(
         '[%(asctime)s] [%(levelname)s] [%(name)s] [%(funcName)s:%(lineno)d] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
@@ -66,21 +66,73 @@ def setup_logger(name: str) -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
     
-    # File handler (daily rotation)
-    log_file = LOGS_DIR / f"bot_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # File handler (rotates at midnight)
+    file_handler = logging.handlers.TimedRotatingFileHandler(
+        LOGS_DIR / "bot.log", when='midnight', backupCount=LOG_BACKUP_DAYS, encoding='utf-8'
+    )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
     
     # Error file handler
-    error_log_file = LOGS_DIR / f"error_{datetime.now().strftime('%Y%m%d')}.log"
-    error_file_handler = logging.FileHandler(error_log_file, encoding='utf-8')
+    error_file_handler = logging.handlers.TimedRotatingFileHandler(
+        LOGS_DIR / "error.log", when='midnight', backupCount=LOG_BACKUP_DAYS, encoding='utf-8'
+    )
     error_file_handler.setLevel(logging.ERROR)
     error_file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(error_file_handler)
+    
+    return console_handler, file_handler, error_file_handler
+
+
+def _get_queue_handler() -> logging.handlers.QueueHandler:
+    """Get the shared queue handler, starting the listener thread on first use."""
+    global _queue_handler, _queue_listener
+    
+    if _queue_handler is None:
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, *_build_sinks(), respect_handler_level=True
+        )
+        _queue_listener.start()
+        atexit.register(stop_logging)
+    
+    return _queue_handler
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _queue_listener
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """
+    Set up a logger that writes through the shared log queue.
+    
+    Args:
+        name: Logger name (usually __name__)
+    
+    Returns:
+        Configured logger instance
+    """
+    logger = logging.getLogger(name)
+    
+    # ✅ PREVENT DUPLICATE HANDLERS - Check if THIS logger already has handlers
+    if logger.hasHandlers():
+        return logger
+    
+    logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    
+    # ✅ PREVENT PROPAGATION TO ROOT LOGGER
+    logger.propagate = False
+    
+    logger.addHandler(_get_queue_handler())
     
     return logger
 
@@ -105,16 +157,307 @@ def _get_log_emoji(level: str) -> str:
     return emoji_map.get(level.upper(), '📝')
 
 
+def _format_log_event(event: dict) -> str:
+    """Format one queued log event as a full Telegram message."""
+    emoji = _get_log_emoji(event['level'])
+    text = f"{emoji} <b>{event['level']}</b>"
+    if event['count'] > 1:
+        text += f" ×{event['count']}"
+    text += f"\n⏰ {event['first'].strftime('%Y-%m-%d %H:%M:%S IST')}"
+    if event['count'] > 1:
+        text += f" → {event['last'].strftime('%H:%M:%S')}"
+    text += "\n"
+    
+    if event['module']:
+        text += f"📦 Module: <code>{event['module']}</code>\n"
+    
+    if event['user_id']:
+        text += f"👤 User: <code>{event['user_id']}</code>\n"
+    
+    text += f"\n💬 {event['message']}\n"
+    
+    error_details = event['error_details']
+    if error_details:
+        # Truncate if too long
+        if len(error_details) > 500:
+            error_details = error_details[:500] + "...\n[Truncated]"
+        text += f"\n<pre>{error_details}</pre>"
+    
+    return text
+
+
+def _format_digest_line(event: dict) -> str:
+    """Format one log event as a compact digest line."""
+    line = f"{_get_log_emoji(event['level'])} {event['first'].strftime('%H:%M:%S')}"
+    if event['count'] > 1:
+        line += f" ×{event['count']}"
+    if event['module']:
+        line += f" <code>{event['module']}</code>"
+    message = event['message']
+    if len(message) > 300:
+        message = message[:300] + "…"
+    return f"{line}\n{message}"
+
+
+class TelegramLogShipper:
+    """
+    Bounded queue of Telegram log events drained by a background task.
+    
+    Enqueueing never blocks or awaits the network. Identical events
+    (same level, module and message) waiting in the queue are merged and
+    counted; events that arrive together are sent as one digest message.
+    """
+    
+    def __init__(
+        self,
+        max_queue: int = TELEGRAM_LOG_QUEUE_SIZE,
+        batch_delay: float = TELEGRAM_LOG_BATCH_DELAY,
+        max_per_minute: int = MAX_TELEGRAM_LOGS_PER_MINUTE
+    ):
+        """
+        Initialize shipper.
+        
+        Args:
+            max_queue: Distinct events held before new ones are dropped
+            batch_delay: Seconds to wait for a burst to settle before sending
+            max_per_minute: Telegram messages sent per minute at most
+        """
+        self.max_queue = max_queue
+        self.batch_delay = batch_delay
+        self.send_interval = 60.0 / max_per_minute
+        self._next_send_at = 0.0
+        self._pending: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'enqueued': 0,
+            'deduplicated': 0,
+            'dropped': 0,
+            'sent_messages': 0,
+            'sent_events': 0,
+            'failed': 0
+        }
+    
+    def enqueue(
+        self,
+        message: str,
+        level: str = "INFO",
+        module: Optional[str] = None,
+        user_id: Optional[int] = None,
+        error_details: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a log event without blocking.
+        
+        Args:
+            message: Log message
+            level: Log level name
+            module: Module name where log originated
+            user_id: User ID if applicable
+            error_details: Additional error details (traceback)
+        
+        Returns:
+            True if queued (or merged into a queued duplicate), False if dropped
+        """
+        level = level.upper()
+        now = datetime.now()
+        key = (level, module, message)
+        
+        event = self._pending.get(key)
+        if event is not None:
+            event['count'] += 1
+            event['last'] = now
+            self.stats['deduplicated'] += 1
+            return True
+        
+        if len(self._pending) >= self.max_queue:
+            self.stats['dropped'] += 1
+            return False
+        
+        self._pending[key] = {
+            'level': level,
+            'module': module,
+            'user_id': user_id,
+            'message': message,
+            'error_details': error_details,
+            'count': 1,
+            'first': now,
+            'last': now
+        }
+        self.stats['enqueued'] += 1
+        self._ensure_started()
+        return True
+    
+    def _ensure_started(self):
+        """Start the drain task (if an event loop is running) and wake it."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Shipped once a loop starts and something else is logged
+        
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+    
+    def _build_messages(self, events: list) -> list:
+        """Pack events into as few Telegram messages as fit the size limit."""
+        if len(events) == 1:
+            text = _format_log_event(events[0])
+            if len(text) > TELEGRAM_MESSAGE_LIMIT:
+                text = text[:TELEGRAM_MESSAGE_LIMIT] + "\n...\n[Message truncated]"
+            return [(text, events)]
+        
+        messages = []
+        header = "📦 <b>Log digest</b> ({count} events)\n\n"
+        body, chunk = "", []
+        for event in events:
+            line = _format_digest_line(event) + "\n\n"
+            if body and len(header) + len(body) + len(line) > TELEGRAM_MESSAGE_LIMIT:
+                messages.append((header.format(count=len(chunk)) + body, chunk))
+                body, chunk = "", []
+            body += line
+            chunk.append(event)
+        if body:
+            messages.append((header.format(count=len(chunk)) + body, chunk))
+        return messages
+    
+    def _discard(self, events: list, counts: list):
+        """Drop shipped events, keeping repeats that arrived while sending."""
+        for event, count in zip(events, counts):
+            key = (event['level'], event['module'], event['message'])
+            if event['count'] > count:
+                event['count'] -= count
+                # Repeats merged while sending do not wake the drain task themselves
+                if self._wakeup is not None:
+                    self._wakeup.set()
+            elif self._pending.get(key) is event:
+                del self._pending[key]
+    
+    async def _send(self, text: str) -> bool:
+        """Send one message to the log chat, honouring flood-control waits once."""
+        for attempt in range(2):
+            try:
+                await _get_log_bot().send_message(
+                    chat_id=settings.LOG_CHAT_ID,
+                    text=text,
+                    parse_mode='HTML'
+                )
+                return True
+            except RetryAfter as e:
+                if attempt == 0:
+                    retry_after = e.retry_after
+                    seconds = retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else retry_after
+                    await asyncio.sleep(float(seconds))
+                    continue
+                raise
+        return False
+    
+    async def _flush(self, pace: bool = True):
+        """
+        Send everything currently queued.
+        
+        Events leave the queue only once their message has been sent (or
+        has failed), so a cancelled flush keeps them for the next one.
+        
+        Args:
+            pace: Space messages send_interval apart (off during shutdown)
+        """
+        if not self._pending:
+            return
+        
+        for text, events in self._build_messages(list(self._pending.values())):
+            counts = [event['count'] for event in events]
+            if pace:
+                delay = self._next_send_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                await self._send(text)
+                self.stats['sent_messages'] += 1
+                self.stats['sent_events'] += len(events)
+            except Exception as e:
+                self.stats['failed'] += len(events)
+                logging.getLogger(__name__).error(f"Failed to send log to Telegram: {e}")
+            self._next_send_at = time.monotonic() + self.send_interval
+            self._discard(events, counts)
+    
+    async def _run(self):
+        """Wait for events, let bursts settle, then ship them."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.batch_delay)
+            await self._flush()
+    
+    async def stop(self, timeout: float = 5.0):
+        """
+        Ship what is queued (bounded by timeout) and stop the drain task.
+        
+        Args:
+            timeout: Seconds allowed for the final flush
+        """
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        
+        try:
+            async with asyncio.timeout(timeout):
+                await self._flush(pace=False)
+        except asyncio.TimeoutError:
+            logging.getLogger(__name__).warning(
+                f"Telegram log flush timed out; {len(self._pending)} event(s) not sent"
+            )
+    
+    @property
+    def queue_depth(self) -> int:
+        """Distinct events waiting to be sent."""
+        return len(self._pending)
+    
+    def get_stats(self) -> dict:
+        """Get shipping statistics."""
+        return {**self.stats, 'queue_depth': self.queue_depth}
+    
+    def render_prometheus(self) -> str:
+        """Render shipping statistics in Prometheus text exposition format."""
+        lines = [
+            "# HELP telegram_log_events_total Telegram log events by outcome",
+            "# TYPE telegram_log_events_total counter"
+        ]
+        for outcome in ('enqueued', 'deduplicated', 'dropped', 'sent_events', 'failed'):
+            lines.append(f'telegram_log_events_total{{outcome="{outcome}"}} {self.stats[outcome]}')
+        lines += [
+            "# HELP telegram_log_messages_sent_total Telegram log messages sent",
+            "# TYPE telegram_log_messages_sent_total counter",
+            f"telegram_log_messages_sent_total {self.stats['sent_messages']}",
+            "# HELP telegram_log_queue_depth Telegram log events waiting to be sent",
+            "# TYPE telegram_log_queue_depth gauge",
+            f"telegram_log_queue_depth {self.queue_depth}"
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+# Global Telegram log shipper instance
+log_shipper = TelegramLogShipper()
+
+
 async def log_to_telegram(
     message: str,
     level: str = "INFO",
     module: Optional[str] = None,
     user_id: Optional[int] = None,
     error_details: Optional[str] = None,
-    timeout: float = 3.0  # ✅ ADD TIMEOUT
+    timeout: float = 3.0
 ) -> bool:
     """
-    Send log message to Telegram bot with rate limiting and timeout.
+    Queue a log message for the Telegram log bot.
+    
+    Returns immediately; the shipper sends it in the background.
     
     Args:
         message: Log message to send
@@ -122,79 +465,16 @@ async def log_to_telegram(
         module: Module name where log originated
         user_id: User ID if applicable
         error_details: Additional error details (traceback)
-        timeout: Maximum time to wait for send (seconds)
+        timeout: Unused; kept for existing callers (sending no longer blocks)
     
     Returns:
-        True if message was sent successfully, False otherwise
+        True if the message was queued, False if dropped
     """
-    global _last_telegram_log_time, _telegram_log_queue
-    
     # Only log INFO and above to Telegram
     if level.upper() == 'DEBUG':
         return False
     
-    try:
-        # ✅ ADD TIMEOUT PROTECTION
-        async with asyncio.timeout(timeout):  # Python 3.11+
-            async with _telegram_log_lock:
-                current_time = datetime.now()
-                
-                # Reset queue if more than a minute has passed
-                if (current_time - _last_telegram_log_time).seconds >= 60:
-                    _telegram_log_queue.clear()
-                    _last_telegram_log_time = current_time
-                
-                # Check rate limit
-                if len(_telegram_log_queue) >= MAX_TELEGRAM_LOGS_PER_MINUTE:
-                    return False
-                
-                # Format message
-                emoji = _get_log_emoji(level)
-                formatted_message = f"{emoji} <b>{level.upper()}</b>\n"
-                formatted_message += f"⏰ {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}\n"
-                
-                if module:
-                    formatted_message += f"📦 Module: <code>{module}</code>\n"
-                
-                if user_id:
-                    formatted_message += f"👤 User: <code>{user_id}</code>\n"
-                
-                formatted_message += f"\n💬 {message}\n"
-                
-                if error_details:
-                    # Truncate if too long
-                    if len(error_details) > 500:
-                        error_details = error_details[:500] + "...\n[Truncated]"
-                    formatted_message += f"\n<pre>{error_details}</pre>"
-                
-                # Truncate entire message if too long (Telegram limit: 4096 chars)
-                if len(formatted_message) > 4000:
-                    formatted_message = formatted_message[:4000] + "\n...\n[Message truncated]"
-                
-                # Send message
-                bot = _get_log_bot()
-                await bot.send_message(
-                    chat_id=settings.LOG_CHAT_ID,
-                    text=formatted_message,
-                    parse_mode='HTML'
-                )
-                
-                _telegram_log_queue.append(current_time)
-                return True
-    
-    except asyncio.TimeoutError:  # ✅ HANDLE TIMEOUT
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Telegram log timed out after {timeout}s")
-        return False
-    except TelegramError as e:
-        # Log to console if Telegram fails
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send log to Telegram: {e}")
-        return False
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.error(f"Unexpected error in log_to_telegram: {e}")
-        return False
+    return log_shipper.enqueue(message, level, module, user_id, error_details)
 
 
 def log_user_action(user_id: int, action: str, details: Optional[str] = None):
@@ -231,6 +511,12 @@ def log_api_call(
         error: Error message if failed
     """
     logger = logging.getLogger("api_calls")
+    level = logging.ERROR if error else logging.INFO
+    
+    # Called on every request: build the message only if it will be emitted
+    if not logger.isEnabledFor(level):
+        return
+    
     log_message = f"API {api_id} - {method} {endpoint}"
     
     if status_code:
@@ -238,9 +524,8 @@ def log_api_call(
     
     if error:
         log_message += f" - Error: {error}"
-        logger.error(log_message)
-    else:
-        logger.info(log_message)
+    
+    logger.log(level, log_message)
 
 
 def log_trade_execution(
@@ -272,13 +557,11 @@ def log_trade_execution(
     
     # Also log to Telegram for important trade events
     if action in ['entry', 'exit']:
-        asyncio.create_task(
-            log_to_telegram(
-                message=f"Trade {action}: {strategy_type} {asset}",
-                level="INFO",
-                module="trade_execution",
-                user_id=user_id
-            )
+        log_shipper.enqueue(
+            message=f"Trade {action}: {strategy_type} {asset}",
+            level="INFO",
+            module="trade_execution",
+            user_id=user_id
         )
 
 
@@ -301,14 +584,12 @@ class TelegramLogHandler(logging.Handler):
             if record.exc_info:
                 error_details = ''.join(traceback.format_exception(*record.exc_info))
             
-            # Send to Telegram (non-blocking)
-            asyncio.create_task(
-                log_to_telegram(
-                    message=record.getMessage(),
-                    level=record.levelname,
-                    module=record.name,
-                    error_details=error_details
-                )
+            # Queue for Telegram (non-blocking)
+            log_shipper.enqueue(
+                message=record.getMessage(),
+                level=record.levelname,
+                module=record.name,
+                error_details=error_details
             )
         except Exception:
             self.handleError(record)
@@ -1,16 +1,31 @@
 """
 Conversation state management for multi-step user interactions.
+
+States live in compact slotted records guarded by striped per-user locks,
+so concurrently processed updates for different users never contend.
+Expiry uses a hashed timer wheel: each record sits in the slot of the
+tick it expires on and only the slots that come due are visited, instead
+of scanning every user.
+
+With STATE_SNAPSHOT_ENABLED, changed conversations are written behind to
+Mongo in batches and restored on startup, so in-progress wizards survive
+a restart.
 """
 
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 import asyncio
+import time
 
+from config import settings
 from .logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Wizard states whose data holds credentials; never snapshotted to Mongo
+UNSNAPSHOTTED_STATE_PREFIXES = ('api_add_',)
+
 
 class ConversationState(Enum):
     """Enumeration of conversation states."""
@@ -104,43 +119,135 @@ class ConversationState(Enum):
     AUTO_CONFIRM = "auto_confirm"
 
 
+class _StateRecord:
+    """One user's conversation state."""
+
+    __slots__ = ('state', 'data', 'expires_at', 'slot')
+
+    def __init__(self):
+        self.state: Optional[str] = None
+        self.data: Dict[str, Any] = {}
+        self.expires_at = 0.0
+        self.slot = -1
+
+
 class StateManager:
     """
     Manages conversation states for users.
     Stores temporary data during multi-step conversations.
     """
-    
-    def __init__(self, timeout_minutes: int = 10):
+
+    def __init__(self, timeout_minutes: int = 10, stripes: int = 64, tick_seconds: float = 5.0):
         """
         Initialize state manager.
-        
+
         Args:
             timeout_minutes: Minutes until state expires
+            stripes: Number of locks users are striped across
+            tick_seconds: Timer wheel resolution
         """
-        self._states: Dict[int, Dict[str, Any]] = {}
-        self._timeout = timedelta(minutes=timeout_minutes)
-        self._lock = asyncio.Lock()
-        self._cleanup_task = None
-        
+        self._records: Dict[int, _StateRecord] = {}
+        self._timeout = timeout_minutes * 60
+        self._locks = [asyncio.Lock() for _ in range(stripes)]
+        self._tick = tick_seconds
+        # One revolution covers the timeout, so a slot never holds two laps
+        self._wheel: List[Set[int]] = [set() for _ in range(int(self._timeout // tick_seconds) + 2)]
+        self._cursor = int(time.monotonic() // tick_seconds)
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._dirty: Set[int] = set()
+        self._dirty_event = asyncio.Event()
+        self.expired = 0
+        self.snapshot_writes = 0
+        self.restored = 0
+
         logger.info(f"StateManager initialized with {timeout_minutes} minute timeout")
-    
+
+    # ==================== Records ====================
+
+    def _lock(self, user_id: int) -> asyncio.Lock:
+        """Lock stripe guarding a user."""
+        return self._locks[hash(user_id) % len(self._locks)]
+
+    def _schedule(self, user_id: int, record: _StateRecord, expires_at: Optional[float] = None):
+        """Set a record's expiry and move it to the matching wheel slot."""
+        record.expires_at = expires_at if expires_at is not None else time.monotonic() + self._timeout
+        slot = int(record.expires_at // self._tick) % len(self._wheel)
+        if slot != record.slot:
+            if record.slot >= 0:
+                self._wheel[record.slot].discard(user_id)
+            self._wheel[slot].add(user_id)
+            record.slot = slot
+
+    def _remove(self, user_id: int) -> bool:
+        """Drop a record and its wheel entry."""
+        record = self._records.pop(user_id, None)
+        if record is None:
+            return False
+        if record.slot >= 0:
+            self._wheel[record.slot].discard(user_id)
+        return True
+
+    def _live(self, user_id: int) -> Optional[_StateRecord]:
+        """Record for a user, refreshed on access; None if missing or expired."""
+        record = self._records.get(user_id)
+        if record is None:
+            return None
+        if record.expires_at <= time.monotonic():
+            logger.debug(f"State expired for user {user_id}")
+            self._remove(user_id)
+            self.expired += 1
+            return None
+        self._schedule(user_id, record)
+        return record
+
+    def _record(self, user_id: int) -> _StateRecord:
+        """Live record for a user, created if needed."""
+        record = self._live(user_id)
+        if record is None:
+            record = self._records[user_id] = _StateRecord()
+            self._schedule(user_id, record)
+        return record
+
+    def _mark_dirty(self, user_id: int):
+        """Queue a user's conversation for the next snapshot write."""
+        if self._snapshot_task is not None:
+            self._dirty.add(user_id)
+            self._dirty_event.set()
+
+    # ==================== Public API ====================
+
     async def start_cleanup_task(self):
-        """Start the cleanup task. Call this after event loop is running."""
+        """Start expiry (and snapshots if enabled). Call this after event loop is running."""
         if self._cleanup_task is None:
+            self._cursor = int(time.monotonic() // self._tick)
             self._cleanup_task = asyncio.create_task(self._cleanup_expired_states())
             logger.info("State cleanup task started")
-    
+
+        if settings.STATE_SNAPSHOT_ENABLED and self._snapshot_task is None:
+            self.restored = await self._restore()
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+            logger.info(f"State snapshots enabled ({self.restored} conversation(s) restored)")
+
     async def stop_cleanup_task(self):
-        """Stop the cleanup task."""
+        """Stop background tasks, writing any pending snapshots first."""
+        for attr in ('_cleanup_task', '_snapshot_task'):
+            task = getattr(self, attr)
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if self._snapshot_task:
+            await self.flush()
+            self._snapshot_task = None
+
         if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
             self._cleanup_task = None
             logger.info("State cleanup task stopped")
-    
+
     async def set_state(
         self,
         user_id: int,
@@ -153,42 +260,31 @@ class StateManager:
 
         Args:
             user_id: User ID
-            state: Conversation state (ConversationState enum or string)
+            state: Conversation state (ConversationState enum, string or None)
             data: Additional data to store (merged with existing)
         """
-        async with self._lock:
-            if user_id not in self._states:
-                self._states[user_id] = {
-                    'state': None,
-                    'data': {},
-                    'timestamp': datetime.now()
-                }
-    
-            # Preserve existing data and merge with new data
-            existing_data = self._states[user_id].get('data', {})
-            new_data = {**existing_data, **(data or {})}
-        
-            # CRITICAL FIX: Convert state to string for storage
-            if hasattr(state, 'value'):
-                state_to_store = state.value
-            elif isinstance(state, str):
-                state_to_store = state  # Keep original string (don't lowercase!)
-            else:
-                state_to_store = str(state)
-
-            self._states[user_id]['state'] = state_to_store
-            self._states[user_id]['data'] = new_data
-            self._states[user_id]['timestamp'] = datetime.now()
-    
-            logger.info(f"✅ State SET for user {user_id}: {state_to_store}")  # Changed to INFO
-    
+        # Convert state to string for storage
+        if hasattr(state, 'value'):
+            state = state.value
+        elif state is not None and not isinstance(state, str):
+            state = str(state)
+
+        async with self._lock(user_id):
+            record = self._record(user_id)
+            record.state = state
+            if data:
+                record.data.update(data)
+            self._mark_dirty(user_id)
+
+        logger.debug(f"State set for user {user_id}: {state}")
+
     async def get_state_data(self, user_id: int) -> Dict[str, Any]:
         """
         Get stored data for a user (alias for get_data).
-    
+
         Args:
             user_id: User ID
-    
+
         Returns:
             Stored data dictionary
         """
@@ -197,145 +293,227 @@ class StateManager:
     async def set_state_data(self, user_id: int, data: Dict[str, Any]):
         """
         Set/update stored data for a user (alias for update_data).
-    
+
         Args:
             user_id: User ID
             data: Data to store (merged with existing)
         """
         await self.update_data(user_id, data)
-    
+
     async def get_state(self, user_id: int) -> Optional[str]:
-        async with self._lock:
-            user_data = self._states.get(user_id)
-        
-            if not user_data:
-                logger.info(f"❌ No state found for user {user_id}")
-                return None
-        
-            # Check if expired
-            if datetime.now() - user_data['timestamp'] > self._timeout:
-                logger.debug(f"State expired for user {user_id}")
-                del self._states[user_id]
-                return None
-        
-        # ✅ ADD THIS LINE - Update timestamp on access!
-            user_data['timestamp'] = datetime.now()
-        
-            state = user_data.get('state')
-            logger.info(f"✅ State RETRIEVED for user {user_id}: {state}")
-            return state
-        
+        """
+        Get conversation state for a user (refreshes its expiry).
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            State string or None
+        """
+        async with self._lock(user_id):
+            record = self._live(user_id)
+
+        if record is None:
+            logger.debug(f"No state found for user {user_id}")
+            return None
+
+        logger.debug(f"State retrieved for user {user_id}: {record.state}")
+        return record.state
+
     async def get_data(self, user_id: int) -> Dict[str, Any]:
         """
         Get stored data for a user.
-        
+
         Args:
             user_id: User ID
-        
+
         Returns:
             Stored data dictionary
         """
-        async with self._lock:
-            user_data = self._states.get(user_id)
-            
-            if not user_data:
-                logger.warning(f"No state found for user {user_id}")
-                return {}
-            
-            # Check if expired
-            if datetime.now() - user_data['timestamp'] > self._timeout:
-                logger.debug(f"State expired for user {user_id}")
-                del self._states[user_id]
-                return {}
-            
-            # Update timestamp on access
-            user_data['timestamp'] = datetime.now()
-            
-            data = user_data.get('data', {})
-            logger.debug(f"Retrieved data for user {user_id}: {list(data.keys())}")
-            return data
-    
+        async with self._lock(user_id):
+            record = self._live(user_id)
+
+        if record is None:
+            logger.debug(f"No state data found for user {user_id}")
+            return {}
+
+        return record.data
+
     async def update_data(self, user_id: int, data: Dict[str, Any]):
         """
         Update stored data for a user.
-        
+
         Args:
             user_id: User ID
             data: Data to update (merged with existing)
         """
-        async with self._lock:
-            if user_id not in self._states:
-                self._states[user_id] = {
-                    'state': None,
-                    'data': {},
-                    'timestamp': datetime.now()
-                }
-            
-            # Merge with existing data
-            existing_data = self._states[user_id].get('data', {})
-            self._states[user_id]['data'] = {**existing_data, **data}
-            self._states[user_id]['timestamp'] = datetime.now()
-            
-            logger.debug(
-                f"Updated data for user {user_id}, "
-                f"keys: {list(self._states[user_id]['data'].keys())}"
-            )
-    
+        async with self._lock(user_id):
+            record = self._record(user_id)
+            record.data.update(data)
+            self._mark_dirty(user_id)
+
+        logger.debug(f"Updated data for user {user_id}, keys: {list(data.keys())}")
+
     async def clear_state(self, user_id: int):
         """
         Clear conversation state for a user.
-        
+
         Args:
             user_id: User ID
         """
-        async with self._lock:
-            if user_id in self._states:
-                del self._states[user_id]
+        async with self._lock(user_id):
+            if self._remove(user_id):
+                self._mark_dirty(user_id)
                 logger.debug(f"Cleared state for user {user_id}")
-    
+
     async def has_state(self, user_id: int) -> bool:
         """
         Check if user has an active conversation state.
-        
+
         Args:
             user_id: User ID
-        
+
         Returns:
             True if user has active state
         """
         state = await self.get_state(user_id)
         return state is not None
-    
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Active conversations, expiry and snapshot counters."""
+        return {
+            'active': len(self._records),
+            'expired': self.expired,
+            'snapshots': self._snapshot_task is not None,
+            'snapshot_pending': len(self._dirty),
+            'snapshot_writes': self.snapshot_writes,
+            'restored': self.restored
+        }
+
+    # ==================== Expiry ====================
+
+    def _expire_due(self, now: float) -> int:
+        """Expire records in every wheel slot whose tick has passed."""
+        current = int(now // self._tick)
+        # After a stall longer than one revolution, each slot is visited once
+        start = max(self._cursor, current - len(self._wheel) + 1)
+        expired = 0
+
+        for tick in range(start, current + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            for user_id in list(slot):
+                record = self._records.get(user_id)
+                if record is None or record.slot != tick % len(self._wheel):
+                    slot.discard(user_id)
+                elif record.expires_at <= now:
+                    self._remove(user_id)
+                    expired += 1
+
+        self._cursor = current
+        self.expired += expired
+        return expired
+
     async def _cleanup_expired_states(self):
         """
-        Periodic task to clean up expired states.
-        Runs every 5 minutes.
+        Periodic task advancing the timer wheel.
+        Runs every tick; only slots that came due are visited.
         """
         while True:
             try:
-                await asyncio.sleep(300)  # 5 minutes
-                
-                async with self._lock:
-                    current_time = datetime.now()
-                    expired_users = [
-                        user_id
-                        for user_id, data in self._states.items()
-                        if current_time - data['timestamp'] > self._timeout
-                    ]
-                    
-                    for user_id in expired_users:
-                        del self._states[user_id]
-                    
-                    if expired_users:
-                        logger.info(f"Cleaned up {len(expired_users)} expired state(s)")
-            
+                await asyncio.sleep(self._tick)
+                expired = self._expire_due(time.monotonic())
+                if expired:
+                    logger.info(f"Cleaned up {expired} expired state(s)")
+
             except asyncio.CancelledError:
                 logger.info("Cleanup task cancelled")
-                break
+                raise
             except Exception as e:
                 logger.error(f"Error in state cleanup task: {e}")
 
+    # ==================== Snapshots ====================
+
+    async def flush(self):
+        """
+        Write changed conversations to Mongo in one bulk write.
+
+        Conversations in UNSNAPSHOTTED_STATE_PREFIXES states are written as
+        deletions, so credentials typed into a wizard never reach the
+        collection. If the write fails, the users are queued again and
+        retried on the next snapshot.
+        """
+        from database.operations.conversation_state_ops import save_conversation_states
+
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+
+        now = time.monotonic()
+        wall_now = datetime.utcnow()
+        documents = []
+        deleted = []
+        for user_id in dirty:
+            record = self._records.get(user_id)
+            if record is None or (record.state or '').startswith(UNSNAPSHOTTED_STATE_PREFIXES):
+                deleted.append(user_id)
+                continue
+            documents.append({
+                '_id': user_id,
+                'state': record.state,
+                'data': record.data,
+                'expires_at': wall_now + timedelta(seconds=max(0.0, record.expires_at - now))
+            })
+
+        written = await save_conversation_states(documents, deleted)
+        if written is None:
+            # Keep changes made since the swap; they are already in _dirty
+            self._dirty |= dirty
+            if self._snapshot_task is not None:
+                self._dirty_event.set()
+        elif written:
+            self.snapshot_writes += 1
+
+    async def _snapshot_loop(self):
+        """Flush changes every STATE_SNAPSHOT_INTERVAL seconds."""
+        while True:
+            try:
+                await self._dirty_event.wait()
+                await asyncio.sleep(settings.STATE_SNAPSHOT_INTERVAL)
+                self._dirty_event.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error writing state snapshots: {e}", exc_info=True)
+
+    async def _restore(self) -> int:
+        """
+        Reload conversations saved before the last shutdown.
+
+        Returns:
+            Number of conversations restored
+        """
+        from database.operations.conversation_state_ops import get_conversation_states
+
+        restored = 0
+        wall_now = datetime.utcnow()
+        now = time.monotonic()
+
+        for doc in await get_conversation_states():
+            user_id = doc['_id']
+            async with self._lock(user_id):
+                if user_id in self._records:
+                    # A newer conversation already started since boot
+                    continue
+                record = self._records[user_id] = _StateRecord()
+                record.state = doc.get('state')
+                record.data = doc.get('data') or {}
+                remaining = (doc['expires_at'] - wall_now).total_seconds()
+                self._schedule(user_id, record, now + min(max(remaining, 0.0), self._timeout))
+                restored += 1
+
+        return restored
+
 
 # Global state manager instance
 state_manager = StateManager(timeout_minutes=10)
-            
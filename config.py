@@ -7,9 +7,16 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
 from typing import List
 import os
+from functools import lru_cache
 from cryptography.fernet import Fernet
 
 
+@lru_cache(maxsize=1)
+def _fernet_cipher(key: str) -> Fernet:
+    """Build the Fernet cipher once per encryption key."""
+    return Fernet(key.encode())
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
@@ -41,12 +48,42 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
     MAX_RETRIES: int = Field(default=3, description="Maximum API retry attempts")
     RETRY_DELAY: int = Field(default=2, description="Delay between retries in seconds")
-    RATE_LIMIT_PER_MINUTE: int = Field(default=50, description="Max requests per user per minute")
+    DELTA_RATE_LIMIT_QUOTA: int = Field(default=10000, description="Delta API weight units allowed per key per window")
+    DELTA_RATE_LIMIT_WINDOW: int = Field(default=300, description="Delta API rate limit window in seconds")
+    DELTA_CLIENT_IDLE_TTL: int = Field(default=900, description="Seconds before an idle pooled Delta client is closed")
+    ACCOUNT_FANOUT_CONCURRENCY: int = Field(default=5, description="Accounts fetched concurrently for multi-API views")
+    ACCOUNT_FETCH_TIMEOUT: float = Field(default=15.0, description="Seconds allowed per account in multi-API views")
+    WEBHOOK_WORKERS: int = Field(default=8, description="Webhook updates processed concurrently across chats")
+    WEBHOOK_MAX_PENDING: int = Field(default=1000, description="Queued webhook updates before new ones are refused")
+    CREDENTIAL_CACHE_TTL: int = Field(default=300, description="Seconds decrypted API credentials stay cached")
+    CREDENTIAL_CACHE_SIZE: int = Field(default=256, description="Maximum decrypted API credentials cached")
+    STATE_SNAPSHOT_ENABLED: bool = Field(default=False, description="Write conversation states to Mongo so wizards survive restarts")
+    STATE_SNAPSHOT_INTERVAL: int = Field(default=5, description="Seconds between batched conversation state snapshot writes")
+    
+    # WebSocket Feed Settings
+    DELTA_WS_URL: str = Field(
+        default="wss://socket.india.delta.exchange",
+        description="Delta Exchange India WebSocket URL"
+    )
+    WS_FALLBACK_POLL_INTERVAL: int = Field(default=30, description="REST poll interval when no feed events arrive")
+    MONITOR_MIN_TICK: float = Field(default=1.0, description="Fastest monitor tick when a position nears its stop")
+    MONITOR_FALLBACK_TICK: float = Field(default=5.0, description="Monitor tick for legs without a stop price, and longest retry delay after a failed positions fetch")
+    MONITOR_FLUSH_INTERVAL: int = Field(default=15, description="Seconds between batched monitor heartbeat writes")
+    MONITOR_RECORD_TTL: int = Field(default=172800, description="Seconds a monitor record is kept after its last heartbeat")
     
     # Cache TTL Settings (in seconds)
     SPOT_PRICE_CACHE_TTL: int = Field(default=5, description="Spot price cache TTL")
     OPTION_CHAIN_CACHE_TTL: int = Field(default=60, description="Option chain cache TTL")
     USER_SETTINGS_CACHE_TTL: int = Field(default=300, description="User settings cache TTL")
+    PRODUCT_CATALOG_REFRESH_INTERVAL: int = Field(default=300, description="Product catalogue refresh interval")
+    PRODUCT_CATALOG_MISS_REFRESH_INTERVAL: int = Field(default=30, description="Minimum seconds between catalogue refreshes triggered by unknown symbols")
+    
+    # Market History Settings
+    MARKET_DATA_DIR: str = Field(default="data/market", description="Directory for locally stored market history")
+    MARKET_HISTORY_ENABLED: bool = Field(default=False, description="Record candles and option-chain snapshots in the background")
+    MARKET_HISTORY_ASSETS: str = Field(default="BTC,ETH", description="Comma-separated assets to record")
+    MARKET_HISTORY_RESOLUTION: str = Field(default="1m", description="Candle resolution recorded for each asset")
+    CHAIN_SNAPSHOT_INTERVAL: int = Field(default=60, description="Seconds between recorded option-chain snapshots")
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -90,8 +127,8 @@ class Settings(BaseSettings):
         return [int(uid.strip()) for uid in self.ALLOWED_USER_IDS.split(",")]
     
     def get_fernet_cipher(self) -> Fernet:
-        """Return Fernet cipher instance for encryption/decryption."""
-        return Fernet(self.ENCRYPTION_KEY.encode())
+        """Return the shared Fernet cipher instance for encryption/decryption."""
+        return _fernet_cipher(self.ENCRYPTION_KEY)
     
     def get_webhook_endpoint(self) -> str:
         """Return full webhook endpoint URL."""
@@ -3,12 +3,14 @@ MongoDB connection management using Motor (async driver).
 """
 
 import asyncio
+import time
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
 from config import settings
 from bot.utils.logger import setup_logger, log_to_telegram
+from .indexes import apply_indexes, audit_queries
 
 logger = setup_logger(__name__)
 
@@ -110,36 +112,25 @@ def get_database() -> AsyncIOMotorDatabase:
 
 async def _create_indexes():
     """
-    Create database indexes for optimal query performance.
+    Build the index manifest (database/indexes.py) and audit hot queries.
     """
     try:
         db = get_database()
         
         logger.info("Creating database indexes...")
+        started = time.perf_counter()
+        applied = await apply_indexes(db)
+        logger.info(
+            f"✓ Database indexes created successfully: {sum(applied.values())} across "
+            f"{len(applied)} collections ({(time.perf_counter() - started) * 1000:.0f} ms)"
+        )
         
-        # API Credentials indexes
-        await db.api_credentials.create_index([("user_id", 1)])
-        await db.api_credentials.create_index([("user_id", 1), ("api_name", 1)], unique=True)
-        
-        # Strategy Presets indexes
-        await db.strategy_presets.create_index([("user_id", 1)])
-        await db.strategy_presets.create_index([("user_id", 1), ("strategy_type", 1)])
-        await db.strategy_presets.create_index([("user_id", 1), ("name", 1)], unique=True)
-        
-        # Auto Execution indexes
-        await db.auto_executions.create_index([("user_id", 1)])
-        await db.auto_executions.create_index([("enabled", 1)])
-        await db.auto_executions.create_index([("execution_time", 1)])
-        
-        # Trade History indexes
-        await db.trade_history.create_index([("user_id", 1)])
-        await db.trade_history.create_index([("user_id", 1), ("entry_time", -1)])
-        await db.trade_history.create_index([("api_id", 1)])
-        
-        # User Settings indexes
-        await db.user_settings.create_index([("user_id", 1)], unique=True)
-        
-        logger.info("✓ Database indexes created successfully")
+        # Every timer-driven query should be served by an index
+        for finding in await audit_queries(db):
+            logger.warning(
+                f"Query on {finding['collection']} ({finding['source']}) scans the whole collection: "
+                f"filter={finding['filter']} sort={finding['sort']}"
+            )
     
     except Exception as e:
         logger.error(f"Failed to create indexes: {e}", exc_info=True)
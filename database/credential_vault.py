@@ -0,0 +1,200 @@
+"""
+In-process vault of decrypted API credentials.
+
+Decrypted key pairs are kept for a short TTL in a size-bounded LRU so
+polls, screens and scheduled trades resolve credentials with a dict hit
+instead of a Mongo round trip plus two Fernet decrypts. Entries are held
+as bytearrays and overwritten with zeros when they expire, are evicted or
+are invalidated by an update/delete (or, on a replica set, by a change
+stream on 'api_credentials').
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Change events that invalidate a cached credential. Updates that only
+# touch last_used (written by every cache fill) are filtered out, otherwise
+# each fill would invalidate the entry it just cached.
+CHANGE_PIPELINE = [
+    {'$addFields': {
+        'changed_fields': {'$setDifference': [
+            {'$map': {
+                'input': {'$objectToArray': {'$ifNull': ['$updateDescription.updatedFields', {}]}},
+                'as': 'field',
+                'in': '$$field.k'
+            }},
+            ['last_used']
+        ]}
+    }},
+    {'$match': {'$or': [
+        {'operationType': {'$in': ['replace', 'delete']}},
+        {'operationType': 'update', 'changed_fields.0': {'$exists': True}},
+        {'operationType': 'update', 'updateDescription.removedFields.0': {'$exists': True}}
+    ]}}
+]
+
+
+class _Entry:
+    """Decrypted key pair held in mutable buffers so it can be wiped."""
+
+    __slots__ = ('api_key', 'api_secret', 'expires_at')
+
+    def __init__(self, api_key: str, api_secret: str, expires_at: float):
+        self.api_key = bytearray(api_key.encode())
+        self.api_secret = bytearray(api_secret.encode())
+        self.expires_at = expires_at
+
+    def pair(self) -> Tuple[str, str]:
+        return self.api_key.decode(), self.api_secret.decode()
+
+    def wipe(self):
+        for buffer in (self.api_key, self.api_secret):
+            buffer[:] = b'\x00' * len(buffer)
+
+
+class CredentialVault:
+    """
+    TTL + LRU cache of decrypted (api_key, api_secret) pairs by credential ID.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: Optional[int] = None):
+        """
+        Initialize credential vault.
+
+        Args:
+            ttl: Seconds a decrypted pair is kept
+            max_size: Maximum cached credentials
+        """
+        self.ttl = ttl if ttl is not None else settings.CREDENTIAL_CACHE_TTL
+        self.max_size = max_size or settings.CREDENTIAL_CACHE_SIZE
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._watch_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, credential_id: str) -> Optional[Tuple[str, str]]:
+        """
+        Get a cached decrypted pair.
+
+        Args:
+            credential_id: Credential ID
+
+        Returns:
+            (api_key, api_secret) or None on miss/expiry
+        """
+        entry = self._entries.get(credential_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._drop(credential_id)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(credential_id)
+        self.hits += 1
+        return entry.pair()
+
+    def put(self, credential_id: str, api_key: str, api_secret: str):
+        """
+        Cache a decrypted pair, evicting the least recently used beyond max_size.
+
+        Args:
+            credential_id: Credential ID
+            api_key: Decrypted API key
+            api_secret: Decrypted API secret
+        """
+        if self.ttl <= 0:
+            return
+
+        self._drop(credential_id)
+        self._entries[credential_id] = _Entry(api_key, api_secret, time.monotonic() + self.ttl)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def invalidate(self, credential_id: str):
+        """Drop and wipe one credential (after update/delete)."""
+        if self._drop(credential_id):
+            self.invalidations += 1
+            logger.debug(f"Credential {credential_id} invalidated")
+
+    def clear(self):
+        """Drop and wipe every cached credential."""
+        for credential_id in list(self._entries):
+            self._drop(credential_id)
+
+    def _drop(self, credential_id: str) -> bool:
+        """Remove and wipe an entry."""
+        entry = self._entries.pop(credential_id, None)
+        if entry is None:
+            return False
+        entry.wipe()
+        return True
+
+    # ==================== Change stream ====================
+
+    async def _watch(self):
+        """Invalidate credentials changed by other processes (replica sets only)."""
+        from pymongo.errors import OperationFailure
+        from database.connection import get_database
+
+        try:
+            collection = get_database().api_credentials
+            async with collection.watch(CHANGE_PIPELINE) as stream:
+                logger.info("Credential vault watching api_credentials changes")
+                async for change in stream:
+                    self.invalidate(str(change['documentKey']['_id']))
+
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            # Standalone servers have no change streams; TTL expiry still applies
+            logger.info(f"Credential change stream unavailable, relying on TTL: {e}")
+        except Exception as e:
+            logger.warning(f"Credential change stream stopped: {e}")
+
+    def start(self):
+        """Start the optional change-stream invalidation task."""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Stop the change stream and wipe every cached credential."""
+        if self._watch_task and not self._watch_task.done():
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+        self._watch_task = None
+        self.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'watching': self._watch_task is not None and not self._watch_task.done()
+        }
+
+
+# Global credential vault instance
+credential_vault = CredentialVault()
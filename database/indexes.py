@@ -0,0 +1,347 @@
+"""
+Declarative index manifest and query-plan audit.
+
+INDEX_MANIFEST lists every index per collection; apply_indexes() builds
+them with one createIndexes command per collection, all collections
+concurrently. HOT_QUERIES mirrors the queries the schedulers, monitors
+and handlers run on a timer; audit_queries() explains each one (or
+queries taken from the MongoDB profiler) and reports any that would
+still scan a whole collection.
+
+    python -m database.indexes               # build indexes, audit hot queries
+    python -m database.indexes --profile     # also audit profiled slow queries
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from config import settings
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index: key pattern plus options."""
+
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    expire_after: Optional[int] = None
+
+    def model(self) -> IndexModel:
+        """Build the pymongo IndexModel."""
+        options = {}
+        if self.unique:
+            options['unique'] = True
+        if self.expire_after is not None:
+            options['expireAfterSeconds'] = self.expire_after
+        return IndexModel(list(self.keys), **options)
+
+
+def _index(*keys: Tuple[str, int], unique: bool = False, expire_after: Optional[int] = None) -> IndexSpec:
+    return IndexSpec(tuple(keys), unique, expire_after)
+
+
+# Collection -> indexes
+INDEX_MANIFEST: Dict[str, List[IndexSpec]] = {
+    'api_credentials': [
+        _index(('user_id', 1)),
+        _index(('user_id', 1), ('api_name', 1), unique=True),
+    ],
+    'strategy_presets': [
+        _index(('user_id', 1)),
+        _index(('user_id', 1), ('strategy_type', 1)),
+        _index(('user_id', 1), ('name', 1), unique=True),
+    ],
+    'auto_executions': [
+        _index(('user_id', 1)),
+        _index(('enabled', 1)),
+        _index(('execution_time', 1)),
+        _index(('enabled', 1), ('next_run_at', 1)),
+    ],
+    # Scheduling core due-job queries run every minute
+    'algo_setups': [
+        _index(('is_active', 1), ('next_run_at', 1)),
+        _index(('user_id', 1), ('is_active', 1)),
+    ],
+    'move_auto_executions': [
+        _index(('enabled', 1), ('next_run_at', 1)),
+        _index(('user_id', 1), ('created_at', -1)),
+    ],
+    'move_trade_presets': [
+        _index(('user_id', 1), ('created_at', -1)),
+    ],
+    'manual_trade_presets': [
+        _index(('user_id', 1)),
+    ],
+    'move_presets': [
+        _index(('user_id', 1)),
+    ],
+    'move_strategies': [
+        _index(('user_id', 1), ('created_at', -1)),
+    ],
+    'move_trades': [
+        _index(('user_id', 1)),
+    ],
+    # Leg protection monitor polls every 10 s
+    'active_positions': [
+        _index(('status', 1), ('enable_leg_protection', 1), ('strategy_type', 1)),
+    ],
+    'trade_history': [
+        _index(('user_id', 1)),
+        _index(('user_id', 1), ('entry_time', -1)),
+        _index(('user_id', 1), ('status', 1), ('exit_time', -1)),
+        _index(('api_id', 1)),
+    ],
+    'user_settings': [
+        _index(('user_id', 1), unique=True),
+    ],
+    # TTL drops monitor records without heartbeats
+    'strategy_monitors': [
+        _index(('status', 1)),
+        _index(('updated_at', 1), expire_after=settings.MONITOR_RECORD_TTL),
+    ],
+    # TTL drops abandoned wizards
+    'conversation_states': [
+        _index(('expires_at', 1), expire_after=0),
+    ],
+}
+
+
+@dataclass
+class QueryShape:
+    """A query to explain: collection, filter and optional sort."""
+
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[Dict[str, int]] = None
+    source: str = ''
+
+
+def _due(active_filter: Dict[str, Any]) -> Dict[str, Any]:
+    """Scheduling core due-job filter (see schedule_ops.get_due_schedules)."""
+    return {**active_filter, '$or': [{'next_run_at': {'$lte': datetime.utcnow()}}, {'next_run_at': None}]}
+
+
+# Queries run on a timer or on every interaction (sample values)
+HOT_QUERIES: List[QueryShape] = [
+    QueryShape('algo_setups', _due({'is_active': True}), source='scheduling_core due jobs'),
+    QueryShape('algo_setups', {'is_active': True}, {'next_run_at': 1}, source='scheduling_core upcoming'),
+    QueryShape('algo_setups', {'user_id': 1, 'is_active': True}, source='get_algo_setups'),
+    QueryShape('move_auto_executions', _due({'enabled': True}), source='scheduling_core due jobs'),
+    QueryShape('move_auto_executions', {'enabled': True}, {'next_run_at': 1}, source='scheduling_core upcoming'),
+    QueryShape('move_auto_executions', {'user_id': 1}, {'created_at': -1}, source='get_move_auto_executions'),
+    QueryShape('auto_executions', {'enabled': True}, {'execution_time': 1}, source='get_enabled_auto_executions'),
+    QueryShape(
+        'active_positions',
+        {
+            'strategy_type': {'$in': ['straddle', 'strangle']},
+            'enable_leg_protection': True,
+            'status': 'active',
+            'legs': {'$exists': True}
+        },
+        source='LegProtectionMonitor'
+    ),
+    QueryShape('move_trade_presets', {'user_id': 1}, {'created_at': -1}, source='move presets list'),
+    QueryShape('manual_trade_presets', {'user_id': 1}, source='manual presets list'),
+    QueryShape('move_presets', {'user_id': 1}, source='move presets'),
+    QueryShape('move_strategies', {'user_id': 1}, {'created_at': -1}, source='move strategies list'),
+    QueryShape('move_trades', {'user_id': 1}, source='move trades list'),
+    QueryShape('trade_history', {'user_id': 1, 'status': 'open'}, {'entry_time': -1}, source='get_trade_history'),
+    QueryShape(
+        'trade_history',
+        {'user_id': 1, 'status': 'closed', 'exit_time': {'$gte': datetime.utcnow()}},
+        {'exit_time': -1},
+        source='get_closed_trades'
+    ),
+    QueryShape('api_credentials', {'user_id': 1, 'is_active': True}, {'created_at': -1}, source='get_api_credentials'),
+    QueryShape('strategy_presets', {'user_id': 1, 'is_active': True}, {'created_at': -1}, source='get_strategy_presets'),
+    QueryShape('user_settings', {'user_id': 1}, source='get_user_settings'),
+    QueryShape('conversation_states', {'expires_at': {'$gt': datetime.utcnow()}}, source='state restore'),
+]
+
+
+async def _apply_collection(db: AsyncIOMotorDatabase, collection: str, specs: List[IndexSpec]) -> int:
+    """Create a collection's indexes in one command, falling back to one at a time."""
+    try:
+        await db[collection].create_indexes([spec.model() for spec in specs])
+        return len(specs)
+    except OperationFailure as e:
+        logger.warning(f"Batch index build failed for {collection} ({e}), retrying one by one")
+
+    created = 0
+    for spec in specs:
+        try:
+            await db[collection].create_indexes([spec.model()])
+            created += 1
+        except OperationFailure as e:
+            logger.error(f"Failed to create index {list(spec.keys)} on {collection}: {e}")
+    return created
+
+
+async def apply_indexes(
+    db: AsyncIOMotorDatabase,
+    manifest: Optional[Dict[str, List[IndexSpec]]] = None
+) -> Dict[str, int]:
+    """
+    Build all manifest indexes, collections concurrently.
+
+    Args:
+        db: Database
+        manifest: Collection -> indexes (defaults to INDEX_MANIFEST)
+
+    Returns:
+        Collection -> indexes created or already present
+    """
+    manifest = manifest if manifest is not None else INDEX_MANIFEST
+    results = await asyncio.gather(
+        *(_apply_collection(db, collection, specs) for collection, specs in manifest.items()),
+        return_exceptions=True
+    )
+
+    applied = {}
+    for collection, result in zip(manifest, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to create indexes on {collection}: {result}")
+            applied[collection] = 0
+        else:
+            applied[collection] = result
+    return applied
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """All stage names in an explain plan tree."""
+    if isinstance(plan, list):
+        return [stage for child in plan for stage in _plan_stages(child)]
+    if not isinstance(plan, dict):
+        return []
+
+    stages = [plan['stage']] if 'stage' in plan else []
+    for key in ('inputStage', 'inputStages', 'queryPlan', 'thenStage', 'elseStage', 'outerStage', 'innerStage'):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    return stages
+
+
+async def explain_query(db: AsyncIOMotorDatabase, query: QueryShape) -> List[str]:
+    """
+    Get the winning plan's stages for a query.
+
+    Args:
+        db: Database
+        query: Query to explain
+
+    Returns:
+        Stage names (e.g. ['FETCH', 'IXSCAN'])
+    """
+    command = {'find': query.collection, 'filter': query.filter}
+    if query.sort:
+        command['sort'] = query.sort
+    result = await db.command('explain', command, verbosity='queryPlanner')
+    return _plan_stages(result.get('queryPlanner', {}).get('winningPlan', {}))
+
+
+async def audit_queries(db: AsyncIOMotorDatabase, queries: Optional[List[QueryShape]] = None) -> List[Dict[str, Any]]:
+    """
+    Explain queries and report the ones planned as collection scans.
+
+    Collections that do not exist yet explain as EOF and are not reported.
+
+    Args:
+        db: Database
+        queries: Queries to check (defaults to HOT_QUERIES)
+
+    Returns:
+        One dict per COLLSCAN (collection, filter, sort, source, stages)
+    """
+    queries = queries if queries is not None else HOT_QUERIES
+    results = await asyncio.gather(*(explain_query(db, q) for q in queries), return_exceptions=True)
+
+    findings = []
+    for query, stages in zip(queries, results):
+        if isinstance(stages, Exception):
+            logger.warning(f"Could not explain query on {query.collection} ({query.source}): {stages}")
+            continue
+        if 'COLLSCAN' in stages:
+            findings.append({
+                'collection': query.collection,
+                'filter': query.filter,
+                'sort': query.sort,
+                'source': query.source,
+                'stages': stages
+            })
+    return findings
+
+
+async def profiled_queries(db: AsyncIOMotorDatabase, limit: int = 200, min_millis: int = 0) -> List[QueryShape]:
+    """
+    Read queries from the MongoDB profiler (system.profile).
+
+    The profiler must be enabled (e.g. db.setProfilingLevel(1) for slow
+    operations); entries are deduplicated by collection, filter and sort.
+
+    Args:
+        db: Database
+        limit: Most recent profile entries to read
+        min_millis: Only entries at least this slow
+
+    Returns:
+        Queries to audit
+    """
+    cursor = db['system.profile'].find(
+        {'op': {'$in': ['query', 'update', 'remove', 'command']}, 'millis': {'$gte': min_millis}}
+    ).sort('ts', -1).limit(limit)
+
+    queries: Dict[str, QueryShape] = {}
+    async for entry in cursor:
+        command = entry.get('command', {})
+        collection = command.get('find') or command.get('count') or entry.get('ns', '').split('.', 1)[-1]
+        query_filter = command.get('filter', command.get('query', command.get('q')))
+        if not collection or collection.startswith('system.') or not isinstance(query_filter, dict):
+            continue
+
+        sort = command.get('sort') or None
+        key = f"{collection}|{query_filter!r}|{sort!r}"
+        queries.setdefault(key, QueryShape(
+            collection,
+            query_filter,
+            sort,
+            source=f"profile ({entry.get('millis', 0)} ms, {entry.get('planSummary', '?')})"
+        ))
+    return list(queries.values())
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from database.connection import connect_db, close_db
+
+    parser = argparse.ArgumentParser(prog='python -m database.indexes', description='Index manifest and COLLSCAN audit')
+    parser.add_argument('--profile', action='store_true', help='Also audit queries from system.profile')
+    parser.add_argument('--min-millis', type=int, default=0, help='Only profiled queries at least this slow')
+    args = parser.parse_args()
+
+    async def main() -> int:
+        db = await connect_db()  # applies the manifest
+        try:
+            queries = list(HOT_QUERIES)
+            if args.profile:
+                queries += await profiled_queries(db, min_millis=args.min_millis)
+
+            findings = await audit_queries(db, queries)
+            for finding in findings:
+                print(f"COLLSCAN {finding['collection']} {finding['filter']} sort={finding['sort']} [{finding['source']}]")
+            print(f"{len(queries)} queries audited, {len(findings)} collection scans")
+            return 1 if findings else 0
+        finally:
+            await close_db()
+
+    sys.exit(asyncio.run(main()))
@@ -81,6 +81,19 @@ async def get_algo_setup(setup_id: str) -> Optional[dict]:
         return None
 
 
+async def is_algo_setup_active(setup_id: str) -> bool:
+    """Check whether a setup still exists and is active (False on errors)."""
+    try:
+        db = get_database()
+        
+        setup = await db.algo_setups.find_one({'_id': ObjectId(setup_id)}, {'is_active': 1})
+        return bool(setup and setup.get('is_active'))
+    
+    except Exception as e:
+        logger.error(f"Failed to check algo setup: {e}", exc_info=True)
+        return False
+
+
 async def update_algo_setup(setup_id: str, setup_data: dict) -> bool:
     """Update an algo setup."""
     try:
@@ -89,6 +102,7 @@ async def update_algo_setup(setup_id: str, setup_data: dict) -> bool:
         update_data = {
             'manual_preset_id': setup_data['manual_preset_id'],
             'execution_time': setup_data['execution_time'],
+            'next_run_at': None,  # Scheduling core recomputes on next sync
             'updated_at': datetime.utcnow()
         }
         
@@ -9,6 +9,7 @@ from pymongo.errors import DuplicateKeyError
 
 from config import settings
 from database.connection import get_database
+from database.credential_vault import credential_vault
 from database.models.api_credentials import (
     APICredential,
     APICredentialCreate,
@@ -168,12 +169,19 @@ async def get_decrypted_api_credential(credential_id: str) -> Optional[Tuple[str
     """
     Get decrypted API credentials.
     
+    Served from the credential vault when cached; a miss loads, decrypts
+    and caches the pair and records last_used.
+    
     Args:
         credential_id: Credential ID
     
     Returns:
         Tuple of (api_key, api_secret) or None if not found
     """
+    cached = credential_vault.get(credential_id)
+    if cached:
+        return cached
+    
     try:
         credential = await get_api_credential_by_id(credential_id)
         
@@ -184,9 +192,14 @@ async def get_decrypted_api_credential(credential_id: str) -> Optional[Tuple[str
         api_key = _decrypt_credential(credential.encrypted_api_key)
         api_secret = _decrypt_credential(credential.encrypted_api_secret)
         
-        # Update last_used timestamp
-        await update_api_credential(credential_id, {"last_used": datetime.now()})
+        # Update last_used timestamp (once per cache fill; the vault's change stream ignores it)
+        db = get_database()
+        await db.api_credentials.update_one(
+            {"_id": ObjectId(credential_id)},
+            {"$set": {"last_used": datetime.now()}}
+        )
         
+        credential_vault.put(credential_id, api_key, api_secret)
         logger.debug(f"Decrypted API credential: {credential_id}")
         
         return (api_key, api_secret)
@@ -228,6 +241,7 @@ async def update_api_credential(
             {"_id": ObjectId(credential_id)},
             {"$set": update_data}
         )
+        credential_vault.invalidate(credential_id)
         
         if result.modified_count > 0:
             logger.info(f"Updated API credential: {credential_id}")
@@ -256,6 +270,7 @@ async def delete_api_credential(credential_id: str) -> bool:
         
         # Delete document
         result = await db.api_credentials.delete_one({"_id": ObjectId(credential_id)})
+        credential_vault.invalidate(credential_id)
         
         if result.deleted_count > 0:
             logger.info(f"Deleted API credential: {credential_id}")
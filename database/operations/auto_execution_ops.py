@@ -173,6 +173,9 @@ async def update_auto_execution(
         # Add updated_at timestamp
         update_data["updated_at"] = datetime.now()
         
+        # Time or enabled flag may have changed; scheduling core recomputes the next run
+        update_data["next_run_at"] = None
+        
         # Update document
         result = await db.auto_executions.update_one(
             {"_id": ObjectId(schedule_id)},
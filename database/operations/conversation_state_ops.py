@@ -0,0 +1,75 @@
+"""
+Database operations for conversation state snapshots.
+
+In-progress wizards are written behind to the 'conversation_states'
+collection (keyed by user ID) so a restart does not drop them. Records
+carry an 'expires_at' timestamp covered by a TTL index, so abandoned
+conversations age out on their own.
+"""
+
+from typing import List, Dict, Any, Iterable, Optional
+from datetime import datetime
+
+import bson
+from pymongo import DeleteOne, ReplaceOne
+
+from database.connection import get_database
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+COLLECTION = 'conversation_states'
+
+
+async def save_conversation_states(documents: Iterable[Dict[str, Any]], deleted: Iterable[int] = ()) -> Optional[int]:
+    """
+    Replace snapshots and delete cleared ones in one bulk write.
+
+    Args:
+        documents: Snapshot documents with '_id' set to the user ID
+        deleted: User IDs whose conversation was cleared
+
+    Returns:
+        Number of operations written, or None if the write failed
+    """
+    operations = []
+    for doc in documents:
+        try:
+            # Wizard data can hold values Mongo cannot store; skip those users
+            bson.encode(doc)
+        except Exception as e:
+            logger.debug(f"Conversation state for user {doc['_id']} not snapshotted: {e}")
+            # Never restore an older snapshot of a conversation that has moved on
+            operations.append(DeleteOne({'_id': doc['_id']}))
+            continue
+        operations.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+
+    operations.extend(DeleteOne({'_id': user_id}) for user_id in deleted)
+    if not operations:
+        return 0
+
+    try:
+        db = get_database()
+        await db[COLLECTION].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    except Exception as e:
+        logger.error(f"Failed to save conversation states: {e}", exc_info=True)
+        return None
+
+
+async def get_conversation_states() -> List[Dict[str, Any]]:
+    """
+    Get snapshots that have not expired yet.
+
+    Returns:
+        List of snapshot documents
+    """
+    try:
+        db = get_database()
+        cursor = db[COLLECTION].find({'expires_at': {'$gt': datetime.utcnow()}})
+        return await cursor.to_list(length=None)
+
+    except Exception as e:
+        logger.error(f"Failed to load conversation states: {e}", exc_info=True)
+        return []
@@ -0,0 +1,99 @@
+"""
+Database operations for persisted position monitors.
+
+Monitor definitions live in the 'strategy_monitors' collection keyed by
+strategy ID so they survive restarts and redeploys. Records carry an
+'updated_at' timestamp covered by a TTL index; active monitors refresh it
+with every heartbeat flush, finished ones age out on their own.
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime
+from pymongo import UpdateOne
+
+from database.connection import get_database
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+COLLECTION = 'strategy_monitors'
+
+
+async def save_monitors(documents: Iterable[Dict[str, Any]]) -> Optional[int]:
+    """
+    Upsert full monitor definitions in one bulk write.
+
+    Args:
+        documents: Monitor documents with '_id' set to the strategy ID
+
+    Returns:
+        Number of documents written, or None if the write failed
+    """
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {'_id': doc['_id']},
+            {'$set': {**{k: v for k, v in doc.items() if k != '_id'}, 'updated_at': now}},
+            upsert=True
+        )
+        for doc in documents
+    ]
+    if not operations:
+        return 0
+
+    try:
+        db = get_database()
+        result = await db[COLLECTION].bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    except Exception as e:
+        logger.error(f"Failed to save monitors: {e}", exc_info=True)
+        return None
+
+
+async def update_monitor_heartbeats(updates: Iterable[Tuple[str, Dict[str, Any]]]) -> Optional[int]:
+    """
+    Write check-count/status heartbeats for many monitors in one bulk write.
+
+    Args:
+        updates: (strategy_id, fields) pairs
+
+    Returns:
+        Number of documents modified, or None if the write failed
+    """
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({'_id': strategy_id}, {'$set': {**fields, 'updated_at': now}})
+        for strategy_id, fields in updates
+    ]
+    if not operations:
+        return 0
+
+    try:
+        db = get_database()
+        result = await db[COLLECTION].bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    except Exception as e:
+        logger.error(f"Failed to write monitor heartbeats: {e}", exc_info=True)
+        return None
+
+
+async def get_active_monitors(final_statuses: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Load every monitor that has not reached a final status.
+
+    Args:
+        final_statuses: Statuses that mark a monitor as finished
+
+    Returns:
+        List of monitor documents
+    """
+    try:
+        db = get_database()
+        cursor = db[COLLECTION].find({'status': {'$nin': list(final_statuses)}})
+        return await cursor.to_list(length=None)
+
+    except Exception as e:
+        logger.error(f"Failed to load active monitors: {e}", exc_info=True)
+        return []
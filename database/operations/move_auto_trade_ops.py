@@ -141,6 +141,30 @@ async def get_all_active_move_schedules() -> List[Dict[str, Any]]:
         return []
 
 
+async def is_move_schedule_enabled(schedule_id: str) -> bool:
+    """
+    Check whether a schedule still exists and is enabled.
+    
+    Args:
+        schedule_id: Schedule ID
+    
+    Returns:
+        True if enabled, False if disabled, deleted or on errors
+    """
+    try:
+        auto_execution_collection, _ = get_collections()
+        
+        schedule = await auto_execution_collection.find_one(
+            {'_id': ObjectId(schedule_id)},
+            {'enabled': 1}
+        )
+        return bool(schedule and schedule.get('enabled'))
+    
+    except Exception as e:
+        logger.error(f"Error checking schedule status: {e}", exc_info=True)
+        return False
+
+
 async def update_move_schedule_last_execution(
     schedule_id: str,
     execution_time: datetime
@@ -201,6 +225,7 @@ async def toggle_move_schedule_status(
             {
                 '$set': {
                     'enabled': enabled,
+                    'next_run_at': None,  # Scheduling core recomputes on next sync
                     'updated_at': datetime.utcnow()
                 }
             }
@@ -268,6 +293,7 @@ async def update_move_schedule_time(
             {
                 '$set': {
                     'execution_time': new_time,
+                    'next_run_at': None,  # Scheduling core recomputes on next sync
                     'updated_at': datetime.utcnow()
                 }
             }
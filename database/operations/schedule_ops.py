@@ -0,0 +1,127 @@
+"""
+Database operations shared by every scheduled job type.
+
+Schedulable collections (algo setups, MOVE schedules, auto executions)
+carry a 'next_run_at' field (naive UTC) maintained by the scheduling
+core. Writers reset it to None whenever the time or enabled flag changes,
+so one indexed query per collection finds everything due soon plus
+anything that needs its next run computed.
+"""
+
+from typing import List, Dict, Any
+from datetime import datetime
+from bson import ObjectId
+
+from database.connection import get_database
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _object_id(doc_id: str):
+    """Convert string ID to ObjectId where possible."""
+    return ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id
+
+
+async def get_due_schedules(
+    collection: str,
+    active_filter: Dict[str, Any],
+    horizon: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Get active schedules due before horizon or without a computed next run.
+
+    Args:
+        collection: Collection name
+        active_filter: Filter selecting enabled schedules
+        horizon: Latest next_run_at to include (naive UTC)
+
+    Returns:
+        List of schedule documents with '_id' as string
+    """
+    try:
+        db = get_database()
+        cursor = db[collection].find({
+            **active_filter,
+            '$or': [
+                {'next_run_at': {'$lte': horizon}},
+                {'next_run_at': None}
+            ]
+        })
+        docs = await cursor.to_list(length=None)
+
+        for doc in docs:
+            doc['_id'] = str(doc['_id'])
+
+        return docs
+
+    except Exception as e:
+        logger.error(f"Failed to get due schedules from {collection}: {e}", exc_info=True)
+        return []
+
+
+async def set_next_run_at(collection: str, doc_id: str, next_run_at: datetime) -> bool:
+    """
+    Store the next run time for a schedule.
+
+    Args:
+        collection: Collection name
+        doc_id: Schedule ID
+        next_run_at: Next run time (naive UTC)
+
+    Returns:
+        True if updated
+    """
+    try:
+        db = get_database()
+        result = await db[collection].update_one(
+            {'_id': _object_id(doc_id)},
+            {'$set': {'next_run_at': next_run_at}}
+        )
+        return result.matched_count > 0
+
+    except Exception as e:
+        logger.error(f"Failed to set next_run_at for {collection}/{doc_id}: {e}", exc_info=True)
+        return False
+
+
+async def get_upcoming_schedules(
+    collection: str,
+    active_filter: Dict[str, Any],
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Get active schedules ordered by next run time.
+
+    Args:
+        collection: Collection name
+        active_filter: Filter selecting enabled schedules
+        limit: Maximum schedules returned
+
+    Returns:
+        List of schedule documents with '_id' as string
+    """
+    try:
+        db = get_database()
+        cursor = db[collection].find(active_filter).sort('next_run_at', 1).limit(limit)
+        docs = await cursor.to_list(length=limit)
+
+        for doc in docs:
+            doc['_id'] = str(doc['_id'])
+
+        return docs
+
+    except Exception as e:
+        logger.error(f"Failed to get upcoming schedules from {collection}: {e}", exc_info=True)
+        return []
+
+
+async def count_active_schedules(collection: str, active_filter: Dict[str, Any]) -> int:
+    """Count enabled schedules in a collection."""
+    try:
+        db = get_database()
+        return await db[collection].count_documents(active_filter)
+
+    except Exception as e:
+        logger.error(f"Failed to count schedules in {collection}: {e}", exc_info=True)
+        return 0
@@ -3,6 +3,12 @@ Delta Exchange India API integration package.
 """
 
 from .client import DeltaClient
+from .client_registry import client_registry, get_delta_client, get_public_client
+from .product_catalog import product_catalog, ProductCatalog
+from .expiry_calendar import expiry_calendar, ExpiryCalendar, Expiry
+from .metrics import delta_metrics, request_tags
+from .market_data import market_data_cache
+from .rate_limiter import rate_limiter, request_priority
 from .signature import generate_signature
 from .models.order import Order, OrderType, OrderSide, TimeInForce
 from .models.position import Position
@@ -11,6 +17,19 @@ from .models.balance import Balance
 
 __all__ = [
     'DeltaClient',
+    'client_registry',
+    'get_delta_client',
+    'get_public_client',
+    'product_catalog',
+    'ProductCatalog',
+    'expiry_calendar',
+    'ExpiryCalendar',
+    'Expiry',
+    'delta_metrics',
+    'request_tags',
+    'market_data_cache',
+    'rate_limiter',
+    'request_priority',
     'generate_signature',
     'Order',
     'OrderType',
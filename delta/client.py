@@ -2,6 +2,8 @@
 Delta Exchange API client with async support.
 """
 
+import asyncio
+import logging
 import time
 import json
 from typing import Dict, Any, Optional, List
@@ -9,6 +11,9 @@ import httpx
 
 from config import settings
 from .signature import generate_signature
+from .metrics import delta_metrics, normalize_endpoint, current_tags, RequestRecord
+from .market_data import market_data_cache, spot_key, chain_key, spot_ttl, chain_ttl
+from .rate_limiter import rate_limiter
 from bot.utils.logger import setup_logger, log_api_call
 from bot.utils.error_handler import (
     APIError,
@@ -31,9 +36,10 @@ class DeltaClient:
         self,
         api_key: str,
         api_secret: str,
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        http2: bool = False,
+        pooled: bool = False
     ):
-        self.logger = setup_logger(__name__)  # ✅ ADD THIS
         """
         Initialize Delta Exchange client.
         
@@ -41,29 +47,73 @@ class DeltaClient:
             api_key: API key
             api_secret: API secret
             base_url: Base URL for API (defaults to India API)
+            http2: Negotiate HTTP/2 on the underlying connection pool
+            pooled: Client is owned by the client registry (close() only releases it)
         """
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url or settings.DELTA_BASE_URL
+        self.pooled = pooled
+        self.last_used = time.monotonic()
+        # Registry leases not yet released, and requests in progress
+        self.holders = 0
+        self.in_flight = 0
         
         # Create async HTTP client
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=30.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            http2=http2,
+            limits=httpx.Limits(
+                max_keepalive_connections=5,
+                max_connections=10,
+                keepalive_expiry=settings.DELTA_CLIENT_IDLE_TTL if pooled else 5.0
+            )
         )
         
         logger.info(f"Initialized DeltaClient with base URL: {self.base_url}")
     
+    @property
+    def is_closed(self) -> bool:
+        """Whether the underlying HTTP client has been closed."""
+        return self.client.is_closed
+    
+    def touch(self):
+        """Mark the client as recently used (keeps pooled clients from idle eviction)."""
+        self.last_used = time.monotonic()
+    
+    @property
+    def is_idle(self) -> bool:
+        """Whether nobody holds the client and no request is in progress."""
+        return self.holders == 0 and self.in_flight == 0
+    
+    def release(self):
+        """Give back one registry lease on a pooled client."""
+        if self.holders > 0:
+            self.holders -= 1
+        self.touch()
+    
     async def close(self):
-        """Close the HTTP client."""
+        """
+        Close the HTTP client.
+        
+        Pooled clients are shared through the client registry, so closing
+        one only releases it; the registry closes it once it is unheld and
+        idle, or at shutdown.
+        """
+        if self.pooled:
+            self.release()
+            return
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the underlying HTTP client unconditionally."""
         await self.client.aclose()
         logger.debug("DeltaClient closed")
     
     def _get_timestamp(self) -> str:
         """Get current timestamp in SECONDS (not milliseconds)."""
         timestamp_sec = int(time.time())  # SECONDS, not milliseconds!
-        logger.debug(f"Generated timestamp: {timestamp_sec}")
         return str(timestamp_sec)
     
     def _generate_headers(
@@ -77,18 +127,10 @@ class DeltaClient:
         Generate request headers with signature.
         """
         timestamp = self._get_timestamp()
-
-        # DEBUG: Log current time - FIX THE DISPLAY BUG
-        import datetime
-        current_time = datetime.datetime.now()
-        timestamp_int = int(timestamp)
-        # FIXED: Don't divide by 1000 since timestamp is already in seconds!
-        timestamp_date = datetime.datetime.fromtimestamp(timestamp_int)
-    
-        logger.info(f"🕐 Time Debug:")
-        logger.info(f"  Current server time: {current_time}")
-        logger.info(f"  Generated timestamp: {timestamp}")
-        logger.info(f"  Timestamp as date: {timestamp_date}")
+        
+        # Hot path: lazy %-formatting, skipped entirely unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Signing %s %s at timestamp %s", method, path, timestamp)
     
         # Generate signature
         signature = generate_signature(
@@ -120,6 +162,43 @@ class DeltaClient:
     ) -> Dict[str, Any]:
         """
         Make HTTP request to Delta Exchange API.
+        
+        Latency (across all attempts), retries, 429s, bytes and in-flight
+        counts are recorded in delta_metrics under the endpoint template.
+        """
+        self.touch()
+        metric_endpoint = normalize_endpoint(endpoint)
+        record = RequestRecord(
+            method=method,
+            endpoint=metric_endpoint,
+            status='error',
+            elapsed=0.0,
+            attempts=0,
+            started_at=time.time(),
+            tags=current_tags()
+        )
+        started = time.perf_counter()
+        delta_metrics.request_started(metric_endpoint)
+        self.in_flight += 1
+        try:
+            return await self._send(method, endpoint, params, data, authenticated, record)
+        finally:
+            self.in_flight -= 1
+            self.touch()
+            record.elapsed = time.perf_counter() - started
+            delta_metrics.request_finished(record)
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        authenticated: bool,
+        record: RequestRecord
+    ) -> Dict[str, Any]:
+        """
+        Sign and send a request with retries, filling in its metrics record.
         """
         # Build query string with SORTED parameters (CRITICAL!)
         query_string = ""
@@ -133,14 +212,11 @@ class DeltaClient:
         if data:
             payload = json.dumps(data, separators=(',', ':'))
     
-        # Generate headers
-        if authenticated:
-            headers = self._generate_headers(method, endpoint, query_string, payload)
-        else:
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'TelegramTradingBot/1.0'
-            }
+        # Unauthenticated headers (signed headers are built per attempt)
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'TelegramTradingBot/1.0'
+        }
     
         # Build full URL
         url = endpoint
@@ -151,12 +227,22 @@ class DeltaClient:
             # Make request with retry logic
             for attempt in range(settings.MAX_RETRIES):
                 try:
+                    record.attempts = attempt + 1
+                    
+                    # Wait for this key's shared quota, then sign (signatures expire quickly)
+                    if authenticated:
+                        await rate_limiter.acquire(self.api_key, method, record.endpoint)
+                        headers = self._generate_headers(method, endpoint, query_string, payload)
+                    
+                    record.bytes_out += len(payload.encode()) if payload else 0
                     response = await self.client.request(
                         method=method,
                         url=url,
                         headers=headers,
                         content=payload if payload else None
                     )
+                    record.status = str(response.status_code)
+                    record.bytes_in += len(response.content)
                     
                     # Log API call
                     log_api_call(
@@ -168,11 +254,17 @@ class DeltaClient:
                 
                     # Handle rate limiting
                     if response.status_code == 429:
+                        delta_metrics.rate_limited(record.endpoint)
                         retry_after = int(response.headers.get('Retry-After', settings.RETRY_DELAY))
                         logger.warning(f"Rate limited. Retry after {retry_after}s")
                     
                         if attempt < settings.MAX_RETRIES - 1:
-                            await asyncio.sleep(retry_after)
+                            delta_metrics.retry(record.endpoint, 'rate_limit')
+                            if authenticated:
+                                # Blocks every client on this key; the retry waits in the limiter
+                                rate_limiter.penalize(self.api_key, retry_after)
+                            else:
+                                await asyncio.sleep(retry_after)
                             continue
                         else:
                             raise APIRateLimitError("Rate limit exceeded")
@@ -215,16 +307,20 @@ class DeltaClient:
                     return response_data
             
                 except httpx.TimeoutException:
+                    record.status = 'timeout'
                     logger.warning(f"Request timeout (attempt {attempt + 1}/{settings.MAX_RETRIES})")
                     if attempt < settings.MAX_RETRIES - 1:
+                        delta_metrics.retry(record.endpoint, 'timeout')
                         await asyncio.sleep(settings.RETRY_DELAY)
                         continue
                     else:
                         raise APITimeoutError("Request timed out")
             
                 except httpx.NetworkError as e:
+                    record.status = 'network_error'
                     logger.warning(f"Network error (attempt {attempt + 1}/{settings.MAX_RETRIES}): {e}")
                     if attempt < settings.MAX_RETRIES - 1:
+                        delta_metrics.retry(record.endpoint, 'network')
                         await asyncio.sleep(settings.RETRY_DELAY)
                         continue
                     else:
@@ -535,20 +631,21 @@ class DeltaClient:
         Get OHLC candle data.
         
         Args:
-            symbol: Product symbol
+            symbol: Product symbol (e.g. BTCUSD, or MARK:C-BTC-... for mark candles)
             resolution: Candle resolution (1m, 5m, 15m, 1h, etc.)
-            start: Start timestamp
-            end: End timestamp
+            start: Start timestamp (seconds)
+            end: End timestamp (seconds)
         
         Returns:
-            OHLC data
+            OHLC data ('result' is a list of time/open/high/low/close/volume)
         """
         params = {
+            'symbol': symbol,
             'resolution': resolution,
             'start': start,
             'end': end
         }
-        return await self._request('GET', f'/v2/chart/history', params=params, authenticated=False)
+        return await self._request('GET', '/v2/history/candles', params=params, authenticated=False)
     
     async def get_mark_price(self, symbol: str) -> Dict[str, Any]:
         """
@@ -584,46 +681,79 @@ class DeltaClient:
     async def get_spot_price(self, asset: str = "BTC") -> float:
         """
         Get spot price for asset using tickers endpoint.
+        
+        Served from the market data cache for SPOT_PRICE_CACHE_TTL seconds;
+        concurrent callers share one ticker request.
 
         Args:
             asset: Asset symbol (BTC or ETH)
 
         Returns:
             Spot price as float
-        """    
-        try:
-            symbol = f"{asset}USD"
-            print(f"✅ Fetching spot price for {symbol}")
-            self.logger.info(f"Fetching spot price for {symbol}")
-    
-            response = await self._request('GET', f'/v2/tickers/{symbol}', authenticated=False)
-    
-            print(f"✅ Ticker response: {response}")
-            self.logger.info(f"Ticker API response: {response}")
-    
-            # ✅ CRITICAL FIX: Extract result from response
-            result = response.get('result', {}) if response.get('success') else {}
-    
-            if result.get('spot_price'):
-                price = float(result['spot_price'])
-                print(f"✅ Spot price: {price}")
-                self.logger.info(f"✅ Spot price: {price}")
-                return price
-    
-            if result.get('mark_price'):
-                price = float(result['mark_price'])
-                print(f"✅ Mark price (fallback): {price}")
-                self.logger.info(f"✅ Mark price (fallback): {price}")
-                return price
+        
+        Raises:
+            APIError: If the ticker carries no price (failures are not cached)
+        """
+        return await market_data_cache.get_or_fetch(
+            spot_key(asset), spot_ttl(), lambda: self._fetch_spot_price(asset)
+        )
     
-            self.logger.error(f"❌ No price found in response: {response}")
-            print(f"❌ No price found")
-            return 0.0
+    async def _fetch_spot_price(self, asset: str) -> float:
+        """Fetch spot price from the ticker (mark price as fallback)."""
+        symbol = f"{asset}USD"
+        response = await self._request('GET', f'/v2/tickers/{symbol}', authenticated=False)
+        result = response.get('result', {}) if response.get('success') else {}
+        
+        if result.get('spot_price'):
+            return float(result['spot_price'])
+        
+        if result.get('mark_price'):
+            logger.debug("No spot price for %s, using mark price", symbol)
+            return float(result['mark_price'])
+        
+        logger.error(f"❌ No price found in {symbol} ticker response: {response}")
+        raise APIError(f"No price found in {symbol} ticker")
     
-        except Exception as e:
-            print(f"❌ Exception: {e}")
-            self.logger.error(f"❌ Exception fetching spot price: {e}", exc_info=True)
-            raise
+    async def get_option_chain(
+        self,
+        asset: str,
+        expiry_date: Optional[str] = None,
+        contract_types: str = 'call_options,put_options',
+        fresh: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get live tickers for an asset's options, keyed by symbol.
+        
+        Served from the market data cache for OPTION_CHAIN_CACHE_TTL seconds;
+        concurrent callers share one request.
+        
+        Args:
+            asset: Underlying asset (BTC or ETH)
+            expiry_date: Limit to one expiry (DD-MM-YYYY)
+            contract_types: Comma-separated contract types
+            fresh: Bypass the cache and fetch now
+        
+        Returns:
+            Dictionary of symbol -> ticker (mark_price, quotes, greeks, ...)
+        """
+        async def fetch():
+            params = {
+                'contract_types': contract_types,
+                'underlying_asset_symbols': asset.upper()
+            }
+            if expiry_date:
+                params['expiry_date'] = expiry_date
+            
+            response = await self._request('GET', '/v2/tickers', params=params, authenticated=False)
+            if not response.get('success'):
+                raise APIError(f"Failed to fetch {asset} option chain")
+            return {ticker['symbol']: ticker for ticker in response.get('result', []) if ticker.get('symbol')}
+        
+        if fresh:
+            return await fetch()
+        return await market_data_cache.get_or_fetch(
+            chain_key(asset, contract_types, expiry_date), chain_ttl(), fetch
+        )
     
     # ==================== Order History Endpoints ====================
     
@@ -684,10 +814,6 @@ class DeltaClient:
         return await self._request('GET', '/v2/fills', params=params)
 
 
-# Import asyncio for sleep
-import asyncio
-
-
 if __name__ == "__main__":
     # Test client
     async def test():
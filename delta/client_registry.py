@@ -0,0 +1,257 @@
+"""
+Process-wide registry of pooled Delta Exchange clients.
+
+Hands out one long-lived DeltaClient per API credential (plus one shared
+unauthenticated client) so handlers, schedulers and monitors reuse warm
+keep-alive connections instead of opening a new TLS session per call.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import time
+from typing import Dict, Any, List, Optional
+
+from config import settings
+from bot.utils.logger import setup_logger
+from .client import DeltaClient
+
+logger = setup_logger(__name__)
+
+# HTTP/2 needs the optional 'h2' package (installed via httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Symbol used to probe exchange reachability during health checks
+HEALTH_CHECK_SYMBOL = "BTCUSD"
+
+
+class DeltaClientRegistry:
+    """
+    Registry of pooled DeltaClient instances keyed by API credential.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: Optional[float] = None,
+        sweep_interval: float = 60.0
+    ):
+        """
+        Initialize client registry.
+
+        Args:
+            idle_ttl: Seconds a client may stay unused before it is closed
+            sweep_interval: Seconds between idle-eviction/health-check sweeps
+        """
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.DELTA_CLIENT_IDLE_TTL
+        self.sweep_interval = sweep_interval
+        self._clients: Dict[str, DeltaClient] = {}
+        self._public_client: Optional[DeltaClient] = None
+        # Clients dropped from the registry, closed once their last request ends
+        self._retired: List[DeltaClient] = []
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._last_health: Dict[str, Any] = {}
+
+    @staticmethod
+    def _registry_key(api_key: str, api_secret: str) -> str:
+        """Build registry key without keeping raw secrets as dict keys."""
+        return hashlib.sha256(f"{api_key}:{api_secret}".encode()).hexdigest()
+
+    def get_client(self, api_key: str, api_secret: str) -> DeltaClient:
+        """
+        Get pooled authenticated client for a credential.
+
+        Args:
+            api_key: Decrypted API key
+            api_secret: Decrypted API secret
+
+        Each call takes a lease that keeps the client from idle eviction
+        until it is given back with close().
+
+        Returns:
+            Shared DeltaClient (call close() to release, never aclose())
+        """
+        key = self._registry_key(api_key, api_secret)
+        client = self._clients.get(key)
+
+        if client is None or client.is_closed:
+            client = DeltaClient(api_key, api_secret, http2=HTTP2_AVAILABLE, pooled=True)
+            self._clients[key] = client
+            logger.debug(f"Pooled DeltaClient created for API {api_key[:8]}...")
+
+        client.holders += 1
+        client.touch()
+        return client
+
+    def get_public_client(self) -> DeltaClient:
+        """
+        Get shared client for unauthenticated (market data) endpoints.
+
+        Returns:
+            Shared unauthenticated DeltaClient
+        """
+        if self._public_client is None or self._public_client.is_closed:
+            self._public_client = DeltaClient("", "", http2=HTTP2_AVAILABLE, pooled=True)
+            logger.debug("Pooled public DeltaClient created")
+
+        self._public_client.touch()
+        return self._public_client
+
+    async def evict_idle(self) -> int:
+        """
+        Close unheld clients that have been idle longer than idle_ttl.
+
+        Clients still leased by a caller (e.g. a running monitor) are kept
+        however long ago they were last used.
+
+        Returns:
+            Number of evicted clients
+        """
+        now = time.monotonic()
+        stale = [
+            key for key, client in self._clients.items()
+            if client.is_closed or (client.is_idle and now - client.last_used > self.idle_ttl)
+        ]
+
+        for key in stale:
+            client = self._clients.pop(key)
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing idle DeltaClient: {e}")
+
+        if stale:
+            logger.info(f"Evicted {len(stale)} idle DeltaClient(s)")
+
+        # Retired clients close as soon as their last request has finished
+        retired, self._retired = self._retired, []
+        for client in retired:
+            if not client.is_idle:
+                self._retired.append(client)
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing retired DeltaClient: {e}")
+
+        return len(stale)
+
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Probe exchange reachability through the public client.
+
+        A failed probe retires the public client so the next caller gets
+        a fresh connection pool instead of a wedged one. Requests already
+        running on the old client finish first; the sweep closes it after.
+
+        Returns:
+            Health status dictionary
+        """
+        started = time.monotonic()
+        healthy = False
+        error = None
+
+        try:
+            response = await self.get_public_client().get_ticker(HEALTH_CHECK_SYMBOL)
+            healthy = bool(response.get('success'))
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"DeltaClient health check failed: {e}")
+
+        if not healthy and self._public_client is not None:
+            self._retired.append(self._public_client)
+            self._public_client = None
+
+        self._last_health = {
+            'healthy': healthy,
+            'latency_ms': round((time.monotonic() - started) * 1000, 1),
+            'error': error,
+            'checked_at': time.time()
+        }
+        return self._last_health
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics."""
+        return {
+            'authenticated_clients': len(self._clients),
+            'held_clients': sum(1 for client in self._clients.values() if client.holders),
+            'retired_clients': len(self._retired),
+            'public_client': self._public_client is not None and not self._public_client.is_closed,
+            'http2': HTTP2_AVAILABLE,
+            'idle_ttl': self.idle_ttl,
+            'last_health': self._last_health
+        }
+
+    async def _sweep_loop(self):
+        """Periodically evict idle clients and health-check the exchange."""
+        while True:
+            try:
+                await asyncio.sleep(self.sweep_interval)
+                await self.evict_idle()
+                await self.health_check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in DeltaClient registry sweep: {e}", exc_info=True)
+
+    def start(self):
+        """Start background sweeper task."""
+        if self._sweeper_task and not self._sweeper_task.done():
+            logger.warning("DeltaClient registry sweeper already running")
+            return
+
+        self._sweeper_task = asyncio.create_task(self._sweep_loop())
+        logger.info(f"DeltaClient registry started (http2={HTTP2_AVAILABLE}, idle_ttl={self.idle_ttl}s)")
+
+    async def close_all(self):
+        """Stop sweeper and close every pooled client."""
+        if self._sweeper_task and not self._sweeper_task.done():
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+        self._sweeper_task = None
+
+        clients = list(self._clients.values()) + self._retired
+        if self._public_client is not None:
+            clients.append(self._public_client)
+
+        self._clients.clear()
+        self._retired = []
+        self._public_client = None
+
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing DeltaClient: {e}")
+
+        logger.info(f"Closed {len(clients)} pooled DeltaClient(s)")
+
+
+# Global client registry instance
+client_registry = DeltaClientRegistry()
+
+
+def get_delta_client(api_key: str, api_secret: str) -> DeltaClient:
+    """
+    Get pooled authenticated Delta client.
+
+    Args:
+        api_key: Decrypted API key
+        api_secret: Decrypted API secret
+
+    Returns:
+        Shared DeltaClient instance
+    """
+    return client_registry.get_client(api_key, api_secret)
+
+
+def get_public_client() -> DeltaClient:
+    """
+    Get pooled unauthenticated Delta client.
+
+    Returns:
+        Shared DeltaClient instance
+    """
+    return client_registry.get_public_client()
@@ -0,0 +1,183 @@
+"""
+In-process async pub/sub bus for market-data and account events.
+
+Publishers never block: each subscriber owns a bounded queue and the
+oldest event is dropped when a slow subscriber falls behind.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional, Set, Callable
+
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """
+    A subscriber's view of one or more bus topics.
+    """
+
+    def __init__(self, bus: 'EventBus', topics: Set[str], maxsize: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initialize subscription.
+
+        Args:
+            bus: Owning event bus
+            topics: Topics to receive
+            maxsize: Queue size before oldest events are dropped
+        """
+        self.bus = bus
+        self.topics = set(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+        # Called once when the subscription is closed (e.g. to release a connection)
+        self.on_close: Optional[Callable[[], None]] = None
+
+    def _deliver(self, event: Dict[str, Any]):
+        """Enqueue event, dropping the oldest one if full."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            Event dict or None on timeout
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def wait_for(
+        self,
+        predicate: Callable[[Dict[str, Any]], bool],
+        timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the first event matching predicate.
+
+        Args:
+            predicate: Event filter
+            timeout: Overall seconds to wait (None waits forever)
+
+        Returns:
+            Matching event or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+
+            event = await self.get(remaining)
+            if event is None:
+                return None
+            if predicate(event):
+                return event
+
+    def close(self):
+        """Detach from the bus."""
+        if not self.closed:
+            self.bus.unsubscribe(self)
+            self.closed = True
+            if self.on_close is not None:
+                self.on_close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if self.closed:
+            raise StopAsyncIteration
+        return await self.queue.get()
+
+
+class EventBus:
+    """
+    Topic-based async pub/sub bus.
+    """
+
+    def __init__(self):
+        """Initialize event bus."""
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+
+    def subscribe(self, *topics: str, maxsize: int = DEFAULT_QUEUE_SIZE) -> Subscription:
+        """
+        Subscribe to one or more topics.
+
+        Args:
+            topics: Topic names (e.g. 'ticker:BTCUSD', 'positions:<account>')
+            maxsize: Subscriber queue size
+
+        Returns:
+            Subscription (call close() when done)
+        """
+        subscription = Subscription(self, set(topics), maxsize)
+        for topic in subscription.topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription from all its topics."""
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> int:
+        """
+        Publish event to a topic (never blocks).
+
+        Args:
+            topic: Topic name
+            event: Event payload
+
+        Returns:
+            Number of subscribers the event was delivered to
+        """
+        self.published += 1
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return 0
+
+        for subscription in list(subscribers):
+            subscription._deliver(event)
+
+        return len(subscribers)
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether anyone is listening on a topic."""
+        return bool(self._subscribers.get(topic))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus statistics."""
+        subscriptions = {s for subs in self._subscribers.values() for s in subs}
+        return {
+            'topics': len(self._subscribers),
+            'subscriptions': len(subscriptions),
+            'published': self.published,
+            'dropped': sum(s.dropped for s in subscriptions)
+        }
+
+
+# Global event bus instance
+event_bus = EventBus()
@@ -0,0 +1,247 @@
+"""
+Expiry calendar built from listed settlement times.
+
+Every expiry code the bot uses (D, D+1, W, W+2, M, M+1, daily/weekly/
+monthly presets) resolves here against the expiries Delta actually lists,
+instead of re-deriving dates from weekday rules. The product catalogue
+feeds the calendar on each refresh; codes are re-indexed when listings
+change or when the nearest expiry settles, so resolving is a dict lookup.
+
+Options and MOVE contracts are listed on different expiries, so each
+product family has its own calendar per asset and callers resolve
+against the family they trade.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple
+
+import pytz
+
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Product families with separate expiry listings
+FAMILY_OPTIONS = 'options'
+FAMILY_MOVE = 'move'
+
+# Strategy expiry_type -> calendar code
+EXPIRY_TYPE_CODES = {
+    'daily': 'D',
+    'weekly': 'W',
+    'monthly': 'M',
+}
+
+
+@dataclass(frozen=True)
+class Expiry:
+    """A listed expiry for one underlying."""
+
+    asset: str
+    code: str  # DDMMYY, as in product symbols
+    settlement: datetime  # timezone-aware
+
+    @property
+    def date(self) -> date:
+        """Settlement date in IST."""
+        return self.settlement.astimezone(IST).date()
+
+    @property
+    def is_weekly(self) -> bool:
+        """Settles on a Friday."""
+        return self.date.weekday() == 4
+
+    @property
+    def is_monthly(self) -> bool:
+        """Settles on the last Friday of its month."""
+        return self.is_weekly and (self.date + timedelta(days=7)).month != self.date.month
+
+    def format(self, fmt: str = '%d %b %Y') -> str:
+        """Settlement date formatted for display."""
+        return self.date.strftime(fmt)
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of an expiry code ('w + 0' -> 'W')."""
+    code = code.upper().replace(' ', '')
+    return code[:-2] if code.endswith('+0') else code
+
+
+class ExpiryCalendar:
+    """
+    Listed expiries per (asset, product family), indexed by code.
+    """
+
+    def __init__(self):
+        """Initialize an empty calendar."""
+        self._expiries: Dict[Tuple[str, str], List[Expiry]] = {}
+        self._listed: frozenset = frozenset()
+        self._by_code: Dict[Tuple[str, str, str], Expiry] = {}
+        self._valid_until: float = 0.0
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether any expiries have been listed."""
+        return bool(self._expiries)
+
+    def update(self, settlements: Dict[Tuple[str, str, str], datetime]) -> bool:
+        """
+        Replace listed expiries (called by the product catalogue).
+
+        Args:
+            settlements: (asset, family, DDMMYY) -> settlement time
+
+        Returns:
+            True if the listings changed
+        """
+        listed = frozenset(settlements.items())
+        if listed == self._listed:
+            return False
+
+        expiries: Dict[Tuple[str, str], List[Expiry]] = {}
+        for (asset, family, code), settlement in settlements.items():
+            expiries.setdefault((asset, family), []).append(Expiry(asset, code, settlement))
+        for family_expiries in expiries.values():
+            family_expiries.sort(key=lambda e: e.settlement)
+
+        self._expiries = expiries
+        self._listed = listed
+        self._valid_until = 0.0
+        logger.info(
+            f"Expiry calendar updated: {len(settlements)} expiries across "
+            f"{len({asset for asset, _ in expiries})} assets"
+        )
+        return True
+
+    def _index(self, now: float) -> Tuple[Dict[Tuple[str, str, str], Expiry], float]:
+        """
+        Assign relative codes to upcoming expiries.
+
+        Returns:
+            Tuple of ((asset, family, code) -> Expiry, time the nearest expiry settles)
+        """
+        by_code: Dict[Tuple[str, str, str], Expiry] = {}
+        valid_until = float('inf')
+
+        for (asset, family), expiries in self._expiries.items():
+            upcoming = [e for e in expiries if e.settlement.timestamp() > now]
+            if not upcoming:
+                continue
+            valid_until = min(valid_until, upcoming[0].settlement.timestamp())
+
+            for expiry in upcoming:
+                by_code[(asset, family, expiry.code)] = expiry
+
+            # D+n: the expiry settling n days after the nearest one
+            first_day = upcoming[0].date
+            for expiry in reversed(upcoming):
+                by_code[(asset, family, normalize_code(f"D+{(expiry.date - first_day).days}"))] = expiry
+
+            # W+n: the Friday expiry n weeks after the nearest Friday
+            weekly = [e for e in upcoming if e.is_weekly]
+            if weekly:
+                for expiry in weekly:
+                    weeks = (expiry.date - weekly[0].date).days // 7
+                    by_code.setdefault((asset, family, normalize_code(f"W+{weeks}")), expiry)
+
+            # M+n: the n-th listed month-end expiry
+            monthly = [e for e in upcoming if e.is_monthly]
+            for months, expiry in enumerate(monthly):
+                by_code[(asset, family, normalize_code(f"M+{months}"))] = expiry
+
+        return by_code, valid_until
+
+    def resolve(
+        self,
+        asset: str,
+        code: str,
+        now: Optional[datetime] = None,
+        family: str = FAMILY_OPTIONS
+    ) -> Optional[Expiry]:
+        """
+        Resolve an expiry code to a listed expiry.
+
+        Args:
+            asset: BTC or ETH
+            code: D, D+n, W, W+n, M, M+n or an explicit DDMMYY code
+            now: Reference time (defaults to now)
+            family: FAMILY_OPTIONS or FAMILY_MOVE
+
+        Returns:
+            Expiry, or None if nothing listed matches
+        """
+        key = (asset, family, normalize_code(code))
+        if now is not None:
+            by_code, _ = self._index(now.timestamp())
+            return by_code.get(key)
+
+        if time.time() >= self._valid_until:
+            self._by_code, self._valid_until = self._index(time.time())
+
+        return self._by_code.get(key)
+
+    def resolve_type(
+        self,
+        asset: str,
+        expiry_type: str,
+        now: Optional[datetime] = None,
+        family: str = FAMILY_OPTIONS
+    ) -> Optional[Expiry]:
+        """
+        Resolve a preset expiry_type ('daily', 'weekly', 'monthly').
+
+        Args:
+            asset: BTC or ETH
+            expiry_type: Strategy expiry type
+            now: Reference time (defaults to now)
+            family: FAMILY_OPTIONS or FAMILY_MOVE
+
+        Returns:
+            Expiry, or None if nothing listed matches
+
+        Raises:
+            ValueError: If expiry_type is unknown
+        """
+        code = EXPIRY_TYPE_CODES.get(expiry_type.lower())
+        if code is None:
+            raise ValueError(f"Invalid expiry_type: {expiry_type}")
+        return self.resolve(asset, code, now, family)
+
+    def get_expiries(
+        self,
+        asset: str,
+        now: Optional[datetime] = None,
+        family: str = FAMILY_OPTIONS
+    ) -> List[Expiry]:
+        """
+        Upcoming expiries for an asset, nearest first.
+
+        Args:
+            asset: BTC or ETH
+            now: Reference time (defaults to now)
+            family: FAMILY_OPTIONS or FAMILY_MOVE
+
+        Returns:
+            List of Expiry
+        """
+        timestamp = time.time() if now is None else now.timestamp()
+        return [
+            e for e in self._expiries.get((asset, family), [])
+            if e.settlement.timestamp() > timestamp
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get calendar statistics."""
+        return {
+            'assets': len({asset for asset, _ in self._expiries}),
+            'expiries': sum(len(e) for e in self._expiries.values()),
+            'codes': len(self._by_code)
+        }
+
+
+# Global expiry calendar instance
+expiry_calendar = ExpiryCalendar()
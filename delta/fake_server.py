@@ -0,0 +1,985 @@
+"""
+Fake Delta Exchange server for local and load testing.
+
+Implements the REST surface DeltaClient uses (products, tickers, orders,
+batch and bracket orders, positions, fills, wallet, candles) over an
+in-memory exchange:
+
+- A spot random walk per asset; option and MOVE marks are Black-Scholes
+  prices at a flat vol, quoted with a fixed spread.
+- Market and marketable limit orders fill at the touch. Other limit orders
+  rest until the quote crosses them. Stop orders wait for the mark to
+  reach the stop price.
+- Positions, realized PnL and balances are kept per API key. Expired
+  products settle at intrinsic value and new expiries are listed.
+- Private endpoints check the api-key/timestamp/signature headers with
+  delta.signature.verify_signature.
+- Optional per-request latency, random 429s and a per-key request quota.
+
+Run it and point the bot at it:
+
+    python -m delta.fake_server --port 8081 --accounts 1000 --latency-ms 40
+    DELTA_BASE_URL=http://127.0.0.1:8081 python main.py
+
+Account N has API key 'fake-key-N' and secret 'fake-secret-N'.
+GET /fake/stats reports counters, and POST /fake/spot moves a price so
+that stops fire on demand.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from bot.utils.logger import setup_logger
+from .greeks import SECONDS_PER_YEAR, SETTLEMENT_HOUR_UTC, bs_price
+from .signature import verify_signature
+from .utils.strike_rounder import get_strike_increment
+
+logger = setup_logger(__name__)
+
+# Starting spot per asset
+DEFAULT_SPOT = {'BTC': 65000.0, 'ETH': 3200.0}
+
+# Underlying units per contract
+CONTRACT_VALUE = {'BTC': 0.001, 'ETH': 0.01}
+
+# Signatures older than this are rejected (seconds)
+SIGNATURE_MAX_AGE = 30
+
+# Closed orders and fills kept per account
+HISTORY_LIMIT = 1000
+
+
+class ExchangeError(Exception):
+    """Request rejected by the fake exchange."""
+
+    def __init__(self, code: str, message: str = "", status: int = 400):
+        super().__init__(message or code)
+        self.code = code
+        self.message = message or code
+        self.status = status
+
+
+@dataclass
+class FakeExchangeConfig:
+    """Behaviour of the fake exchange."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_limit_prob: float = 0.0
+    requests_per_second: float = 0.0
+    retry_after: int = 1
+    tick_seconds: float = 1.0
+    volatility: float = 0.6
+    spread_pct: float = 1.0
+    strikes_per_side: int = 20
+    daily_expiries: int = 3
+    weekly_expiries: int = 5
+    starting_balance: float = 10000.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Position:
+    product_id: int
+    size: int = 0
+    entry_price: float = 0.0
+    realized_pnl: float = 0.0
+    margin: float = 0.0
+
+
+class _Account:
+    """Balances, positions and orders of one API key."""
+
+    def __init__(self, api_key: str, api_secret: str, balance: float):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.balance = balance
+        self.positions: Dict[int, _Position] = {}
+        self.open_orders: Dict[int, Dict[str, Any]] = {}
+        self.closed_orders: List[Dict[str, Any]] = []
+        self.fills: List[Dict[str, Any]] = []
+        self.window_start = 0.0
+        self.window_count = 0
+
+
+def _now_us() -> int:
+    return int(time.time() * 1_000_000)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _price(value: Any, field: str) -> float:
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ExchangeError('invalid_price', f"{field} must be a number")
+    if not math.isfinite(price) or price <= 0:
+        raise ExchangeError('invalid_price', f"{field} must be positive")
+    return price
+
+
+class FakeExchange:
+    """
+    In-memory exchange state and matching.
+    """
+
+    def __init__(self, config: Optional[FakeExchangeConfig] = None):
+        """
+        Initialize exchange with the default spot prices and listings.
+
+        Args:
+            config: Exchange behaviour (defaults to FakeExchangeConfig())
+        """
+        self.config = config or FakeExchangeConfig()
+        self.random = random.Random(self.config.seed)
+        self.spot = dict(DEFAULT_SPOT)
+        self.accounts: Dict[str, _Account] = {}
+        self.products: Dict[int, Dict[str, Any]] = {}
+        self.by_symbol: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[int, Tuple[_Account, Dict[str, Any]]] = {}
+        self.resting: Dict[int, set] = {}
+        self.stats = {'requests': 0, 'rate_limited': 0, 'auth_failures': 0, 'orders': 0, 'fills': 0, 'ticks': 0}
+        self._next_product_id = 1000
+        self._next_order_id = 1
+        self._listed: set = set()
+        self._marks: Dict[int, float] = {}
+        self._marks_tick = -1
+        self._tick_task: Optional[asyncio.Task] = None
+        self._list_products(datetime.now(timezone.utc))
+
+    # ==================== Accounts ====================
+
+    def add_account(self, api_key: str, api_secret: str, balance: Optional[float] = None):
+        """Register an API key."""
+        self.accounts[api_key] = _Account(
+            api_key, api_secret,
+            self.config.starting_balance if balance is None else balance
+        )
+
+    def authenticate(self, method: str, path: str, query_string: str, payload: str, headers) -> _Account:
+        """
+        Check the signed headers of a private request.
+
+        Raises:
+            ExchangeError: 401 for unknown keys, stale timestamps or bad signatures
+        """
+        account = self.accounts.get(headers.get('api-key', ''))
+        if account is None:
+            raise ExchangeError('invalid_api_key', "Invalid API key", 401)
+
+        timestamp = headers.get('timestamp', '')
+        try:
+            age = abs(time.time() - int(timestamp))
+        except ValueError:
+            raise ExchangeError('invalid_timestamp', "Timestamp header missing or malformed", 401)
+        if age > SIGNATURE_MAX_AGE:
+            raise ExchangeError('expired_signature', f"Signature is {age:.0f}s old", 401)
+
+        if not verify_signature(account.api_secret, method, timestamp, path,
+                                headers.get('signature', ''), query_string, payload):
+            raise ExchangeError('Signature Mismatch', "Signature mismatch", 401)
+        return account
+
+    def admit(self, key: str) -> bool:
+        """Per-key request quota (requests_per_second, one-second windows)."""
+        limit = self.config.requests_per_second
+        if limit <= 0:
+            return True
+        account = self.accounts.get(key)
+        if account is None:
+            return True
+        now = time.monotonic()
+        if now - account.window_start >= 1.0:
+            account.window_start = now
+            account.window_count = 0
+        account.window_count += 1
+        return account.window_count <= limit
+
+    # ==================== Products and prices ====================
+
+    def _expiries(self, now: datetime) -> List[datetime]:
+        """Upcoming settlements: the next daily ones plus the next Fridays."""
+        first = now.replace(hour=SETTLEMENT_HOUR_UTC, minute=0, second=0, microsecond=0)
+        if first <= now:
+            first += timedelta(days=1)
+        expiries = {first + timedelta(days=i) for i in range(self.config.daily_expiries)}
+        friday = first + timedelta(days=(4 - first.weekday()) % 7)
+        expiries.update(friday + timedelta(weeks=i) for i in range(self.config.weekly_expiries))
+        return sorted(expiries)
+
+    def _add_product(self, **product) -> Dict[str, Any]:
+        product.setdefault('state', 'live')
+        product['id'] = self._next_product_id
+        self._next_product_id += 1
+        self.products[product['id']] = product
+        self.by_symbol[product['symbol']] = product
+        return product
+
+    def _list_products(self, now: datetime):
+        """List perpetuals and every missing option/MOVE expiry."""
+        for asset in self.spot:
+            underlying = {'symbol': asset}
+            contract_value = str(CONTRACT_VALUE[asset])
+            if f"{asset}USD" not in self.by_symbol:
+                self._add_product(
+                    symbol=f"{asset}USD", contract_type='perpetual_futures', strike_price=None,
+                    settlement_time=None, underlying_asset=underlying, contract_value=contract_value,
+                    tick_size='0.5'
+                )
+
+            increment = get_strike_increment(asset)
+            atm = round(self.spot[asset] / increment) * increment
+            strikes = [atm + i * increment for i in range(-self.config.strikes_per_side, self.config.strikes_per_side + 1)]
+            for expiry in self._expiries(now):
+                code = expiry.strftime('%d%m%y')
+                if (asset, code) in self._listed:
+                    continue
+                self._listed.add((asset, code))
+                for strike in strikes:
+                    for prefix, contract_type in (('C', 'call_options'), ('P', 'put_options'), ('MV', 'move_options')):
+                        self._add_product(
+                            symbol=f"{prefix}-{asset}-{strike}-{code}", contract_type=contract_type,
+                            strike_price=str(strike), settlement_time=_iso(expiry),
+                            underlying_asset=underlying, contract_value=contract_value, tick_size='0.1'
+                        )
+
+    def _settle(self, now: datetime):
+        """Settle expired products at intrinsic value and list new expiries."""
+        stamp = _iso(now)
+        expired = [
+            p for p in self.products.values()
+            if p['state'] == 'live' and p['settlement_time'] and p['settlement_time'] <= stamp
+        ]
+        if not expired:
+            return
+
+        for product in expired:
+            product['state'] = 'expired'
+            self.by_symbol.pop(product['symbol'], None)
+            spot = self.spot[product['underlying_asset']['symbol']]
+            strike = float(product['strike_price'])
+            value = {
+                'call_options': max(spot - strike, 0.0),
+                'put_options': max(strike - spot, 0.0),
+                'move_options': abs(spot - strike)
+            }[product['contract_type']]
+
+            for order_id in list(self.resting.pop(product['id'], ())):
+                account, order = self.orders[order_id]
+                self._close_order(account, order, 'cancelled')
+            for account in self.accounts.values():
+                position = account.positions.get(product['id'])
+                if position and position.size:
+                    self._apply_fill(account, product, -position.size, value)
+                account.positions.pop(product['id'], None)
+
+        self._list_products(now)
+        logger.info(f"Fake exchange settled {len(expired)} products")
+
+    def _mark_all(self) -> Dict[int, float]:
+        """Marks for every live product, priced once per tick."""
+        if self._marks_tick == self.stats['ticks'] and self._marks:
+            return self._marks
+
+        now = time.time()
+        marks = {}
+        options = [p for p in self.products.values() if p['state'] == 'live' and p['settlement_time']]
+        for product in self.products.values():
+            if product['contract_type'] == 'perpetual_futures':
+                marks[product['id']] = self.spot[product['underlying_asset']['symbol']]
+
+        if options:
+            spot = np.array([self.spot[p['underlying_asset']['symbol']] for p in options])
+            strike = np.array([float(p['strike_price']) for p in options])
+            expiry = np.array([
+                datetime.fromisoformat(p['settlement_time'].replace('Z', '+00:00')).timestamp() for p in options
+            ])
+            t = np.maximum(expiry - now, 60.0) / SECONDS_PER_YEAR
+            vol = np.full(len(options), self.config.volatility)
+            kind = np.array([p['contract_type'] for p in options])
+            call = bs_price(spot, strike, t, vol, np.ones(len(options), dtype=bool))
+            put = call - spot + strike
+            price = np.where(kind == 'call_options', call, np.where(kind == 'put_options', put, call + put))
+            marks.update(zip((p['id'] for p in options), np.maximum(price, 0.1).round(1).tolist()))
+
+        self._marks = marks
+        self._marks_tick = self.stats['ticks']
+        return marks
+
+    def mark(self, product: Dict[str, Any]) -> float:
+        """Mark price of a product."""
+        return self._mark_all().get(product['id'], 0.0)
+
+    def quote(self, product: Dict[str, Any]) -> Tuple[float, float]:
+        """Best bid and ask around the mark."""
+        mark = self.mark(product)
+        half = mark * self.config.spread_pct / 200
+        return round(max(mark - half, 0.1), 1), round(mark + half, 1)
+
+    def ticker(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        """/v2/tickers entry for a product."""
+        asset = product['underlying_asset']['symbol']
+        bid, ask = self.quote(product)
+        mark = self.mark(product)
+        return {
+            'symbol': product['symbol'],
+            'product_id': product['id'],
+            'contract_type': product['contract_type'],
+            'underlying_asset_symbol': asset,
+            'strike_price': product['strike_price'],
+            'mark_price': str(mark),
+            'spot_price': str(self.spot[asset]),
+            'close': mark,
+            'oi': '0',
+            'quotes': {
+                'best_bid': str(bid),
+                'best_ask': str(ask),
+                'mark_iv': str(self.config.volatility),
+                'bid_iv': str(self.config.volatility),
+                'ask_iv': str(self.config.volatility)
+            },
+            'timestamp': _now_us()
+        }
+
+    def product(self, product_id: Any = None, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """Look up a live product by ID or symbol."""
+        product = None
+        if product_id is not None:
+            try:
+                product = self.products.get(int(product_id))
+            except (TypeError, ValueError):
+                product = None
+        elif symbol:
+            product = self.by_symbol.get(symbol)
+        if product is None or product['state'] != 'live':
+            raise ExchangeError('invalid_contract', f"Product not found: {product_id or symbol}", 404)
+        return product
+
+    # ==================== Price driver ====================
+
+    def tick(self):
+        """Advance spot one step, settle expiries and match resting orders."""
+        dt = self.config.tick_seconds / SECONDS_PER_YEAR
+        sigma = self.config.volatility * math.sqrt(dt)
+        for asset in self.spot:
+            self.spot[asset] = round(self.spot[asset] * math.exp(self.random.gauss(-0.5 * sigma * sigma, sigma)), 2)
+        self.stats['ticks'] += 1
+        self._settle(datetime.now(timezone.utc))
+        self.match()
+
+    def set_spot(self, asset: str, price: float):
+        """Move a spot price and match immediately."""
+        self.spot[asset.upper()] = price
+        self.stats['ticks'] += 1
+        self.match()
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.config.tick_seconds)
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Fake exchange tick failed: {e}", exc_info=True)
+
+    def start(self):
+        """Start the price driver."""
+        if self._tick_task is None or self._tick_task.done():
+            self._tick_task = asyncio.create_task(self._tick_loop())
+
+    async def stop(self):
+        """Stop the price driver."""
+        if self._tick_task and not self._tick_task.done():
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+
+    # ==================== Orders ====================
+
+    def place_order(self, account: _Account, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Accept an order and match it against the current quote.
+
+        Raises:
+            ExchangeError: If the order is malformed or the product unknown
+        """
+        product = self.product(data.get('product_id'), data.get('product_symbol'))
+        side = data.get('side')
+        if side not in ('buy', 'sell'):
+            raise ExchangeError('invalid_side', "side must be buy or sell")
+        try:
+            size = int(data.get('size', 0))
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0:
+            raise ExchangeError('invalid_size', "size must be a positive integer")
+
+        order_type = data.get('order_type', 'limit_order')
+        if order_type not in ('market_order', 'limit_order', 'stop_market_order', 'stop_limit_order'):
+            raise ExchangeError('invalid_order_type', f"Unknown order_type {order_type}")
+        stop_order_type = data.get('stop_order_type')
+        is_stop = bool(stop_order_type) or order_type.startswith('stop_')
+        is_limit = order_type in ('limit_order', 'stop_limit_order')
+
+        order = {
+            'id': self._next_order_id,
+            'product_id': product['id'],
+            'product_symbol': product['symbol'],
+            'size': size,
+            'unfilled_size': size,
+            'side': side,
+            'order_type': order_type,
+            'limit_price': str(_price(data.get('limit_price'), 'limit_price')) if is_limit else None,
+            'stop_price': None,
+            'stop_order_type': stop_order_type,
+            'reduce_only': bool(data.get('reduce_only', False)),
+            'client_order_id': data.get('client_order_id'),
+            'time_in_force': data.get('time_in_force', 'gtc'),
+            'state': 'open',
+            'average_fill_price': None,
+            'paid_commission': '0',
+            'created_at': _iso(datetime.now(timezone.utc)),
+            'product': product
+        }
+        if is_stop:
+            stop = _price(data.get('stop_price'), 'stop_price')
+            order['stop_price'] = str(stop)
+            order['state'] = 'pending'
+            if stop_order_type == 'stop_loss_order':
+                order['_trigger_above'] = side == 'buy'
+            elif stop_order_type == 'take_profit_order':
+                order['_trigger_above'] = side == 'sell'
+            else:
+                # Plain stop orders trigger when the mark crosses the stop
+                order['_trigger_above'] = stop >= self.mark(product)
+
+        self._next_order_id += 1
+        self.orders[order['id']] = (account, order)
+        account.open_orders[order['id']] = order
+        self.stats['orders'] += 1
+
+        self._try_fill(account, order)
+        if order['state'] in ('open', 'pending'):
+            if order_type == 'market_order' or order['time_in_force'] in ('ioc', 'fok'):
+                self._close_order(account, order, 'cancelled')
+            else:
+                self.resting.setdefault(product['id'], set()).add(order['id'])
+        return order
+
+    def _try_fill(self, account: _Account, order: Dict[str, Any]):
+        """Trigger a stop and fill a marketable order at the touch."""
+        product = order['product']
+        if order['state'] == 'pending':
+            mark = self.mark(product)
+            stop = float(order['stop_price'])
+            if not (mark >= stop if order['_trigger_above'] else mark <= stop):
+                return
+            order['state'] = 'open'
+
+        bid, ask = self.quote(product)
+        touch = ask if order['side'] == 'buy' else bid
+        if order['limit_price'] is not None:
+            limit = float(order['limit_price'])
+            if (order['side'] == 'buy' and touch > limit) or (order['side'] == 'sell' and touch < limit):
+                return
+
+        size = order['unfilled_size']
+        if order['reduce_only']:
+            position = account.positions.get(product['id'])
+            held = position.size if position else 0
+            reducible = max(-held, 0) if order['side'] == 'buy' else max(held, 0)
+            size = min(size, reducible)
+            if size == 0:
+                self._close_order(account, order, 'cancelled')
+                return
+
+        self._apply_fill(account, product, size if order['side'] == 'buy' else -size, touch, order)
+        order['unfilled_size'] -= size
+        order['average_fill_price'] = str(touch)
+        self._close_order(account, order, 'closed')
+
+    def _apply_fill(
+        self,
+        account: _Account,
+        product: Dict[str, Any],
+        signed_size: int,
+        price: float,
+        order: Optional[Dict[str, Any]] = None
+    ):
+        """Update a position and balance for a fill (or a settlement when order is None)."""
+        position = account.positions.setdefault(product['id'], _Position(product['id']))
+        contract_value = float(product['contract_value'])
+
+        if position.size == 0 or (position.size > 0) == (signed_size > 0):
+            total = position.size + signed_size
+            position.entry_price = (
+                (position.entry_price * abs(position.size) + price * abs(signed_size)) / abs(total)
+            )
+            position.size = total
+        else:
+            closed = min(abs(signed_size), abs(position.size))
+            direction = 1 if position.size > 0 else -1
+            pnl = (price - position.entry_price) * closed * direction * contract_value
+            position.realized_pnl += pnl
+            account.balance += pnl
+            position.size += signed_size
+            if position.size == 0:
+                position.entry_price = 0.0
+            elif (position.size > 0) != (direction > 0):
+                position.entry_price = price
+
+        if order is not None:
+            self.stats['fills'] += 1
+            account.fills.append({
+                'id': self.stats['fills'],
+                'order_id': order['id'],
+                'product_id': product['id'],
+                'product_symbol': product['symbol'],
+                'side': order['side'],
+                'size': abs(signed_size),
+                'price': str(price),
+                'commission': '0',
+                'created_at': _iso(datetime.now(timezone.utc))
+            })
+            del account.fills[:-HISTORY_LIMIT]
+
+    def _close_order(self, account: _Account, order: Dict[str, Any], state: str):
+        order['state'] = state
+        account.open_orders.pop(order['id'], None)
+        self.resting.get(order['product_id'], set()).discard(order['id'])
+        account.closed_orders.append(order)
+        # Orders that fall out of the account history are forgotten entirely
+        for expired in account.closed_orders[:-HISTORY_LIMIT]:
+            self.orders.pop(expired['id'], None)
+        del account.closed_orders[:-HISTORY_LIMIT]
+
+    def match(self):
+        """Re-check resting and untriggered orders against current prices."""
+        for product_id, order_ids in list(self.resting.items()):
+            for order_id in list(order_ids):
+                account, order = self.orders[order_id]
+                self._try_fill(account, order)
+
+    def cancel_order(self, account: _Account, order_id: Any) -> Dict[str, Any]:
+        """Cancel one open or untriggered order."""
+        try:
+            order = account.open_orders.get(int(order_id))
+        except (TypeError, ValueError):
+            order = None
+        if order is None:
+            raise ExchangeError('open_order_not_found', f"Open order {order_id} not found", 404)
+        self._close_order(account, order, 'cancelled')
+        return order
+
+    def edit_order(self, account: _Account, order_id: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Change price or size of an open order and re-match it."""
+        try:
+            order = account.open_orders.get(int(order_id))
+        except (TypeError, ValueError):
+            order = None
+        if order is None:
+            raise ExchangeError('open_order_not_found', f"Open order {order_id} not found", 404)
+        if data.get('limit_price') is not None and order['limit_price'] is not None:
+            order['limit_price'] = str(_price(data['limit_price'], 'limit_price'))
+        if data.get('stop_price') is not None and order['stop_price'] is not None:
+            order['stop_price'] = str(_price(data['stop_price'], 'stop_price'))
+        if data.get('size') is not None:
+            order['unfilled_size'] = order['size'] = int(data['size'])
+        self._try_fill(account, order)
+        return order
+
+    def place_bracket(self, account: _Account, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Attach stop-loss and/or take-profit orders to a position."""
+        base = {
+            'product_id': data.get('product_id'),
+            'product_symbol': data.get('product_symbol'),
+            'size': data.get('size'),
+            'side': data.get('side'),
+            'reduce_only': True
+        }
+        orders = []
+        for prefix, stop_order_type in (('bracket_stop', 'stop_loss_order'), ('bracket_take_profit', 'take_profit_order')):
+            trigger = data.get(f'{prefix}_trigger_price')
+            if trigger is None:
+                continue
+            limit = data.get(f'{prefix}_limit_price')
+            orders.append(self.place_order(account, {
+                **base,
+                'order_type': 'limit_order' if limit is not None else 'market_order',
+                'limit_price': limit,
+                'stop_order_type': stop_order_type,
+                'stop_price': trigger
+            }))
+        if not orders:
+            raise ExchangeError('invalid_bracket_order', "No bracket trigger price given")
+        return orders
+
+    # ==================== Views ====================
+
+    @staticmethod
+    def order_view(order: Dict[str, Any]) -> Dict[str, Any]:
+        view = {k: v for k, v in order.items() if not k.startswith('_') and k != 'product'}
+        view['product'] = {'id': order['product']['id'], 'symbol': order['product']['symbol']}
+        return view
+
+    def position_view(self, position: _Position) -> Dict[str, Any]:
+        product = self.products[position.product_id]
+        mark = self.mark(product)
+        unrealized = (mark - position.entry_price) * position.size * float(product['contract_value'])
+        return {
+            'product_id': product['id'],
+            'product_symbol': product['symbol'],
+            'size': position.size,
+            'entry_price': str(position.entry_price),
+            'mark_price': str(mark),
+            'margin': str(position.margin),
+            'unrealized_pnl': str(round(unrealized, 6)),
+            'realized_pnl': str(round(position.realized_pnl, 6)),
+            'product': {
+                'id': product['id'],
+                'symbol': product['symbol'],
+                'contract_type': product['contract_type'],
+                'strike_price': product['strike_price'],
+                'settlement_time': product['settlement_time'],
+                'contract_value': product['contract_value']
+            }
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for load tests."""
+        return {
+            **self.stats,
+            'accounts': len(self.accounts),
+            'products': sum(1 for p in self.products.values() if p['state'] == 'live'),
+            'resting_orders': sum(len(ids) for ids in self.resting.values()),
+            'spot': dict(self.spot)
+        }
+
+
+def _ok(result: Any) -> Dict[str, Any]:
+    return {'success': True, 'result': result}
+
+
+def _error(error: ExchangeError) -> JSONResponse:
+    return JSONResponse(
+        {'success': False, 'error': {'code': error.code, 'message': error.message}},
+        status_code=error.status
+    )
+
+
+def create_app(exchange: Optional[FakeExchange] = None) -> FastAPI:
+    """
+    Build the FastAPI app serving an exchange.
+
+    Args:
+        exchange: Exchange state (a new default one if omitted)
+
+    Returns:
+        FastAPI application (exchange available as app.state.exchange)
+    """
+    exchange = exchange or FakeExchange()
+    config = exchange.config
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        exchange.start()
+        yield
+        await exchange.stop()
+
+    app = FastAPI(title="Fake Delta Exchange", lifespan=lifespan)
+    app.state.exchange = exchange
+
+    @app.middleware("http")
+    async def network(request: Request, call_next):
+        if request.url.path.startswith('/v2/'):
+            exchange.stats['requests'] += 1
+            if config.latency_ms or config.jitter_ms:
+                delay = config.latency_ms + exchange.random.uniform(-config.jitter_ms, config.jitter_ms)
+                await asyncio.sleep(max(delay, 0.0) / 1000)
+            if (config.rate_limit_prob and exchange.random.random() < config.rate_limit_prob) or \
+                    not exchange.admit(request.headers.get('api-key', '')):
+                exchange.stats['rate_limited'] += 1
+                return JSONResponse(
+                    {'success': False, 'error': {'code': 'ratelimit_exceeded'}},
+                    status_code=429,
+                    headers={'Retry-After': str(config.retry_after)}
+                )
+        return await call_next(request)
+
+    @app.exception_handler(ExchangeError)
+    async def exchange_error(request: Request, error: ExchangeError):
+        if error.status == 401:
+            exchange.stats['auth_failures'] += 1
+        return _error(error)
+
+    async def account_for(request: Request) -> _Account:
+        query_string = '&'.join(f"{k}={v}" for k, v in request.query_params.multi_items())
+        payload = (await request.body()).decode()
+        return exchange.authenticate(request.method, request.url.path, query_string, payload, request.headers)
+
+    async def body(request: Request) -> Dict[str, Any]:
+        raw = await request.body()
+        if not raw:
+            return {}
+        try:
+            return await request.json()
+        except ValueError:
+            raise ExchangeError('invalid_json', "Request body is not valid JSON")
+
+    # ---------- Public market data ----------
+
+    @app.get("/v2/products")
+    async def products(contract_types: Optional[str] = None):
+        types = set(contract_types.split(',')) if contract_types else None
+        return _ok([
+            p for p in exchange.products.values()
+            if p['state'] == 'live' and (types is None or p['contract_type'] in types)
+        ])
+
+    @app.get("/v2/products/{symbol}")
+    async def product(symbol: str):
+        return _ok(exchange.product(symbol=symbol))
+
+    @app.get("/v2/tickers")
+    async def tickers(
+        contract_types: Optional[str] = None,
+        underlying_asset_symbols: Optional[str] = None,
+        expiry_date: Optional[str] = None
+    ):
+        types = set(contract_types.split(',')) if contract_types else None
+        assets = set(underlying_asset_symbols.split(',')) if underlying_asset_symbols else None
+        code = datetime.strptime(expiry_date, '%d-%m-%Y').strftime('%d%m%y') if expiry_date else None
+        return _ok([
+            exchange.ticker(p) for p in exchange.products.values()
+            if p['state'] == 'live'
+            and (types is None or p['contract_type'] in types)
+            and (assets is None or p['underlying_asset']['symbol'] in assets)
+            and (code is None or p['symbol'].endswith(code))
+        ])
+
+    @app.get("/v2/tickers/{symbol}")
+    async def ticker(symbol: str):
+        return _ok(exchange.ticker(exchange.product(symbol=symbol)))
+
+    @app.get("/v2/l2orderbook/{symbol}")
+    async def orderbook(symbol: str, depth: int = 20):
+        product = exchange.product(symbol=symbol)
+        bid, ask = exchange.quote(product)
+        tick = float(product['tick_size'])
+        return _ok({
+            'symbol': symbol,
+            'buy': [{'price': str(round(bid - i * tick, 1)), 'size': 100} for i in range(depth) if bid - i * tick > 0],
+            'sell': [{'price': str(round(ask + i * tick, 1)), 'size': 100} for i in range(depth)]
+        })
+
+    @app.get("/v2/indices/{symbol}")
+    async def index(symbol: str):
+        asset = next((a for a in exchange.spot if a in symbol.upper()), 'BTC')
+        return _ok({'symbol': symbol, 'price': str(exchange.spot[asset])})
+
+    @app.get("/v2/history/candles")
+    async def candles(symbol: str, resolution: str, start: int, end: int):
+        from delta.market_history import RESOLUTION_SECONDS
+
+        step = RESOLUTION_SECONDS.get(resolution)
+        if step is None:
+            raise ExchangeError('invalid_resolution', f"Unknown resolution {resolution}")
+        asset = next((a for a in exchange.spot if symbol.upper().startswith(a)), None)
+        if asset is None:
+            raise ExchangeError('invalid_contract', f"No candles for {symbol}", 404)
+
+        times = np.arange((start + step - 1) // step * step, min(end, time.time()) + 1, step, dtype=np.int64)[:2000]
+        if not len(times):
+            return _ok([])
+        # A walk ending at the current spot, seeded by the window for repeatable replies
+        rng = np.random.default_rng(int(times[0]) ^ step)
+        sigma = config.volatility * math.sqrt(step / SECONDS_PER_YEAR)
+        walk = np.cumsum(rng.normal(0.0, sigma, len(times) + 1))
+        path = exchange.spot[asset] * np.exp(walk - walk[-1])
+        opens, closes = path[:-1], path[1:]
+        wiggle = np.abs(rng.normal(0.0, sigma / 2, len(times))) * opens
+        return _ok([
+            {'time': int(t), 'open': round(o, 2), 'high': round(max(o, c) + w, 2),
+             'low': round(min(o, c) - w, 2), 'close': round(c, 2), 'volume': 0}
+            for t, o, c, w in zip(times.tolist(), opens.tolist(), closes.tolist(), wiggle.tolist())
+        ])
+
+    # ---------- Wallet ----------
+
+    @app.get("/v2/wallet/balances")
+    async def balances(request: Request):
+        account = await account_for(request)
+        return _ok([{
+            'asset_symbol': 'USD',
+            'balance': str(round(account.balance, 6)),
+            'available_balance': str(round(account.balance, 6)),
+            'blocked_margin': '0'
+        }])
+
+    @app.get("/v2/wallet/transactions")
+    async def transactions(request: Request):
+        await account_for(request)
+        return _ok([])
+
+    # ---------- Orders ----------
+
+    @app.post("/v2/orders")
+    async def place(request: Request):
+        account = await account_for(request)
+        return _ok(exchange.order_view(exchange.place_order(account, await body(request))))
+
+    @app.post("/v2/orders/batch")
+    async def place_batch(request: Request):
+        account = await account_for(request)
+        data = await body(request)
+        results = []
+        for order in data.get('orders', []):
+            order.setdefault('product_id', data.get('product_id'))
+            order.setdefault('product_symbol', data.get('product_symbol'))
+            results.append(exchange.order_view(exchange.place_order(account, order)))
+        return _ok(results)
+
+    @app.post("/v2/orders/bracket")
+    async def place_bracket(request: Request):
+        account = await account_for(request)
+        return _ok([exchange.order_view(o) for o in exchange.place_bracket(account, await body(request))])
+
+    @app.get("/v2/orders")
+    async def open_orders(request: Request, product_id: Optional[int] = None):
+        account = await account_for(request)
+        return _ok([
+            exchange.order_view(o) for o in account.open_orders.values()
+            if product_id is None or o['product_id'] == product_id
+        ])
+
+    @app.get("/v2/orders/history")
+    async def order_history(request: Request, product_id: Optional[int] = None, page_size: int = 100):
+        account = await account_for(request)
+        orders = [o for o in account.closed_orders if product_id is None or o['product_id'] == product_id]
+        return _ok([exchange.order_view(o) for o in reversed(orders[-page_size:])])
+
+    @app.get("/v2/orders/{order_id}")
+    async def get_order(request: Request, order_id: int):
+        account = await account_for(request)
+        entry = exchange.orders.get(order_id)
+        if entry is None or entry[0] is not account:
+            raise ExchangeError('order_not_found', f"Order {order_id} not found", 404)
+        return _ok(exchange.order_view(entry[1]))
+
+    @app.put("/v2/orders/{order_id}")
+    async def edit(request: Request, order_id: int):
+        account = await account_for(request)
+        return _ok(exchange.order_view(exchange.edit_order(account, order_id, await body(request))))
+
+    @app.delete("/v2/orders/all")
+    async def cancel_all(request: Request, product_id: Optional[int] = None):
+        account = await account_for(request)
+        for order in list(account.open_orders.values()):
+            if product_id is None or order['product_id'] == product_id:
+                exchange.cancel_order(account, order['id'])
+        return _ok({})
+
+    @app.delete("/v2/orders")
+    async def cancel(request: Request):
+        account = await account_for(request)
+        return _ok(exchange.order_view(exchange.cancel_order(account, (await body(request)).get('id'))))
+
+    # ---------- Positions and fills ----------
+
+    @app.get("/v2/positions/margined")
+    async def positions(request: Request, product_ids: Optional[str] = None, contract_types: Optional[str] = None):
+        account = await account_for(request)
+        ids = {int(i) for i in product_ids.split(',')} if product_ids else None
+        types = set(contract_types.split(',')) if contract_types else None
+        return _ok([
+            exchange.position_view(p) for p in account.positions.values()
+            if p.size and (ids is None or p.product_id in ids)
+            and (types is None or exchange.products[p.product_id]['contract_type'] in types)
+        ])
+
+    @app.get("/v2/positions")
+    async def position(request: Request, product_id: int):
+        account = await account_for(request)
+        held = account.positions.get(product_id)
+        if held is None or not held.size:
+            return _ok({'size': 0, 'entry_price': None})
+        return _ok(exchange.position_view(held))
+
+    @app.post("/v2/positions/change_margin")
+    async def change_margin(request: Request):
+        account = await account_for(request)
+        data = await body(request)
+        held = account.positions.get(int(data.get('product_id') or 0))
+        if held is None or not held.size:
+            raise ExchangeError('no_position_for_reduce_only', "No open position", 400)
+        held.margin += float(data.get('delta_margin', 0))
+        return _ok(exchange.position_view(held))
+
+    @app.get("/v2/fills")
+    async def fills(request: Request, product_id: Optional[int] = None):
+        account = await account_for(request)
+        return _ok([f for f in reversed(account.fills) if product_id is None or f['product_id'] == product_id])
+
+    # ---------- Test controls ----------
+
+    @app.get("/fake/stats")
+    async def stats():
+        return exchange.get_stats()
+
+    @app.post("/fake/spot")
+    async def set_spot(asset: str, price: float):
+        exchange.set_spot(asset, price)
+        return exchange.get_stats()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Delta Exchange REST server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--accounts', type=int, default=10, help="Accounts fake-key-N / fake-secret-N to create")
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--rate-limit-prob', type=float, default=0.0, help="Probability of a random 429")
+    parser.add_argument('--rps', type=float, default=0.0, help="Per-key requests per second (0 = unlimited)")
+    parser.add_argument('--tick', type=float, default=1.0, help="Seconds between price moves")
+    parser.add_argument('--vol', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    exchange = FakeExchange(FakeExchangeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_prob=args.rate_limit_prob,
+        requests_per_second=args.rps,
+        tick_seconds=args.tick,
+        volatility=args.vol,
+        starting_balance=args.balance,
+        seed=args.seed
+    ))
+    for i in range(args.accounts):
+        exchange.add_account(f"fake-key-{i}", f"fake-secret-{i}")
+
+    import uvicorn
+    logger.info(f"Fake Delta Exchange on http://{args.host}:{args.port} with {args.accounts} accounts")
+    uvicorn.run(create_app(exchange), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+"""
+Vectorized implied volatility and Greeks for option chains.
+
+A whole expiry from /v2/tickers is converted to NumPy arrays and priced
+in one pass with Black-Scholes (European, zero rate, on the underlying
+spot): implied volatility is solved for every strike with vectorized
+Newton steps, strikes Newton cannot settle fall back to a vectorized
+bisection, and delta/gamma/vega/theta follow from the solved vols.
+
+Results are cached per (asset, expiry, chain snapshot), so repeated
+strike selection against the same market data costs a dictionary hit.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Options settle at 12:00 UTC (17:30 IST) on the expiry date
+SETTLEMENT_HOUR_UTC = 12
+
+SECONDS_PER_YEAR = 365.0 * 24 * 3600
+
+# Implied volatility search range (annualized) and solver settings
+IV_MIN = 1e-4
+IV_MAX = 5.0
+IV_TOLERANCE = 1e-6  # relative to the option price
+MIN_TIME_VALUE = 1e-9  # fraction of spot below which a price carries no vol information
+NEWTON_ITERATIONS = 8
+BISECTION_ITERATIONS = 60
+
+# Computed chains kept in the cache
+MAX_CACHED_CHAINS = 32
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via a Chebyshev erfc fit (relative error < 1.2e-7)."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    erfc = t * np.exp(
+        -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+            -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+                -0.82215223 + t * 0.17087277))))))))
+    )
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal density."""
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _d1(spot: float, strike: np.ndarray, t: float, vol: np.ndarray) -> np.ndarray:
+    return (np.log(spot / strike) + 0.5 * vol * vol * t) / (vol * np.sqrt(t))
+
+
+def bs_price(spot: float, strike: np.ndarray, t: float, vol: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Black-Scholes prices (zero rate) for arrays of strikes and vols.
+
+    Args:
+        spot: Underlying price
+        strike: Strike prices
+        t: Years to expiry
+        vol: Annualized volatilities
+        is_call: True for calls, False for puts
+
+    Returns:
+        Option prices
+    """
+    d1 = _d1(spot, strike, t, vol)
+    d2 = d1 - vol * np.sqrt(t)
+    call = spot * _norm_cdf(d1) - strike * _norm_cdf(d2)
+    return np.where(is_call, call, call - spot + strike)
+
+
+def implied_vol(
+    spot: float,
+    strike: np.ndarray,
+    t: float,
+    price: np.ndarray,
+    is_call: np.ndarray
+) -> np.ndarray:
+    """
+    Solve implied volatility for every strike at once.
+
+    Args:
+        spot: Underlying price
+        strike: Strike prices
+        t: Years to expiry
+        price: Observed option prices
+        is_call: True for calls, False for puts
+
+    Returns:
+        Annualized implied vols (NaN where the price has no solution)
+    """
+    # Solve on the out-of-the-money side: under zero rates an ITM option's
+    # time value equals the OTM option's price at the same strike, and the
+    # OTM price is far better conditioned
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))
+    otm_price = price - intrinsic
+    otm_call = strike >= spot
+    upper = np.where(otm_call, spot, strike)
+    solvable = np.isfinite(otm_price) & (otm_price > MIN_TIME_VALUE * spot) & (otm_price < upper)
+    tolerance = IV_TOLERANCE * otm_price
+
+    # Newton from the Brenner-Subrahmanyam ATM estimate
+    vol = np.clip(np.sqrt(2.0 * np.pi / t) * otm_price / spot, 0.05, 2.0)
+    sqrt_t = np.sqrt(t)
+    active = solvable.copy()
+    for _ in range(NEWTON_ITERATIONS):
+        if not active.any():
+            break
+        diff = bs_price(spot, strike, t, vol, otm_call) - otm_price
+        vega = spot * _norm_pdf(_d1(spot, strike, t, vol)) * sqrt_t
+        step = np.divide(diff, vega, out=np.zeros_like(diff), where=active & (vega > 1e-12))
+        vol = np.where(active, vol - step, vol)
+        active &= np.abs(diff) > tolerance
+
+    # Newton can leave the bracket or stall on flat-vega wings; bisect those
+    with np.errstate(invalid='ignore'):
+        diff = bs_price(spot, strike, t, np.clip(vol, IV_MIN, IV_MAX), otm_call) - otm_price
+        failed = solvable & ~((vol >= IV_MIN) & (vol <= IV_MAX) & (np.abs(diff) <= tolerance * 10))
+    if failed.any():
+        lo = np.full(int(failed.sum()), IV_MIN)
+        hi = np.full(lo.shape, IV_MAX)
+        k, p, c = strike[failed], otm_price[failed], otm_call[failed]
+        for _ in range(BISECTION_ITERATIONS):
+            mid = 0.5 * (lo + hi)
+            above = bs_price(spot, k, t, mid, c) > p
+            hi = np.where(above, mid, hi)
+            lo = np.where(above, lo, mid)
+        vol[failed] = 0.5 * (lo + hi)
+
+    return np.where(solvable, vol, np.nan)
+
+
+class ChainGreeks:
+    """
+    Implied vols and Greeks for one expiry, as parallel arrays sorted by strike.
+
+    Units: vega per 1 vol point (0.01), theta per calendar day.
+    """
+
+    __slots__ = ('asset', 'expiry', 'spot', 't', 'symbols', 'strikes', 'is_call',
+                 'prices', 'iv', 'delta', 'gamma', 'vega', 'theta')
+
+    def __init__(self, asset: str, expiry: datetime, spot: float, t: float,
+                 symbols: np.ndarray, strikes: np.ndarray, is_call: np.ndarray, prices: np.ndarray):
+        self.asset = asset
+        self.expiry = expiry
+        self.spot = spot
+        self.t = t
+        self.symbols = symbols
+        self.strikes = strikes
+        self.is_call = is_call
+        self.prices = prices
+
+        self.iv = implied_vol(spot, strikes, t, prices, is_call)
+        vol = np.where(np.isfinite(self.iv), self.iv, 1.0)
+        sqrt_t = np.sqrt(t)
+        d1 = _d1(spot, strikes, t, vol)
+        pdf = _norm_pdf(d1)
+        valid = np.isfinite(self.iv)
+
+        self.delta = np.where(valid, np.where(is_call, _norm_cdf(d1), _norm_cdf(d1) - 1.0), np.nan)
+        self.gamma = np.where(valid, pdf / (spot * vol * sqrt_t), np.nan)
+        self.vega = np.where(valid, spot * pdf * sqrt_t / 100.0, np.nan)
+        self.theta = np.where(valid, -spot * pdf * vol / (2.0 * sqrt_t) / 365.0, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def nearest_delta(self, target_delta: float, call: bool) -> Optional[int]:
+        """
+        Index of the option whose |delta| is closest to a target.
+
+        Args:
+            target_delta: Absolute delta wanted (e.g. 0.25)
+            call: Search calls (True) or puts (False)
+
+        Returns:
+            Array index, or None if no strike of that type has a solved vol
+        """
+        distance = np.abs(np.abs(self.delta) - target_delta)
+        distance = np.where((self.is_call == call) & np.isfinite(distance), distance, np.inf)
+        index = int(np.argmin(distance))
+        return index if np.isfinite(distance[index]) else None
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """One option's values as a dictionary."""
+        return {
+            'symbol': str(self.symbols[index]),
+            'strike': float(self.strikes[index]),
+            'contract_type': 'call' if self.is_call[index] else 'put',
+            'price': float(self.prices[index]),
+            'iv': float(self.iv[index]),
+            'delta': float(self.delta[index]),
+            'gamma': float(self.gamma[index]),
+            'vega': float(self.vega[index]),
+            'theta': float(self.theta[index])
+        }
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def expiry_from_symbol(symbol: str) -> Optional[datetime]:
+    """
+    Settlement time encoded in an option symbol (e.g. 'C-BTC-65000-161026').
+
+    Returns:
+        UTC settlement datetime, or None if the symbol has no DDMMYY suffix
+    """
+    try:
+        day = datetime.strptime(symbol.rsplit('-', 1)[1], '%d%m%y')
+    except (IndexError, ValueError):
+        return None
+    return day.replace(hour=SETTLEMENT_HOUR_UTC, tzinfo=timezone.utc)
+
+
+def snapshot_id(chain: Dict[str, Dict[str, Any]]) -> Optional[Hashable]:
+    """Identity of a chain snapshot: its newest ticker timestamp (None if absent)."""
+    stamps = [ticker.get('timestamp') for ticker in chain.values() if ticker.get('timestamp')]
+    return (len(chain), max(stamps)) if stamps else None
+
+
+def compute_chain_greeks(
+    asset: str,
+    chain: Dict[str, Dict[str, Any]],
+    expiry: Optional[datetime] = None,
+    spot: Optional[float] = None,
+    now: Optional[datetime] = None,
+    use_mid: bool = False
+) -> Optional[ChainGreeks]:
+    """
+    Price one expiry of a /v2/tickers option chain.
+
+    Args:
+        asset: Underlying asset
+        chain: Symbol -> ticker for a single expiry
+        expiry: Settlement time (parsed from the symbols if omitted)
+        spot: Underlying price (the tickers' spot_price if omitted)
+        now: Valuation time (current UTC time if omitted)
+        use_mid: Price from the bid/ask mid instead of the mark price
+
+    Returns:
+        ChainGreeks, or None if the chain has no usable options
+    """
+    symbols, strikes, is_call, prices, spots = [], [], [], [], []
+    for symbol, ticker in chain.items():
+        contract_type = ticker.get('contract_type', '')
+        if contract_type not in ('call_options', 'put_options'):
+            continue
+
+        price = _to_float(ticker.get('mark_price'))
+        if use_mid:
+            quotes = ticker.get('quotes') or {}
+            bid, ask = _to_float(quotes.get('best_bid')), _to_float(quotes.get('best_ask'))
+            if bid > 0 and ask > 0:
+                price = 0.5 * (bid + ask)
+
+        symbols.append(symbol)
+        strikes.append(_to_float(ticker.get('strike_price')))
+        is_call.append(contract_type == 'call_options')
+        prices.append(price)
+        spots.append(_to_float(ticker.get('spot_price')))
+
+    if not symbols:
+        return None
+
+    if spot is None:
+        spot = float(np.nanmedian(spots)) if np.isfinite(spots).any() else np.nan
+    if not spot or not np.isfinite(spot):
+        logger.warning(f"No spot price for {asset} option chain")
+        return None
+
+    expiry = expiry or expiry_from_symbol(symbols[0])
+    if expiry is None:
+        logger.warning(f"Cannot determine expiry of {asset} option chain")
+        return None
+
+    now = now or datetime.now(timezone.utc)
+    t = (expiry - now).total_seconds() / SECONDS_PER_YEAR
+    if t <= 0:
+        return None
+
+    strikes_arr = np.asarray(strikes, dtype=float)
+    order = np.argsort(strikes_arr, kind='stable')
+    return ChainGreeks(
+        asset=asset.upper(),
+        expiry=expiry,
+        spot=spot,
+        t=t,
+        symbols=np.asarray(symbols, dtype=object)[order],
+        strikes=strikes_arr[order],
+        is_call=np.asarray(is_call, dtype=bool)[order],
+        prices=np.asarray(prices, dtype=float)[order]
+    )
+
+
+class GreeksCache:
+    """
+    Computed chains keyed by (asset, expiry, snapshot, pricing inputs).
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_CHAINS):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Chains kept before the least recently used is dropped
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Optional[ChainGreeks]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        asset: str,
+        expiry_date: str,
+        chain: Dict[str, Dict[str, Any]],
+        **kwargs: Any
+    ) -> Optional[ChainGreeks]:
+        """
+        Greeks for a chain snapshot, computing them on first use.
+
+        Chains without ticker timestamps cannot be told apart, so they
+        are computed on every call instead of cached.
+
+        Args:
+            asset: Underlying asset
+            expiry_date: Expiry the chain was fetched for (DD-MM-YYYY)
+            chain: Symbol -> ticker from DeltaClient.get_option_chain
+            **kwargs: Passed to compute_chain_greeks on a miss
+
+        Returns:
+            ChainGreeks or None
+        """
+        snapshot = snapshot_id(chain)
+        if snapshot is None:
+            self.misses += 1
+            return compute_chain_greeks(asset, chain, **kwargs)
+
+        key = (asset.upper(), expiry_date, snapshot, tuple(sorted(kwargs.items())))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        greeks = compute_chain_greeks(asset, chain, **kwargs)
+        self._entries[key] = greeks
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return greeks
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters."""
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+async def select_strikes_by_delta(
+    client,
+    asset: str,
+    expiry_date: str,
+    target_delta: float = 0.25,
+    use_mid: bool = False
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Pick the call and put whose deltas are closest to a target.
+
+    Args:
+        client: DeltaClient used to fetch the chain
+        asset: Underlying asset (BTC or ETH)
+        expiry_date: Expiry (DD-MM-YYYY)
+        target_delta: Absolute delta wanted for both legs
+        use_mid: Solve vols from bid/ask mids instead of mark prices
+
+    Returns:
+        {'call': {...}, 'put': {...}} option rows, or None if the chain
+        could not be priced
+    """
+    chain = await client.get_option_chain(asset, expiry_date)
+    greeks = greeks_cache.get(asset, expiry_date, chain, use_mid=use_mid)
+    if greeks is None:
+        return None
+
+    call_index = greeks.nearest_delta(target_delta, call=True)
+    put_index = greeks.nearest_delta(target_delta, call=False)
+    if call_index is None or put_index is None:
+        return None
+
+    return {'call': greeks.row(call_index), 'put': greeks.row(put_index)}
+
+
+# Global Greeks cache instance
+greeks_cache = GreeksCache()
@@ -0,0 +1,157 @@
+"""
+Short-lived market data cache with single-flight coalescing.
+
+Spot prices and option chains are public data that many callers ask for
+at the same moment (ten schedules firing at 09:30). Entries live for the
+configured TTL (SPOT_PRICE_CACHE_TTL, OPTION_CHAIN_CACHE_TTL) and
+concurrent misses for the same key share one in-flight fetch, so a burst
+of identical requests costs a single API call.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config import settings
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MarketDataCache:
+    """
+    TTL cache whose misses are coalesced into one in-flight fetch per key.
+    """
+
+    def __init__(self):
+        """Initialize empty cache."""
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, outcome: str):
+        """Increment a hit/miss/coalesced/error counter for a key kind."""
+        stats = self._stats.setdefault(kind, {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0})
+        stats[outcome] += 1
+
+    async def get_or_fetch(
+        self,
+        key: Tuple[Hashable, ...],
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return a cached value or fetch it once for all concurrent callers.
+
+        Args:
+            key: Cache key; the first element names the kind for stats
+            ttl: Seconds the fetched value stays fresh
+            fetch: Coroutine function producing the value
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        kind = key[0]
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._count(kind, 'hits')
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(kind, 'coalesced')
+        else:
+            self._count(kind, 'misses')
+            task = asyncio.create_task(self._fetch(key, ttl, fetch))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+
+        # Shield so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Tuple[Hashable, ...], ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one fetch and store its result."""
+        try:
+            value = await fetch()
+            if ttl > 0:
+                self._entries[key] = (time.monotonic() + ttl, value)
+            return value
+        except Exception:
+            self._count(key[0], 'errors')
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, kind: Optional[str] = None):
+        """
+        Drop cached entries.
+
+        Args:
+            kind: Only drop keys of this kind ('spot', 'chain'); None drops all
+        """
+        if kind is None:
+            self._entries.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == kind]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesced counts per key kind plus entry counts."""
+        stats = {}
+        for kind, counts in self._stats.items():
+            lookups = counts['hits'] + counts['misses'] + counts['coalesced']
+            stats[kind] = {
+                **counts,
+                'hit_rate': round((counts['hits'] + counts['coalesced']) / lookups, 3) if lookups else None
+            }
+        return {
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'kinds': stats
+        }
+
+    def render_prometheus(self) -> str:
+        """Render cache counters in Prometheus text exposition format."""
+        lines = [
+            "# HELP delta_market_data_cache_total Market data cache lookups by outcome",
+            "# TYPE delta_market_data_cache_total counter"
+        ]
+        for kind, counts in sorted(self._stats.items()):
+            for outcome, count in counts.items():
+                lines.append(f'delta_market_data_cache_total{{kind="{kind}",outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP delta_market_data_cache_entries Cached market data entries",
+            "# TYPE delta_market_data_cache_entries gauge",
+            f"delta_market_data_cache_entries {len(self._entries)}"
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def _consume_exception(task: asyncio.Task):
+    """Retrieve a fetch error so it is not reported as never retrieved."""
+    if not task.cancelled():
+        task.exception()
+
+
+def spot_key(asset: str) -> Tuple[str, str]:
+    """Cache key for an asset's spot price."""
+    return ('spot', asset.upper())
+
+
+def chain_key(asset: str, contract_types: str, expiry_date: Optional[str]) -> Tuple[str, str, str, str]:
+    """Cache key for an option chain."""
+    return ('chain', asset.upper(), contract_types, expiry_date or '')
+
+
+def spot_ttl() -> float:
+    """Configured spot price TTL."""
+    return float(settings.SPOT_PRICE_CACHE_TTL)
+
+
+def chain_ttl() -> float:
+    """Configured option chain TTL."""
+    return float(settings.OPTION_CHAIN_CACHE_TTL)
+
+
+# Global market data cache instance
+market_data_cache = MarketDataCache()
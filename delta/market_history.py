@@ -0,0 +1,521 @@
+"""
+Append-only on-disk market history.
+
+Candles and option-chain snapshots are stored under MARKET_DATA_DIR as
+raw fixed-width NumPy records, one file per day:
+
+    candles/{symbol}/{resolution}/{YYYYMMDD}.bin
+    chains/{asset}/{expiry DDMMYY}/{YYYYMMDD}.bin
+
+Files are only ever appended to and are read back with np.memmap, so a
+day partition is sliced without copying or parsing and a torn final
+record (crash mid-write) is simply ignored. Sync is incremental from the
+last stored timestamp of each series.
+
+The recorder keeps the store current while the bot runs: every
+CHAIN_SNAPSHOT_INTERVAL seconds it appends one option-chain snapshot per
+asset and the candles closed since the previous sync.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config import settings
+from bot.utils.logger import setup_logger
+from .client_registry import get_public_client
+
+logger = setup_logger(__name__)
+
+# Candle resolutions and their length in seconds
+RESOLUTION_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '1d': 86400
+}
+
+# Candles requested per call (the exchange caps a response at 2000)
+FETCH_BATCH = 2000
+
+CANDLE_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+# One row per option per snapshot; NaN where the ticker had no value
+CHAIN_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('strike', '<f8'),
+    ('is_call', '?'),
+    ('mark', '<f8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('iv', '<f8'),
+    ('oi', '<f8'),
+    ('spot', '<f8'),
+])
+
+DAY_SECONDS = 86400
+
+
+@dataclass
+class CandleSeries:
+    """Candles as parallel arrays sorted by time (seconds)."""
+
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> 'CandleSeries':
+        """Column views over CANDLE_DTYPE records (no copy)."""
+        return cls(*(records[name] for name in CANDLE_DTYPE.names))
+
+    def between(self, start: int, end: int) -> 'CandleSeries':
+        """Candles with start <= time < end (views, no copy)."""
+        lo, hi = np.searchsorted(self.time, [start, end])
+        return CandleSeries(*(
+            None if column is None else column[lo:hi]
+            for column in (self.time, self.open, self.high, self.low, self.close, self.volume)
+        ))
+
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y%m%d')
+
+
+def _day_start(day: str) -> int:
+    return int(datetime.strptime(day, '%Y%m%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class MarketHistory:
+    """
+    Day-partitioned, memory-mapped store of candles and chain snapshots.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            root: Store directory (defaults to MARKET_DATA_DIR)
+        """
+        self.root = root or settings.MARKET_DATA_DIR
+        self._last: Dict[str, int] = {}
+
+    # ==================== Partitions ====================
+
+    def _series_dir(self, kind: str, key: str, sub: str) -> str:
+        return os.path.join(self.root, kind, key, sub)
+
+    @staticmethod
+    def _days(directory: str) -> List[str]:
+        """Stored day partitions of a series, oldest first."""
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-4] for name in names if name.endswith('.bin'))
+
+    @staticmethod
+    def _map(path: str, dtype: np.dtype) -> np.ndarray:
+        """Memory-map a partition's complete records (read-only)."""
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+    def _append(self, directory: str, records: np.ndarray):
+        """Append time-sorted records to their day partitions."""
+        os.makedirs(directory, exist_ok=True)
+        days = records['time'] // DAY_SECONDS
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for chunk in np.split(records, bounds):
+            path = os.path.join(directory, f"{_day(int(chunk['time'][0]))}.bin")
+            with open(path, 'ab') as f:
+                # Drop a torn trailing record so appends stay aligned
+                size = f.tell()
+                if size % records.dtype.itemsize:
+                    f.truncate(size - size % records.dtype.itemsize)
+                f.write(chunk.tobytes())
+        self._last[directory] = int(records['time'][-1])
+
+    def _last_time(self, directory: str, dtype: np.dtype) -> Optional[int]:
+        """Timestamp of the newest stored record in a series."""
+        if directory in self._last:
+            return self._last[directory]
+        for day in reversed(self._days(directory)):
+            records = self._map(os.path.join(directory, f"{day}.bin"), dtype)
+            if len(records):
+                self._last[directory] = int(records['time'][-1])
+                return self._last[directory]
+        return None
+
+    def _read(self, directory: str, dtype: np.dtype, start: Optional[int], end: Optional[int]) -> List[np.ndarray]:
+        """Memmap slices of the partitions overlapping [start, end)."""
+        parts = []
+        for day in self._days(directory):
+            day_start = _day_start(day)
+            if (start is not None and day_start + DAY_SECONDS <= start) or (end is not None and day_start >= end):
+                continue
+            records = self._map(os.path.join(directory, f"{day}.bin"), dtype)
+            lo = 0 if start is None else int(np.searchsorted(records['time'], start))
+            hi = len(records) if end is None else int(np.searchsorted(records['time'], end))
+            if hi > lo:
+                parts.append(records[lo:hi])
+        return parts
+
+    # ==================== Candles ====================
+
+    def candle_partitions(
+        self,
+        symbol: str,
+        resolution: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """
+        Stored candles as zero-copy per-day record views.
+
+        Args:
+            symbol: Product symbol (e.g. BTCUSD)
+            resolution: Candle resolution
+            start: First timestamp (seconds, inclusive)
+            end: Last timestamp (seconds, exclusive)
+
+        Returns:
+            List of CANDLE_DTYPE memmap slices, oldest first
+        """
+        return self._read(self._series_dir('candles', symbol, resolution), CANDLE_DTYPE, start, end)
+
+    def read_candles(
+        self,
+        symbol: str,
+        resolution: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> CandleSeries:
+        """
+        Stored candles as one series (views when a single day is read).
+
+        Args:
+            symbol: Product symbol (e.g. BTCUSD)
+            resolution: Candle resolution
+            start: First timestamp (seconds, inclusive)
+            end: Last timestamp (seconds, exclusive)
+
+        Returns:
+            CandleSeries (empty if nothing is stored)
+        """
+        parts = self.candle_partitions(symbol, resolution, start, end)
+        if len(parts) == 1:
+            return CandleSeries.from_records(parts[0])
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=CANDLE_DTYPE)
+        return CandleSeries.from_records(records)
+
+    def append_candles(self, symbol: str, resolution: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append exchange candle rows newer than the last stored candle.
+
+        Args:
+            symbol: Product symbol
+            resolution: Candle resolution
+            rows: get_ohlc result rows (time/open/high/low/close/volume)
+
+        Returns:
+            Number of candles stored
+        """
+        directory = self._series_dir('candles', symbol, resolution)
+        last = self._last_time(directory, CANDLE_DTYPE)
+
+        by_time = {}
+        for row in rows:
+            ts = int(row['time'])
+            if last is None or ts > last:
+                by_time[ts] = row
+        if not by_time:
+            return 0
+
+        records = np.empty(len(by_time), dtype=CANDLE_DTYPE)
+        for i, ts in enumerate(sorted(by_time)):
+            row = by_time[ts]
+            records[i] = (ts, _to_float(row.get('open')), _to_float(row.get('high')),
+                          _to_float(row.get('low')), _to_float(row.get('close')),
+                          _to_float(row.get('volume')))
+        self._append(directory, records)
+        return len(records)
+
+    async def sync_candles(
+        self,
+        client,
+        symbol: str,
+        resolution: str,
+        start: int,
+        end: Optional[int] = None
+    ) -> int:
+        """
+        Fetch candles closed since the last stored one (or since start).
+
+        Args:
+            client: DeltaClient
+            symbol: Product symbol (e.g. BTCUSD)
+            resolution: Candle resolution
+            start: Timestamp to backfill from when nothing is stored
+            end: Fetch up to this timestamp (defaults to now)
+
+        Returns:
+            Number of candles stored
+        """
+        step = RESOLUTION_SECONDS[resolution]
+        # Only closed candles: the current one would be stored half-formed
+        end = (end or int(datetime.now(timezone.utc).timestamp())) // step * step
+
+        # Disk reads and writes run off the event loop
+        last = await asyncio.to_thread(
+            self._last_time, self._series_dir('candles', symbol, resolution), CANDLE_DTYPE
+        )
+        cursor = start if last is None else max(start, last + step)
+
+        stored = 0
+        while cursor < end:
+            batch_end = min(end, cursor + step * FETCH_BATCH)
+            response = await client.get_ohlc(symbol, resolution, cursor, batch_end - 1)
+            if not response.get('success'):
+                logger.error(f"Candle fetch failed for {symbol} {resolution}: {response.get('error')}")
+                break
+            stored += await asyncio.to_thread(
+                self.append_candles, symbol, resolution,
+                [row for row in response.get('result') or [] if int(row['time']) < end]
+            )
+            cursor = batch_end
+
+        if stored:
+            logger.info(f"Stored {stored} {resolution} candles for {symbol}")
+        return stored
+
+    # ==================== Option chains ====================
+
+    def chain_expiries(self, asset: str) -> List[str]:
+        """Expiries (DDMMYY) with stored snapshots for an asset."""
+        try:
+            return sorted(os.listdir(os.path.join(self.root, 'chains', asset.upper())))
+        except FileNotFoundError:
+            return []
+
+    def chain_partitions(
+        self,
+        asset: str,
+        expiry: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """
+        Stored snapshot rows as zero-copy per-day record views.
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+            start: First timestamp (seconds, inclusive)
+            end: Last timestamp (seconds, exclusive)
+
+        Returns:
+            List of CHAIN_DTYPE memmap slices, oldest first
+        """
+        return self._read(self._series_dir('chains', asset.upper(), expiry), CHAIN_DTYPE, start, end)
+
+    def read_chain(
+        self,
+        asset: str,
+        expiry: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Stored snapshot rows for one expiry as a single CHAIN_DTYPE array.
+
+        Returns:
+            Records sorted by time (a view when a single day is read)
+        """
+        parts = self.chain_partitions(asset, expiry, start, end)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=CHAIN_DTYPE)
+
+    def chain_at(self, asset: str, expiry: str, ts: int) -> np.ndarray:
+        """
+        The latest snapshot taken at or before a timestamp.
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+            ts: Timestamp (seconds)
+
+        Returns:
+            That snapshot's rows (empty if none is stored that day or earlier)
+        """
+        directory = self._series_dir('chains', asset.upper(), expiry)
+        for day in reversed(self._days(directory)):
+            if _day_start(day) > ts:
+                continue
+            records = self._map(os.path.join(directory, f"{day}.bin"), CHAIN_DTYPE)
+            hi = int(np.searchsorted(records['time'], ts, side='right'))
+            if hi:
+                snapshot_time = records['time'][hi - 1]
+                lo = int(np.searchsorted(records['time'], snapshot_time))
+                return records[lo:hi]
+        return np.empty(0, dtype=CHAIN_DTYPE)
+
+    def append_chain(self, asset: str, chain: Dict[str, Dict[str, Any]], ts: int) -> int:
+        """
+        Append one option-chain snapshot, split by expiry.
+
+        Args:
+            asset: BTC or ETH
+            chain: Symbol -> /v2/tickers ticker
+            ts: Snapshot timestamp (seconds)
+
+        Returns:
+            Number of rows stored (0 if this snapshot time is already stored)
+        """
+        by_expiry: Dict[str, list] = {}
+        for symbol, ticker in chain.items():
+            contract_type = ticker.get('contract_type')
+            expiry = symbol.rsplit('-', 1)[-1]
+            if contract_type not in ('call_options', 'put_options') or not (len(expiry) == 6 and expiry.isdigit()):
+                continue
+            quotes = ticker.get('quotes') or {}
+            by_expiry.setdefault(expiry, []).append((
+                ts,
+                _to_float(ticker.get('strike_price')),
+                contract_type == 'call_options',
+                _to_float(ticker.get('mark_price')),
+                _to_float(quotes.get('best_bid')),
+                _to_float(quotes.get('best_ask')),
+                _to_float(quotes.get('mark_iv')),
+                _to_float(ticker.get('oi')),
+                _to_float(ticker.get('spot_price'))
+            ))
+
+        stored = 0
+        for expiry, rows in by_expiry.items():
+            directory = self._series_dir('chains', asset.upper(), expiry)
+            last = self._last_time(directory, CHAIN_DTYPE)
+            if last is not None and ts <= last:
+                continue
+            records = np.array(rows, dtype=CHAIN_DTYPE)
+            records.sort(order=['strike', 'is_call'])
+            self._append(directory, records)
+            stored += len(records)
+        return stored
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Series and bytes stored."""
+        series, size = 0, 0
+        for kind in ('candles', 'chains'):
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, kind)):
+                files = [f for f in filenames if f.endswith('.bin')]
+                if files:
+                    series += 1
+                    size += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+        return {'root': self.root, 'series': series, 'bytes': size}
+
+
+class MarketHistoryRecorder:
+    """
+    Background task keeping the store current for the configured assets.
+    """
+
+    def __init__(self, history: MarketHistory, interval: Optional[float] = None):
+        """
+        Initialize recorder.
+
+        Args:
+            history: Store to append to
+            interval: Seconds between snapshots (defaults to CHAIN_SNAPSHOT_INTERVAL)
+        """
+        self.history = history
+        self.interval = interval if interval is not None else settings.CHAIN_SNAPSHOT_INTERVAL
+        self.assets = [a.strip().upper() for a in settings.MARKET_HISTORY_ASSETS.split(',') if a.strip()]
+        self.resolution = settings.MARKET_HISTORY_RESOLUTION
+        self._task: Optional[asyncio.Task] = None
+
+    async def record(self):
+        """Append one chain snapshot and new candles for every asset."""
+        client = get_public_client()
+        ts = int(datetime.now(timezone.utc).timestamp()) // self.interval * self.interval
+        backfill_from = int((datetime.now(timezone.utc) - timedelta(days=1)).timestamp())
+
+        for asset in self.assets:
+            try:
+                # Uncached: a snapshot stamped ts must hold prices from ts
+                chain = await client.get_option_chain(asset, fresh=True)
+                # Disk writes run off the event loop
+                await asyncio.to_thread(self.history.append_chain, asset, chain, ts)
+            except Exception as e:
+                logger.warning(f"Failed to record {asset} option chain: {e}")
+
+            try:
+                await self.history.sync_candles(client, f"{asset}USD", self.resolution, backfill_from)
+            except Exception as e:
+                logger.warning(f"Failed to sync {asset} candles: {e}")
+
+    async def _loop(self):
+        """Record every interval seconds."""
+        while True:
+            try:
+                await self.record()
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in market history recorder: {e}", exc_info=True)
+                await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start recording if MARKET_HISTORY_ENABLED."""
+        if not settings.MARKET_HISTORY_ENABLED:
+            return
+        if self._task and not self._task.done():
+            logger.warning("Market history recorder already running")
+            return
+
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            f"Market history recorder started ({', '.join(self.assets)} every {self.interval}s "
+            f"→ {self.history.root})"
+        )
+
+    async def stop(self):
+        """Stop recording."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# Global market history instances
+market_history = MarketHistory()
+market_history_recorder = MarketHistoryRecorder(market_history)
@@ -0,0 +1,286 @@
+"""
+Request metrics for the Delta Exchange client.
+
+Every DeltaClient request is recorded here: per-endpoint latency
+histograms, retry and 429 counts, bytes in/out and in-flight gauges,
+rendered in Prometheus text format for the /metrics route.
+
+Callers can tag the requests made inside a block (for example with the
+setup_id of a scheduled algo entry) through request_tags(); tagged
+requests are kept in a short per-tag trace so one execution can be
+broken down call by call, and listeners receive every finished request.
+"""
+
+import contextvars
+import re
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Distinct tag values with a kept trace, and requests kept per trace
+MAX_TRACES = 200
+TRACE_LENGTH = 100
+
+# Path resources whose next segment is a symbol rather than a sub-route
+SYMBOL_RESOURCES = {'products', 'tickers', 'l2orderbook', 'indices'}
+
+# Tags applied to requests made in the current task
+_request_tags: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
+    'delta_request_tags', default={}
+)
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Collapse IDs and symbols in a path so metrics keep a bounded label set.
+
+    Args:
+        endpoint: Request path (e.g. '/v2/orders/12345')
+
+    Returns:
+        Endpoint template (e.g. '/v2/orders/{id}')
+    """
+    parts = endpoint.split('?', 1)[0].split('/')
+    for i in range(3, len(parts)):
+        if re.fullmatch(r'\d+', parts[i]):
+            parts[i] = '{id}'
+        elif i == 3 and parts[2] in SYMBOL_RESOURCES:
+            parts[i] = '{symbol}'
+    return '/'.join(parts)
+
+
+@contextmanager
+def request_tags(**tags: Any):
+    """
+    Tag every Delta request made inside the block (and tasks it spawns).
+
+    Args:
+        **tags: Tag values, e.g. setup_id='...', job='algo', phase='fire'
+    """
+    merged = {**_request_tags.get(), **{k: str(v) for k, v in tags.items() if v is not None}}
+    token = _request_tags.set(merged)
+    try:
+        yield merged
+    finally:
+        _request_tags.reset(token)
+
+
+def current_tags() -> Dict[str, str]:
+    """Tags applied to requests made in the current context."""
+    return _request_tags.get()
+
+
+@dataclass
+class RequestRecord:
+    """One finished Delta request (all attempts)."""
+
+    method: str
+    endpoint: str
+    status: str
+    elapsed: float
+    attempts: int = 1
+    bytes_out: int = 0
+    bytes_in: int = 0
+    started_at: float = 0.0
+    tags: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'status': self.status,
+            'elapsed_ms': round(self.elapsed * 1000, 2),
+            'attempts': self.attempts,
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'started_at': self.started_at,
+            'tags': self.tags
+        }
+
+
+class _Histogram:
+    """Cumulative-bucket histogram."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class DeltaMetrics:
+    """
+    In-process metric store for Delta API requests.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._latency: Dict[Tuple[str, str], _Histogram] = defaultdict(_Histogram)
+        self._requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._retries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._rate_limited: Dict[str, int] = defaultdict(int)
+        self._bytes_out: Dict[str, int] = defaultdict(int)
+        self._bytes_in: Dict[str, int] = defaultdict(int)
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._traces: "OrderedDict[str, deque]" = OrderedDict()
+        self._listeners: List[Callable[[RequestRecord], None]] = []
+        self.started_at = time.time()
+
+    # ==================== Recording ====================
+
+    def request_started(self, endpoint: str):
+        """Mark a request as in flight."""
+        self._in_flight[endpoint] += 1
+
+    def request_finished(self, record: RequestRecord):
+        """
+        Record a finished request.
+
+        Args:
+            record: Request outcome
+        """
+        endpoint = record.endpoint
+        self._in_flight[endpoint] = max(0, self._in_flight[endpoint] - 1)
+        self._latency[(record.method, endpoint)].observe(record.elapsed)
+        self._requests[(record.method, endpoint, record.status)] += 1
+        self._bytes_out[endpoint] += record.bytes_out
+        self._bytes_in[endpoint] += record.bytes_in
+
+        trace_key = record.tags.get('setup_id')
+        if trace_key:
+            trace = self._traces.pop(trace_key, None) or deque(maxlen=TRACE_LENGTH)
+            trace.append(record)
+            self._traces[trace_key] = trace
+            while len(self._traces) > MAX_TRACES:
+                self._traces.popitem(last=False)
+
+        for listener in self._listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                logger.warning(f"Request listener failed: {e}")
+
+    def retry(self, endpoint: str, reason: str):
+        """Count a retried attempt."""
+        self._retries[(endpoint, reason)] += 1
+
+    def rate_limited(self, endpoint: str):
+        """Count a 429 response."""
+        self._rate_limited[endpoint] += 1
+
+    # ==================== Hooks ====================
+
+    def add_listener(self, listener: Callable[[RequestRecord], None]):
+        """
+        Receive every finished request (called inline; keep it cheap).
+
+        Args:
+            listener: Callable taking a RequestRecord
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[RequestRecord], None]):
+        """Stop sending requests to a listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get_trace(self, setup_id: str) -> List[Dict[str, Any]]:
+        """
+        Get recent requests tagged with a setup_id, oldest first.
+
+        Args:
+            setup_id: Tag value passed to request_tags(setup_id=...)
+
+        Returns:
+            List of request dictionaries
+        """
+        return [record.to_dict() for record in self._traces.get(setup_id, ())]
+
+    # ==================== Export ====================
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Per-endpoint counts and mean latency as a dictionary."""
+        summary = {}
+        for (method, endpoint), hist in self._latency.items():
+            summary[f"{method} {endpoint}"] = {
+                'count': hist.count,
+                'mean_ms': round(hist.sum / hist.count * 1000, 2) if hist.count else None,
+                'in_flight': self._in_flight.get(endpoint, 0),
+                'rate_limited': self._rate_limited.get(endpoint, 0)
+            }
+        return summary
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header('delta_request_duration_seconds', 'histogram', 'Delta API request latency including retries')
+        for (method, endpoint), hist in sorted(self._latency.items()):
+            labels = _labels(method=method, endpoint=endpoint)
+            for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                lines.append(f'delta_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'delta_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'delta_request_duration_seconds_sum{{{labels}}} {hist.sum:.6f}')
+            lines.append(f'delta_request_duration_seconds_count{{{labels}}} {hist.count}')
+
+        header('delta_requests_total', 'counter', 'Delta API requests by final status')
+        for (method, endpoint, status), count in sorted(self._requests.items()):
+            lines.append(f'delta_requests_total{{{_labels(method=method, endpoint=endpoint, status=status)}}} {count}')
+
+        header('delta_request_retries_total', 'counter', 'Retried Delta API attempts')
+        for (endpoint, reason), count in sorted(self._retries.items()):
+            lines.append(f'delta_request_retries_total{{{_labels(endpoint=endpoint, reason=reason)}}} {count}')
+
+        header('delta_rate_limited_total', 'counter', 'Delta API 429 responses')
+        for endpoint, count in sorted(self._rate_limited.items()):
+            lines.append(f'delta_rate_limited_total{{{_labels(endpoint=endpoint)}}} {count}')
+
+        header('delta_request_bytes_sent_total', 'counter', 'Request body bytes sent')
+        for endpoint, count in sorted(self._bytes_out.items()):
+            lines.append(f'delta_request_bytes_sent_total{{{_labels(endpoint=endpoint)}}} {count}')
+
+        header('delta_response_bytes_received_total', 'counter', 'Response body bytes received')
+        for endpoint, count in sorted(self._bytes_in.items()):
+            lines.append(f'delta_response_bytes_received_total{{{_labels(endpoint=endpoint)}}} {count}')
+
+        header('delta_requests_in_flight', 'gauge', 'Delta API requests currently in flight')
+        for endpoint, count in sorted(self._in_flight.items()):
+            lines.append(f'delta_requests_in_flight{{{_labels(endpoint=endpoint)}}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: Any) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _labels(**labels: Any) -> str:
+    """Format Prometheus labels."""
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+# Global metrics instance
+delta_metrics = DeltaMetrics()
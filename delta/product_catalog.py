@@ -0,0 +1,466 @@
+"""
+Product catalogue cache with symbol/strike/expiry indexes.
+
+Keeps the Delta Exchange /v2/products list in memory, refreshed on a
+schedule, so strike and product lookups on the trading path are dict or
+bisect lookups instead of a full download and linear scan per call.
+"""
+
+import asyncio
+import bisect
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from config import settings
+from bot.utils.logger import setup_logger
+from .client_registry import get_public_client
+from .expiry_calendar import expiry_calendar, FAMILY_MOVE, FAMILY_OPTIONS
+
+logger = setup_logger(__name__)
+
+# Product states that can be traded
+TRADABLE_STATES = ('live', 'auction')
+
+# contract_type -> option type code used in symbols
+OPTION_TYPE_CODES = {
+    'call_options': 'C',
+    'put_options': 'P',
+}
+
+
+def _expiry_code(product: Dict[str, Any]) -> Optional[str]:
+    """
+    Get DDMMYY expiry code for a product.
+
+    Delta option symbols end with the expiry (e.g. C-BTC-95000-161026);
+    settlement_time is used when the symbol does not carry it.
+    """
+    symbol = product.get('symbol', '')
+    tail = symbol.rsplit('-', 1)[-1]
+    if len(tail) == 6 and tail.isdigit():
+        return tail
+
+    settlement_time = product.get('settlement_time')
+    if settlement_time:
+        try:
+            settlement = datetime.fromisoformat(settlement_time.replace('Z', '+00:00'))
+            return settlement.strftime('%d%m%y')
+        except ValueError:
+            pass
+
+    return None
+
+
+def _settlement(product: Dict[str, Any], expiry: str) -> datetime:
+    """Get settlement time of a product (17:30 IST on the expiry date if unlisted)."""
+    settlement_time = product.get('settlement_time')
+    if settlement_time:
+        try:
+            return datetime.fromisoformat(settlement_time.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+    return datetime.strptime(expiry, '%d%m%y').replace(hour=12, tzinfo=timezone.utc)
+
+
+def _underlying_symbol(product: Dict[str, Any]) -> Optional[str]:
+    """Get underlying asset symbol (BTC/ETH) for a product."""
+    underlying = product.get('underlying_asset')
+    if isinstance(underlying, dict) and underlying.get('symbol'):
+        return underlying['symbol']
+
+    parts = product.get('symbol', '').split('-')
+    if len(parts) >= 3:
+        return parts[1]
+
+    return None
+
+
+class ProductCatalog:
+    """
+    In-memory product catalogue with lookup indexes.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        """
+        Initialize product catalogue.
+
+        Args:
+            refresh_interval: Seconds between background refreshes
+        """
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else settings.PRODUCT_CATALOG_REFRESH_INTERVAL
+        )
+        self._by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._by_contract_type: Dict[str, List[Dict[str, Any]]] = {}
+        self._strikes: Dict[Tuple[str, str], List[float]] = {}
+        self._options: Dict[Tuple[str, str, float, str], Dict[str, Any]] = {}
+        self._options_by_expiry: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._moves_by_expiry: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._refreshed_at: float = 0.0
+        self._miss_refresh_at: float = float('-inf')
+        self.miss_refreshes = 0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the catalogue has been loaded at least once."""
+        return self._refreshed_at > 0
+
+    @property
+    def age(self) -> float:
+        """Seconds since last successful refresh."""
+        if not self.is_loaded:
+            return float('inf')
+        return time.monotonic() - self._refreshed_at
+
+    def _build_indexes(self, products: List[Dict[str, Any]]):
+        """Build lookup indexes, swap them in atomically and update the expiry calendar."""
+        by_symbol = {}
+        by_id = {}
+        by_contract_type: Dict[str, List[Dict[str, Any]]] = {}
+        strike_sets: Dict[Tuple[str, str], set] = {}
+        options = {}
+        options_by_expiry: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        moves_by_expiry: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        settlements: Dict[Tuple[str, str, str], datetime] = {}
+
+        for product in products:
+            symbol = product.get('symbol')
+            if not symbol:
+                continue
+
+            by_symbol[symbol] = product
+            if product.get('id') is not None:
+                by_id[product['id']] = product
+
+            contract_type = product.get('contract_type', '')
+            by_contract_type.setdefault(contract_type, []).append(product)
+
+            option_type = OPTION_TYPE_CODES.get(contract_type)
+            is_move = contract_type == 'move_options'
+            if not (option_type or is_move) or product.get('state') not in TRADABLE_STATES:
+                continue
+
+            asset = _underlying_symbol(product)
+            expiry = _expiry_code(product)
+            if not asset or not expiry:
+                continue
+
+            family = FAMILY_MOVE if is_move else FAMILY_OPTIONS
+            if (asset, family, expiry) not in settlements:
+                settlements[(asset, family, expiry)] = _settlement(product, expiry)
+
+            if is_move:
+                moves_by_expiry.setdefault((asset, expiry), []).append(product)
+                continue
+
+            strike = product.get('strike_price')
+            if strike in (None, ''):
+                continue
+
+            strike = float(strike)
+            strike_sets.setdefault((asset, expiry), set()).add(strike)
+            options[(asset, expiry, strike, option_type)] = product
+            options_by_expiry.setdefault((asset, expiry), []).append(product)
+
+        self._by_symbol = by_symbol
+        self._by_id = by_id
+        self._by_contract_type = by_contract_type
+        self._strikes = {key: sorted(values) for key, values in strike_sets.items()}
+        self._options = options
+        self._options_by_expiry = options_by_expiry
+        self._moves_by_expiry = moves_by_expiry
+
+        expiry_calendar.update(settlements)
+
+    async def refresh(self) -> bool:
+        """
+        Download the product list and rebuild indexes.
+
+        Concurrent callers share one in-flight refresh.
+
+        Returns:
+            True if refreshed successfully, False otherwise
+        """
+        started_at = time.monotonic()
+
+        async with self._refresh_lock:
+            # Another caller refreshed while we waited for the lock
+            if self._refreshed_at >= started_at:
+                return True
+
+            try:
+                response = await get_public_client().get_products()
+
+                if not response.get('success'):
+                    error_msg = response.get('error', {}).get('message', 'Unknown error')
+                    logger.error(f"Failed to refresh product catalogue: {error_msg}")
+                    return False
+
+                products = response.get('result', [])
+                self._build_indexes(products)
+                self._refreshed_at = time.monotonic()
+
+                logger.info(
+                    f"Product catalogue refreshed: {len(products)} products, "
+                    f"{len(self._strikes)} option expiries "
+                    f"({(self._refreshed_at - started_at) * 1000:.0f} ms)"
+                )
+                return True
+
+            except Exception as e:
+                logger.error(f"Error refreshing product catalogue: {e}", exc_info=True)
+                return False
+
+    async def ensure_fresh(self, max_age: Optional[float] = None) -> bool:
+        """
+        Refresh the catalogue if it is older than max_age.
+
+        Args:
+            max_age: Maximum acceptable age in seconds (defaults to refresh_interval)
+
+        Returns:
+            True if catalogue is loaded
+        """
+        if max_age is None:
+            max_age = self.refresh_interval
+
+        if self.age > max_age:
+            await self.refresh()
+
+        return self.is_loaded
+
+    # ==================== Lookups ====================
+
+    async def get_product(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get product by symbol, refreshing on a miss (new listing).
+
+        Miss-triggered refreshes run at most once per
+        PRODUCT_CATALOG_MISS_REFRESH_INTERVAL, so repeated lookups of an
+        unknown symbol do not download the product list each time.
+
+        Args:
+            symbol: Product symbol
+
+        Returns:
+            Product dict or None if not found
+        """
+        await self.ensure_fresh()
+
+        product = self._by_symbol.get(symbol)
+        if product is None:
+            now = time.monotonic()
+            if now - self._miss_refresh_at >= settings.PRODUCT_CATALOG_MISS_REFRESH_INTERVAL:
+                self._miss_refresh_at = now
+                self.miss_refreshes += 1
+                await self.refresh()
+                product = self._by_symbol.get(symbol)
+
+        return product
+
+    async def get_product_id(self, symbol: str) -> Optional[int]:
+        """
+        Get product ID by symbol.
+
+        Args:
+            symbol: Product symbol
+
+        Returns:
+            Product ID or None if not found
+        """
+        product = await self.get_product(symbol)
+        return product['id'] if product else None
+
+    def get_product_by_id(self, product_id: int) -> Optional[Dict[str, Any]]:
+        """Get product by ID from the loaded catalogue."""
+        return self._by_id.get(product_id)
+
+    def get_products_by_contract_type(
+        self,
+        contract_type: str,
+        asset: Optional[str] = None,
+        tradable_only: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get products for a contract type.
+
+        Args:
+            contract_type: e.g. 'call_options', 'put_options', 'move_options'
+            asset: Filter by underlying asset (BTC/ETH)
+            tradable_only: Only include live/auction products
+
+        Returns:
+            List of product dicts
+        """
+        products = self._by_contract_type.get(contract_type, [])
+
+        return [
+            p for p in products
+            if (asset is None or _underlying_symbol(p) == asset)
+            and (not tradable_only or p.get('state') in TRADABLE_STATES)
+        ]
+
+    def get_strikes(self, asset: str, expiry: str) -> List[float]:
+        """
+        Get sorted option strikes for an asset and expiry.
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+
+        Returns:
+            Sorted list of strikes (empty if none)
+        """
+        return self._strikes.get((asset, expiry), [])
+
+    def get_expiries(self, asset: str) -> List[str]:
+        """
+        Get available option expiries for an asset, nearest first.
+
+        Args:
+            asset: BTC or ETH
+
+        Returns:
+            List of DDMMYY expiry codes
+        """
+        expiries = [expiry for (a, expiry) in self._strikes if a == asset]
+        return sorted(expiries, key=lambda e: (e[4:6], e[2:4], e[0:2]))
+
+    def nearest_strike(self, asset: str, expiry: str, target: float) -> Optional[float]:
+        """
+        Find listed strike closest to a target price (binary search).
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+            target: Target price
+
+        Returns:
+            Closest strike or None if no strikes listed
+        """
+        strikes = self.get_strikes(asset, expiry)
+        if not strikes:
+            return None
+
+        index = bisect.bisect_left(strikes, target)
+        if index == 0:
+            return strikes[0]
+        if index == len(strikes):
+            return strikes[-1]
+
+        lower, upper = strikes[index - 1], strikes[index]
+        return lower if target - lower <= upper - target else upper
+
+    def get_option(
+        self,
+        asset: str,
+        expiry: str,
+        strike: float,
+        option_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get option product for (asset, expiry, strike, C/P).
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+            strike: Strike price
+            option_type: 'C' for call, 'P' for put
+
+        Returns:
+            Product dict or None
+        """
+        return self._options.get((asset, expiry, float(strike), option_type.upper()[0]))
+
+    def get_option_product_id(
+        self,
+        asset: str,
+        expiry: str,
+        strike: float,
+        option_type: str
+    ) -> Optional[int]:
+        """Get option product ID for (asset, expiry, strike, C/P)."""
+        product = self.get_option(asset, expiry, strike, option_type)
+        return product['id'] if product else None
+
+    def get_options_for_expiry(self, asset: str, expiry: str) -> List[Dict[str, Any]]:
+        """
+        Get all tradable call/put products for an asset and expiry.
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+
+        Returns:
+            List of option product dicts
+        """
+        return self._options_by_expiry.get((asset, expiry), [])
+
+    def get_move_contracts(self, asset: str, expiry: str) -> List[Dict[str, Any]]:
+        """
+        Get tradable MOVE contracts for an asset and expiry.
+
+        Args:
+            asset: BTC or ETH
+            expiry: Expiry code in DDMMYY format
+
+        Returns:
+            List of MOVE product dicts
+        """
+        return self._moves_by_expiry.get((asset, expiry), [])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get catalogue statistics."""
+        return {
+            'loaded': self.is_loaded,
+            'age_seconds': round(self.age, 1) if self.is_loaded else None,
+            'products': len(self._by_symbol),
+            'option_expiries': len(self._strikes),
+            'options': len(self._options),
+            'move_expiries': len(self._moves_by_expiry),
+            'miss_refreshes': self.miss_refreshes,
+            'calendar': expiry_calendar.get_stats()
+        }
+
+    # ==================== Background refresh ====================
+
+    async def _refresh_loop(self):
+        """Refresh the catalogue every refresh_interval seconds."""
+        while True:
+            try:
+                await asyncio.sleep(self.refresh_interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in product catalogue refresh loop: {e}", exc_info=True)
+
+    async def start(self):
+        """Load the catalogue and start background refresh."""
+        if self._refresh_task and not self._refresh_task.done():
+            logger.warning("Product catalogue refresh already running")
+            return
+
+        await self.refresh()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Product catalogue started (refresh every {self.refresh_interval}s)")
+
+    async def stop(self):
+        """Stop background refresh."""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+        logger.info("Product catalogue stopped")
+
+
+# Global product catalogue instance
+product_catalog = ProductCatalog()
@@ -0,0 +1,323 @@
+"""
+Client-side, weight-aware rate limiter for Delta Exchange API keys.
+
+Delta meters each API key with a quota of weight units per fixed window,
+and each endpoint costs a different weight. One token bucket per key is
+shared by every DeltaClient using that key, so the pooled client, the
+monitor engine and handlers draw from the same budget.
+
+Waiters are served by priority lane. Protective actions (stop-loss
+placement and cancels while protecting a leg) jump ahead of trading
+calls, which jump ahead of read-only polling and UI refreshes. Lower
+lanes also leave a reserve of the bucket untouched, so a burst of
+monitor polling can never spend the tokens a stop needs.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Priority lanes (lower value is served first)
+LANE_PROTECTIVE = 0
+LANE_TRADING = 1
+LANE_READ = 2
+
+LANE_NAMES = {
+    LANE_PROTECTIVE: 'protective',
+    LANE_TRADING: 'trading',
+    LANE_READ: 'read'
+}
+
+# Fraction of the bucket each lane must leave for higher lanes
+LANE_RESERVE = {
+    LANE_PROTECTIVE: 0.0,
+    LANE_TRADING: 0.05,
+    LANE_READ: 0.20
+}
+
+# Weights modelled on Delta's per-endpoint quota costs; keys are
+# (method, endpoint template) as produced by delta.metrics.normalize_endpoint
+ENDPOINT_WEIGHTS = {
+    ('POST', '/v2/orders/batch'): 25,
+    ('PUT', '/v2/orders/batch'): 25,
+    ('DELETE', '/v2/orders/batch'): 25,
+    ('DELETE', '/v2/orders/all'): 25,
+    ('GET', '/v2/orders/history'): 10,
+    ('GET', '/v2/fills'): 10,
+    ('GET', '/v2/wallet/transactions'): 10,
+}
+
+# Weights for endpoints not listed above
+DEFAULT_READ_WEIGHT = 3
+DEFAULT_WRITE_WEIGHT = 5
+
+# Lane requested by the caller for requests made in the current task
+_request_lane: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    'delta_request_lane', default=None
+)
+
+
+def endpoint_weight(method: str, endpoint: str) -> int:
+    """
+    Get quota weight of a request.
+
+    Args:
+        method: HTTP method
+        endpoint: Endpoint template
+
+    Returns:
+        Weight units consumed
+    """
+    weight = ENDPOINT_WEIGHTS.get((method, endpoint))
+    if weight is not None:
+        return weight
+    return DEFAULT_READ_WEIGHT if method == 'GET' else DEFAULT_WRITE_WEIGHT
+
+
+def resolve_lane(method: str) -> int:
+    """Lane for a request: the caller's lane, else trading for writes and read for GETs."""
+    lane = _request_lane.get()
+    if lane is not None:
+        return lane
+    return LANE_READ if method == 'GET' else LANE_TRADING
+
+
+@contextmanager
+def request_priority(lane: int):
+    """
+    Send every Delta request made inside the block on a priority lane.
+
+    Args:
+        lane: LANE_PROTECTIVE, LANE_TRADING or LANE_READ
+    """
+    token = _request_lane.set(lane)
+    try:
+        yield
+    finally:
+        _request_lane.reset(token)
+
+
+class TokenBucket:
+    """
+    Token bucket with strict-priority waiters and per-lane reserves.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        """
+        Initialize bucket (starts full).
+
+        Args:
+            capacity: Maximum tokens (weight units)
+            refill_rate: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters: List[list] = []
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self.stats: Dict[int, Dict[str, float]] = {
+            lane: {'acquired': 0, 'throttled': 0, 'weight': 0, 'wait_seconds': 0.0, 'max_wait': 0.0}
+            for lane in LANE_NAMES
+        }
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def _notify(self):
+        """Wake every waiter so the new head of the queue re-checks."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _delay(self, weight: float, lane: int, now: float) -> float:
+        """Seconds until the head waiter could be granted."""
+        floor = self.capacity * LANE_RESERVE[lane]
+        missing = weight + floor - self.tokens
+        delay = missing / self.refill_rate if missing > 0 else 0.0
+        return max(delay, self.blocked_until - now)
+
+    async def acquire(self, weight: float, lane: int) -> float:
+        """
+        Wait for and consume tokens.
+
+        Args:
+            weight: Tokens to consume
+            lane: Priority lane
+
+        Returns:
+            Seconds spent waiting
+        """
+        weight = min(weight, self.capacity * (1 - LANE_RESERVE[lane]))
+        started = time.monotonic()
+        entry = [lane, next(self._counter), weight]
+        heapq.heappush(self._waiters, entry)
+
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                changed = self._changed
+
+                if self._waiters[0] is entry:
+                    delay = self._delay(weight, lane, now)
+                    if delay <= 0:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= weight
+                        self._notify()
+                        break
+                else:
+                    delay = None
+
+                try:
+                    await asyncio.wait_for(changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+        except BaseException:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._notify()
+            raise
+
+        waited = time.monotonic() - started
+        stats = self.stats[lane]
+        stats['acquired'] += 1
+        stats['weight'] += weight
+        if waited > 0.001:
+            stats['throttled'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+        return waited
+
+    def penalize(self, seconds: float):
+        """
+        Block the bucket after a 429 from the exchange.
+
+        Tokens are left as they are: emptying them would hold the lower
+        lanes behind their reserve for far longer than Retry-After.
+
+        Args:
+            seconds: Retry-After reported by the exchange
+        """
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self._notify()
+
+    @property
+    def waiting(self) -> int:
+        """Requests queued for tokens."""
+        return len(self._waiters)
+
+
+class DeltaRateLimiter:
+    """
+    Registry of token buckets keyed by API key.
+    """
+
+    def __init__(self, quota: Optional[int] = None, window: Optional[int] = None):
+        """
+        Initialize rate limiter.
+
+        Args:
+            quota: Weight units allowed per window per key
+            window: Quota window in seconds
+        """
+        self.quota = quota or settings.DELTA_RATE_LIMIT_QUOTA
+        self.window = window or settings.DELTA_RATE_LIMIT_WINDOW
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, api_key: str) -> TokenBucket:
+        """Get (or create) the bucket shared by every client using a key."""
+        bucket = self._buckets.get(api_key)
+        if bucket is None:
+            bucket = TokenBucket(self.quota, self.quota / self.window)
+            self._buckets[api_key] = bucket
+        return bucket
+
+    async def acquire(self, api_key: str, method: str, endpoint: str) -> float:
+        """
+        Wait until a request may be sent.
+
+        Args:
+            api_key: API key the request is signed with
+            method: HTTP method
+            endpoint: Endpoint template
+
+        Returns:
+            Seconds spent waiting
+        """
+        lane = resolve_lane(method)
+        waited = await self.bucket(api_key).acquire(endpoint_weight(method, endpoint), lane)
+        if waited > 1.0:
+            logger.warning(
+                f"Rate limiter held {LANE_NAMES[lane]} {method} {endpoint} "
+                f"for API {api_key[:8]}... {waited:.1f}s"
+            )
+        return waited
+
+    def penalize(self, api_key: str, seconds: float):
+        """Block a key after the exchange returned 429."""
+        self.bucket(api_key).penalize(seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-key tokens, queue depth and per-lane wait statistics."""
+        return {
+            f"{api_key[:8]}...": {
+                'tokens': round(bucket.tokens, 1),
+                'capacity': bucket.capacity,
+                'waiting': bucket.waiting,
+                'lanes': {LANE_NAMES[lane]: dict(stats) for lane, stats in bucket.stats.items()}
+            }
+            for api_key, bucket in self._buckets.items()
+        }
+
+    def render_prometheus(self) -> str:
+        """Render limiter state in Prometheus text exposition format."""
+        lines = [
+            "# HELP delta_rate_limit_tokens Tokens left in the per-key bucket",
+            "# TYPE delta_rate_limit_tokens gauge"
+        ]
+        for api_key, bucket in self._buckets.items():
+            lines.append(f'delta_rate_limit_tokens{{api="{api_key[:8]}"}} {bucket.tokens:.1f}')
+
+        lines += [
+            "# HELP delta_rate_limit_wait_seconds_total Time requests waited for tokens",
+            "# TYPE delta_rate_limit_wait_seconds_total counter"
+        ]
+        for api_key, bucket in self._buckets.items():
+            for lane, stats in bucket.stats.items():
+                lines.append(
+                    f'delta_rate_limit_wait_seconds_total{{api="{api_key[:8]}",lane="{LANE_NAMES[lane]}"}} '
+                    f'{stats["wait_seconds"]:.3f}'
+                )
+
+        lines += [
+            "# HELP delta_rate_limit_throttled_total Requests that had to wait for tokens",
+            "# TYPE delta_rate_limit_throttled_total counter"
+        ]
+        for api_key, bucket in self._buckets.items():
+            for lane, stats in bucket.stats.items():
+                lines.append(
+                    f'delta_rate_limit_throttled_total{{api="{api_key[:8]}",lane="{LANE_NAMES[lane]}"}} '
+                    f'{stats["throttled"]}'
+                )
+
+        return '\n'.join(lines) + '\n'
+
+
+# Global rate limiter instance
+rate_limiter = DeltaRateLimiter()
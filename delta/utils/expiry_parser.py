@@ -1,5 +1,8 @@
 """
 Option expiry date parser and formatter.
+
+These are weekday rules, usable without the product catalogue. Trading
+paths resolve codes against listed expiries with delta.expiry_calendar.
 """
 
 from datetime import datetime, timedelta
@@ -121,7 +124,7 @@ def parse_expiry_code(expiry_code: str, reference_date: Optional[datetime] = Non
             )
             
             # If we're past last Friday this month, get next month
-            if reference_date > last_friday:
+            if reference_date.replace(tzinfo=None) > last_friday:
                 next_month = reference_date.month + 1
                 next_year = reference_date.year
                 if next_month > 12:
@@ -2,8 +2,9 @@
 OTM (Out of The Money) strike calculator for strangle strategies.
 """
 
-from typing import Tuple
+from typing import Optional, Tuple
 from .strike_rounder import round_to_strike, get_strike_increment
+from ..greeks import select_strikes_by_delta
 from bot.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -176,27 +177,45 @@ def calculate_otm_range(
         raise
 
 
-def get_otm_strikes_by_delta(
+async def get_otm_strikes_by_delta(
     spot_price: float,
     asset: str,
-    target_delta: float = 0.25
+    target_delta: float = 0.25,
+    client=None,
+    expiry_date: Optional[str] = None
 ) -> Tuple[int, int]:
     """
-    Estimate OTM strikes based on target delta (simplified).
+    Get OTM strikes for a target delta.
+    
+    With a client and expiry the option chain is fetched and priced by
+    delta.greeks, and the strikes with the nearest true delta are used.
+    Otherwise (or if the chain cannot be priced) strikes are estimated
+    from spot with a fixed delta-to-percentage table.
     
     Args:
         spot_price: Current spot price
         asset: Asset symbol
         target_delta: Target delta (0.1 to 0.4)
+        client: DeltaClient used to fetch the chain
+        expiry_date: Expiry (DD-MM-YYYY) to select from
     
     Returns:
         Tuple of (call_strike, put_strike)
-    
-    Note:
-        This is a simplified calculation. Real delta-based strikes
-        require option pricing models and volatility data.
     """
     try:
+        if client is not None and expiry_date:
+            selected = await select_strikes_by_delta(client, asset, expiry_date, target_delta)
+            if selected:
+                call_strike = int(selected['call']['strike'])
+                put_strike = int(selected['put']['strike'])
+                logger.debug(
+                    f"OTM strikes for delta {target_delta} from chain: "
+                    f"Call={call_strike} ({selected['call']['delta']:.2f}), "
+                    f"Put={put_strike} ({selected['put']['delta']:.2f})"
+                )
+                return (call_strike, put_strike)
+            logger.warning(f"Could not price {asset} {expiry_date} chain, estimating strikes from spot")
+        
         # Simplified: Higher delta = closer to ATM
         # 0.5 delta ≈ ATM
         # 0.25 delta ≈ ~5-10% OTM
@@ -0,0 +1,484 @@
+"""
+Delta Exchange WebSocket market-data and account feed.
+
+One public connection carries ticker/mark-price channels for every
+subscribed symbol and one authenticated connection per API key carries
+positions/orders. Account connections are reference-counted and closed
+when their last subscription is; public symbols are reference-counted
+per channel and unsubscribed when their last subscription is. Messages
+are fanned out to in-process subscribers through the event bus, so
+monitors react to leg closures as they happen instead of polling REST
+per strategy.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import time
+from typing import Dict, Any, Optional, Set, Tuple
+
+import aiohttp
+
+from config import settings
+from bot.utils.logger import setup_logger
+from .event_bus import event_bus, EventBus, Subscription
+from .signature import generate_signature
+
+logger = setup_logger(__name__)
+
+# Delta sends a heartbeat every 30s once enabled
+HEARTBEAT_TIMEOUT = 40.0
+
+# Reconnect backoff bounds (seconds)
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+
+def account_key(api_key: str) -> str:
+    """Stable, non-secret identifier for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def ticker_topic(symbol: str) -> str:
+    """Bus topic for ticker updates of a symbol."""
+    return f"ticker:{symbol}"
+
+
+def mark_price_topic(symbol: str) -> str:
+    """Bus topic for mark price updates of a symbol."""
+    return f"mark_price:{symbol}"
+
+
+def positions_topic(account: str) -> str:
+    """Bus topic for position updates of an account."""
+    return f"positions:{account}"
+
+
+def orders_topic(account: str) -> str:
+    """Bus topic for order updates of an account."""
+    return f"orders:{account}"
+
+
+class FeedConnection:
+    """
+    A single reconnecting WebSocket connection with its channel set.
+    """
+
+    def __init__(
+        self,
+        feed: 'MarketDataFeed',
+        name: str,
+        credentials: Optional[Tuple[str, str]] = None
+    ):
+        """
+        Initialize connection.
+
+        Args:
+            feed: Owning feed
+            name: Connection name for logs ('public' or account key)
+            credentials: (api_key, api_secret) for private channels
+        """
+        self.feed = feed
+        self.name = name
+        self.credentials = credentials
+        self.account = account_key(credentials[0]) if credentials else None
+        # Channel -> symbol -> subscriptions using it
+        self.channels: Dict[str, Dict[str, int]] = {}
+        self.subscribers = 0
+        self.connected = asyncio.Event()
+        self.messages_received = 0
+        self.reconnects = 0
+        self.last_message_at: Optional[float] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the connection task."""
+        if self._task is None or self._task.done():
+            # Fresh context: a loop started from a tagged job must not inherit its request tags
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self):
+        """Stop the connection task and close the socket."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.connected.clear()
+
+    async def add_channel(self, name: str, symbols: Set[str]):
+        """
+        Subscribe to a channel (sent immediately if connected).
+
+        Each call takes one reference on every symbol; release it with
+        release_channel.
+
+        Args:
+            name: Channel name (e.g. 'v2/ticker', 'positions')
+            symbols: Symbols for the channel
+        """
+        current = self.channels.setdefault(name, {})
+        new_symbols = set(symbols) - current.keys()
+        for symbol in set(symbols):
+            current[symbol] = current.get(symbol, 0) + 1
+
+        if new_symbols and self.connected.is_set():
+            await self._send_subscribe({name: new_symbols})
+
+    def release_channel(self, name: str, symbols: Set[str]) -> Set[str]:
+        """
+        Drop one reference on each symbol of a channel.
+
+        Args:
+            name: Channel name
+            symbols: Symbols passed to add_channel
+
+        Returns:
+            Symbols no longer used by any subscription
+        """
+        current = self.channels.get(name, {})
+        unused = set()
+        for symbol in set(symbols):
+            count = current.get(symbol, 0) - 1
+            if count > 0:
+                current[symbol] = count
+            elif symbol in current:
+                del current[symbol]
+                unused.add(symbol)
+        if not current:
+            self.channels.pop(name, None)
+        return unused
+
+    async def unsubscribe_unused(self, name: str, symbols: Set[str]):
+        """
+        Unsubscribe symbols released earlier, unless re-subscribed since.
+
+        Args:
+            name: Channel name
+            symbols: Symbols returned by release_channel
+        """
+        unused = set(symbols) - self.channels.get(name, {}).keys()
+        if unused and self.connected.is_set():
+            await self._send_channels('unsubscribe', {name: unused})
+
+    async def _send(self, message: Dict[str, Any]):
+        """Send JSON message if the socket is open."""
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(json.dumps(message))
+
+    async def _send_subscribe(self, channels: Dict[str, Set[str]]):
+        """Send subscribe message for channels."""
+        await self._send_channels('subscribe', channels)
+
+    async def _send_channels(self, msg_type: str, channels: Dict[str, Set[str]]):
+        """Send a subscribe or unsubscribe message for channels."""
+        if not channels:
+            return
+        await self._send({
+            'type': msg_type,
+            'payload': {
+                'channels': [
+                    {'name': name, 'symbols': sorted(symbols)}
+                    for name, symbols in channels.items()
+                ]
+            }
+        })
+
+    async def _authenticate(self, ws: aiohttp.ClientWebSocketResponse) -> bool:
+        """
+        Authenticate private connection (signature over GET /live).
+
+        Private channels may only be subscribed after the auth reply,
+        so this waits for it before returning.
+
+        Returns:
+            True if the exchange accepted the credentials
+        """
+        api_key, api_secret = self.credentials
+        timestamp = str(int(time.time()))
+        signature = generate_signature(api_secret, 'GET', timestamp, '/live')
+        await self._send({
+            'type': 'key-auth',
+            'payload': {
+                'api-key': api_key,
+                'signature': signature,
+                'timestamp': timestamp
+            }
+        })
+
+        while True:
+            msg = await ws.receive(timeout=HEARTBEAT_TIMEOUT)
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return False
+            try:
+                data = json.loads(msg.data)
+            except ValueError:
+                continue
+            if data.get('type') in ('auth', 'key-auth'):
+                self.feed._dispatch(self, data)
+                return bool(data.get('success'))
+
+    async def _run(self):
+        """Connect, subscribe and read messages; reconnect with backoff."""
+        delay = RECONNECT_MIN_DELAY
+
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.feed.url, heartbeat=None) as ws:
+                        self._ws = ws
+                        logger.info(f"WebSocket [{self.name}] connected to {self.feed.url}")
+
+                        if self.credentials and not await self._authenticate(ws):
+                            raise ConnectionError("authentication failed")
+
+                        await self._send({'type': 'enable_heartbeat'})
+                        await self._send_subscribe(self.channels)
+                        self.connected.set()
+                        delay = RECONNECT_MIN_DELAY
+
+                        while True:
+                            msg = await ws.receive(timeout=HEARTBEAT_TIMEOUT)
+
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self.messages_received += 1
+                                self.last_message_at = time.monotonic()
+                                try:
+                                    data = json.loads(msg.data)
+                                except ValueError:
+                                    logger.warning(f"WebSocket [{self.name}] invalid JSON: {msg.data[:200]}")
+                                    continue
+                                self.feed._dispatch(self, data)
+
+                            elif msg.type in (
+                                aiohttp.WSMsgType.CLOSE,
+                                aiohttp.WSMsgType.CLOSED,
+                                aiohttp.WSMsgType.ERROR
+                            ):
+                                logger.warning(f"WebSocket [{self.name}] closed: {msg.type.name}")
+                                break
+
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"WebSocket [{self.name}] heartbeat timeout, reconnecting")
+            except Exception as e:
+                logger.warning(f"WebSocket [{self.name}] error: {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection statistics."""
+        return {
+            'connected': self.connected.is_set(),
+            'subscribers': self.subscribers,
+            'channels': {name: len(symbols) for name, symbols in self.channels.items()},
+            'messages_received': self.messages_received,
+            'reconnects': self.reconnects,
+            'last_message_age': (
+                round(time.monotonic() - self.last_message_at, 1)
+                if self.last_message_at else None
+            )
+        }
+
+
+class MarketDataFeed:
+    """
+    WebSocket feed manager publishing Delta events to the event bus.
+    """
+
+    def __init__(self, url: Optional[str] = None, bus: Optional[EventBus] = None):
+        """
+        Initialize feed.
+
+        Args:
+            url: WebSocket URL (defaults to settings.DELTA_WS_URL)
+            bus: Event bus to publish to (defaults to global bus)
+        """
+        self.url = url or settings.DELTA_WS_URL
+        self.bus = bus or event_bus
+        self._public: Optional[FeedConnection] = None
+        self._private: Dict[str, FeedConnection] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    def _public_connection(self) -> FeedConnection:
+        """Get (or start) the shared public connection."""
+        if self._public is None:
+            self._public = FeedConnection(self, 'public')
+        self._public.start()
+        return self._public
+
+    def _private_connection(self, api_key: str, api_secret: str) -> FeedConnection:
+        """Get (or start) the authenticated connection for an API key."""
+        account = account_key(api_key)
+        connection = self._private.get(account)
+        if connection is None:
+            connection = FeedConnection(self, f"account:{account}", (api_key, api_secret))
+            self._private[account] = connection
+        connection.start()
+        return connection
+
+    def _release_account(self, connection: FeedConnection):
+        """Drop one account subscriber; close the connection after the last."""
+        connection.subscribers -= 1
+        if connection.subscribers > 0:
+            return
+
+        if self._private.get(connection.account) is connection:
+            del self._private[connection.account]
+        task = asyncio.create_task(connection.stop())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+        logger.info(f"WebSocket [{connection.name}] closed (no subscribers left)")
+
+    def _release_symbols(self, connection: FeedConnection, channel: str, symbols: Set[str]):
+        """Drop a subscription's symbols; unsubscribe the ones nobody uses."""
+        unused = connection.release_channel(channel, symbols)
+        if not unused or connection is not self._public:
+            return
+
+        task = asyncio.create_task(self._unsubscribe(connection, channel, unused))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _unsubscribe(self, connection: FeedConnection, channel: str, symbols: Set[str]):
+        """Send an unsubscribe for released symbols."""
+        try:
+            await connection.unsubscribe_unused(channel, symbols)
+        except Exception as e:
+            logger.warning(f"WebSocket [{connection.name}] unsubscribe failed: {e}")
+
+    async def subscribe_ticker(self, *symbols: str) -> Subscription:
+        """
+        Subscribe to ticker updates.
+
+        Args:
+            symbols: Product symbols
+
+        Returns:
+            Bus subscription receiving ticker events; closing it releases
+            the symbols
+        """
+        connection = self._public_connection()
+        await connection.add_channel('v2/ticker', set(symbols))
+
+        subscription = self.bus.subscribe(*(ticker_topic(s) for s in symbols))
+        subscription.on_close = lambda: self._release_symbols(connection, 'v2/ticker', set(symbols))
+        return subscription
+
+    async def subscribe_mark_price(self, *symbols: str) -> Subscription:
+        """
+        Subscribe to mark price updates.
+
+        Args:
+            symbols: Product symbols (without 'MARK:' prefix)
+
+        Returns:
+            Bus subscription receiving mark price events; closing it
+            releases the symbols
+        """
+        connection = self._public_connection()
+        channel_symbols = {f"MARK:{s}" for s in symbols}
+        await connection.add_channel('mark_price', channel_symbols)
+
+        subscription = self.bus.subscribe(*(mark_price_topic(s) for s in symbols))
+        subscription.on_close = lambda: self._release_symbols(connection, 'mark_price', channel_symbols)
+        return subscription
+
+    async def subscribe_account(self, api_key: str, api_secret: str) -> Subscription:
+        """
+        Subscribe to position and order updates for an account.
+
+        Args:
+            api_key: Decrypted API key
+            api_secret: Decrypted API secret
+
+        Returns:
+            Bus subscription receiving positions/orders events; closing it
+            releases the account connection
+        """
+        connection = self._private_connection(api_key, api_secret)
+        connection.subscribers += 1
+        try:
+            await connection.add_channel('positions', {'all'})
+            await connection.add_channel('orders', {'all'})
+        except Exception:
+            self._release_account(connection)
+            raise
+
+        subscription = self.bus.subscribe(
+            positions_topic(connection.account),
+            orders_topic(connection.account)
+        )
+        subscription.on_close = lambda: self._release_account(connection)
+        return subscription
+
+    def _dispatch(self, connection: FeedConnection, data: Dict[str, Any]):
+        """Translate a raw WebSocket message into bus events."""
+        msg_type = data.get('type')
+
+        if msg_type == 'v2/ticker':
+            self.bus.publish(ticker_topic(data.get('symbol', '')), data)
+
+        elif msg_type == 'mark_price':
+            symbol = data.get('symbol', '')
+            if symbol.startswith('MARK:'):
+                symbol = symbol[5:]
+            self.bus.publish(mark_price_topic(symbol), data)
+
+        elif msg_type == 'positions' and connection.account:
+            topic = positions_topic(connection.account)
+            if data.get('action') == 'snapshot':
+                for position in data.get('result', []):
+                    self.bus.publish(topic, {**position, 'type': 'positions', 'action': 'snapshot'})
+            else:
+                self.bus.publish(topic, data)
+
+        elif msg_type == 'orders' and connection.account:
+            self.bus.publish(orders_topic(connection.account), data)
+
+        elif msg_type in ('auth', 'key-auth'):
+            if data.get('success'):
+                logger.info(f"WebSocket [{connection.name}] authenticated")
+            else:
+                logger.error(f"WebSocket [{connection.name}] authentication failed: {data}")
+
+        elif msg_type == 'error':
+            logger.warning(f"WebSocket [{connection.name}] error message: {data}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get feed statistics."""
+        return {
+            'url': self.url,
+            'public': self._public.get_stats() if self._public else None,
+            'accounts': {name: conn.get_stats() for name, conn in self._private.items()},
+            'bus': self.bus.get_stats()
+        }
+
+    async def stop(self):
+        """Close every connection."""
+        connections = list(self._private.values())
+        if self._public is not None:
+            connections.append(self._public)
+
+        for connection in connections:
+            await connection.stop()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+        self._private.clear()
+        self._public = None
+        logger.info(f"Market data feed stopped ({len(connections)} connection(s))")
+
+
+# Global market data feed instance
+market_feed = MarketDataFeed()
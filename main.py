@@ -3,13 +3,12 @@ Main application entry point.
 Initializes FastAPI app, sets up webhook, and starts the server.
 
 FIXES APPLIED:
-- ✅ Global move_scheduler properly managed
+- ✅ Single scheduling core for algo, MOVE and auto-execution jobs
 - ✅ Lifespan globals correctly declared
 - ✅ Proper async/await for logging (no fire-and-forget tasks)
 - ✅ Safe error handling in shutdown
 """
 
-import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -21,12 +20,25 @@ from telegram.ext import Application
 
 from config import settings
 from bot.application import create_application
+from bot.update_dispatcher import update_dispatcher
+from bot.handlers.message_router import state_router
 from database.connection import connect_db, close_db
-from scheduler.job_scheduler import init_scheduler, shutdown_scheduler
-from bot.utils.logger import setup_logger, log_to_telegram
+from database.credential_vault import credential_vault
+from scheduler.job_scheduler import register_auto_execution_jobs
+from bot.utils.logger import setup_logger, log_to_telegram, log_shipper
 from bot.utils.keepalive import start_keepalive, stop_keepalive
-from bot.scheduler.algo_scheduler import start_algo_scheduler
-from bot.scheduler.move_scheduler import get_move_scheduler
+from bot.utils.state_manager import state_manager
+from bot.scheduler.algo_scheduler import register_algo_jobs
+from bot.scheduler.move_scheduler import register_move_jobs
+from bot.scheduler.scheduling_core import scheduling_core
+from delta.client_registry import client_registry
+from delta.metrics import delta_metrics
+from delta.market_data import market_data_cache
+from delta.rate_limiter import rate_limiter
+from delta.product_catalog import product_catalog
+from delta.market_history import market_history_recorder
+from delta.websocket_feed import market_feed
+from services.monitor_engine import monitor_engine
 
 # Setup logging
 logger = setup_logger(__name__)
@@ -34,8 +46,6 @@ logger = setup_logger(__name__)
 
 # ============= GLOBALS AT MODULE LEVEL =============
 bot_app: Application = None
-algo_scheduler_task = None
-move_scheduler = None  # ✅ NEW - Global move scheduler instance
 
 
 @asynccontextmanager
@@ -46,11 +56,11 @@ async def lifespan(app: FastAPI):
     Manages:
     - Database connection
     - Bot application initialization
-    - Scheduler tasks (algo, move, job)
+    - Scheduling core (algo, move, auto-execution jobs)
     - Keep-alive service
     - Clean shutdown
     """
-    global bot_app, algo_scheduler_task, move_scheduler  # ✅ DECLARE ALL GLOBALS
+    global bot_app  # ✅ DECLARE ALL GLOBALS
     
     # Startup
     logger.info("=" * 50)
@@ -63,15 +73,41 @@ async def lifespan(app: FastAPI):
         await connect_db()
         logger.info("✓ MongoDB connected successfully")
         
+        # Decrypted credential cache (change-stream invalidation when available)
+        credential_vault.start()
+        
+        # Start pooled Delta client registry
+        logger.info("Starting Delta client registry...")
+        client_registry.start()
+        logger.info("✓ Delta client registry started")
+        
+        # Load product catalogue (background refresh)
+        logger.info("Loading product catalogue...")
+        await product_catalog.start()
+        logger.info("✓ Product catalogue loaded")
+        
+        # Record candles and option-chain snapshots (MARKET_HISTORY_ENABLED)
+        market_history_recorder.start()
+        
         # Initialize bot application
         logger.info("Initializing bot application...")
         bot_app = await create_application()
         await bot_app.initialize()
         logger.info("✓ Bot application initialized")
+        
+        # Per-chat update lanes behind the webhook
+        update_dispatcher.start(bot_app)
+        
+        # Position monitors notify users through the bot
+        monitor_engine.set_bot_application(bot_app)
+        
+        # Resume monitors persisted before the last restart
+        logger.info("Starting monitor engine...")
+        await monitor_engine.start()
+        logger.info("✓ Monitor engine started")
 
         # Start state manager cleanup task
         logger.info("Starting state manager...")
-        from bot.utils.state_manager import state_manager
         await state_manager.start_cleanup_task()
         logger.info("✓ State manager started")
         
@@ -101,21 +137,13 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Failed to send webhook error log: {e}")
         
-        # Initialize job scheduler (existing scheduler)
-        logger.info("Initializing job scheduler...")
-        await init_scheduler(bot_app)
-        logger.info("✓ Job scheduler initialized")
-        
-        # ✅ Start algo scheduler in background
-        logger.info("Starting algo scheduler...")
-        algo_scheduler_task = asyncio.create_task(start_algo_scheduler(bot_app))
-        logger.info("✓ Algo scheduler started in background")
-
-        # ✅ Start MOVE auto-trade scheduler (STORE AS GLOBAL)
-        logger.info("Starting MOVE auto-trade scheduler...")
-        move_scheduler = get_move_scheduler(bot_app)
-        await move_scheduler.start()
-        logger.info("✓ MOVE scheduler started")
+        # ✅ Start scheduling core (algo, MOVE and auto-execution jobs)
+        logger.info("Starting scheduling core...")
+        register_algo_jobs()
+        register_move_jobs(bot_app)
+        register_auto_execution_jobs()
+        await scheduling_core.start(bot_app)
+        logger.info("✓ Scheduling core started")
         
         # ✅ Start keep-alive service
         BASE_URL = os.getenv(
@@ -136,8 +164,7 @@ async def lifespan(app: FastAPI):
                 f"🟢 Bot started successfully!\n"
                 f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S IST')}\n"
                 f"Webhook: {webhook_url}\n"
-                f"Algo Scheduler: Active\n"
-                f"MOVE Scheduler: Active ✅"
+                f"Scheduler: Active ✅ ({', '.join(scheduling_core.job_types)})"
             )
         except Exception as e:
             logger.warning(f"Failed to send startup notification: {e}")
@@ -158,24 +185,13 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 50)
     
     try:
-        # ✅ Stop algo scheduler (check if running)
-        if algo_scheduler_task and not algo_scheduler_task.done():
-            logger.info("Stopping algo scheduler...")
-            algo_scheduler_task.cancel()
-            try:
-                await algo_scheduler_task
-            except asyncio.CancelledError:
-                pass
-            logger.info("✓ Algo scheduler stopped")
-
-        # ✅ Stop MOVE scheduler (use global instance)
-        if move_scheduler:
-            logger.info("Stopping MOVE scheduler...")
-            try:
-                await move_scheduler.stop()
-                logger.info("✓ MOVE scheduler stopped")
-            except Exception as e:
-                logger.error(f"Error stopping MOVE scheduler: {e}", exc_info=True)
+        # ✅ Stop scheduling core (cancels pending fires)
+        logger.info("Stopping scheduling core...")
+        try:
+            await scheduling_core.stop()
+            logger.info("✓ Scheduling core stopped")
+        except Exception as e:
+            logger.error(f"Error stopping scheduling core: {e}", exc_info=True)
         
         # ✅ Stop keep-alive service
         logger.info("Stopping keep-alive service...")
@@ -185,23 +201,22 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error stopping keep-alive: {e}", exc_info=True)
         
-        # Stop state manager cleanup task
+        # Drain queued webhook updates
+        logger.info("Stopping update dispatcher...")
+        try:
+            await update_dispatcher.stop()
+            logger.info("✓ Update dispatcher stopped")
+        except Exception as e:
+            logger.error(f"Error stopping update dispatcher: {e}", exc_info=True)
+        
+        # Stop state manager (writes pending snapshots after updates drain)
         logger.info("Stopping state manager...")
         try:
-            from bot.utils.state_manager import state_manager
             await state_manager.stop_cleanup_task()
             logger.info("✓ State manager stopped")
         except Exception as e:
             logger.error(f"Error stopping state manager: {e}", exc_info=True)
         
-        # Shutdown job scheduler
-        logger.info("Shutting down job scheduler...")
-        try:
-            await shutdown_scheduler()
-            logger.info("✓ Job scheduler shutdown complete")
-        except Exception as e:
-            logger.error(f"Error during scheduler shutdown: {e}", exc_info=True)
-        
         # Shutdown bot application
         if bot_app:
             logger.info("Shutting down bot application...")
@@ -211,6 +226,54 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.error(f"Error during bot shutdown: {e}", exc_info=True)
         
+        # Stop market history recorder
+        logger.info("Stopping market history recorder...")
+        try:
+            await market_history_recorder.stop()
+            logger.info("✓ Market history recorder stopped")
+        except Exception as e:
+            logger.error(f"Error stopping market history recorder: {e}", exc_info=True)
+        
+        # Stop product catalogue refresh
+        logger.info("Stopping product catalogue...")
+        try:
+            await product_catalog.stop()
+            logger.info("✓ Product catalogue stopped")
+        except Exception as e:
+            logger.error(f"Error stopping product catalogue: {e}", exc_info=True)
+        
+        # Stop position monitor engine
+        logger.info("Stopping monitor engine...")
+        try:
+            await monitor_engine.stop()
+            logger.info("✓ Monitor engine stopped")
+        except Exception as e:
+            logger.error(f"Error stopping monitor engine: {e}", exc_info=True)
+        
+        # Close WebSocket market data feed
+        logger.info("Stopping market data feed...")
+        try:
+            await market_feed.stop()
+            logger.info("✓ Market data feed stopped")
+        except Exception as e:
+            logger.error(f"Error stopping market data feed: {e}", exc_info=True)
+        
+        # Close pooled Delta clients
+        logger.info("Closing Delta client registry...")
+        try:
+            await client_registry.close_all()
+            logger.info("✓ Delta client registry closed")
+        except Exception as e:
+            logger.error(f"Error closing Delta client registry: {e}", exc_info=True)
+        
+        # Wipe cached credentials
+        logger.info("Stopping credential vault...")
+        try:
+            await credential_vault.stop()
+            logger.info("✓ Credential vault stopped")
+        except Exception as e:
+            logger.error(f"Error stopping credential vault: {e}", exc_info=True)
+        
         # Close database connection
         logger.info("Closing database connection...")
         try:
@@ -232,6 +295,12 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Failed to send shutdown notification: {e}")
         
+        # Ship queued Telegram logs (including the notification above)
+        try:
+            await log_shipper.stop()
+        except Exception as e:
+            logger.warning(f"Failed to flush Telegram logs: {e}")
+        
     except Exception as e:
         logger.error(f"Error during shutdown: {e}", exc_info=True)
 
@@ -266,7 +335,9 @@ async def health_check(request: Request):
         "status": "ok",
         "timestamp": datetime.now().isoformat(),
         "service": "telegram_trading_bot",
-        "method": request.method
+        "method": request.method,
+        "updates": update_dispatcher.get_stats(),
+        "states": state_manager.get_stats()
     }
 
 
@@ -274,7 +345,7 @@ async def health_check(request: Request):
 async def webhook_handler(request: Request):
     """
     Webhook endpoint to receive Telegram updates.
-    Processes updates sequentially with proper error handling.
+    Queues updates on per-chat lanes and acknowledges immediately.
     """
     try:
         # Parse incoming update
@@ -285,9 +356,9 @@ async def webhook_handler(request: Request):
         update_id = update.update_id if update else "unknown"
         logger.debug(f"Received update: {update_id}")
         
-        # Process update sequentially (await for proper ordering)
-        if update:
-            await bot_app.process_update(update)
+        # Queue on the chat's lane; a full queue asks Telegram to redeliver later
+        if update and not update_dispatcher.submit(update):
+            return Response(status_code=503)
         
         # Return 200 OK immediately
         return Response(status_code=200)
@@ -322,26 +393,52 @@ async def webhook_info():
         return {"error": str(e)}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Delta API, cache, rate limiter, log shipping and message route metrics in Prometheus text format."""
+    return Response(
+        content=(
+            delta_metrics.render_prometheus()
+            + market_data_cache.render_prometheus()
+            + rate_limiter.render_prometheus()
+            + log_shipper.render_prometheus()
+            + state_router.render_prometheus()
+        ),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/metrics/trace/{setup_id}")
+async def metrics_trace(setup_id: str):
+    """Recent Delta API calls tagged with a schedule/setup ID, oldest first."""
+    return {
+        "setup_id": setup_id,
+        "requests": delta_metrics.get_trace(setup_id)
+    }
+
+
+@app.get("/scheduler/status")
+async def scheduler_status():
+    """Get scheduling core status (all job types, timing and pending jobs)."""
+    try:
+        status = await scheduling_core.get_status()
+        status["timestamp"] = datetime.now().isoformat()
+        return status
+    except Exception as e:
+        logger.error(f"Error getting scheduler status: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
 @app.get("/algo/status")
 async def algo_status():
-    """Get algo scheduler status."""
+    """Get algo job status."""
     try:
-        from database.operations.algo_setup_ops import get_all_active_algo_setups
-        
-        setups = await get_all_active_algo_setups()
-        
+        status = await scheduling_core.get_status()
         return {
-            "status": "running" if (algo_scheduler_task and not algo_scheduler_task.done()) else "stopped",
-            "active_setups": len(setups),
-            "setups": [
-                {
-                    "user_id": s['user_id'],
-                    "execution_time": s['execution_time'],
-                    "last_execution": s.get('last_execution'),
-                    "last_status": s.get('last_execution_status')
-                }
-                for s in setups
-            ]
+            "status": status["status"],
+            **status["job_types"].get("algo", {}),
+            "timing": status["timing"],
+            "jobs": [j for j in status["jobs"] if j["job_id"].startswith("algo:")]
         }
     except Exception as e:
         logger.error(f"Error getting algo status: {e}", exc_info=True)
@@ -350,28 +447,14 @@ async def algo_status():
 
 @app.get("/move/scheduler/status")
 async def move_scheduler_status():
-    """Get MOVE auto-trade scheduler status."""
+    """Get MOVE auto-trade job status."""
     try:
-        from database.operations.move_auto_trade_ops import get_all_active_move_schedules
-        
-        schedules = await get_all_active_move_schedules()
-        
-        # ✅ Use global move_scheduler instance
-        scheduler_status = "running" if (move_scheduler and move_scheduler.running) else "stopped"
-        
+        status = await scheduling_core.get_status()
         return {
-            "status": scheduler_status,
-            "active_schedules": len(schedules),
-            "schedules": [
-                {
-                    "user_id": s['user_id'],
-                    "preset_name": s.get('preset_name'),
-                    "execution_time": s['execution_time'],
-                    "enabled": s.get('enabled', True),
-                    "last_executed": s.get('last_executed')
-                }
-                for s in schedules
-            ],
+            "status": status["status"],
+            **status["job_types"].get("move", {}),
+            "timing": status["timing"],
+            "jobs": [j for j in status["jobs"] if j["job_id"].startswith("move:")],
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
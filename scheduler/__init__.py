@@ -2,13 +2,11 @@
 Job scheduler package for automated executions.
 """
 
-from .job_scheduler import init_scheduler, shutdown_scheduler, add_auto_execution_job, remove_auto_execution_job
+from .job_scheduler import register_auto_execution_jobs, get_scheduled_jobs
 from .auto_trade_jobs import execute_auto_trade
 
 __all__ = [
-    'init_scheduler',
-    'shutdown_scheduler',
-    'add_auto_execution_job',
-    'remove_auto_execution_job',
+    'register_auto_execution_jobs',
+    'get_scheduled_jobs',
     'execute_auto_trade'
 ]
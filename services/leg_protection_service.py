@@ -3,9 +3,10 @@ Leg Protection Service - FIXED VERSION
 Cancels old SL order with BOTH product_id and order_id
 """
 
-import asyncio
+from datetime import datetime, timedelta
 from typing import Dict
 from bot.utils.logger import setup_logger
+from services.monitor_engine import monitor_engine, MonitoredStrategy, KIND_LEG_PROTECTION
 
 logger = setup_logger(__name__)
 
@@ -13,106 +14,41 @@ logger = setup_logger(__name__)
 async def start_leg_protection_monitor(strategy_details: Dict, bot_application):
     """
     Start monitoring a strategy for leg protection.
+    
+    The strategy is registered with the shared monitor engine, which
+    watches every strategy on the same API with one positions fetch per tick.
     """
-    client = None
     try:
         logger.info(f"🔍 Starting leg protection monitor for {strategy_details['ce_symbol']}/{strategy_details['pe_symbol']}")
         
-        # Get API credentials
-        from database.operations.api_ops import get_decrypted_api_credential
-        credentials = await get_decrypted_api_credential(strategy_details['api_id'])
-        
-        if not credentials:
-            logger.error("Failed to get API credentials for monitoring")
-            return
-        
-        api_key, api_secret = credentials
-        from delta.client import DeltaClient
-        client = DeltaClient(api_key, api_secret)
+        monitor_engine.set_bot_application(bot_application)
         
-        # Monitor for up to 24 hours (2880 checks at 30sec intervals)
-        leg_protection_activated = False
-        
-        for _ in range(2880):
-            await asyncio.sleep(30)  # Check every 30 seconds
-            
-            # Skip if already protected
-            if leg_protection_activated:
-                logger.info("Leg protection already activated, stopping monitor")
-                break
-            
-            try:
-                # Get current positions
-                positions = await client.get_positions()
-                
-                if not positions.get('success'):
-                    continue
-                
-                positions_data = positions['result']
-                
-                # Find CE and PE positions
-                ce_position = next((p for p in positions_data 
-                                  if strategy_details['ce_symbol'] in p.get('product', {}).get('symbol', '')), None)
-                pe_position = next((p for p in positions_data 
-                                  if strategy_details['pe_symbol'] in p.get('product', {}).get('symbol', '')), None)
-                
-                # Check if positions exist
-                ce_size = int(ce_position.get('size', 0)) if ce_position else 0
-                pe_size = int(pe_position.get('size', 0)) if pe_position else 0
-                
-                # Check if ONE leg is closed
-                ce_closed = ce_size == 0
-                pe_closed = pe_size == 0
-                
-                # ONE leg closed, other still open → PROTECT!
-                if ce_closed and not pe_closed:
-                    logger.info(f"🛡️ CE leg closed, protecting PE leg")
-                    await protect_remaining_leg(
-                        client=client,
-                        strategy=strategy_details,
-                        remaining_symbol=strategy_details['pe_symbol'],
-                        remaining_entry_price=strategy_details['pe_entry_price'],
-                        remaining_sl_order_id=strategy_details.get('pe_sl_order_id'),
-                        closed_leg='CE',
-                        bot_application=bot_application
-                    )
-                    leg_protection_activated = True
-                    break
-                
-                elif pe_closed and not ce_closed:
-                    logger.info(f"🛡️ PE leg closed, protecting CE leg")
-                    await protect_remaining_leg(
-                        client=client,
-                        strategy=strategy_details,
-                        remaining_symbol=strategy_details['ce_symbol'],
-                        remaining_entry_price=strategy_details['ce_entry_price'],
-                        remaining_sl_order_id=strategy_details.get('ce_sl_order_id'),
-                        closed_leg='PE',
-                        bot_application=bot_application
-                    )
-                    leg_protection_activated = True
-                    break
-                
-                # Both legs still open - continue monitoring
-                elif not ce_closed and not pe_closed:
-                    continue
-                
-                # Both legs closed - stop monitoring
-                else:
-                    logger.info("Both legs closed, stopping monitor")
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Error checking leg status: {e}")
-                continue
+        strategy_id = strategy_details.get('strategy_id') or (
+            f"{strategy_details['user_id']}_{strategy_details['ce_symbol']}_{strategy_details['pe_symbol']}"
+        )
         
-        logger.info("Leg protection monitoring ended")
+        # Monitor for up to 24 hours
+        monitor_engine.register(MonitoredStrategy(
+            strategy_id=strategy_id,
+            user_id=strategy_details['user_id'],
+            api_id=strategy_details['api_id'],
+            kind=KIND_LEG_PROTECTION,
+            strategy_type=strategy_details.get('strategy_type', 'straddle'),
+            call_symbol=strategy_details['ce_symbol'],
+            put_symbol=strategy_details['pe_symbol'],
+            call_entry_price=strategy_details['ce_entry_price'],
+            put_entry_price=strategy_details['pe_entry_price'],
+            direction=strategy_details.get('direction', 'long'),
+            lot_size=strategy_details.get('lot_size', 1),
+            call_sl_order_id=strategy_details.get('ce_sl_order_id'),
+            put_sl_order_id=strategy_details.get('pe_sl_order_id'),
+            call_sl_price=strategy_details.get('ce_sl_price'),
+            put_sl_price=strategy_details.get('pe_sl_price'),
+            expires_at=datetime.now() + timedelta(hours=24)
+        ))
         
     except Exception as e:
         logger.error(f"Error in leg protection monitor: {e}", exc_info=True)
-    finally:
-        if client:
-            await client.close()
 
 
 async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str, 
@@ -121,6 +57,8 @@ async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str,
     """
     Protect remaining leg with SMART stop-loss placement.
     
+    Returns True once the new protective SL is placed.
+    
     Strategy:
     1. Get current market price
     2. If current price ≈ entry price → Use dynamic SL (above current price)
@@ -134,20 +72,20 @@ async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str,
         # ✅ STEP 1: Get product_id for the remaining symbol
         logger.info(f"📍 Fetching product details for {remaining_symbol}")
         
-        product_response = await client.get_product(remaining_symbol)
+        from delta.product_catalog import product_catalog
+        product_id = await product_catalog.get_product_id(remaining_symbol)
         
-        if not product_response.get('success'):
+        if not product_id:
             logger.error(f"❌ Failed to get product for {remaining_symbol}")
-            return
+            return False
         
-        product_id = product_response['result']['id']
         logger.info(f"✅ Product ID: {product_id}")
         
         # ✅ STEP 2: Get current market price
         ticker_response = await client.get_ticker(remaining_symbol)
         if not ticker_response.get('success'):
             logger.error("Failed to fetch ticker")
-            return
+            return False
         
         ticker = ticker_response['result']
         current_mark_price = float(ticker.get('mark_price', 0))
@@ -214,7 +152,7 @@ async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str,
         if not new_sl_order.get('success'):
             error_msg = new_sl_order.get('error', {}).get('message', 'Unknown error')
             logger.error(f"❌ Failed to place new SL: {error_msg}")
-            return
+            return False
         
         new_sl_id = new_sl_order['result']['id']
         logger.info(f"✅ New protective SL placed: {new_sl_id} at ${sl_price:.2f}")
@@ -267,5 +205,8 @@ async def protect_remaining_leg(client, strategy: Dict, remaining_symbol: str,
         except Exception as e:
             logger.error(f"Failed to send notification: {e}")
         
+        return True
+        
     except Exception as e:
         logger.error(f"Error protecting remaining leg: {e}", exc_info=True)
+        return False
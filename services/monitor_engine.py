@@ -0,0 +1,675 @@
+"""
+Consolidated multi-strategy position monitor engine.
+
+Strategies are grouped per API credential. Each group fetches positions
+once per tick and evaluates every strategy on that account against the
+same snapshot, so N strategies on one account cost one REST call per
+tick instead of N. Ticks are adaptive (faster near stop prices) and
+position events from the WebSocket feed wake a group immediately.
+
+Definitions are persisted to MongoDB on registration and rehydrated at
+startup; check counts and status changes are flushed in batches.
+"""
+
+import asyncio
+import contextvars
+from dataclasses import dataclass, field, asdict, fields
+from datetime import datetime
+from typing import Dict, Any, Optional, Set, List
+
+from config import settings
+from bot.utils.logger import setup_logger
+from bot.utils.error_handler import APIError
+from database.operations.api_ops import get_decrypted_api_credential
+from database.operations.monitor_ops import (
+    save_monitors,
+    update_monitor_heartbeats,
+    get_active_monitors
+)
+from delta.client_registry import get_delta_client
+from delta.websocket_feed import market_feed
+from delta.rate_limiter import request_priority, LANE_PROTECTIVE
+
+logger = setup_logger(__name__)
+
+# Monitor kinds
+KIND_SL_TO_COST = 'sl_to_cost'
+KIND_LEG_PROTECTION = 'leg_protection'
+
+# Statuses that end monitoring
+FINAL_STATUSES = ('completed', 'both_closed', 'error', 'stopped', 'expired')
+
+# (distance to stop in %, tick seconds) - first match wins
+ADAPTIVE_TICKS = (
+    (2.0, 1.0),
+    (5.0, 3.0),
+    (10.0, 10.0),
+)
+
+
+@dataclass
+class MonitoredStrategy:
+    """A two-leg strategy watched by the monitor engine."""
+
+    strategy_id: str
+    user_id: int
+    api_id: str
+    kind: str
+    strategy_type: str
+    call_symbol: str
+    put_symbol: str
+    call_entry_price: float
+    put_entry_price: float
+    direction: str = 'long'
+    lot_size: int = 1
+    call_sl_order_id: Optional[str] = None
+    put_sl_order_id: Optional[str] = None
+    call_sl_price: Optional[float] = None
+    put_sl_price: Optional[float] = None
+    expires_at: Optional[datetime] = None
+    status: str = 'running'
+    check_count: int = 0
+    started_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    @property
+    def symbols(self) -> tuple:
+        """Both leg symbols."""
+        return (self.call_symbol, self.put_symbol)
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the strategy is still being monitored."""
+        return self.status not in FINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+    def to_document(self) -> Dict[str, Any]:
+        """Convert to compact MongoDB document (unset fields omitted)."""
+        doc = {k: v for k, v in asdict(self).items() if v is not None}
+        doc['_id'] = doc.pop('strategy_id')
+        return doc
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> 'MonitoredStrategy':
+        """Build strategy from a stored MongoDB document."""
+        known = {f.name for f in fields(cls)}
+        data = {k: v for k, v in doc.items() if k in known}
+        data['strategy_id'] = doc['_id']
+        return cls(**data)
+
+    def heartbeat(self) -> Dict[str, Any]:
+        """Fields written back on each heartbeat flush."""
+        data = {'status': self.status, 'check_count': self.check_count}
+        if self.completed_at:
+            data['completed_at'] = self.completed_at
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+def _position_symbol(position: Dict[str, Any]) -> str:
+    """Get symbol from a /positions/margined entry."""
+    return position.get('product_symbol') or position.get('product', {}).get('symbol', '')
+
+
+class AccountMonitor:
+    """
+    All monitored strategies that share one API credential.
+    """
+
+    def __init__(self, engine: 'MonitorEngine', api_id: str):
+        """
+        Initialize account group.
+
+        Args:
+            engine: Owning engine
+            api_id: API credential ID
+        """
+        self.engine = engine
+        self.api_id = api_id
+        self.strategies: Dict[str, MonitoredStrategy] = {}
+        self.symbol_index: Dict[str, Set[str]] = {}
+        self.ticks = 0
+        self.last_interval: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, strategy: MonitoredStrategy):
+        """Add strategy and index its legs."""
+        self.strategies[strategy.strategy_id] = strategy
+        for symbol in strategy.symbols:
+            self.symbol_index.setdefault(symbol, set()).add(strategy.strategy_id)
+        self.start()
+
+    def remove(self, strategy_id: str):
+        """Remove strategy and drop its legs from the index."""
+        strategy = self.strategies.pop(strategy_id, None)
+        if strategy is None:
+            return
+        for symbol in strategy.symbols:
+            ids = self.symbol_index.get(symbol)
+            if ids:
+                ids.discard(strategy_id)
+                if not ids:
+                    del self.symbol_index[symbol]
+
+    def start(self):
+        """Start the account loop if not running."""
+        if self._task is None or self._task.done():
+            # Fresh context: a loop started from a tagged job must not inherit its request tags
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self):
+        """Cancel the account loop."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _next_interval(self, positions: Dict[str, Dict[str, Any]]) -> float:
+        """
+        Pick the next tick interval from distance to the nearest stop.
+
+        Args:
+            positions: Snapshot keyed by symbol
+
+        Returns:
+            Seconds until next tick
+        """
+        nearest = None
+        unbounded = False
+
+        for strategy in self.strategies.values():
+            for symbol, sl_price in (
+                (strategy.call_symbol, strategy.call_sl_price),
+                (strategy.put_symbol, strategy.put_sl_price)
+            ):
+                position = positions.get(symbol)
+                if not position:
+                    continue
+                mark_price = float(position.get('mark_price') or 0)
+                if not sl_price or mark_price <= 0:
+                    # No stop distance to adapt to (e.g. SL-to-cost): keep a short tick
+                    unbounded = True
+                    continue
+                distance = abs(mark_price - sl_price) / sl_price * 100
+                nearest = distance if nearest is None else min(nearest, distance)
+
+        interval = float(settings.WS_FALLBACK_POLL_INTERVAL)
+        if nearest is not None:
+            for threshold, tick in ADAPTIVE_TICKS:
+                if nearest <= threshold:
+                    interval = max(tick, settings.MONITOR_MIN_TICK)
+                    break
+        if unbounded:
+            interval = min(interval, settings.MONITOR_FALLBACK_TICK)
+
+        return interval
+
+    def _retry_delay(self, failures: int) -> float:
+        """Backoff after consecutive failed fetches, capped at MONITOR_FALLBACK_TICK."""
+        return min(settings.MONITOR_MIN_TICK * 2 ** (failures - 1), settings.MONITOR_FALLBACK_TICK)
+
+    async def _evaluate(
+        self,
+        client,
+        strategy: MonitoredStrategy,
+        positions: Dict[str, Dict[str, Any]]
+    ):
+        """
+        Evaluate one strategy against the snapshot and dispatch actions.
+
+        Args:
+            client: Pooled DeltaClient for this account
+            strategy: Strategy to evaluate
+            positions: Open positions keyed by symbol
+        """
+        strategy.check_count += 1
+        self.engine._mark_dirty(strategy)
+
+        if strategy.expires_at and datetime.now() >= strategy.expires_at:
+            logger.info(f"Monitor {strategy.strategy_id} expired")
+            self.engine._finish(strategy, 'expired')
+            return
+
+        call_pos = positions.get(strategy.call_symbol)
+        put_pos = positions.get(strategy.put_symbol)
+
+        if call_pos and put_pos:
+            return
+
+        if not call_pos and not put_pos:
+            logger.info(f"🟡 Both legs closed for {strategy.strategy_id}")
+            self.engine._finish(strategy, 'both_closed')
+            return
+
+        if call_pos:
+            closed_leg, remaining_pos = 'PE', call_pos
+        else:
+            closed_leg, remaining_pos = 'CE', put_pos
+
+        strategy.status = 'moving_sl'
+        self.engine._mark_dirty(strategy, urgent=True)
+        logger.info(f"🛡️ {closed_leg} leg closed for {strategy.strategy_id}, protecting remaining leg")
+
+        try:
+            success = await self.engine._dispatch(client, strategy, closed_leg, remaining_pos)
+            self.engine._finish(strategy, 'completed' if success else 'error')
+        except Exception as e:
+            logger.error(f"Protection action failed for {strategy.strategy_id}: {e}", exc_info=True)
+            self.engine._finish(strategy, 'error', str(e))
+
+    async def _run(self):
+        """Fetch positions once per tick and evaluate every strategy."""
+        client = None
+        subscription = None
+        try:
+            credentials = await get_decrypted_api_credential(self.api_id)
+            if not credentials:
+                logger.error(f"No credentials for API {self.api_id}")
+                for strategy in list(self.strategies.values()):
+                    self.engine._finish(strategy, 'error', 'API credential not found')
+                return
+
+            api_key, api_secret = credentials
+            client = get_delta_client(api_key, api_secret)
+            subscription = await market_feed.subscribe_account(api_key, api_secret)
+
+            failures = 0
+            while self.strategies:
+                self.ticks += 1
+
+                # A failed tick (network, API error) is retried; it never ends monitoring
+                try:
+                    response = await client.get_positions()
+                    if not response.get('success'):
+                        raise APIError(f"positions fetch unsuccessful: {response.get('error')}")
+
+                    positions = {}
+                    for pos in response.get('result', []):
+                        if float(pos.get('size', 0) or 0) != 0:
+                            positions[_position_symbol(pos)] = pos
+
+                    for strategy in list(self.strategies.values()):
+                        await self._evaluate(client, strategy, positions)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    failures += 1
+                    delay = self._retry_delay(failures)
+                    logger.warning(
+                        f"Monitor tick failed for API {self.api_id} "
+                        f"(attempt {failures}, retrying in {delay:.0f}s): {e}"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                failures = 0
+                if not self.strategies:
+                    break
+
+                self.last_interval = self._next_interval(positions)
+
+                # Wake early on a position event for any monitored leg
+                await subscription.wait_for(
+                    lambda event: event.get('symbol') in self.symbol_index,
+                    timeout=self.last_interval
+                )
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in account monitor {self.api_id}: {e}", exc_info=True)
+            for strategy in list(self.strategies.values()):
+                self.engine._finish(strategy, 'error', str(e))
+        finally:
+            if subscription:
+                subscription.close()
+            if client:
+                await client.close()
+            self.engine._account_done(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get account group statistics."""
+        return {
+            'strategies': len(self.strategies),
+            'symbols': len(self.symbol_index),
+            'ticks': self.ticks,
+            'last_interval': self.last_interval
+        }
+
+
+class MonitorEngine:
+    """
+    Registry of monitored strategies grouped by API credential.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        """
+        Initialize monitor engine.
+
+        Args:
+            flush_interval: Seconds between batched heartbeat writes
+        """
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.MONITOR_FLUSH_INTERVAL
+        )
+        self.strategies: Dict[str, MonitoredStrategy] = {}
+        self.accounts: Dict[str, AccountMonitor] = {}
+        self.bot_application = None
+        self.restored = 0
+        self.flushes = 0
+        self._pending_saves: Dict[str, MonitoredStrategy] = {}
+        self._dirty: Dict[str, MonitoredStrategy] = {}
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Restored mid-protection; their new stop may already be placed
+        self._resumed_protection: Set[str] = set()
+
+    def set_bot_application(self, bot_application):
+        """Set bot application used for user notifications."""
+        self.bot_application = bot_application
+
+    def register(self, strategy: MonitoredStrategy, persist: bool = True) -> bool:
+        """
+        Start monitoring a strategy.
+
+        Args:
+            strategy: Strategy definition
+            persist: Save the definition to MongoDB (False when rehydrating)
+
+        Returns:
+            True if registered, False if already monitored
+        """
+        existing = self.strategies.get(strategy.strategy_id)
+        if existing and existing.is_active:
+            logger.warning(f"Strategy {strategy.strategy_id} already being monitored")
+            return False
+
+        self.strategies[strategy.strategy_id] = strategy
+
+        account = self.accounts.get(strategy.api_id)
+        if account is None:
+            account = AccountMonitor(self, strategy.api_id)
+            self.accounts[strategy.api_id] = account
+        account.add(strategy)
+
+        if persist:
+            self._pending_saves[strategy.strategy_id] = strategy
+            self._flush_event.set()
+
+        logger.info(f"🔍 Monitoring {strategy.kind} for {strategy.strategy_id} ({strategy.call_symbol}/{strategy.put_symbol})")
+        return True
+
+    def unregister(self, strategy_id: str, status: str = 'stopped') -> bool:
+        """
+        Stop monitoring a strategy.
+
+        Args:
+            strategy_id: Strategy ID
+            status: Final status to record
+
+        Returns:
+            True if strategy was being monitored
+        """
+        strategy = self.strategies.get(strategy_id)
+        if strategy is None or not strategy.is_active:
+            return False
+
+        self._finish(strategy, status)
+        return True
+
+    def get(self, strategy_id: str) -> Optional[MonitoredStrategy]:
+        """Get a monitored strategy by ID."""
+        return self.strategies.get(strategy_id)
+
+    def get_all(self) -> List[MonitoredStrategy]:
+        """Get all strategies (active and finished)."""
+        return list(self.strategies.values())
+
+    def _finish(self, strategy: MonitoredStrategy, status: str, error: Optional[str] = None):
+        """Record final status and drop strategy from its account group."""
+        strategy.status = status
+        strategy.completed_at = datetime.now()
+        if error:
+            strategy.error = error
+
+        account = self.accounts.get(strategy.api_id)
+        if account:
+            account.remove(strategy.strategy_id)
+
+        self._mark_dirty(strategy, urgent=True)
+        logger.info(f"🛑 Stopped monitoring {strategy.strategy_id} ({status})")
+
+    def _mark_dirty(self, strategy: MonitoredStrategy, urgent: bool = False):
+        """
+        Queue a strategy's heartbeat for the next batched write.
+
+        Args:
+            strategy: Changed strategy
+            urgent: Flush now instead of waiting for the interval (status changes)
+        """
+        self._dirty[strategy.strategy_id] = strategy
+        if urgent:
+            self._flush_event.set()
+
+    def _account_done(self, account: AccountMonitor):
+        """Drop an account group whose loop has exited with nothing left to watch."""
+        if not account.strategies and self.accounts.get(account.api_id) is account:
+            del self.accounts[account.api_id]
+
+    async def _dispatch(
+        self,
+        client,
+        strategy: MonitoredStrategy,
+        closed_leg: str,
+        remaining_pos: Dict[str, Any]
+    ) -> bool:
+        """
+        Run the protection action for a strategy whose leg closed.
+
+        Args:
+            client: Pooled DeltaClient
+            strategy: Strategy with one closed leg
+            closed_leg: 'CE' or 'PE'
+            remaining_pos: Position of the open leg
+
+        Returns:
+            True if the action succeeded
+        """
+        remaining_is_call = closed_leg == 'PE'
+        entry_price = strategy.call_entry_price if remaining_is_call else strategy.put_entry_price
+        remaining_symbol = strategy.call_symbol if remaining_is_call else strategy.put_symbol
+        old_sl_order_id = strategy.call_sl_order_id if remaining_is_call else strategy.put_sl_order_id
+
+        # Stop placement and cancels pre-empt polling on this key's rate limit
+        with request_priority(LANE_PROTECTIVE):
+            if strategy.kind == KIND_SL_TO_COST:
+                from services.sl_monitor_service import _move_sl_to_cost
+                return await _move_sl_to_cost(client, remaining_pos, entry_price)
+
+            if strategy.strategy_id in self._resumed_protection:
+                self._resumed_protection.discard(strategy.strategy_id)
+                if await self._finish_resumed_protection(client, remaining_pos, remaining_symbol, old_sl_order_id):
+                    return True
+
+            from services.leg_protection_service import protect_remaining_leg
+            return await protect_remaining_leg(
+                client=client,
+                strategy=strategy.to_dict(),
+                remaining_symbol=remaining_symbol,
+                remaining_entry_price=entry_price,
+                remaining_sl_order_id=old_sl_order_id,
+                closed_leg=closed_leg,
+                bot_application=self.bot_application
+            )
+
+    async def _finish_resumed_protection(
+        self,
+        client,
+        remaining_pos: Dict[str, Any],
+        remaining_symbol: str,
+        old_sl_order_id: Optional[str]
+    ) -> bool:
+        """
+        Complete a leg protection interrupted by a restart.
+
+        protect_remaining_leg places the new stop before cancelling the old
+        one, so a crash in between leaves both open. If a stop other than
+        the original one is already open on the remaining leg, only the old
+        stop is cancelled.
+
+        Args:
+            client: Pooled DeltaClient
+            remaining_pos: Position of the open leg
+            remaining_symbol: Symbol of the open leg
+            old_sl_order_id: Stop placed with the strategy
+
+        Returns:
+            True if the new stop was already in place
+
+        Raises:
+            APIError: If open orders cannot be checked
+        """
+        from delta.product_catalog import product_catalog
+        product_id = remaining_pos.get('product_id') or await product_catalog.get_product_id(remaining_symbol)
+
+        response = await client.get_open_orders(product_id)
+        if not response.get('success'):
+            # Placing blind could leave a second protective stop
+            raise APIError(f"open orders check failed for {remaining_symbol}: {response.get('error')}")
+
+        stops = [o for o in response.get('result', []) if o.get('stop_order_type') == 'stop_loss_order']
+        new_stops = [o for o in stops if str(o.get('id')) != str(old_sl_order_id)]
+        if not new_stops:
+            return False
+
+        logger.info(f"🛡️ Protective stop {new_stops[0].get('id')} already open on {remaining_symbol}, not placing another")
+        if old_sl_order_id and len(stops) > len(new_stops):
+            cancel = await client.cancel_order(product_id=product_id, order_id=old_sl_order_id)
+            if not cancel.get('success'):
+                logger.warning(f"Failed to cancel old SL {old_sl_order_id}: {cancel.get('error')}")
+        return True
+
+    # ==================== Persistence ====================
+
+    async def flush(self):
+        """
+        Write pending definitions and heartbeats in batched bulk writes.
+
+        Heartbeats only update existing records, so a definition whose
+        save fails is queued again (as are failed heartbeats) and retried
+        on the next flush.
+        """
+        saves, self._pending_saves = self._pending_saves, {}
+        dirty, self._dirty = self._dirty, {}
+
+        if saves and await save_monitors(s.to_document() for s in saves.values()) is None:
+            for strategy_id, strategy in saves.items():
+                self._pending_saves.setdefault(strategy_id, strategy)
+
+        heartbeats = [
+            (strategy_id, strategy.heartbeat())
+            for strategy_id, strategy in dirty.items()
+            if strategy_id not in saves
+        ]
+        if heartbeats and await update_monitor_heartbeats(heartbeats) is None:
+            for strategy_id, _ in heartbeats:
+                self._dirty.setdefault(strategy_id, dirty[strategy_id])
+
+        if saves or heartbeats:
+            self.flushes += 1
+
+    async def _flush_loop(self):
+        """Flush every flush_interval seconds, or sooner on status changes."""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error flushing monitor heartbeats: {e}", exc_info=True)
+
+    async def restore(self) -> int:
+        """
+        Rehydrate active monitors saved before the last shutdown.
+
+        Returns:
+            Number of monitors restored
+        """
+        documents = await get_active_monitors(FINAL_STATUSES)
+        restored = 0
+
+        for doc in documents:
+            try:
+                strategy = MonitoredStrategy.from_document(doc)
+            except Exception as e:
+                logger.error(f"Skipping invalid monitor record {doc.get('_id')}: {e}")
+                continue
+
+            if strategy.status == 'moving_sl':
+                strategy.status = 'running'
+                self._resumed_protection.add(strategy.strategy_id)
+            if self.register(strategy, persist=False):
+                restored += 1
+
+        self.restored = restored
+        return restored
+
+    async def start(self):
+        """Rehydrate persisted monitors and start the heartbeat flusher."""
+        if self._flush_task and not self._flush_task.done():
+            logger.warning("Monitor engine already started")
+            return
+
+        restored = await self.restore()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Monitor engine started ({restored} monitor(s) restored)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics."""
+        return {
+            'active': sum(1 for s in self.strategies.values() if s.is_active),
+            'total': len(self.strategies),
+            'restored': self.restored,
+            'flushes': self.flushes,
+            'pending_writes': len(self._pending_saves) + len(self._dirty),
+            'accounts': {api_id: acc.get_stats() for api_id, acc in self.accounts.items()}
+        }
+
+    async def stop(self):
+        """
+        Stop every account loop and flush pending writes.
+
+        Active monitors keep their stored status so the next start resumes them.
+        """
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+
+        for account in list(self.accounts.values()):
+            await account.stop()
+        self.accounts.clear()
+
+        await self.flush()
+        logger.info("Monitor engine stopped")
+
+
+# Global monitor engine instance
+monitor_engine = MonitorEngine()
@@ -2,12 +2,15 @@
 Manual trade execution.
 """
 
+import asyncio
 from typing import Dict, Any
 from datetime import datetime
 
 from bot.utils.logger import setup_logger, log_trade_execution
-from delta.client import DeltaClient
-from delta.utils.expiry_parser import parse_expiry_code
+from bot.utils.error_handler import APIError
+from delta.client_registry import get_delta_client
+from delta.expiry_calendar import expiry_calendar
+from delta.product_catalog import product_catalog
 from strategies.straddle import StraddleStrategy
 from strategies.strangle import StrangleStrategy
 from .stoploss_manager import place_stoploss_orders
@@ -43,13 +46,14 @@ async def execute_manual_strategy(
         logger.info(f"Executing manual strategy: {preset.name} for user {user_id}")
         
         # Create Delta client
-        client = DeltaClient(api_key, api_secret)
+        client = get_delta_client(api_key, api_secret)
         
         try:
             # Step 1: Fetch spot price
-            spot_price = await client.get_spot_price(preset.asset)
-            
-            if spot_price == 0:
+            try:
+                spot_price = await client.get_spot_price(preset.asset)
+            except APIError as e:
+                logger.error(f"Failed to fetch spot price for {preset.asset}: {e}")
                 return {
                     'success': False,
                     'error': 'Failed to fetch spot price'
@@ -66,8 +70,15 @@ async def execute_manual_strategy(
             # Step 3: Calculate strikes
             strikes = await strategy.calculate_strikes(spot_price, params)
             
-            # Step 4: Find products (option contracts)
-            expiry_date = parse_expiry_code(preset.expiry_code)
+            # Step 4: Find products (option contracts) for the listed expiry
+            await product_catalog.ensure_fresh()
+            expiry = expiry_calendar.resolve(preset.asset, preset.expiry_code)
+            if not expiry:
+                return {
+                    'success': False,
+                    'error': f"No {preset.expiry_code} expiry listed for {preset.asset}"
+                }
+            expiry_date = expiry.settlement
             expiry_str = expiry_date.strftime('%d%b%y').upper()
             
             # Construct option symbols
@@ -96,11 +107,20 @@ async def execute_manual_strategy(
             orders = strategy.generate_order_list(strikes, product_ids)
             
             # Step 6: Get market prices for limit orders
-            call_ticker = await client.get_ticker(call_symbol)
-            put_ticker = await client.get_ticker(put_symbol)
+            # (fresh tickers; the cached option chain can be up to a minute old)
+            call_ticker, put_ticker = await asyncio.gather(
+                client.get_ticker(call_symbol),
+                client.get_ticker(put_symbol)
+            )
+            
+            if not call_ticker.get('success') or not put_ticker.get('success'):
+                return {
+                    'success': False,
+                    'error': 'Failed to fetch option prices'
+                }
             
-            call_price = call_ticker['result'].get('mark_price', 0)
-            put_price = put_ticker['result'].get('mark_price', 0)
+            call_price = float(call_ticker['result'].get('mark_price') or 0)
+            put_price = float(put_ticker['result'].get('mark_price') or 0)
             
             # Add limit prices to orders
             orders[0]['limit_price'] = str(call_price)